@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        benchmarks/bench_cascade.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Per-tick cost of a chain of output timeframes: legacy chained loggers versus Crypto_logger_cascade.
+# Usage:       python -m benchmarks.bench_cascade --symbols 200
+
+# Library imports.
+from benchmarks.bench_log_storage import make_output_buffer
+from benchmarks.bench_resample import legacy_put, make_parent_bars
+from utils.crypto_logger_cascade import Crypto_logger_cascade
+from utils.resample import resample
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+# Function definitions.
+def legacy_chain(datasets: dict, 
+                 dataset: pd.DataFrame, 
+                 intervals: list, 
+                 buffer_sizes: dict) -> dict:
+    """Chained Crypto_logger_output.get_and_put_next calls, each fed the tail(2) of its parent."""
+    for interval in intervals:
+        dataset = legacy_put(datasets[interval], dataset.tail(2).copy(), 
+                             interval, buffer_sizes[interval])
+        datasets[interval] = dataset
+    return datasets
+
+def reference_chain(feed: pd.DataFrame, intervals: list) -> dict:
+    """Resample every timeframe from the full history of its parent (resample rounds its input index)."""
+    references = {}
+    for interval in intervals:
+        feed = resample(feed.copy(), interval)
+        references[interval] = feed
+    return references
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=200)
+    parser.add_argument('--interval-input', default='5s')
+    parser.add_argument('--intervals', nargs='+', default=['15s', '1min', '30min', '1h', '1d'])
+    parser.add_argument('--warmup', type=int, default=18000)
+    parser.add_argument('--ticks', type=int, default=24)
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())
+    history = make_output_buffer(args.symbols, args.warmup, interval=args.interval_input)
+    feed = pd.concat([history, make_parent_bars(history, args.ticks, args.interval_input)])
+    print('{} symbols, {} input bars, {} warmup bars, {} ticks.'.format(
+        args.symbols, args.interval_input, args.warmup, args.ticks))
+    print('{:>7s} {:>14s} {:>14s} {:>8s}'.format('stages', 'chain ms', 'cascade ms', 'speedup'))
+    for n_stages in range(1, len(args.intervals) + 1):
+        intervals = args.intervals[:n_stages]
+        buffer_sizes = {interval: 1500 if interval == '1min' else 60 for interval in intervals}
+        warm = reference_chain(history, intervals)
+        legacy_datasets = {interval: warm[interval].tail(buffer_sizes[interval]) for interval in intervals}
+        cascade = Crypto_logger_cascade(intervals=intervals, interval_input=args.interval_input, 
+                                        input_log_name='output', buffer_sizes=buffer_sizes)
+        for interval in intervals:
+            cascade.datasets['output_' + interval] = legacy_datasets[interval]
+        legacy_timings = []
+        timings = []
+        for t in range(args.warmup + 1, args.warmup + args.ticks + 1):
+            tick = feed.iloc[t - 2:t]
+            t1 = time.perf_counter()
+            legacy_datasets = legacy_chain(legacy_datasets, tick, intervals, buffer_sizes)
+            t2 = time.perf_counter()
+            cascade.get_and_put_next(dataset=tick)
+            t3 = time.perf_counter()
+            legacy_timings.append(t2 - t1)
+            timings.append(t3 - t2)
+        legacy_time = np.median(legacy_timings)
+        cascade_time = np.median(timings)
+        print('{:7d} {:14.2f} {:14.3f} {:7.0f}x'.format(
+            n_stages, legacy_time * 1000, cascade_time * 1000, legacy_time / cascade_time))
+
+    # The timed cascades restart from logged bars, so check one fed from the first input bar.
+    cascade = Crypto_logger_cascade(intervals=args.intervals, interval_input=args.interval_input, 
+                                    input_log_name='output', buffer_sizes=buffer_sizes)
+    for t in range(2, feed.shape[0] + 1):
+        cascade.get_and_put_next(dataset=feed.iloc[t - 2:t])
+    references = reference_chain(feed, args.intervals)
+    for interval in args.intervals:
+        pd.testing.assert_frame_equal(cascade.datasets['output_' + interval], 
+                                      references[interval].tail(buffer_sizes[interval]), 
+                                      check_freq=False)
+    print('Every timeframe equals the resample of its full parent history.')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        benchmarks/bench_clean_data.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: The per-ticker clean_data loop versus the whole-market clean_data.
+# Usage:       python -m benchmarks.bench_clean_data --symbols 1500 --rows 2880
+#              python -m benchmarks.bench_clean_data --legacy-symbols 100 (the full loop takes minutes)
+
+# Library imports.
+from benchmarks.bench_conversion_table import time_it
+from utils.ohlcv_cleaning import clean_data
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+# Function definitions.
+def legacy_clean_data(data):
+    """The former clean_data, kept as the reference."""
+    def clean_ticker(data, main_ticker, volume_columns=None, 
+                     rolling_volume_columns=None):
+        df = data[main_ticker].copy()
+        data = data.sort_index(axis='columns')
+        data = data.drop(columns=[main_ticker])
+        if volume_columns is not None and len(volume_columns) > 0:
+            df[volume_columns] = df[volume_columns].fillna(value=0.0)
+        if rolling_volume_columns is not None and \
+                len(rolling_volume_columns) > 0:
+            df[rolling_volume_columns] = \
+                df[rolling_volume_columns].fillna(method='pad').fillna(method='backfill')
+        s = pd.concat([df['open'], df['close']])
+        s = s.sort_index(kind='merge')
+        s = s.fillna(method='pad')
+        s = s.fillna(method='backfill')
+        df['open'] = s.iloc[0::2]
+        df['close'] = s.iloc[1::2]
+        df.loc[df['high'].isna(),'high'] = \
+            df.loc[df['high'].isna(),['open', 'high', 'low', 'close']].max(axis='columns')
+        df.loc[df['low'].isna(),'low'] = \
+            df.loc[df['low'].isna(),['open', 'high', 'low', 'close']].min(axis='columns')
+        column_names = df.columns.tolist()
+        columns = [(main_ticker, column) for column in column_names]
+        df.columns = pd.MultiIndex.from_tuples(columns)
+        df.columns = df.columns.set_names(['symbol', 'feature'])
+        data = pd.concat([data, df], axis='columns')
+        return data
+    data.columns = data.columns.set_names(['symbol', 'feature'])
+    columns = data.columns.tolist()
+    tickers_list = data.columns.get_level_values('symbol').unique().tolist()
+    features_list = data.columns.get_level_values('feature').unique().tolist()
+    volume_columns = [feature for feature in features_list if feature.endswith('volume')]
+    rolling_volume_columns = [feature for feature in volume_columns if feature.startswith('rolling_')]
+    volume_columns = [feature for feature in volume_columns if not feature.startswith('rolling_')]
+    for main_ticker in tickers_list:
+        data = clean_ticker(data, main_ticker, volume_columns=volume_columns, 
+                            rolling_volume_columns=rolling_volume_columns)
+    data = data[columns]
+    return data
+
+def make_gapped_pairs(n_symbols: int, 
+                      n_rows: int, 
+                      features: list, 
+                      nan_fraction: float = 0.05, 
+                      seed: int = 0) -> pd.DataFrame:
+    """Return a download_pairs-like frame with scattered gaps, late listings and early delistings."""
+    rng = np.random.default_rng(seed)
+    symbols = ['X{:04d}'.format(i) for i in range(n_symbols)]
+    columns = pd.MultiIndex.from_product([symbols, features], names=['symbol', 'feature'])
+    index = pd.date_range('2022-12-01', periods=n_rows, freq='1min', name='date')
+    values = np.exp(rng.normal(0, 1, size=(n_rows, n_symbols, len(features))))
+    values[rng.random(values.shape) < nan_fraction] = np.nan
+    listed = rng.integers(n_rows, size=n_symbols)
+    late = rng.random(n_symbols) < 0.1
+    rows = np.arange(n_rows)[:, None]
+    values[(rows < listed) & late] = np.nan
+    values[(rows > listed) & (rng.random(n_symbols) < 0.02)] = np.nan
+    return pd.DataFrame(values.reshape(n_rows, -1), index=index, columns=columns)
+
+def check(pairs: pd.DataFrame) -> None:
+    """Assert that clean_data reproduces the loop, on sorted and shuffled dates and mixed dtypes."""
+    pd.testing.assert_frame_equal(clean_data(pairs.copy()), legacy_clean_data(pairs.copy()))
+    shuffled = pairs.sample(frac=1, random_state=0)
+    pd.testing.assert_frame_equal(clean_data(shuffled.copy()), legacy_clean_data(shuffled.copy()))
+    mixed = pairs.copy()
+    mixed[(mixed.columns[0][0], 'n_trades')] = np.arange(mixed.shape[0])
+    mixed[(mixed.columns[6][0], 'n_trades')] = np.arange(mixed.shape[0])
+    mixed = mixed.sort_index(axis='columns')
+    pd.testing.assert_frame_equal(clean_data(mixed.copy()), legacy_clean_data(mixed.copy()))
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=1500)
+    parser.add_argument('--rows', type=int, default=2880)
+    parser.add_argument('--legacy-symbols', type=int, default=None, 
+                        help='Symbols cleaned by the loop (all by default, which is slow).')
+    parser.add_argument('--nan-fraction', type=float, default=0.05)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    features = ['open', 'high', 'low', 'close', 'base_volume', 'quote_volume']
+    check(make_gapped_pairs(20, 200, features + ['rolling_base_volume', 'rolling_quote_volume'], 
+                            nan_fraction=0.2))
+    pairs = make_gapped_pairs(args.symbols, args.rows, features, nan_fraction=args.nan_fraction)
+    legacy_symbols = args.symbols if args.legacy_symbols is None else args.legacy_symbols
+    legacy_pairs = pairs.iloc[:, :legacy_symbols * len(features)]
+
+    t1 = time.perf_counter()
+    expected = legacy_clean_data(legacy_pairs.copy())
+    legacy_time = time.perf_counter() - t1
+    pd.testing.assert_frame_equal(clean_data(pairs.copy()).iloc[:, :legacy_pairs.shape[1]], expected)
+    copy_time = time_it(lambda: pairs.copy(), repeat=args.repeat)
+    vectorized_time = time_it(lambda: clean_data(pairs.copy()), repeat=args.repeat) - copy_time
+    print('{} symbols x {} rows x {} features, {:.0%} missing'.format(
+        args.symbols, args.rows, len(features), np.isnan(pairs.to_numpy()).mean()))
+    print('per-ticker loop: {:.1f} s for {} symbols | whole market: {:.1f} ms for {} symbols'.format(
+        legacy_time, legacy_symbols, vectorized_time * 1000, args.symbols))
+    if legacy_symbols == args.symbols:
+        print('{:.0f}x faster'.format(legacy_time / vectorized_time))
+    print('The whole-market clean_data matched the per-ticker loop.')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        benchmarks/bench_conversion_table.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Per-tick latency of the USDT pricing stage of process_conversion_table.
+# Usage:       python -m benchmarks.bench_conversion_table --symbols 2000
+
+# Library imports.
+from typing import Callable
+from benchmarks.synthetic_market import make_exchange_info, make_ticker
+from benchmarks.synthetic_market import make_shortest_paths_to_USDT
+from utils.conversion import convert_price, convert_prices
+from utils.conversion_table import get_conversion_table_from_binance
+from utils.conversion_table import process_conversion_table
+import argparse
+import time
+import pandas as pd
+
+# Class definition.
+class Synthetic_client:
+    def __init__(self, exchange_info: pd.DataFrame, seed: int = 0):
+        self.exchange_info = exchange_info
+        self.seed = seed
+        self.t = 0
+
+    def get_ticker(self):
+        self.t += 1
+        return make_ticker(self.exchange_info, seed=self.seed, t=self.t)
+
+# Function definitions.
+def time_it(function: Callable, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        t1 = time.perf_counter()
+        function()
+        t2 = time.perf_counter()
+        timings.append(t2 - t1)
+    return min(timings)
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    exchange_info = make_exchange_info(n_symbols=args.symbols, seed=0)
+    shortest_paths = make_shortest_paths_to_USDT(exchange_info)
+    client = Synthetic_client(exchange_info)
+    conversion_table = get_conversion_table_from_binance(
+        client=client, exchange_info=exchange_info)
+    base_assets = conversion_table['base_asset'].unique().tolist()
+
+    def legacy_pricing():
+        for key in ['open', 'close']:
+            [convert_price(size=1, from_asset=base_asset, to_asset='USDT', 
+                           conversion_table=conversion_table, 
+                           exchange_info=exchange_info, key=key, 
+                           priority='accuracy', shortest_path=shortest_paths)
+             for base_asset in base_assets]
+
+    def batched_pricing():
+        convert_prices(from_assets=base_assets, to_asset='USDT', 
+                       conversion_table=conversion_table, 
+                       exchange_info=exchange_info, keys=['open', 'close'], 
+                       priority='accuracy', shortest_paths=shortest_paths)
+
+    def tick():
+        process_conversion_table(
+            conversion_table=conversion_table, exchange_info=exchange_info, 
+            as_pair=False, minimal=False, extra_minimal=True, 
+            super_extra_minimal=False, convert_to_USDT=False, 
+            shortest_paths=shortest_paths)
+
+    print('Symbols:', conversion_table.shape[0], '| base assets:', len(base_assets))
+    legacy = time_it(legacy_pricing, repeat=1)
+    batched = time_it(batched_pricing, repeat=args.repeat)
+    print('Legacy convert_price per asset:  {:8.2f} ms'.format(legacy * 1000))
+    print('Batched convert_prices:          {:8.2f} ms ({:.0f}x)'.format(
+        batched * 1000, legacy / batched))
+    print('process_conversion_table (tick): {:8.2f} ms'.format(
+        time_it(tick, repeat=args.repeat) * 1000))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        benchmarks/bench_conversion_table_modes.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Every mode of process_conversion_table against the outputs pinned from the baseline.
+# Usage:       python -m benchmarks.bench_conversion_table_modes
+
+# Library imports.
+from typing import Dict
+from benchmarks.bench_conversion_table import time_it
+from benchmarks.bench_suite import Synthetic_market
+from os.path import dirname, join
+import argparse
+import hashlib
+import itertools
+import json
+import pandas as pd
+
+# Variable definitions.
+MODE_FLAGS = ['as_pair', 'minimal', 'extra_minimal', 'super_extra_minimal', 'convert_to_USDT']
+PINNED_OUTPUTS = join(dirname(__file__), 'conversion_table_modes.json')
+
+# Function definitions.
+def get_mode_name(modes: Dict[str, bool]) -> str:
+    return ' '.join(flag for flag in MODE_FLAGS if modes[flag]) or 'none'
+
+def describe_frame(frame: pd.DataFrame) -> Dict[str, object]:
+    """Return the shape, the columns, the dtypes and a digest of every cell and index label."""
+    digest = hashlib.sha256(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    return {'shape': list(frame.shape), 
+            'columns': frame.columns.tolist(), 
+            'dtypes': frame.dtypes.astype(str).tolist(), 
+            'digest': digest.hexdigest()}
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--pin', action='store_true', 
+                        help='Rewrite the pinned outputs from this tree (after an intended change).')
+    args = parser.parse_args()
+
+    from utils.conversion_table import process_conversion_table
+    market = Synthetic_market(n_symbols=args.symbols, n_rows=1, n_ticks=1)
+    tickers = market.get_tickers()
+    shortest_paths = market.get_shortest_paths()
+    key = str(args.symbols)
+    with open(PINNED_OUTPUTS, 'r') as f:
+        pinned = json.load(f)
+    if not args.pin and key not in pinned:
+        raise SystemExit('No outputs pinned for {} symbols (pinned: {}).'.format(
+            args.symbols, ', '.join(sorted(pinned, key=int))))
+
+    outputs = {}
+    print('{} symbols, {} mode combinations'.format(tickers.shape[0], 2 ** len(MODE_FLAGS)))
+    for flags in itertools.product([False, True], repeat=len(MODE_FLAGS)):
+        modes = dict(zip(MODE_FLAGS, flags))
+        name = get_mode_name(modes)
+        process = lambda: process_conversion_table(
+            conversion_table=tickers.copy(), exchange_info=market.exchange_info, 
+            shortest_paths=shortest_paths, **modes)
+        outputs[name] = describe_frame(process())
+        if not args.pin:
+            assert outputs[name] == pinned[key][name], name
+        print('{:66s} {:8.1f} ms'.format(name, time_it(process, repeat=args.repeat) * 1000))
+    if args.pin:
+        pinned[key] = outputs
+        with open(PINNED_OUTPUTS, 'w') as f:
+            json.dump(pinned, f, indent=1, sort_keys=True)
+            f.write('\n')
+        print('Pinned the outputs of every mode to {}.'.format(PINNED_OUTPUTS))
+    else:
+        print('Every mode matched its pinned output.')
+
+if __name__ == '__main__':
+    main()
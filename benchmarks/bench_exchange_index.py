@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        benchmarks/bench_exchange_index.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: DataFrame-filter symbol lookups versus the compiled ExchangeIndex.
+# Usage:       python -m benchmarks.bench_exchange_index --symbols 2000
+
+# Library imports.
+from benchmarks.bench_conversion_table import Synthetic_client, time_it
+from benchmarks.synthetic_market import make_exchange_info
+from utils.conversion import compact_float_string, round_step_size
+from utils.conversion import get_assets_from_pair, make_tradable_quantity
+from utils.conversion_table import get_conversion_table_from_binance
+from utils.exchange_index import ExchangeIndex
+import argparse
+import pandas as pd
+
+# Function definitions.
+def legacy_get_assets_from_pair(pair: str, exchange_info: pd.DataFrame):
+    pair_info = exchange_info[exchange_info['symbol'] == pair]
+    return pair_info['base_asset'].iat[-1], pair_info['quote_asset'].iat[-1]
+
+def legacy_make_tradable_quantity(pair: str, 
+                                  coins_available: float, 
+                                  exchange_info: pd.DataFrame) -> str:
+    pair_exchange_info = exchange_info[exchange_info['symbol'] == pair].iloc[0]
+    tick_size = float(pair_exchange_info['tick_size'])
+    precision = pair_exchange_info['quote_precision']
+    quantity = round_step_size(quantity=float(coins_available), step_size=tick_size)
+    return compact_float_string(float(quantity), precision)
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    exchange_info = make_exchange_info(n_symbols=args.symbols, seed=0)
+    symbols = exchange_info['symbol'].tolist()
+    client = Synthetic_client(exchange_info)
+    ticker = client.get_ticker()
+    client.get_ticker = lambda: ticker
+
+    for symbol in symbols[::97]:
+        assert legacy_get_assets_from_pair(symbol, exchange_info) == \
+            get_assets_from_pair(symbol, exchange_info)
+        assert legacy_make_tradable_quantity(symbol, 123.456789, exchange_info) == \
+            make_tradable_quantity(symbol, 123.456789, exchange_info)
+
+    def legacy_lookups():
+        for symbol in symbols:
+            legacy_get_assets_from_pair(symbol, exchange_info)
+
+    def indexed_lookups():
+        for symbol in symbols:
+            get_assets_from_pair(symbol, exchange_info)
+
+    def legacy_quantities():
+        for symbol in symbols:
+            legacy_make_tradable_quantity(symbol, 123.456789, exchange_info)
+
+    def indexed_quantities():
+        for symbol in symbols:
+            make_tradable_quantity(symbol, 123.456789, exchange_info)
+
+    def legacy_table():
+        conversion_table = pd.DataFrame(ticker)
+        conversion_table = conversion_table[
+            conversion_table['symbol'].isin(exchange_info['symbol'])].copy()
+        conversion_table['base_asset'] = conversion_table['symbol'].apply(
+            lambda x: legacy_get_assets_from_pair(x, exchange_info)[0])
+        conversion_table['quote_asset'] = conversion_table['symbol'].apply(
+            lambda x: legacy_get_assets_from_pair(x, exchange_info)[1])
+
+    def indexed_table():
+        get_conversion_table_from_binance(client=client, exchange_info=exchange_info)
+
+    build = time_it(lambda: ExchangeIndex(exchange_info), repeat=args.repeat)
+    print('Symbols:', len(symbols))
+    print('ExchangeIndex build:             {:8.2f} ms'.format(build * 1000))
+    for (name, legacy, indexed) in [
+            ('get_assets_from_pair', legacy_lookups, indexed_lookups), 
+            ('make_tradable_quantity', legacy_quantities, indexed_quantities), 
+            ('conversion table assets', legacy_table, indexed_table)]:
+        legacy_time = time_it(legacy, repeat=1)
+        indexed_time = time_it(indexed, repeat=args.repeat)
+        print('{:24s} legacy {:9.2f} ms | indexed {:8.2f} ms ({:.0f}x)'.format(
+            name, legacy_time * 1000, indexed_time * 1000, legacy_time / indexed_time))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        benchmarks/bench_frame_assembly.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Frames grown by pd.concat in a loop versus assemble_frame and assemble_rows.
+# Usage:       python -m benchmarks.bench_frame_assembly --symbols 1500 --rows 240
+
+# Library imports.
+from benchmarks.bench_conversion_table import time_it
+from benchmarks.synthetic_market import make_exchange_info, make_exchange_info_payload
+from utils.conversion import get_base_asset_from_pair
+from utils.exchange import Cryptocurrency_exchange
+from utils.frame_assembly import assemble_frame, assemble_rows
+from utils.ohlcvs import named_pairs_to_df
+import argparse
+import numpy as np
+import pandas as pd
+
+# Variable definitions.
+FILTER_COLUMNS = ['symbol', 'min_price', 'max_price', 'tick_size', 'step_size', 'multiplier_up']
+
+# Class definition.
+class Payload_client:
+    """Client answering get_exchange_info with a fixed payload."""
+    def __init__(self, payload: dict):
+        self.payload = payload
+
+    def get_exchange_info(self) -> dict:
+        return self.payload
+
+# Function definitions.
+def make_pairs(symbols: list, n_rows: int, seed: int = 0) -> list:
+    """Return one download_pair-like frame per symbol, a tenth of them listed during the period."""
+    rng = np.random.default_rng(seed)
+    features = ['open', 'high', 'low', 'close', 'base_volume', 'quote_volume']
+    dates = pd.date_range('2022-12-01', periods=n_rows, freq='1min', name='date')
+    pairs = []
+    for i in range(len(symbols)):
+        start = int(rng.integers(n_rows // 2)) if i % 10 == 0 else 0
+        pairs.append(pd.DataFrame(np.exp(rng.normal(0, 1, size=(n_rows - start, len(features)))), 
+                                  index=dates[start:], columns=features))
+    return pairs
+
+def legacy_named_pairs_to_df(assets: list, pairs: list) -> pd.DataFrame:
+    """The former named_pairs_to_df loop."""
+    df = pd.DataFrame()
+    column_names = pairs[0].columns.tolist()
+    for (asset, pair) in zip(assets, pairs):
+        pair = pair.copy()
+        pair.columns = pd.MultiIndex.from_tuples([(asset, column) for column in column_names], 
+                                                 names=['symbol', 'feature'])
+        df = pd.concat([df, pair], axis='columns')
+    return df
+
+def legacy_named_pairs_to_5dim_df(symbols: list, pairs: list, exchange_info: pd.DataFrame) -> pd.DataFrame:
+    """The former named_pairs_to_5dim_df loop of add_base_asset_level_to_pairs."""
+    df = pd.DataFrame()
+    column_names = pairs[0].columns.tolist()
+    for (symbol, pair) in zip(symbols, pairs):
+        pair = pair.copy()
+        columns = [('not_inverted', get_base_asset_from_pair(symbol, exchange_info), symbol, column)
+                   for column in column_names]
+        pair.columns = pd.MultiIndex.from_tuples(columns, 
+                                                 names=['is_inverted', 'asset', 'symbol', 'feature'])
+        df = pd.concat([df, pair], axis='columns')
+    return df
+
+def legacy_filter_rows(rows: list) -> pd.DataFrame:
+    """The former filter-row loop of Cryptocurrency_exchange.get_exchange_info."""
+    df = pd.DataFrame()
+    for row in rows:
+        x = pd.DataFrame([row], columns=FILTER_COLUMNS)
+        df = pd.concat([df, x], axis='index')
+    return df.set_index('symbol')
+
+def get_exchange_info(client: Payload_client) -> pd.DataFrame:
+    exchange = object.__new__(Cryptocurrency_exchange)
+    exchange.client = client
+    exchange.get_exchange_info()
+    return exchange.info
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=1500)
+    parser.add_argument('--rows', type=int, default=240)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    exchange_info = make_exchange_info(n_symbols=args.symbols, seed=0)
+    symbols = exchange_info['symbol'].tolist()
+    pairs = make_pairs(symbols, args.rows)
+    aligned_pairs = [pair.reindex(pairs[1].index) for pair in pairs]
+    keys = [('not_inverted', get_base_asset_from_pair(symbol, exchange_info), symbol) for symbol in symbols]
+    names = ['is_inverted', 'asset', 'symbol', 'feature']
+    rows = [[row.symbol, row.min_price, row.max_price, row.tick_size, row.step_size, 5]
+            for row in exchange_info.itertuples(index=False)]
+    client = Payload_client(make_exchange_info_payload(exchange_info))
+
+    expected = legacy_named_pairs_to_df(symbols, pairs)
+    pd.testing.assert_frame_equal(named_pairs_to_df(symbols, pairs), expected)
+    expected = legacy_named_pairs_to_5dim_df(symbols, aligned_pairs, exchange_info)
+    pd.testing.assert_frame_equal(assemble_frame(keys, aligned_pairs, names=names), expected)
+    pd.testing.assert_frame_equal(assemble_rows(rows, columns=FILTER_COLUMNS).set_index('symbol'), 
+                                  legacy_filter_rows(rows))
+    info = get_exchange_info(client)
+    assert info['symbol'].tolist() == symbols
+    assert info['tick_size'].astype(float).tolist() == exchange_info['tick_size'].round(8).tolist()
+
+    cases = [('named_pairs_to_df (ragged listings)', 
+              lambda: legacy_named_pairs_to_df(symbols, pairs), 
+              lambda: named_pairs_to_df(symbols, pairs)), 
+             ('named_pairs_to_5dim_df', 
+              lambda: legacy_named_pairs_to_5dim_df(symbols, aligned_pairs, exchange_info), 
+              lambda: assemble_frame(keys, aligned_pairs, names=names)), 
+             ('exchange filter rows', 
+              lambda: legacy_filter_rows(rows), 
+              lambda: assemble_rows(rows, columns=FILTER_COLUMNS).set_index('symbol'))]
+    print('{} symbols x {} rows x 6 features'.format(args.symbols, args.rows))
+    for (name, legacy, assembled) in cases:
+        legacy_time = time_it(legacy, repeat=1)
+        assembled_time = time_it(assembled, repeat=args.repeat)
+        print('{:36s} concat loop {:8.1f} ms | assembled {:8.1f} ms ({:.1f}x)'.format(
+            name, legacy_time * 1000, assembled_time * 1000, legacy_time / assembled_time))
+    print('The assembled frames matched the concat loops.')
+
+if __name__ == '__main__':
+    main()
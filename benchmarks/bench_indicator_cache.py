@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        benchmarks/bench_indicator_cache.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Several pandas_ta triggers per symbol with and without a shared Indicator_cache, with hit rates.
+# Usage:       python -m benchmarks.bench_indicator_cache --symbols 100 --rows 1500
+
+# Library imports.
+from benchmarks.bench_log_storage import make_output_buffer
+from utils.indicators import filter_in_market, get_heikin_ashi_trigger, get_positive_JMA_trigger
+from utils.indicators import get_positive_momentum_trigger, get_positive_RSI_trigger, get_RSI_reversal_trigger
+from utils.indicator_cache import Indicator_cache
+import argparse
+import time
+import warnings
+
+# Variable definitions.
+TRIGGERS = [get_positive_RSI_trigger, get_positive_momentum_trigger, get_positive_JMA_trigger, 
+            get_RSI_reversal_trigger, get_heikin_ashi_trigger]
+
+# Function definitions.
+def run_triggers(dataset, cache=None) -> list:
+    """Return the symbols passing each trigger, as screen_one would chain them."""
+    return [filter_in_market(trigger, dataset, indicators=cache).tolist() for trigger in TRIGGERS]
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=100)
+    parser.add_argument('--rows', type=int, default=1500)
+    parser.add_argument('--passes', type=int, default=3, 
+                        help='screening passes over the same bars (the cache persists across them)')
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+
+    dataset = make_output_buffer(args.symbols, args.rows, interval='1min')
+    dataset = dataset.rename(columns={'base_volume': 'volume'}, level=1)
+    t1 = time.perf_counter()
+    for _ in range(args.passes):
+        expected = run_triggers(dataset)
+    t2 = time.perf_counter()
+    cache = Indicator_cache()
+    for _ in range(args.passes):
+        assert run_triggers(dataset, cache=cache) == expected
+    t3 = time.perf_counter()
+    print('{} passes of {} triggers over {} symbols x {} rows'.format(
+        args.passes, len(TRIGGERS), args.symbols, args.rows))
+    print('uncached {:.2f} s | cached {:.2f} s | {:.1f}x'.format(t2 - t1, t3 - t2, (t2 - t1) / (t3 - t2)))
+    print(cache.format_stats())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        benchmarks/bench_kline_download.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Sequential python-binance kline downloads versus Kline_downloader against a local fake kline server.
+# Usage:       python -m benchmarks.bench_kline_download --symbols 200 --latency 0.02 --workers 16
+
+# Library imports.
+from benchmarks.fake_kline_server import start_server_process
+from benchmarks.synthetic_market import make_asset_names
+from binance.client import Client
+from utils.kline_downloader import FEATURES, Kline_downloader
+from utils.ohlcv import download_pair
+from utils.ohlcvs import download_pairs, named_pairs_to_df
+import argparse
+import time
+import requests
+import warnings
+import pandas as pd
+
+# Function definitions.
+def get_symbols(n_symbols: int) -> list:
+    return [name + 'USDT' for name in make_asset_names(n_symbols)]
+
+def download_sequentially(client: Client, symbols: list, period: int) -> pd.DataFrame:
+    """The former download_pairs_helper download: python-binance, one symbol after the other."""
+    pairs = [download_pair(client=client, symbol=symbol, period=period) for symbol in symbols]
+    return named_pairs_to_df(symbols, pairs)
+
+def check(expected: pd.DataFrame, pairs: pd.DataFrame) -> None:
+    """Assert equal frames over their common dates and the columns of pairs.
+
+    The runs start seconds apart and a sequential download crossing a minute
+    leaves its first and last dates ragged, hence compared without them.
+    """
+    dates = expected.index.intersection(pairs.index)
+    assert expected.shape[0] - dates.shape[0] <= 1 and pairs.shape[0] - dates.shape[0] <= 1
+    dates = dates.sort_values()[1:-1]
+    pd.testing.assert_frame_equal(expected.loc[dates, pairs.columns], pairs.loc[dates], 
+                                  check_freq=False, check_names=False)
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=200)
+    parser.add_argument('--period', type=int, default=2880)
+    parser.add_argument('--latency', type=float, default=0.02, 
+                        help='seconds added by the fake server to every answer')
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--failure-rate', type=float, default=0.05, 
+                        help='503s of the throttled run')
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+
+    symbols = get_symbols(args.symbols)
+    listings = {symbols[0]: int(time.time() * 1000) - args.period // 2 * 60000} # Listed during the period.
+    (server, url) = start_server_process(latency=args.latency, listings=listings)
+    try:
+        client = Client(ping=False)
+        client.API_URL = url + '/api'
+        downloader = Kline_downloader(api_url=url, workers=args.workers, progress=False)
+        downloader.download(symbols, period=args.period) # Warms up the server's kline cache.
+        t1 = time.perf_counter()
+        expected = download_sequentially(client, symbols, args.period)
+        t2 = time.perf_counter()
+        pairs = downloader.download(symbols, period=args.period)
+        t3 = time.perf_counter()
+        check(expected, pairs)
+        check(download_pairs(client, symbols[:20], period=args.period, second_period=60), 
+              download_pairs(None, symbols[:20], period=args.period, second_period=60, downloader=downloader))
+    finally:
+        server.terminate()
+    print('{} symbols x {} klines, {:.0f} ms latency'.format(args.symbols, args.period, args.latency * 1000))
+    print('python-binance sequential {:.2f} s | Kline_downloader ({} workers) {:.2f} s | {:.1f}x'.format(
+        t2 - t1, args.workers, t3 - t2, (t2 - t1) / (t3 - t2)))
+
+    # A weight limit the download must spread over several windows, with failures.
+    n_symbols = min(args.symbols, 100)
+    weight = 2 * n_symbols * -(-(args.period + 1) // 1000)
+    (weight_limit, weight_window) = (weight // 3, 2.0)
+    (server, url) = start_server_process(weight_limit=weight_limit, weight_window=weight_window, 
+                                         latency=args.latency, failure_rate=args.failure_rate, 
+                                         listings=listings)
+    try:
+        downloader = Kline_downloader(api_url=url, workers=args.workers, weight_limit=weight_limit, 
+                                      weight_window=weight_window, backoff=0.05, progress=False)
+        t1 = time.perf_counter()
+        pairs = downloader.download(symbols[:n_symbols], period=args.period)
+        t2 = time.perf_counter()
+        server_stats = requests.get(url + '/stats').json()
+    finally:
+        server.terminate()
+    check(expected, pairs)
+    stats = downloader.get_stats()
+    print('{} weight per {:.0f} s window, {:.0%} failures: {:.2f} s, {} requests, {} retries, '
+          '{:.1f} s throttled in total, {} failed and {} rejected by the server'.format(
+              weight_limit, weight_window, args.failure_rate, t2 - t1, stats['requests'], 
+              stats.get('retries', 0), stats['throttled_s'], server_stats.get('failed', 0), 
+              server_stats.get('rejected', 0)))
+    assert server_stats.get('rejected', 0) == 0
+    print('The downloaded frames matched the sequential download.')
+
+if __name__ == '__main__':
+    main()
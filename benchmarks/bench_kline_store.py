@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        benchmarks/bench_kline_store.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Bootstrap downloads through the per-symbol Kline_store (cold, warm and after a crash) against a fake kline server.
+# Usage:       python -m benchmarks.bench_kline_store --symbols 500 --gap 60
+
+# Library imports.
+from benchmarks.bench_kline_download import get_symbols
+from benchmarks.fake_kline_server import start_server_process
+from utils.kline_downloader import Kline_downloader
+from utils.kline_store import Kline_store
+import argparse
+import tempfile
+import time
+import pandas as pd
+
+# Class definition.
+class Crashing_downloader(Kline_downloader):
+    """Kline_downloader raising after n_pages pages, as a bootstrap killed mid-download."""
+    def __init__(self, n_pages: int, **kwargs):
+        """
+        :param n_pages: pages downloaded before crashing.
+        """
+        super().__init__(**kwargs)
+        self.n_pages = n_pages
+
+    def iterate_pages(self, pages):
+        for (i, page) in enumerate(super().iterate_pages(pages)):
+            if i == self.n_pages:
+                raise RuntimeError('Crashed after {} pages.'.format(i))
+            yield page
+
+# Function definitions.
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--period', type=int, default=2880)
+    parser.add_argument('--gap', type=int, default=60, help='minutes between the cold and the warm bootstrap')
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--weight-limit', type=int, default=60000, 
+                        help='per minute, above the 6000 of Binance so the runs are not throttled')
+    args = parser.parse_args()
+
+    symbols = get_symbols(args.symbols)
+    end_time = int(time.time() * 1000)
+    cold_end_time = end_time - args.gap * 60000
+    (server, url) = start_server_process(latency=args.latency, weight_limit=args.weight_limit, 
+                                         listings={symbols[0]: end_time - args.period // 2 * 60000})
+    try:
+        parameters = {'api_url': url, 'workers': args.workers, 'weight_limit': args.weight_limit, 
+                      'progress': False}
+        downloader = Kline_downloader(**parameters)
+        downloader.download(symbols, period=args.period, end_time=end_time) # Warms up the server's kline cache.
+        t1 = time.perf_counter()
+        expected = downloader.download(symbols, period=args.period, end_time=end_time)
+        t2 = time.perf_counter()
+        with tempfile.TemporaryDirectory() as directory:
+            store = Kline_store(Kline_downloader(**parameters), directory=directory)
+            t3 = time.perf_counter()
+            cold = store.download(symbols, period=args.period, end_time=cold_end_time)
+            t4 = time.perf_counter()
+            pd.testing.assert_frame_equal(cold, downloader.download(symbols, period=args.period, 
+                                                                    end_time=cold_end_time))
+            store = Kline_store(Kline_downloader(**parameters), directory=directory)
+            t5 = time.perf_counter()
+            warm = store.download(symbols, period=args.period, end_time=end_time)
+            t6 = time.perf_counter()
+            pd.testing.assert_frame_equal(warm, expected)
+            warm_stats = store.get_stats()
+
+        with tempfile.TemporaryDirectory() as directory:
+            n_pages = len(symbols) # About a third of the pages.
+            store = Kline_store(Crashing_downloader(n_pages, **parameters), directory=directory)
+            try:
+                store.download(symbols, period=args.period, end_time=end_time)
+            except RuntimeError:
+                pass
+            store = Kline_store(Kline_downloader(**parameters), directory=directory)
+            t7 = time.perf_counter()
+            resumed = store.download(symbols, period=args.period, end_time=end_time)
+            t8 = time.perf_counter()
+            pd.testing.assert_frame_equal(resumed, expected)
+            resumed_stats = store.get_stats()
+    finally:
+        server.terminate()
+    print('{} symbols x {} klines, {:.0f} ms latency'.format(args.symbols, args.period, args.latency * 1000))
+    print('full download {:.2f} s | cold store {:.2f} s | warm store after {} min {:.2f} s ({} pages, {:.1f}x)'.format(
+        t2 - t1, t4 - t3, args.gap, t6 - t5, warm_stats['pages'], (t2 - t1) / (t6 - t5)))
+    print('after a crash {} pages in: {} symbols resumed, {} downloaded again, {:.2f} s'.format(
+        n_pages, resumed_stats.get('resumed', 0), resumed_stats.get('downloaded', 0), t8 - t7))
+    assert resumed_stats.get('resumed', 0) > 0
+    print('The stored downloads matched the full download.')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        benchmarks/bench_log_storage.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Write/read latency and file size of the logger buffer storage backends.
+# Usage:       python -m benchmarks.bench_log_storage --symbols 500
+
+# Library imports.
+from benchmarks.bench_conversion_table import Synthetic_client, time_it
+from benchmarks.synthetic_market import make_exchange_info
+from utils.conversion_table import get_conversion_table
+from utils.storage import get_log_storage
+from os import remove, walk
+from os.path import getsize, isdir, join
+from shutil import rmtree
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Function definitions.
+def get_size(path: str) -> int:
+    if not isdir(path):
+        return getsize(path)
+    return sum([getsize(join(root, name)) for (root, _, names) in walk(path) 
+                for name in names])
+
+def next_tick(dataset: pd.DataFrame, t: int, seed: int = 0) -> pd.DataFrame:
+    """Return dataset with its last bar updated and a new bar every 4 ticks."""
+    rng = np.random.default_rng(seed + t)
+    buffer_size = dataset.shape[0]
+    if t % 4 == 0:
+        frequency = dataset.index[-1] - dataset.index[-2]
+        new_bar = pd.DataFrame(dataset.iloc[[-1]].to_numpy(), 
+                               index=[dataset.index[-1] + frequency], 
+                               columns=dataset.columns)
+        dataset = pd.concat([dataset, new_bar], axis='index')
+        dataset.index.name = 'date'
+    else:
+        dataset = dataset.copy()
+    dataset.iloc[-1] = dataset.iloc[-1].to_numpy() * np.exp(
+        rng.normal(0, 0.01, size=dataset.shape[1]))
+    return dataset.tail(buffer_size)
+
+def make_input_buffer(exchange_info: pd.DataFrame, 
+                      n_rows: int, 
+                      interval: str = '5s') -> pd.DataFrame:
+    """Return a raw input buffer (Crypto_logger_input) of n_rows rows."""
+    client = Synthetic_client(exchange_info)
+    tables = []
+    n_ticks = -(-n_rows // exchange_info.shape[0])
+    for t in range(n_ticks):
+        table = get_conversion_table(client=client, exchange_info=exchange_info, 
+                                     as_pair=False, extra_minimal=True)
+        table.index = pd.DatetimeIndex(['2022-12-01'] * table.shape[0]) + \
+            pd.Timedelta(interval) * t
+        table.index.name = 'date'
+        tables.append(table)
+    return pd.concat(tables, axis='index').tail(n_rows)
+
+def make_output_buffer(n_symbols: int, 
+                       n_rows: int, 
+                       interval: str = '1min', 
+                       seed: int = 0) -> pd.DataFrame:
+    """Return an OHLCV output buffer (Crypto_logger_output) of n_rows rows."""
+    rng = np.random.default_rng(seed)
+    features = ['open', 'high', 'low', 'close', 'base_volume', 'quote_volume', 
+                'rolling_base_volume', 'rolling_quote_volume']
+    symbols = ['X{:04d}'.format(i) for i in range(n_symbols)]
+    columns = pd.MultiIndex.from_product([symbols, features], names=['symbol', 'feature'])
+    index = pd.date_range('2022-12-01', periods=n_rows, freq=interval, name='date')
+    values = np.exp(rng.normal(0, 1, size=(n_rows, len(columns))))
+    return pd.DataFrame(values, index=index, columns=columns)
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--buffer-sizes', type=int, nargs='+', default=[60, 1500, 3000])
+    parser.add_argument('--ticks', type=int, default=20)
+    args = parser.parse_args()
+
+    exchange_info = make_exchange_info(n_symbols=args.symbols, seed=0)
+    directory = tempfile.mkdtemp()
+    print('{:8s} {:6s} {:5s} {:>10s} {:>10s} {:>10s}'.format(
+        'buffer', 'rows', 'store', 'write ms', 'read ms', 'size MB'))
+    for buffer_size in args.buffer_sizes:
+        buffers = [('input', make_input_buffer(exchange_info, buffer_size), 0), 
+                   ('output', make_output_buffer(args.symbols, buffer_size), [0, 1])]
+        for (name, dataset, header) in buffers:
+            for storage_name in ['csv', 'npz']:
+                storage = get_log_storage(storage_name)
+                path = storage.get_path(join(directory, name))
+                write = time_it(lambda: storage.write(dataset, path), repeat=args.repeat)
+                read = time_it(lambda: storage.read(path, header=header), repeat=args.repeat)
+                print('{:8s} {:6d} {:5s} {:10.1f} {:10.1f} {:10.2f}'.format(
+                    name, buffer_size, storage_name, write * 1000, read * 1000, 
+                    getsize(path) / 1e6))
+                remove(path)
+
+    print()
+    print('Steady-state output buffer ticks (last bar updated, new bar every 4 ticks):')
+    print('{:6s} {:9s} {:>12s} {:>14s} {:>10s}'.format(
+        'rows', 'store', 'tick ms', 'tick KB', 'read ms'))
+    for buffer_size in args.buffer_sizes:
+        dataset = make_output_buffer(args.symbols, buffer_size)
+        for storage_name in ['npz', 'segments']:
+            storage = get_log_storage(storage_name, max_rows=buffer_size)
+            path = storage.get_path(join(directory, 'tick'))
+            storage.write(dataset, path)
+            ticks = [next_tick(dataset, t) for t in range(1, args.ticks + 1)]
+            size = get_size(path)
+            written = 0
+            elapsed = 0.0
+            for tick in ticks:
+                before = get_size(path) if storage_name == 'segments' else 0
+                elapsed += time_it(lambda: storage.write(tick, path), repeat=1)
+                written += get_size(path) - before if storage_name == 'segments' \
+                    else get_size(path)
+            read = time_it(lambda: storage.read(path), repeat=args.repeat)
+            print('{:6d} {:9s} {:12.2f} {:14.1f} {:10.1f}'.format(
+                buffer_size, storage_name, elapsed / len(ticks) * 1000, 
+                max(written, 0) / len(ticks) / 1e3, read * 1000))
+            rmtree(path) if isdir(path) else remove(path)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        benchmarks/bench_pipeline.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Poll cadence of the sequential logger loop versus Crypto_logger_pipeline, with stages of given latencies.
+# Usage:       python -m benchmarks.bench_pipeline --interval 1s --persist-ms 600
+
+# Library imports.
+from utils.crypto_logger_pipeline import Crypto_logger_pipeline
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+# Class definition.
+class Fake_logger:
+    """Stands for a logger: sleeps instead of polling, screening and writing logs."""
+    def __init__(self, 
+                 interval: str, 
+                 fetch_ms: float, 
+                 screen_ms: float, 
+                 persist_ms: float, 
+                 spike_every: int = 10):
+        self.interval = interval
+        self.fetch_ms = fetch_ms
+        self.screen_ms = screen_ms
+        self.persist_ms = persist_ms
+        self.spike_every = spike_every
+        self.polls = []
+        self.writes = 0
+
+    def get(self) -> pd.DataFrame:
+        self.polls.append(time.time())
+        time.sleep(self.fetch_ms / 1000)
+        return pd.DataFrame({'close': [1.0]}, index=pd.DatetimeIndex([pd.Timestamp.now()], name='date'))
+
+    def put_next(self, dataset: pd.DataFrame, old_dataset: pd.DataFrame = None) -> pd.DataFrame:
+        return dataset
+
+    def get_and_put_next(self, old_dataset: pd.DataFrame = None, dataset: pd.DataFrame = None) -> pd.DataFrame:
+        return self.put_next(self.get(), old_dataset=old_dataset)
+
+    def screen_next(self, old_dataset_screened=None, dataset_screened=None, dataset=None, live_filtered=None):
+        time.sleep(self.screen_ms / 1000)
+        return dataset, []
+
+    def log_next(self, dataset=None, dataset_screened=None) -> None:
+        self.writes += 1
+        spike = 5 if self.writes % self.spike_every == 0 else 1
+        time.sleep(spike * self.persist_ms / 1000)
+
+class Fake_cascade:
+    """Stands for Crypto_logger_cascade with one output timeframe."""
+    def __init__(self, aggregate_ms: float, screen_ms: float, logger: Fake_logger):
+        self.aggregate_ms = aggregate_ms
+        self.screen_ms = screen_ms
+        self.loggers = {'output_1min': logger}
+        self.datasets = {'output_1min': None}
+        self.datasets_screened = {'output_1min': None}
+
+    def get_and_put_next(self, dataset=None):
+        time.sleep(self.aggregate_ms / 1000)
+        self.datasets['output_1min'] = dataset
+        return self.datasets
+
+    def screen_next(self, dataset_screened=None, live_filtered=None, datasets=None):
+        time.sleep(self.screen_ms / 1000)
+        return {'output_1min': dataset_screened}
+
+    def get_bar_counts(self) -> dict:
+        return {}
+
+# Function definitions.
+def make_loggers(args: argparse.Namespace) -> tuple:
+    input_logger = Fake_logger(args.interval, args.fetch_ms, args.screen_ms, args.persist_ms)
+    output_logger = Fake_logger(args.interval, 0, 0, args.persist_ms)
+    return input_logger, Fake_cascade(args.aggregate_ms, args.screen_ms, output_logger)
+
+def sequential_loop(input_logger: Fake_logger, outputs: Fake_cascade, duration: float) -> None:
+    """loop_loggers of crypto_logger_5s.py before Crypto_logger_pipeline."""
+    stop = time.time() + duration
+    dataset = None
+    while time.time() < stop:
+        dataset = input_logger.get_and_put_next(old_dataset=dataset, dataset=None)
+        outputs.get_and_put_next(dataset=dataset)
+        dataset_screened, live_filtered = input_logger.screen_next(dataset=dataset)
+        outputs.screen_next(dataset_screened=dataset_screened, live_filtered=live_filtered)
+        input_logger.log_next(dataset=dataset, dataset_screened=dataset_screened)
+        outputs.loggers['output_1min'].log_next(dataset=dataset)
+
+def describe_polls(name: str, polls: list, period: float) -> None:
+    periods = np.diff(polls)
+    print('{:10s} polls {:4d} | period mean {:6.3f} s max {:6.3f} s | late polls {:4d}'.format(
+        name, len(polls), periods.mean(), periods.max(), int((periods > 1.5 * period).sum())))
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--interval', default='1s')
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--fetch-ms', type=float, default=300.0)
+    parser.add_argument('--aggregate-ms', type=float, default=20.0)
+    parser.add_argument('--screen-ms', type=float, default=100.0)
+    parser.add_argument('--persist-ms', type=float, default=300.0)
+    args = parser.parse_args()
+    period = pd.Timedelta(args.interval).total_seconds()
+
+    (input_logger, outputs) = make_loggers(args)
+    sequential_loop(input_logger, outputs, args.duration)
+    describe_polls('sequential', input_logger.polls, period)
+
+    (input_logger, outputs) = make_loggers(args)
+    pipeline = Crypto_logger_pipeline(input_logger, outputs, queue_size=2)
+    pipeline.start()
+    time.sleep(args.duration)
+    pipeline.stop()
+    describe_polls('pipeline', input_logger.polls, period)
+    print(pipeline.format_metrics())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        benchmarks/bench_renko.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Array-based Renko bricks versus the list-appending loop, brick-size scoring and the market-wide 30min screen.
+# Usage:       python -m benchmarks.bench_renko --symbols 1000 --rows 1500 --sizes 64
+
+# Library imports.
+from benchmarks.bench_conversion_table import time_it
+from benchmarks.bench_log_storage import make_output_buffer
+from utils.renko_bricks import build_renko, get_auto_brick_sizes, get_brick_lists
+from utils.renko_bricks import get_renko_scores, get_renko_trigger_mask, score_brick_sizes
+from utils.screener import get_feature_matrices, get_renko_mask
+import argparse
+import numpy as np
+
+# Function definitions.
+def build_history(prices: np.ndarray, brick_size: float) -> tuple:
+    """The former Renko.build_history loop, kept as the reference."""
+    renko_prices = [prices[0]]
+    renko_directions = [0]
+    timed_renko_prices = [prices[0]]
+    for last_price in prices[1:]:
+        gap_div = int(float(last_price - renko_prices[-1]) / brick_size)
+        is_new_brick = False
+        start_brick = 0
+        if gap_div != 0:
+            if (gap_div > 0 and (renko_directions[-1] > 0 or renko_directions[-1] == 0)) or \
+               (gap_div < 0 and (renko_directions[-1] < 0 or renko_directions[-1] == 0)):
+                is_new_brick = True
+            elif np.abs(gap_div) >= 2:
+                start_brick = 2
+                is_new_brick = True
+                renko_prices.append(renko_prices[-1] + 2 * brick_size * np.sign(gap_div))
+                renko_directions.append(np.sign(gap_div))
+            if is_new_brick:
+                for d in range(start_brick, np.abs(gap_div)):
+                    renko_prices.append(renko_prices[-1] + brick_size * np.sign(gap_div))
+                    renko_directions.append(np.sign(gap_div))
+        timed_renko_prices.append(renko_prices[-1])
+    return renko_prices, renko_directions, timed_renko_prices
+
+def evaluate(prices: np.ndarray, renko_directions: list) -> float:
+    """The former Renko.evaluate(method='simple') score."""
+    balance = sign_changes = 0
+    for i in range(2, len(renko_directions)):
+        if renko_directions[i] == renko_directions[i - 1]:
+            balance += 1
+        else:
+            balance -= 2
+            sign_changes += 1
+    sign_changes = max(sign_changes, 1)
+    score = balance / sign_changes
+    price_ratio = len(prices) / len(renko_directions)
+    return np.log(score + 1) * np.log(price_ratio) if score >= 0 and price_ratio >= 1 else -1.0
+
+def check(close: np.ndarray, brick_sizes: np.ndarray) -> None:
+    """Assert that the array core reproduces the loop for every column."""
+    bricks = build_renko(close, brick_sizes)
+    scores = get_renko_scores(bricks)
+    longs = get_renko_trigger_mask(bricks, 'long', 'entry')
+    shorts = get_renko_trigger_mask(bricks, 'short', 'exit')
+    for column in range(close.shape[1]):
+        expected = build_history(close[:, column], brick_sizes[column])
+        assert get_brick_lists(close[:, column], brick_sizes[column]) == expected
+        directions = expected[1]
+        assert scores[column] == evaluate(close[:, column], directions)
+        if len(directions) > 2:
+            assert longs[column] == (directions[-1] == 1 and directions[-2] == -1)
+            assert shorts[column] == (directions[-1] == 1 and directions[-2] == -1)
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=1000)
+    parser.add_argument('--rows', type=int, default=1500)
+    parser.add_argument('--sizes', type=int, default=64)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    buffer = make_output_buffer(args.symbols, args.rows, interval='30min')
+    (symbols, matrices) = get_feature_matrices(buffer, ['high', 'low', 'close'])
+    rng = np.random.default_rng(0)
+    close = np.cumsum(rng.normal(0, 1, size=(args.rows, args.symbols)), axis=0) + 1000
+    brick_sizes = get_auto_brick_sizes(close + 1, close - 1, close) * rng.uniform(0.5, 3, args.symbols)
+    n = min(100, args.symbols)
+    check(close[:, :n], brick_sizes[:n])
+
+    loop_time = time_it(lambda: [build_history(close[:, column], brick_sizes[column])
+                                 for column in range(n)], repeat=args.repeat) / n
+    single_time = time_it(lambda: get_brick_lists(close[:, 0], brick_sizes[0]), repeat=args.repeat)
+    market_time = time_it(lambda: build_renko(close, brick_sizes), repeat=args.repeat)
+    candidates = np.linspace(brick_sizes[0] / 4, brick_sizes[0] * 4, args.sizes)
+    grid_time = time_it(lambda: score_brick_sizes(close[:, 0], candidates), repeat=args.repeat)
+    screen_time = time_it(lambda: get_renko_mask(matrices['high'], matrices['low'], matrices['close']), 
+                          repeat=args.repeat)
+    print('{} rows: loop {:.2f} ms/series | array {:.2f} ms/series | {} series at once {:.1f} ms ({:.3f} ms/series)'.format(
+        args.rows, loop_time * 1000, single_time * 1000, args.symbols, market_time * 1000, 
+        market_time * 1000 / args.symbols))
+    print('{} brick sizes scored in one pass: {:.1f} ms ({} loop builds: {:.1f} ms)'.format(
+        args.sizes, grid_time * 1000, args.sizes, args.sizes * loop_time * 1000))
+    print('30min Renko screen of {} symbols (auto ATR bricks on hlc3): {:.1f} ms'.format(
+        args.symbols, screen_time * 1000))
+    print('The array bricks, scores and triggers matched the loop.')
+
+if __name__ == '__main__':
+    main()
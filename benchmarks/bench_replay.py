@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        benchmarks/bench_replay.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: End-to-end 5s logger loop replayed offline from recorded get_ticker payloads: ticks/s and per-stage timings.
+# Usage:       python -m benchmarks.bench_replay --symbols 2000 --ticks 200
+#              python -m benchmarks.bench_replay --recording crypto_recordings --pipeline --speed 10
+
+# Library imports.
+from benchmarks.synthetic_market import make_exchange_info, make_exchange_info_payload
+from benchmarks.synthetic_market import make_asset_values, make_ticker
+from utils.binance_replay import Replay_client, Replay_exhausted, append_ticker, write_exchange_info
+from utils.crypto_logger_input import Crypto_logger_input
+from utils.crypto_logger_cascade import Crypto_logger_cascade
+from utils.crypto_logger_pipeline import Crypto_logger_pipeline
+from utils.profiling import PROFILER
+from os import chdir, getcwd, mkdir
+from os.path import abspath, join
+import argparse
+import tempfile
+import time
+
+# Function definitions.
+def make_recording(directory: str, n_symbols: int, n_ticks: int, seed: int = 0) -> None:
+    """Record a synthetic market polled every 5 seconds, as Recording_client would."""
+    exchange_info = make_exchange_info(n_symbols=n_symbols, seed=seed)
+    asset_values = make_asset_values(exchange_info, seed=seed)
+    mkdir(directory)
+    write_exchange_info(make_exchange_info_payload(exchange_info), directory)
+    for t in range(n_ticks):
+        tickers = make_ticker(exchange_info, seed=seed, t=t, asset_values=asset_values)
+        append_ticker(tickers, directory, t=1670000000.0 + 5 * t)
+
+def run_sequential(pipeline: Crypto_logger_pipeline, n_ticks: int) -> int:
+    """Run the pipeline stages one after the other for each tick, timing each one."""
+    ticks = 0
+    for _ in range(n_ticks):
+        start = time.perf_counter()
+        try:
+            dataset = pipeline.input_logger.get()
+        except Replay_exhausted:
+            break
+        pipeline.dataset = pipeline.input_logger.put_next(dataset, old_dataset=pipeline.dataset)
+        pipeline.metrics['fetch'].add(start)
+        item = pipeline.dataset
+        for (name, process) in [('aggregate', pipeline.aggregate), 
+                                ('screen', pipeline.screen), 
+                                ('persist', pipeline.persist)]:
+            start = time.perf_counter()
+            item = process(item)
+            pipeline.metrics[name].add(start)
+        ticks += 1
+    return ticks
+
+def run_pipelined(pipeline: Crypto_logger_pipeline) -> int:
+    """Run the threaded pipeline until the replay is exhausted."""
+    pipeline.start()
+    while pipeline.is_running():
+        time.sleep(0.1)
+    pipeline.stop()
+    return pipeline.metrics['persist'].count
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--recording', default=None, 
+                        help='directory recorded by Recording_client (synthetic market by default)')
+    parser.add_argument('--symbols', type=int, default=2000)
+    parser.add_argument('--ticks', type=int, default=200)
+    parser.add_argument('--intervals', default='5s,1min,30min,1h,1d')
+    parser.add_argument('--speed', type=float, default=0.0, 
+                        help='replay speed factor, 0 for as fast as possible')
+    parser.add_argument('--pipeline', action='store_true', 
+                        help='run the threaded Crypto_logger_pipeline (paced by its scheduler)')
+    args = parser.parse_args()
+
+    cwd = getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        recording = join(directory, 'crypto_recordings')
+        if args.recording is None:
+            make_recording(recording, args.symbols, args.ticks)
+        else:
+            recording = abspath(args.recording)
+        chdir(directory)
+        try:
+            client = Replay_client(recording, speed=args.speed)
+            t1 = time.perf_counter()
+            input_logger = Crypto_logger_input(interval='5s', buffer_size=3000, 
+                                               price_percent=10.0, volume_percent=0.0, 
+                                               as_pair=False, append=True, roll=10, 
+                                               client=client)
+            outputs = Crypto_logger_cascade(intervals=args.intervals.split(','), 
+                                            interval_input='5s', input_log_name='input', 
+                                            roll=1000)
+            pipeline = Crypto_logger_pipeline(input_logger, outputs)
+            t2 = time.perf_counter()
+            ticks = run_pipelined(pipeline) if args.pipeline else run_sequential(pipeline, len(client))
+            t3 = time.perf_counter()
+        finally:
+            chdir(cwd)
+    print('{} ticks of {} symbols | setup {:.2f} s | loop {:.2f} s | {:.2f} ticks/s'.format(
+        ticks, input_logger.exchange_info.shape[0], t2 - t1, t3 - t2, ticks / (t3 - t2)))
+    print(pipeline.format_metrics())
+    print(PROFILER.format_summary())
+
+if __name__ == '__main__':
+    main()
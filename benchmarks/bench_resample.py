@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        benchmarks/bench_resample.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Per-tick cost of a Crypto_logger_output stage: whole buffer resample versus Incremental_resampler.
+# Usage:       python -m benchmarks.bench_resample --symbols 200
+
+# Library imports.
+from benchmarks.bench_log_storage import make_output_buffer
+from utils.resample import Incremental_resampler, resample
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+# Variable definitions.
+CHECKS = [('5s', '1min', 60, 400), 
+          ('30s', '1min', 1500, 2960), 
+          ('5s', '5s', 60, 200), 
+          ('5s', '15s', 60, 200), 
+          ('1min', '30min', 60, 400), 
+          ('1h', '1d', 60, 400)]
+
+# Function definitions.
+def legacy_put(old_dataset: pd.DataFrame, 
+               dataset: pd.DataFrame, 
+               interval: str, 
+               buffer_size: int) -> pd.DataFrame:
+    """Crypto_logger_base.get_and_put_next (OHLCV) before Incremental_resampler."""
+    dataset = pd.concat([old_dataset, dataset], axis='index', join='outer')
+    dataset = dataset.copy().reset_index()
+    dataset = dataset.drop_duplicates(keep='last', ignore_index=True)
+    dataset = dataset.set_index('date')
+    dataset = resample(dataset, interval)
+    return dataset.tail(buffer_size)
+
+def make_parent_bars(buffer: pd.DataFrame, 
+                     n_ticks: int, 
+                     interval_input: str, 
+                     seed: int = 0) -> pd.DataFrame:
+    """Return n_ticks parent bars following the buffer."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(buffer.index[-1] + pd.Timedelta(interval_input), 
+                          periods=n_ticks, freq=interval_input, name='date')
+    values = np.exp(rng.normal(0, 1, size=(n_ticks, buffer.shape[1])))
+    return pd.DataFrame(values, index=index, columns=buffer.columns)
+
+def make_parent_feed(n_symbols: int, 
+                     n_ticks: int, 
+                     interval_input: str, 
+                     seed: int = 0) -> pd.DataFrame:
+    """Return parent bars with holes and symbols listed late (NaN before)."""
+    buffer = make_output_buffer(n_symbols, n_ticks, interval=interval_input, seed=seed)
+    rng = np.random.default_rng(seed)
+    values = buffer.to_numpy().reshape(n_ticks, n_symbols, -1)
+    values[rng.random((n_ticks, n_symbols)) < 0.05] = np.nan
+    for symbol in range(n_symbols - n_symbols // 4, n_symbols):
+        values[:rng.integers(1, n_ticks // 2), symbol] = np.nan
+    return pd.DataFrame(values.reshape(n_ticks, -1), index=buffer.index, columns=buffer.columns)
+
+def check(interval_input: str, 
+          interval: str, 
+          buffer_size: int, 
+          n_ticks: int, 
+          n_symbols: int, 
+          seed: int = 0) -> None:
+    """Feed tail(2) of the parent bars every tick and compare with resample at sampled ticks.
+
+    Every 7th tick the re-fed parent bar comes with new values: it replaces 
+    its earlier version (the legacy concat summed both), so resample is fed 
+    the last version of each parent bar.
+    """
+    parents = make_parent_feed(n_symbols, n_ticks, interval_input, seed=seed)
+    rng = np.random.default_rng(seed)
+    resampler = Incremental_resampler(interval=interval, buffer_size=buffer_size)
+    checked = set(np.linspace(1, n_ticks, 12).astype(int).tolist())
+    for t in range(1, n_ticks + 1):
+        if t % 7 == 0 and t >= 2:
+            changed = parents.iloc[t - 2].to_numpy() * rng.uniform(0.5, 2, parents.shape[1])
+            parents.iloc[t - 2] = changed
+        resampler.update(parents.iloc[max(t - 2, 0):t])
+        if t in checked:
+            expected = resample(parents.iloc[:t].copy(), interval).tail(buffer_size)
+            pd.testing.assert_frame_equal(resampler.to_frame(), expected, check_freq=False)
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=200)
+    parser.add_argument('--interval-input', default='5s')
+    parser.add_argument('--interval', default='1min')
+    parser.add_argument('--buffer-sizes', type=int, nargs='+', default=[60, 500, 1500, 3000])
+    parser.add_argument('--ticks', type=int, default=24)
+    parser.add_argument('--check-symbols', type=int, default=10)
+    args = parser.parse_args()
+
+    for (interval_input, interval, buffer_size, n_ticks) in CHECKS:
+        check(interval_input, interval, buffer_size, n_ticks, args.check_symbols)
+    print('Incremental bars equal resample of the last parent bar versions at sampled ticks '
+          '({}).'.format(', '.join(['{} -> {}'.format(*case[:2]) for case in CHECKS])))
+
+    print('{} symbols, {} -> {} bars, tail(2) of the parent fed every tick.'.format(
+        args.symbols, args.interval_input, args.interval))
+    print('{:>7s} {:>16s} {:>16s} {:>8s}'.format(
+        'buffer', 'resample ms', 'incremental ms', 'speedup'))
+    for buffer_size in args.buffer_sizes:
+        buffer = make_output_buffer(args.symbols, buffer_size, interval=args.interval)
+        buffer = resample(buffer, args.interval)
+        parents = make_parent_bars(buffer, args.ticks + 1, args.interval_input)
+        resampler = Incremental_resampler(interval=args.interval, buffer_size=buffer_size)
+        resampler.put_frame(buffer)
+        legacy_dataset = buffer
+        legacy_timings = []
+        timings = []
+        for t in range(2, args.ticks + 2):
+            tick = parents.iloc[t - 2:t]
+            t1 = time.perf_counter()
+            legacy_dataset = legacy_put(legacy_dataset, tick.copy(), args.interval, buffer_size)
+            t2 = time.perf_counter()
+            resampler.update(tick)
+            resampler.to_frame()
+            t3 = time.perf_counter()
+            legacy_timings.append(t2 - t1)
+            timings.append(t3 - t2)
+        legacy_time = np.median(legacy_timings)
+        incremental_time = np.median(timings)
+        print('{:7d} {:16.2f} {:16.3f} {:7.0f}x'.format(
+            buffer_size, legacy_time * 1000, incremental_time * 1000, 
+            legacy_time / incremental_time))
+
+if __name__ == '__main__':
+    main()
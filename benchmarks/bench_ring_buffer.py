@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        benchmarks/bench_ring_buffer.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Raw 5s window per tick: concat/dedupe/tail DataFrame versus the ring buffer.
+# Usage:       python -m benchmarks.bench_ring_buffer --symbols 2000
+
+# Library imports.
+from typing import List, Tuple
+from benchmarks.bench_conversion_table import Synthetic_client
+from benchmarks.synthetic_market import make_exchange_info
+from utils.conversion_table import get_conversion_table, get_tradable_tickers_info
+from utils.crypto_logger_output import Crypto_logger_output
+from utils.ring_buffer import Ticker_ring_buffer, filter_movers, get_tradable_tickers
+import argparse
+import time
+import tracemalloc
+import pandas as pd
+
+# Function definitions.
+def legacy_put(old_dataset: pd.DataFrame, 
+               dataset: pd.DataFrame, 
+               buffer_size: int) -> pd.DataFrame:
+    """Crypto_logger_base.get_and_put_next (raw) before the ring buffer."""
+    if old_dataset is not None:
+        dataset = pd.concat([old_dataset, dataset], axis='index', join='outer')
+    dataset = dataset.copy().reset_index()
+    dataset = dataset.drop_duplicates(subset=['symbol', 'count'], 
+                                      keep='first', ignore_index=True)
+    dataset = dataset.set_index('date')
+    return dataset.tail(buffer_size)
+
+def legacy_filter_movers(dataset: pd.DataFrame, 
+                         count: int = 1000, 
+                         price_percent: float = 5.0, 
+                         volume_percent: float = 0.0) -> pd.DataFrame:
+    """Crypto_logger_input.filter_movers before the ring buffer."""
+    dataset = dataset.reset_index()
+    dataset[['price_change_percent', 'rolling_base_volume']] = \
+        dataset[['price_change_percent', 'rolling_base_volume']].astype(float)
+    dataset['last_price_move'] = dataset['price_change_percent'].copy()
+    dataset['last_volume_move'] = dataset['rolling_base_volume'].copy()
+    movers = dataset.groupby(['symbol'])
+    dataset = dataset.drop(columns=['last_price_move', 'last_volume_move'])
+    price_movers = movers['last_price_move']
+    volume_movers = movers['last_volume_move']
+    price_movers = price_movers.agg(lambda x: x.diff(1).abs().iloc[-1])
+    volume_movers = volume_movers.agg(lambda x: (100 * x.pct_change(1)).iloc[-1])
+    price_movers = price_movers.sort_values(ascending=False)
+    volume_movers = volume_movers.sort_values(ascending=False)
+    price_movers = price_movers[price_movers > 0.0]
+    price_movers = price_movers.to_frame(name='last_price_move')
+    volume_movers = volume_movers.to_frame(name='last_volume_move')
+    movers = pd.concat([price_movers, volume_movers], axis='columns')
+    movers = movers.reset_index()
+    price_movers_mask = movers['last_price_move'] > price_percent
+    volume_movers_mask = movers['last_volume_move'] > volume_percent
+    movers = movers[price_movers_mask & volume_movers_mask]
+    movers = movers.sort_values(by=['last_volume_move', 'last_price_move'], ascending=False)
+    movers = movers.tail(count)
+    movers = movers.reset_index(drop=True)
+    dataset = dataset.merge(right=movers, how='right', on=['symbol'])
+    dataset = dataset.set_index('date')
+    return dataset.drop_duplicates(subset=['symbol', 'count'], keep='last')
+
+def legacy_screen(dataset: pd.DataFrame, 
+                  price_percent: float) -> Tuple[pd.DataFrame, List[str]]:
+    dataset, live_filtered = get_tradable_tickers_info(dataset)
+    return legacy_filter_movers(dataset, price_percent=price_percent), live_filtered
+
+def ring_screen(ring: Ticker_ring_buffer, 
+                price_percent: float) -> Tuple[pd.DataFrame, List[str]]:
+    live_filtered = get_tradable_tickers(ring)
+    return filter_movers(ring, price_percent=price_percent), live_filtered
+
+def sort_rows(dataset: pd.DataFrame) -> pd.DataFrame:
+    dataset = dataset.reset_index()
+    return dataset.sort_values(by=['date', 'symbol']).reset_index(drop=True)
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=2000)
+    parser.add_argument('--buffer-size', type=int, default=3000)
+    parser.add_argument('--ticks', type=int, default=40)
+    parser.add_argument('--slots', type=int, default=32)
+    parser.add_argument('--price-percent', type=float, default=0.5)
+    args = parser.parse_args()
+
+    exchange_info = make_exchange_info(n_symbols=args.symbols, seed=0)
+    client = Synthetic_client(exchange_info)
+    tables = []
+    for t in range(args.ticks):
+        table = get_conversion_table(client=client, exchange_info=exchange_info, 
+                                     as_pair=False, extra_minimal=True)
+        table.index = table.index.round('5s')
+        tables.append(table)
+
+    ring = Ticker_ring_buffer(slots=args.slots, max_rows=args.buffer_size)
+    (window_output, tail_output) = [Crypto_logger_output(interval_input='5s', interval='5s') 
+                                    for _ in range(2)]
+    legacy_dataset = None
+    timings = {'legacy put': [], 'legacy screen': [], 'ring put': [], 'ring screen': [], 
+               'ring to_frame': [], 'window bars': [], 'tail bars': []}
+    for table in tables:
+        t1 = time.perf_counter()
+        legacy_dataset = legacy_put(legacy_dataset, table, args.buffer_size)
+        t2 = time.perf_counter()
+        legacy_screened, legacy_live = legacy_screen(legacy_dataset, args.price_percent)
+        t3 = time.perf_counter()
+        ring.put(table)
+        tail = ring.to_tail_frame()
+        t4 = time.perf_counter()
+        screened, live = ring_screen(ring, args.price_percent)
+        t5 = time.perf_counter()
+        dataset = ring.to_frame()
+        t6 = time.perf_counter()
+        window_bars = window_output.get(dataset)
+        t7 = time.perf_counter()
+        tail_bars = tail_output.get(tail)
+        t8 = time.perf_counter()
+        for (name, elapsed) in zip(timings, [t2 - t1, t3 - t2, t4 - t3, t5 - t4, t6 - t5, 
+                                             t7 - t6, t8 - t7]):
+            timings[name].append(elapsed)
+        pd.testing.assert_frame_equal(sort_rows(legacy_dataset), sort_rows(dataset))
+        pd.testing.assert_frame_equal(tail_bars, window_bars)
+        assert tail_output.bar_counts == window_output.bar_counts
+        pd.testing.assert_frame_equal(sort_rows(legacy_screened), sort_rows(screened), 
+                                      check_index_type=False)
+        assert set(legacy_live) == set(live)
+
+    tracemalloc.start()
+    for table in tables:
+        ring.put(table)
+        ring.to_tail_frame()
+        ring_screen(ring, args.price_percent)
+    (_, ring_peak) = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    legacy_dataset = None
+    for table in tables:
+        legacy_dataset = legacy_put(legacy_dataset, table, args.buffer_size)
+        legacy_screen(legacy_dataset, args.price_percent)
+    (_, legacy_peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print('Symbols: {} | buffer: {} rows | ticks: {} | movers last tick: {}'.format(
+        args.symbols, args.buffer_size, args.ticks, screened['symbol'].nunique()))
+    print('Rows handed to the outputs last tick: {} of the {} in the window'.format(
+        tail.shape[0], dataset.shape[0]))
+    print('Ring buffer: {} slots, {:.1f} MB preallocated'.format(
+        ring.slots, (ring.values.nbytes + ring.dates.nbytes + ring.observed.nbytes) / 1e6))
+    for name in timings:
+        steady = sorted(timings[name][args.ticks // 2:])
+        print('{:14s} median {:8.2f} ms | max {:8.2f} ms'.format(
+            name, steady[len(steady) // 2] * 1000, steady[-1] * 1000))
+    print('Peak traced allocation per run: legacy {:.1f} MB | ring {:.1f} MB'.format(
+        legacy_peak / 1e6, ring_peak / 1e6))
+    print('Windows, screened rows, live filters and resampled bars equal on every tick.')
+
+if __name__ == '__main__':
+    main()
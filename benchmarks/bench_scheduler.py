@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        benchmarks/bench_scheduler.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Buckets merged or skipped by a bare polling loop versus Interval_scheduler, with random tick costs.
+# Usage:       python -m benchmarks.bench_scheduler --interval 500ms --duration 20
+
+# Library imports.
+from utils.scheduler import Interval_scheduler
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+# Function definitions.
+def get_work(rng: np.random.Generator, period: float, spike_every: int) -> float:
+    """Tick cost: mostly 20% to 60% of the period, 1.5 periods once every spike_every ticks."""
+    if rng.integers(spike_every) == 0:
+        return 1.5 * period
+    return rng.uniform(0.2, 0.6) * period
+
+def describe_buckets(name: str, polls: list, interval: str) -> None:
+    """Count the buckets of dataset.index.round(interval) receiving no poll or several."""
+    buckets = pd.DatetimeIndex(pd.to_datetime(polls, unit='s')).round(interval).asi8
+    step = pd.Timedelta(interval).value
+    counts = np.bincount((buckets - buckets[0]) // step)
+    print('{:10s} polls {:4d} | buckets {:4d} | merged {:4d} | skipped {:4d}'.format(
+        name, len(polls), counts.shape[0], int((counts > 1).sum()), int((counts == 0).sum())))
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--interval', default='500ms')
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--spike-every', type=int, default=15)
+    args = parser.parse_args()
+    period = pd.Timedelta(args.interval).total_seconds()
+
+    rng = np.random.default_rng(0)
+    polls = []
+    stop = time.time() + args.duration
+    while time.time() < stop:
+        polls.append(time.time())
+        time.sleep(get_work(rng, period, args.spike_every))
+    describe_buckets('bare loop', polls, args.interval)
+
+    rng = np.random.default_rng(0)
+    polls = []
+    scheduler = Interval_scheduler(interval=args.interval)
+    stop = time.time() + args.duration
+    while time.time() < stop:
+        scheduler.wait()
+        polls.append(time.time())
+        work = get_work(rng, period, args.spike_every)
+        if scheduler.is_behind():
+            scheduler.skip('screen')
+            work /= 2
+        time.sleep(work)
+        scheduler.finish()
+    describe_buckets('scheduler', polls, args.interval)
+    print(scheduler.format_summary())
+
+if __name__ == '__main__':
+    main()
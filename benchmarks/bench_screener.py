@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        benchmarks/bench_screener.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Per-symbol filter_in_market(screen_one) versus the cross-sectional screen_all, with equality checks.
+# Usage:       python -m benchmarks.bench_screener --symbols 500 1000 --rows 1500
+
+# Library imports.
+from benchmarks.bench_conversion_table import time_it
+from benchmarks.bench_log_storage import make_output_buffer
+from utils.indicators import filter_in_market, screen_one
+from utils.screener import get_feature_matrices, get_jma, get_kdj, get_rsi, screen_all
+from utils.screener import get_positive_JMA_mask, get_positive_momentum_mask, get_positive_RSI_mask
+from sys import float_info as sflt
+import argparse
+import warnings
+import numpy as np
+import pandas as pd
+try:
+    import pandas_ta as ta
+except ImportError: # Optional: without it, only the reference loops are checked.
+    ta = None
+
+# Function definitions.
+def make_screened_buffer(n_symbols: int, 
+                         n_rows: int, 
+                         interval: str, 
+                         seed: int = 0, 
+                         nan_fraction: float = 0.01) -> pd.DataFrame:
+    """Return an output buffer with square waves, gaps and a spread of daily volumes."""
+    rng = np.random.default_rng(seed)
+    buffer = make_output_buffer(n_symbols, n_rows, interval=interval, seed=seed)
+    values = buffer.to_numpy()
+    columns = buffer.columns
+    for (i, symbol) in enumerate(columns.levels[0]):
+        close = columns.get_loc((symbol, 'close'))
+        if i % 10 == 0:
+            values[-20:, close] = np.round(values[-20:, close])
+        elif i % 10 == 1:
+            values[-min(50, n_rows):, close] = rng.choice([1.0, 2.0], size=min(50, n_rows))
+    rolling_base_volume = columns.get_indexer([(symbol, 'rolling_base_volume')
+                                               for symbol in columns.levels[0]])
+    values[:, rolling_base_volume] *= rng.choice([1e5, 1e7], size=rolling_base_volume.shape[0])
+    values[rng.random(values.shape) < nan_fraction] = np.nan
+    return pd.DataFrame(values, index=buffer.index, columns=columns)
+
+def reference_rma(close: pd.Series, length: int) -> pd.Series:
+    """pandas_ta rma of one symbol."""
+    return close.ewm(alpha=1.0 / length, min_periods=length).mean()
+
+def reference_rsi(close: pd.Series, length: int) -> pd.Series:
+    """pandas_ta rsi of one symbol."""
+    negative = close.diff(1)
+    positive = negative.copy()
+    positive[positive < 0] = 0
+    negative[negative > 0] = 0
+    positive_average = reference_rma(positive, length)
+    negative_average = reference_rma(negative, length)
+    return 100 * positive_average / (positive_average + negative_average.abs())
+
+def reference_kdj(high: pd.Series, 
+                  low: pd.Series, 
+                  close: pd.Series, 
+                  length: int, 
+                  signal: int) -> pd.DataFrame:
+    """pandas_ta kdj of one symbol."""
+    highest_high = high.rolling(length).max()
+    lowest_low = low.rolling(length).min()
+    value_range = highest_high - lowest_low
+    if value_range.eq(0).any():
+        value_range += sflt.epsilon
+    fast_k = 100 * (close - lowest_low) / value_range
+    k = reference_rma(fast_k, signal)
+    d = reference_rma(k, signal)
+    return pd.DataFrame({'K': k, 'D': d, 'J': 3 * k - 2 * d})
+
+def reference_jma(close: pd.Series, length: int, phase: float) -> pd.Series:
+    """pandas_ta jma of one symbol, one bar at a time."""
+    close = close.to_numpy()
+    jma = np.zeros_like(close)
+    volty = np.zeros_like(close)
+    v_sum = np.zeros_like(close)
+    det0 = det1 = 0.0
+    jma[0] = ma1 = upper_band = lower_band = close[0]
+    sum_length = 10
+    half_length = 0.5 * (length - 1)
+    pr = 0.5 if phase < -100 else 2.5 if phase > 100 else 1.5 + phase * 0.01
+    length1 = max((np.log(np.sqrt(half_length)) / np.log(2.0)) + 2.0, 0)
+    pow1 = max(length1 - 2.0, 0.5)
+    length2 = length1 * np.sqrt(half_length)
+    bet = length2 / (length2 + 1)
+    beta = 0.45 * (length - 1) / (0.45 * (length - 1) + 2.0)
+    for i in range(1, close.shape[0]):
+        price = close[i]
+        del1 = price - upper_band
+        del2 = price - lower_band
+        volty[i] = max(abs(del1), abs(del2)) if abs(del1) != abs(del2) else 0
+        v_sum[i] = v_sum[i - 1] + (volty[i] - volty[max(i - sum_length, 0)]) / sum_length
+        average_volty = np.average(v_sum[max(i - 65, 0):i + 1])
+        d_volty = 0 if average_volty == 0 else volty[i] / average_volty
+        r_volty = max(1.0, min(np.power(length1, 1 / pow1), d_volty))
+        power = np.power(r_volty, pow1)
+        kv = np.power(bet, np.sqrt(power))
+        upper_band = price if del1 > 0 else price - kv * del1
+        lower_band = price if del2 < 0 else price - kv * del2
+        alpha = np.power(beta, power)
+        ma1 = (1 - alpha) * price + alpha * ma1
+        det0 = (price - ma1) * (1 - beta) + beta * det0
+        ma2 = ma1 + pr * det0
+        det1 = (ma2 - jma[i - 1]) * (1 - alpha) * (1 - alpha) + alpha * alpha * det1
+        jma[i] = jma[i - 1] + det1
+    jma[:length - 1] = np.nan
+    return pd.Series(jma)
+
+def check_indicators(n_symbols: int, n_rows: int) -> str:
+    """Compare the (time x symbol) RSI, KDJ and JMA and their masks with per-symbol references.
+
+    The references are the pandas_ta definitions transcribed above, and 
+    pandas_ta itself (talib=False) when it is installed.
+    """
+    buffer = make_screened_buffer(n_symbols, n_rows, '1min', nan_fraction=0.0)
+    (symbols, matrices) = get_feature_matrices(buffer, ['high', 'low', 'close'])
+    (high, low, close) = (matrices['high'], matrices['low'], matrices['close'])
+    references = ['reference loops'] + ([] if ta is None else ['pandas_ta'])
+    outputs = {'RSI_{}'.format(length): get_rsi(close, length=length) for length in [6, 12, 24]}
+    outputs.update(zip(['K', 'D', 'J'], get_kdj(high, low, close, length=5, signal=3)))
+    outputs['JMA'] = get_jma(close, length=7, phase=0)
+    expected_masks = {'RSI': [], 'momentum': [], 'JMA': []}
+    for column in range(len(symbols)):
+        (h, l, c) = [pd.Series(values[:, column]) for values in (high, low, close)]
+        for reference in references:
+            if reference == 'pandas_ta':
+                expected = {'RSI_{}'.format(length): ta.rsi(c, length=length, talib=False) 
+                            for length in [6, 12, 24]}
+                kdj = ta.kdj(h, l, c, length=5, signal=3, talib=False)
+                expected.update({line: kdj['{}_5_3'.format(line)] for line in ['K', 'D', 'J']})
+                expected['JMA'] = ta.jma(c, length=7, phase=0, talib=False)
+            else:
+                expected = {'RSI_{}'.format(length): reference_rsi(c, length) 
+                            for length in [6, 12, 24]}
+                expected.update(reference_kdj(h, l, c, length=5, signal=3).items())
+                expected['JMA'] = reference_jma(c, length=7, phase=0)
+            for (name, values) in expected.items():
+                np.testing.assert_allclose(outputs[name][:, column], values.to_numpy(dtype=float), 
+                                           rtol=1e-10, atol=1e-10, err_msg=name)
+        (RSI_6, RSI_12, RSI_24) = [expected['RSI_{}'.format(length)].iat[-1] for length in [6, 12, 24]]
+        expected_masks['RSI'].append((RSI_6 > RSI_12) | (RSI_6 > RSI_24) | (RSI_12 > RSI_24))
+        expected_masks['momentum'].append((expected['J'].iat[-1] > expected['D'].iat[-1]) & 
+                                          (expected['J'].iat[-1] > expected['K'].iat[-1]))
+        expected_masks['JMA'].append(c.iat[-1] < expected['JMA'].iat[-1])
+    masks = {'RSI': get_positive_RSI_mask(close), 
+             'momentum': get_positive_momentum_mask(high, low, close), 
+             'JMA': get_positive_JMA_mask(close)}
+    for (name, mask) in masks.items():
+        np.testing.assert_array_equal(mask, np.array(expected_masks[name]), err_msg=name)
+    return ' and '.join(references)
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, nargs='+', default=[500, 1000])
+    parser.add_argument('--rows', type=int, default=1500)
+    parser.add_argument('--intervals', nargs='+', default=['5s', '1min', '30min', '1d'])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--nan-fraction', type=float, default=0.01, 
+                        help='missing values (any NaN disables the Renko bricks of a symbol at 30min)')
+    parser.add_argument('--check-symbols', type=int, default=50)
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+
+    references = check_indicators(args.check_symbols, args.rows)
+    print('RSI, KDJ, JMA and their masks matched the {} on {} symbols.'.format(
+        references, args.check_symbols))
+
+    print('{:>8s} {:>7s} {:>14s} {:>14s} {:>8s} {:>8s}'.format(
+        'interval', 'symbols', 'per symbol ms', 'screen_all ms', 'speedup', 'passed'))
+    for interval in args.intervals:
+        for n_symbols in args.symbols:
+            buffer = make_screened_buffer(n_symbols, args.rows, interval, nan_fraction=args.nan_fraction)
+            expected = filter_in_market(screen_one, buffer.copy())
+            screened = screen_all(buffer)
+            pd.testing.assert_series_equal(screened, expected)
+            legacy_time = time_it(lambda: filter_in_market(screen_one, buffer.copy()), repeat=args.repeat)
+            time = time_it(lambda: screen_all(buffer), repeat=args.repeat)
+            print('{:>8s} {:7d} {:14.1f} {:14.2f} {:7.0f}x {:8d}'.format(
+                interval, n_symbols, legacy_time * 1000, time * 1000, 
+                legacy_time / time, screened.shape[0]))
+    print('screen_all returned the symbols of filter_in_market(screen_one) every time.')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        benchmarks/bench_shortest_paths.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Per-pair BFS precomputation versus one BFS per asset on the asset graph.
+# Usage:       python -m benchmarks.bench_shortest_paths --symbols 2000 --legacy-sources 3
+
+# Library imports.
+from typing import List, Optional, Tuple
+from benchmarks.bench_conversion_table import time_it
+from benchmarks.synthetic_market import make_exchange_info
+from utils.asset_graph import AssetGraph
+import argparse
+import pickle
+import pandas as pd
+
+# Function definitions.
+def legacy_get_connected_assets(asset: str, exchange_info: pd.DataFrame, priority: str = 'accuracy') -> List[str]:
+    def reorder(connected_assets: List[str], priority: str) -> List[str]:
+        prioritized = \
+            [asset for asset in priority if asset in connected_assets]
+        order = {asset: i for i, asset in enumerate(prioritized)}
+        connected_assets_items = \
+            [asset for asset in connected_assets if asset in order]
+        connected_assets_items.sort(key=order.get)
+        connected_assets_iter = iter(connected_assets_items)
+        return [next(connected_assets_iter) if asset in order 
+                else asset for asset in connected_assets]
+    if priority == 'accuracy':
+        priority = ['USDT', 'BTC', 'BUSD', 'ETH', 'BNB']
+    elif priority == 'fees':
+        priority = ['BUSD', 'BTC', 'BNB', 'ETH', 'USDT']
+    elif priority == 'wallet':
+        priority = ['BTC', 'ETH', 'BUSD', 'BNB', 'USDT']
+    priority += ['BRL', 'AUD']
+    connected_base_assets = exchange_info['quote_asset'] == asset
+    connected_base_assets = exchange_info[connected_base_assets]
+    connected_base_assets = connected_base_assets['base_asset'].tolist()
+    connected_quote_assets = exchange_info['base_asset'] == asset
+    connected_quote_assets = exchange_info[connected_quote_assets]
+    connected_quote_assets = connected_quote_assets['quote_asset'].tolist()
+    connected_assets = list(set(connected_base_assets + connected_quote_assets))
+    connected_assets = reorder(connected_assets, priority=priority)
+    return connected_assets
+
+def legacy_get_shortest_path_between_assets(from_asset: str, 
+                                            to_asset: str, 
+                                            exchange_info: pd.DataFrame, 
+                                            priority: str = 'accuracy') -> List[str]:
+    path_list = [[from_asset]]
+    path_index = 0
+    previous_nodes = [from_asset]
+    if from_asset == to_asset:
+        return path_list[0]
+    while path_index < len(path_list):
+        current_path = path_list[path_index]
+        last_node = current_path[-1]
+        next_nodes = legacy_get_connected_assets(last_node, 
+                                                 exchange_info=exchange_info, 
+                                                 priority=priority)
+        if to_asset in next_nodes:
+            current_path.append(to_asset)
+            return current_path
+        for next_node in next_nodes:
+            if not next_node in previous_nodes:
+                new_path = current_path[:]
+                new_path.append(next_node)
+                path_list.append(new_path)
+                previous_nodes.append([next_node])
+        path_index += 1
+    return []
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=2000)
+    parser.add_argument('--legacy-sources', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    exchange_info = make_exchange_info(n_symbols=args.symbols, seed=0)
+    graph = AssetGraph(exchange_info)
+    assets = graph.assets
+    sources = assets[::max(len(assets) // args.legacy_sources, 1)][:args.legacy_sources]
+
+    def legacy_sources():
+        return [[legacy_get_shortest_path_between_assets(
+                     from_asset, to_asset, exchange_info, priority='accuracy') 
+                 for to_asset in assets if to_asset != from_asset] 
+                for from_asset in sources]
+
+    legacy = time_it(legacy_sources, repeat=1)
+    legacy_paths = legacy_sources()
+    shortest_paths = AssetGraph(exchange_info).get_shortest_paths()
+    for (from_asset, paths) in zip(sources, legacy_paths):
+        targets = [to_asset for to_asset in assets if to_asset != from_asset]
+        for (to_asset, path) in zip(targets, paths):
+            assert len(path) - 1 == len(shortest_paths['accuracy'][from_asset][to_asset])
+
+    build = time_it(lambda: AssetGraph(exchange_info), repeat=args.repeat)
+    graph_time = time_it(lambda: AssetGraph(exchange_info).get_shortest_paths(), 
+                         repeat=args.repeat)
+    legacy_estimate = legacy / len(sources) * len(assets) * len(shortest_paths) / 2
+    print('Symbols:', exchange_info.shape[0], '| assets:', len(assets), 
+          '| priorities:', len(shortest_paths))
+    print('Legacy per-pair BFS:    {:9.2f} ms per source, ~{:.0f} s for all sources '
+          'and priorities (reusing reversed paths)'.format(
+              legacy / len(sources) * 1000, legacy_estimate))
+    print('AssetGraph build:       {:9.2f} ms'.format(build * 1000))
+    print('All shortest paths:     {:9.2f} ms ({:.0f}x)'.format(
+        graph_time * 1000, legacy_estimate / graph_time))
+    print('Pickled size:           {:9.2f} MB'.format(
+        len(pickle.dumps(shortest_paths)) / 1e6))
+
+    delisted_info = exchange_info.drop(exchange_info.index[exchange_info.shape[0] // 2])
+    delisted_graph = AssetGraph(delisted_info)
+    _, recomputed = delisted_graph.update_shortest_paths(shortest_paths)
+    incremental_time = time_it(
+        lambda: AssetGraph(delisted_info).update_shortest_paths(shortest_paths), 
+        repeat=args.repeat)
+    print('One pair delisted:      {:9.2f} ms ({} of {} sources recomputed)'.format(
+        incremental_time * 1000, recomputed, 
+        len(delisted_graph.assets) * len(shortest_paths)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        benchmarks/bench_streaming_indicators.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Streaming indicators advanced per bar versus full-history recomputation, with equality checks.
+# Usage:       python -m benchmarks.bench_streaming_indicators --symbols 500 --rows 1500 --ticks 20
+
+# Library imports.
+from benchmarks.bench_log_storage import make_output_buffer
+from utils.screener import get_feature_matrices, get_rma, get_rsi, get_kdj, get_jma
+from utils.streaming_indicators import Streaming_indicators, INDICATORS
+from sys import float_info as sflt
+import argparse
+import time
+import warnings
+import numpy as np
+import pandas as pd
+
+# Function definitions.
+def get_ema(values: np.ndarray, length: int) -> np.ndarray:
+    """pandas_ta ema of every column."""
+    values = values.copy()
+    mean = np.nanmean(values[:length], axis=0)
+    values[:length - 1] = np.nan
+    values[length - 1] = mean
+    return pd.DataFrame(values).ewm(span=length, adjust=False).mean().to_numpy()
+
+def get_macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> list:
+    macd = get_ema(close, fast) - get_ema(close, slow)
+    signal_line = np.full_like(macd, np.nan)
+    for column in range(macd.shape[1]):
+        first = np.flatnonzero(~np.isnan(macd[:, column]))
+        if first.shape[0] > 0:
+            signal_line[first[0]:, column] = get_ema(macd[first[0]:, [column]], signal)[:, 0]
+    return [macd, macd - signal_line, signal_line]
+
+def get_true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    previous_close = np.full_like(close, np.nan)
+    previous_close[1:] = close[:-1]
+    true_range = np.fmax(np.fmax(np.abs(high - low), np.abs(high - previous_close)), 
+                         np.abs(previous_close - low))
+    true_range[0] = np.nan
+    return true_range
+
+def get_adx(high: np.ndarray, low: np.ndarray, close: np.ndarray, 
+            length: int = 14, lensig: int = None) -> list:
+    lensig = length if lensig is None else lensig
+    atr = get_rma(get_true_range(high, low, close), length)
+    up = np.full_like(high, np.nan)
+    down = np.full_like(low, np.nan)
+    up[1:] = high[1:] - high[:-1]
+    down[1:] = low[:-1] - low[1:]
+    positive = ((up > down) & (up > 0)) * up
+    negative = ((down > up) & (down > 0)) * down
+    positive[np.abs(positive) < sflt.epsilon] = 0
+    negative[np.abs(negative) < sflt.epsilon] = 0
+    dmp = 100 / atr * get_rma(positive, length)
+    dmn = 100 / atr * get_rma(negative, length)
+    return [get_rma(100 * np.abs(dmp - dmn) / (dmp + dmn), lensig), dmp, dmn]
+
+def get_wma(values: np.ndarray, length: int) -> np.ndarray:
+    weights = np.arange(1, length + 1) / (0.5 * length * (length + 1))
+    return pd.DataFrame(values).rolling(length).apply(lambda x: np.dot(x, weights), raw=True).to_numpy()
+
+def get_hma(close: np.ndarray, length: int = 10) -> list:
+    fast = get_wma(close, int(length / 2))
+    slow = get_wma(close, length)
+    return [get_wma(2 * fast - slow, int(np.sqrt(length)))]
+
+def get_cci(high: np.ndarray, low: np.ndarray, close: np.ndarray, 
+            length: int = 14, c: float = 0.015) -> list:
+    typical_price = pd.DataFrame((high + low + close) / 3.0)
+    mean = typical_price.rolling(length).mean()
+    mad = typical_price.rolling(length).apply(lambda x: np.fabs(x - x.mean()).mean(), raw=True)
+    return [((typical_price - mean) / (c * mad)).to_numpy()]
+
+def get_mfi(high: np.ndarray, low: np.ndarray, close: np.ndarray, 
+            volume: np.ndarray, length: int = 14) -> list:
+    typical_price = (high + low + close) / 3.0
+    change = np.full_like(typical_price, np.nan)
+    change[1:] = typical_price[1:] - typical_price[:-1]
+    raw_money_flow = typical_price * volume
+    positive = pd.DataFrame(np.where(change > 0, raw_money_flow, 0.0)).rolling(length).sum()
+    negative = pd.DataFrame(np.where(change < 0, raw_money_flow, 0.0)).rolling(length).sum()
+    return [(100 * positive / (positive + negative)).to_numpy()]
+
+def get_chop(high: np.ndarray, low: np.ndarray, close: np.ndarray, 
+             length: int = 14, atr_length: int = 1, scalar: float = 100) -> list:
+    value_range = pd.DataFrame(high).rolling(length).max() - pd.DataFrame(low).rolling(length).min()
+    atr = get_rma(get_true_range(high, low, close), atr_length)
+    atr_sum = pd.DataFrame(atr).rolling(length).sum()
+    return [(scalar * (np.log10(atr_sum) - np.log10(value_range)) / np.log10(length)).to_numpy()]
+
+def get_rsi_reversal(close: np.ndarray, length: int = 2, 
+                     upper_threshold: float = 95, lower_threshold: float = 5) -> list:
+    RSI = pd.DataFrame(get_rsi(close, length=length))
+    RSI_prev = RSI.shift(1)
+    bear = ((RSI_prev >= upper_threshold) & (RSI < upper_threshold)).astype(int)
+    bull = ((RSI_prev <= lower_threshold) & (RSI > lower_threshold)).astype(int)
+    thresholds = (bear - bull).replace(to_replace=0, method='pad')
+    return [thresholds.to_numpy(dtype=float)]
+
+def get_heikin_ashi(bars: dict) -> dict:
+    close = 0.25 * (bars['open'] + bars['high'] + bars['low'] + bars['close'])
+    open = np.empty_like(close)
+    open[0] = 0.5 * (bars['open'][0] + bars['close'][0])
+    for i in range(1, close.shape[0]):
+        open[i] = 0.5 * (open[i - 1] + close[i - 1])
+    return {'open': open, 
+            'high': np.fmax(np.fmax(open, bars['high']), close), 
+            'low': np.fmin(np.fmin(open, bars['low']), close), 
+            'close': close, 'volume': bars['volume']}
+
+def recompute(name: str, parameters: dict, bars: dict) -> list:
+    """Full-history (time x symbol) outputs of an indicator, in the order of its streaming outputs."""
+    (high, low, close) = (bars['high'], bars['low'], bars['close'])
+    if name == 'rsi':
+        return [get_rsi(close, **parameters)]
+    elif name == 'rsi_reversal':
+        return get_rsi_reversal(close, **parameters)
+    elif name == 'kdj':
+        return list(get_kdj(high, low, close, **parameters))
+    elif name == 'jma':
+        return [get_jma(close, **parameters)]
+    elif name == 'macd':
+        return get_macd(close, **parameters)
+    elif name == 'adx':
+        return get_adx(high, low, close, **parameters)
+    elif name == 'hma':
+        return get_hma(close, **parameters)
+    elif name == 'cci':
+        return get_cci(high, low, close, **parameters)
+    elif name == 'mfi':
+        return get_mfi(high, low, close, bars['volume'], **parameters)
+    elif name == 'chop':
+        return get_chop(high, low, close, **parameters)
+
+def get_bars(dataset: pd.DataFrame, heikin_ashi: bool = False) -> dict:
+    (_, bars) = get_feature_matrices(dataset, ['open', 'high', 'low', 'close', 'base_volume'])
+    bars['volume'] = bars.pop('base_volume')
+    return get_heikin_ashi(bars) if heikin_ashi else bars
+
+def check(indicators: Streaming_indicators, dataset: pd.DataFrame) -> float:
+    """Return the largest relative difference between the streamed and the recomputed outputs."""
+    bars = get_bars(dataset, heikin_ashi=indicators.heikin_ashi)
+    worst = 0.0
+    for (name, parameters) in indicators.specifications:
+        history = indicators.get(name, **parameters)
+        for (output, expected) in zip(history.values(), recompute(name, parameters, bars)):
+            expected = expected[-indicators.keep:]
+            np.testing.assert_array_equal(np.isnan(output), np.isnan(expected), err_msg=name)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                difference = np.abs(output - expected) / np.maximum(np.abs(expected), 1.0)
+            worst = max(worst, np.nanmax(difference, initial=0.0))
+    return worst
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--rows', type=int, default=1500)
+    parser.add_argument('--ticks', type=int, default=20)
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+
+    dataset = make_output_buffer(args.symbols, args.rows + args.ticks, interval='1min')
+    specifications = [(name, {}) for name in INDICATORS]
+    print('{:12s} {:>10s} {:>14s} {:>14s} {:>8s} {:>10s}'.format(
+        'bars', 'seed s', 'update ms/bar', 'recompute ms', 'speedup', 'max error'))
+    for heikin_ashi in [False, True]:
+        indicators = Streaming_indicators(specifications, heikin_ashi=heikin_ashi)
+        t1 = time.perf_counter()
+        indicators.seed(dataset.iloc[:args.rows])
+        t2 = time.perf_counter()
+        for tick in range(args.ticks):
+            indicators.update(dataset.iloc[:args.rows + tick + 1])
+        t3 = time.perf_counter()
+        bars = get_bars(dataset, heikin_ashi=heikin_ashi)
+        for (name, parameters) in specifications:
+            recompute(name, parameters, bars)
+        t4 = time.perf_counter()
+        error = check(indicators, dataset)
+        update = (t3 - t2) / args.ticks
+        print('{:12s} {:10.2f} {:14.2f} {:14.1f} {:7.0f}x {:10.1e}'.format(
+            'heikin-ashi' if heikin_ashi else 'ohlcv', t2 - t1, update * 1000, 
+            (t4 - t3) * 1000, (t4 - t3) / update, error))
+        assert error < 1e-8
+    print('The streamed outputs matched the recomputed ones.')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        benchmarks/bench_suite.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Timings of the conversion, resample and screening hot paths on a synthetic market, stored per commit.
+# Usage:       python -m benchmarks.bench_suite --symbols 500 --rows 720
+#              python -m benchmarks.bench_suite --cases resample clean_data --compare HEAD~3
+
+# Library imports.
+from typing import Callable, Dict, List, Optional
+from benchmarks.bench_conversion_table import Synthetic_client
+from benchmarks.bench_log_storage import make_input_buffer, make_output_buffer
+from benchmarks.synthetic_market import make_exchange_info, make_shortest_paths_to_USDT
+from os import chdir, getcwd, makedirs
+from os.path import abspath, dirname, exists, join
+from glob import glob
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import tempfile
+import time
+import warnings
+import numpy as np
+import pandas as pd
+
+# Variable definitions.
+RESULTS_DIRECTORY = join(dirname(abspath(__file__)), 'results')
+CONVERSION_TABLE_MODES = {
+    'full': {'minimal': False, 'extra_minimal': False}, 
+    'minimal': {'minimal': True, 'extra_minimal': False}, 
+    'extra_minimal': {'extra_minimal': True}, 
+    'super_extra_minimal': {'super_extra_minimal': True}, 
+    'as_pair': {'as_pair': True, 'extra_minimal': False}}
+
+# Class definition.
+class Synthetic_market:
+    """Inputs shared by the cases, generated once per size and on first use."""
+    def __init__(self, n_symbols: int, n_rows: int, n_ticks: int, seed: int = 0):
+        """
+        :param n_symbols: tradable symbols of the market.
+        :param n_rows: bars of the OHLCV buffers.
+        :param n_ticks: ticks of the raw input buffer.
+        :param seed: random seed.
+        """
+        self.n_symbols = n_symbols
+        self.n_rows = n_rows
+        self.n_ticks = n_ticks
+        self.seed = seed
+        self.exchange_info = make_exchange_info(n_symbols=n_symbols, seed=seed)
+        self.cache = {}
+
+    def get(self, name: str, make: Callable[[], object]) -> object:
+        if name not in self.cache:
+            self.cache[name] = make()
+        return self.cache[name]
+
+    def get_shortest_paths(self) -> Dict:
+        return self.get('shortest_paths', lambda: make_shortest_paths_to_USDT(self.exchange_info))
+
+    def get_tickers(self) -> pd.DataFrame:
+        """Return a raw conversion table as returned by client.get_ticker()."""
+        from utils.conversion_table import get_conversion_table_from_binance
+        return self.get('tickers', lambda: get_conversion_table_from_binance(
+            client=Synthetic_client(self.exchange_info, seed=self.seed), 
+            exchange_info=self.exchange_info))
+
+    def get_input_buffer(self) -> pd.DataFrame:
+        return self.get('input_buffer', lambda: make_input_buffer(
+            self.exchange_info, self.n_ticks * self.n_symbols, interval='5s'))
+
+    def get_output_buffer(self) -> pd.DataFrame:
+        """Return a 5s OHLCV buffer named after the symbols of the market."""
+        def make():
+            buffer = make_output_buffer(self.n_symbols, self.n_rows, interval='5s', seed=self.seed)
+            symbols = dict(zip(buffer.columns.levels[0], self.exchange_info['symbol']))
+            return buffer.rename(columns=symbols, level='symbol')
+        return self.get('output_buffer', make)
+
+    def get_gapped_output_buffer(self, fraction: float = 0.05) -> pd.DataFrame:
+        """Return the OHLCV buffer with a fraction of its values missing."""
+        def make():
+            buffer = self.get_output_buffer().copy()
+            rng = np.random.default_rng(self.seed)
+            values = buffer.to_numpy()
+            values[rng.random(values.shape) < fraction] = np.nan
+            return pd.DataFrame(values, index=buffer.index, columns=buffer.columns)
+        return self.get('gapped_output_buffer', make)
+
+# Function definitions.
+def make_process_conversion_table(market: Synthetic_market, mode: str) -> Callable[[], object]:
+    from utils.conversion_table import process_conversion_table
+    conversion_table = market.get_tickers()
+    shortest_paths = market.get_shortest_paths()
+    return lambda: process_conversion_table(conversion_table, market.exchange_info, 
+                                            shortest_paths=shortest_paths, 
+                                            **CONVERSION_TABLE_MODES[mode])
+
+def make_resample(market: Synthetic_market) -> Callable[[], object]:
+    from utils.resample import resample
+    buffer = market.get_output_buffer()
+    return lambda: resample(buffer.copy(), '1min')
+
+def make_resample_from_raw(market: Synthetic_market) -> Callable[[], object]:
+    from utils.crypto_logger_output import Crypto_logger_output
+    logger = Crypto_logger_output(interval_input='5s', interval='5s', buffer_size=market.n_rows)
+    buffer = market.get_input_buffer()
+    return lambda: logger.resample_from_raw(buffer)
+
+def make_filter_movers(market: Synthetic_market) -> Callable[[], object]:
+    from utils.ring_buffer import Ticker_ring_buffer, filter_movers
+    buffer = market.get_input_buffer()
+    ring = Ticker_ring_buffer(slots=32, max_rows=buffer.shape[0])
+    ring.put_frame(buffer)
+    return lambda: filter_movers(ring, count=1000, price_percent=5.0, volume_percent=0.0)
+
+def make_filter_in_market(market: Synthetic_market) -> Callable[[], object]:
+    from utils.indicators import filter_in_market, screen_one
+    from utils.resample import resample
+    buffer = resample(market.get_output_buffer().copy(), '1min')
+    return lambda: filter_in_market(screen_one, buffer.copy())
+
+def make_screen_all(market: Synthetic_market) -> Callable[[], object]:
+    from utils.resample import resample
+    from utils.screener import screen_all
+    buffer = resample(market.get_output_buffer().copy(), '1min')
+    return lambda: screen_all(buffer)
+
+def make_clean_data(market: Synthetic_market) -> Callable[[], object]:
+    from utils.ohlcv_cleaning import clean_data
+    buffer = market.get_gapped_output_buffer()
+    return lambda: clean_data(buffer.copy())
+
+def make_convert_ohlcvs(market: Synthetic_market) -> Callable[[], object]:
+    from utils.conversion_ohlcv import convert_ohlcvs
+    buffer = market.get_output_buffer()
+    buffer = buffer.loc[:, buffer.columns.get_level_values('feature').isin(
+        ['open', 'high', 'low', 'close', 'base_volume', 'quote_volume'])]
+    shortest_paths = market.get_shortest_paths()
+    return lambda: convert_ohlcvs('USDT', buffer.copy(), market.exchange_info, 
+                                  shortest_paths=shortest_paths)
+
+def make_convert_ohlcvs_from_pairs_to_assets(market: Synthetic_market) -> Callable[[], object]:
+    from utils.conversion_ohlcv import convert_ohlcvs_from_pairs_to_assets
+    buffer = market.get_output_buffer()
+    buffer = buffer.loc[:, buffer.columns.get_level_values('feature').isin(
+        ['open', 'high', 'low', 'close', 'base_volume', 'quote_volume'])]
+    shortest_paths = market.get_shortest_paths()
+    return lambda: convert_ohlcvs_from_pairs_to_assets(buffer.copy(), market.exchange_info, 
+                                                       shortest_paths=shortest_paths)
+
+def make_precompute_shortest_paths(market: Synthetic_market) -> Callable[[], object]:
+    from utils.conversion import precompute_shortest_paths
+    return lambda: precompute_shortest_paths(market.exchange_info, priority=None, 
+                                             shortest_paths_file=None)
+
+def get_cases() -> Dict[str, Callable[[Synthetic_market], Callable[[], object]]]:
+    """Return the setup of every case by name, a setup returning the callable to time."""
+    cases = {'process_conversion_table[' + mode + ']':
+             (lambda market, mode=mode: make_process_conversion_table(market, mode))
+             for mode in CONVERSION_TABLE_MODES}
+    cases.update({
+        'resample': make_resample, 
+        'resample_from_raw': make_resample_from_raw, 
+        'filter_movers': make_filter_movers, 
+        'filter_in_market': make_filter_in_market, 
+        'screen_all': make_screen_all, 
+        'clean_data': make_clean_data, 
+        'convert_ohlcvs': make_convert_ohlcvs, 
+        'convert_ohlcvs_from_pairs_to_assets': make_convert_ohlcvs_from_pairs_to_assets, 
+        'precompute_shortest_paths': make_precompute_shortest_paths})
+    return cases
+
+def time_case(function: Callable[[], object], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    timings = []
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for _ in range(warmup):
+            function()
+        for _ in range(repeat):
+            t1 = time.perf_counter()
+            function()
+            t2 = time.perf_counter()
+            timings.append(t2 - t1)
+    timings = np.array(timings) * 1000
+    return {'min_ms': timings.min(), 'median_ms': float(np.median(timings)), 
+            'max_ms': timings.max(), 'repeat': repeat}
+
+def get_commit(reference: str = 'HEAD') -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', reference], capture_output=True, 
+                              text=True, check=True, cwd=dirname(RESULTS_DIRECTORY)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def is_dirty() -> bool:
+    try:
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], 
+                                capture_output=True, text=True, check=True, 
+                                cwd=dirname(RESULTS_DIRECTORY)).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    return len(status.strip()) > 0
+
+def get_results_path(commit: str, n_symbols: int, n_rows: int) -> str:
+    return join(RESULTS_DIRECTORY, '{}_{}x{}.json'.format(commit, n_symbols, n_rows))
+
+def save_results(results: Dict[str, object], path: str) -> None:
+    makedirs(dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=1)
+
+def load_results(path: str) -> Dict[str, object]:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def format_results(results: Dict[str, object], 
+                   baseline: Optional[Dict[str, object]] = None, 
+                   threshold: float = 1.1) -> str:
+    """Tabulate the timings, with their ratio to the baseline ones (flagged above threshold)."""
+    lines = ['{:45s} {:>10s} {:>10s} {:>8s}'.format('case', 'min ms', 'median ms', 'ratio')]
+    for (name, result) in results['cases'].items():
+        if 'error' in result:
+            lines.append('{:45s} {}'.format(name, result['error']))
+            continue
+        line = '{:45s} {:10.2f} {:10.2f}'.format(name, result['min_ms'], result['median_ms'])
+        if baseline is not None and 'min_ms' in baseline['cases'].get(name, {}):
+            ratio = result['min_ms'] / baseline['cases'][name]['min_ms']
+            line += ' {:7.2f}x{}'.format(ratio, ' REGRESSION' if ratio > threshold else '')
+        lines.append(line)
+    return '\n'.join(lines)
+
+def run_suite(market: Synthetic_market, names: List[str], repeat: int) -> Dict[str, Dict[str, object]]:
+    """Time each case, recording the error of the cases failing to set up or run."""
+    cases = get_cases()
+    results = {}
+    for name in names:
+        try:
+            results[name] = time_case(cases[name](market), repeat=repeat)
+        except Exception as e:
+            results[name] = {'error': '{}: {}'.format(type(e).__name__, e)}
+        print('{:45s} {}'.format(name, 'done' if 'error' not in results[name] else 'failed'))
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--rows', type=int, default=720, 
+                        help='bars of the 5s OHLCV buffers')
+    parser.add_argument('--ticks', type=int, default=60, 
+                        help='ticks of the raw input buffer')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--cases', nargs='+', default=None, 
+                        help='cases to run, all by default: ' + ', '.join(get_cases()))
+    parser.add_argument('--compare', default=None, 
+                        help='commit (or results file) to compare with, the latest results by default')
+    parser.add_argument('--threshold', type=float, default=1.1)
+    parser.add_argument('--no-save', action='store_true')
+    args = parser.parse_args()
+    names = list(get_cases()) if args.cases is None else args.cases
+
+    commit = get_commit() or 'unversioned'
+    dirty = is_dirty()
+    cwd = getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        # The loggers write their crypto_logs directory in the working directory.
+        chdir(directory)
+        try:
+            market = Synthetic_market(args.symbols, args.rows, args.ticks)
+            cases = run_suite(market, names, args.repeat)
+        finally:
+            chdir(cwd)
+    results = {'commit': commit, 'dirty': dirty, 
+               'date': datetime.datetime.now().isoformat(timespec='seconds'), 
+               'python': platform.python_version(), 'numpy': np.__version__, 
+               'pandas': pd.__version__, 'machine': platform.machine(), 
+               'symbols': args.symbols, 'rows': args.rows, 'ticks': args.ticks, 
+               'cases': cases}
+
+    path = get_results_path(commit + ('-dirty' if dirty else ''), args.symbols, args.rows)
+    baseline = None
+    if args.compare is None:
+        previous = [load_results(name) for name in 
+                    glob(get_results_path('*', args.symbols, args.rows)) if name != path]
+        if len(previous) > 0:
+            baseline = max(previous, key=lambda results: results['date'])
+    elif exists(args.compare):
+        baseline = load_results(args.compare)
+    else:
+        baseline_path = get_results_path(get_commit(args.compare) or args.compare, 
+                                         args.symbols, args.rows)
+        if exists(baseline_path):
+            baseline = load_results(baseline_path)
+    if baseline is not None:
+        print('Compared with {} ({}).'.format(baseline['commit'], baseline['date']))
+    print(format_results(results, baseline=baseline, threshold=args.threshold))
+
+    if not args.no_save:
+        save_results(results, path)
+        print('Saved to {}.'.format(path))
+
+if __name__ == '__main__':
+    main()
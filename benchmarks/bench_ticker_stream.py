@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        benchmarks/bench_ticker_stream.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Ticker_stream fed by a local Ticker_replay_server: throughput, snapshot cost and equality with get_ticker.
+# Usage:       python -m benchmarks.bench_ticker_stream --symbols 2000 --ticks 60
+
+# Library imports.
+from typing import Dict, List, Tuple
+from benchmarks.synthetic_market import make_asset_values, make_exchange_info, make_ticker
+from benchmarks.synthetic_market import make_shortest_paths_to_USDT
+from utils.conversion_table import get_conversion_table
+from utils.ticker_stream import TICKER_STREAM_FIELDS, BOOK_TICKER_STREAM_FIELDS, Ticker_stream
+from utils.ticker_replay import Ticker_replay_server
+import argparse
+import json
+import time
+import numpy as np
+import pandas as pd
+
+# Function definitions.
+def to_ticker_event(ticker: Dict[str, object], event_time: int) -> Dict[str, object]:
+    """client.get_ticker() record to a '24hrTicker' stream event."""
+    event = {'e': '24hrTicker', 'E': event_time}
+    event.update({key: ticker[name] for (key, name) in TICKER_STREAM_FIELDS.items()})
+    return event
+
+def to_book_ticker_event(ticker: Dict[str, object], update_id: int) -> Dict[str, object]:
+    event = {'u': update_id, 's': ticker['symbol']}
+    event.update({key: ticker[name] for (key, name) in BOOK_TICKER_STREAM_FIELDS.items()})
+    return event
+
+def make_stream_messages(exchange_info: pd.DataFrame, 
+                         n_ticks: int, 
+                         changed: float = 0.3, 
+                         seed: int = 0) -> Tuple[List[Dict[str, object]], List[Tuple[float, str]], List[Dict[str, object]]]:
+    """Return the first get_ticker, one second of combined stream messages per tick and the last get_ticker.
+
+    Every tick, a fraction changed of the symbols gets a ticker event and
+    as many others a book ticker event (bid and ask only).
+    """
+    rng = np.random.default_rng(seed)
+    asset_values = make_asset_values(exchange_info, seed=seed)
+    first = make_ticker(exchange_info, seed=seed, t=0, asset_values=asset_values)
+    expected = {ticker['symbol']: dict(ticker) for ticker in first}
+    messages = []
+    for t in range(1, n_ticks + 1):
+        tickers = make_ticker(exchange_info, seed=seed, t=t, asset_values=asset_values)
+        updated = rng.random(len(tickers)) < changed
+        events = [to_ticker_event(ticker, t * 1000)
+                  for (ticker, update) in zip(tickers, updated) if update]
+        for ticker in events:
+            expected[ticker['s']] = {name: ticker[key] for (key, name) in TICKER_STREAM_FIELDS.items()}
+        messages.append((float(t), json.dumps({'stream': '!ticker@arr', 'data': events})))
+        for i in np.flatnonzero(~updated & (rng.random(len(tickers)) < changed)):
+            event = to_book_ticker_event(tickers[i], t * 100000 + int(i))
+            for (key, name) in BOOK_TICKER_STREAM_FIELDS.items():
+                expected[event['s']][name] = event[key]
+            messages.append((t + 0.5, json.dumps({'stream': '!bookTicker', 'data': event})))
+    return first, messages, list(expected.values())
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=2000)
+    parser.add_argument('--ticks', type=int, default=60)
+    parser.add_argument('--speed', type=float, default=0.0)
+    args = parser.parse_args()
+
+    exchange_info = make_exchange_info(n_symbols=args.symbols, seed=0)
+    shortest_paths = make_shortest_paths_to_USDT(exchange_info)
+    (first, messages, expected) = make_stream_messages(exchange_info, args.ticks)
+    server = Ticker_replay_server(messages, speed=args.speed)
+    url = server.start()
+    stream = Ticker_stream(url=url)
+    stream.table.put_tickers(first)
+    t1 = time.perf_counter()
+    stream.start()
+    while stream.messages < len(messages):
+        time.sleep(0.01)
+    t2 = time.perf_counter()
+    stream.stop()
+    server.stop()
+    print('{} symbols, {} messages ({} ticks) replayed in {:.2f} s: {:.0f} messages/s'.format(
+        args.symbols, len(messages), args.ticks, t2 - t1, len(messages) / (t2 - t1)))
+
+    def snapshot(tickers):
+        return get_conversion_table(client=None, exchange_info=exchange_info, as_pair=False, 
+                                    extra_minimal=True, shortest_paths=shortest_paths, 
+                                    tickers=tickers)
+
+    t1 = time.perf_counter()
+    tickers = stream.get_tickers()
+    t2 = time.perf_counter()
+    streamed = snapshot(tickers)
+    t3 = time.perf_counter()
+    print('Snapshot: get_tickers {:.2f} ms, conversion table {:.2f} ms'.format(
+        (t2 - t1) * 1000, (t3 - t2) * 1000))
+    pd.testing.assert_frame_equal(streamed, snapshot(expected))
+    print('Streamed conversion table equals the one of the final get_ticker.')
+
+if __name__ == '__main__':
+    main()
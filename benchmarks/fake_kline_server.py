@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        benchmarks/fake_kline_server.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Local HTTP server faking /api/v3/klines, with request weight limits, latency and failures.
+# Usage:       python -m benchmarks.fake_kline_server --port 8080 --weight-limit 6000
+
+# Library imports.
+from typing import Dict, List, Optional, Tuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import Process
+from urllib.parse import parse_qs, urlparse
+from collections import Counter
+from zlib import crc32
+import argparse
+import json
+import socket
+import threading
+import time
+import numpy as np
+import requests
+
+# Variable definitions.
+INTERVAL_MILLISECONDS = {'1m': 60000, '3m': 180000, '5m': 300000, '15m': 900000, 
+                         '30m': 1800000, '1h': 3600000, '2h': 7200000, '4h': 14400000, 
+                         '6h': 21600000, '8h': 28800000, '12h': 43200000, '1d': 86400000}
+
+# Function definitions.
+def make_klines(symbol: str, open_times: np.ndarray, interval_ms: int) -> List[list]:
+    """Deterministic klines of symbol: the same open time always gives the same kline."""
+    seed = crc32(symbol.encode()) % 1000
+    t = open_times / interval_ms
+    (noise, previous_noise) = [np.modf(np.sin(u * 12.9898 + seed) * 43758.5453)[0] for u in (t, t - 1)]
+    base = 10.0 ** (seed % 7 - 3)
+    close = base * (1 + 0.05 * np.sin(t / (50 + seed)) + 0.002 * noise)
+    open = base * (1 + 0.05 * np.sin((t - 1) / (50 + seed)) + 0.002 * previous_noise)
+    high = np.maximum(open, close) * (1 + 0.001 * np.abs(noise))
+    low = np.minimum(open, close) * (1 - 0.001 * np.abs(noise))
+    volume = 1000 * (1 + np.abs(noise)) / base
+    return [[int(open_time), '%.8f' % o, '%.8f' % h, '%.8f' % l, '%.8f' % c, '%.8f' % v, 
+             int(open_time) + interval_ms - 1, '%.8f' % (v * c), int(100 * (1 + abs(n))), 
+             '%.8f' % (v / 2), '%.8f' % (v * c / 2), '0']
+            for (open_time, o, h, l, c, v, n) in zip(open_times, open, high, low, close, volume, noise)]
+
+# Class definition.
+class Fake_kline_server:
+    """Threaded local server answering /api/v3/klines like Binance.
+
+    Every symbol has a kline per interval from its listing time up to
+    now. Each request costs its
+    weight in the current weight window, answers carrying
+    X-MBX-USED-WEIGHT-1M, and requests past weight_limit get a 429 with
+    Retry-After. latency delays every answer and failure_rate turns answers
+    into 503s, to exercise the client's retries. /stats returns the
+    requests, rejections and failures served.
+    """
+    def __init__(self, 
+                 port: int = 0, 
+                 weight_limit: int = 6000, 
+                 weight_window: float = 60.0, 
+                 latency: float = 0.0, 
+                 failure_rate: float = 0.0, 
+                 listings: Optional[Dict[str, int]] = None, 
+                 seed: int = 0):
+        """
+        :param port: port to listen on (0 picks a free one).
+        :param weight_limit: request weight allowed per weight window.
+        :param weight_window: length in seconds of the weight window.
+        :param latency: seconds added to every answer.
+        :param failure_rate: fraction of requests answered with a 503.
+        :param listings: listing time (ms) per symbol, 30 days before the server started otherwise.
+        :param seed: random seed of the failures.
+        """
+        self.weight_limit = weight_limit
+        self.weight_window = weight_window
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.listed = int(time.time() * 1000) - 30 * 86400000
+        self.listings = {} if listings is None else listings
+        self.rng = np.random.default_rng(seed)
+        self.lock = threading.Lock()
+        self.used_weight = Counter()
+        self.stats = Counter()
+        self.klines = {} # Encoded klines per (symbol, interval, open time).
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self.get_handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        return 'http://127.0.0.1:{}'.format(self.server.server_address[1])
+
+    def start(self) -> 'Fake_kline_server':
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> 'Fake_kline_server':
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def take_weight(self, weight: int) -> Tuple[bool, int, float, bool]:
+        """Charge weight and return (accepted, used weight, seconds left in the window, failed)."""
+        now = time.time()
+        window = int(now // self.weight_window)
+        with self.lock:
+            self.used_weight[window] += weight
+            used_weight = self.used_weight[window]
+            failed = self.rng.random() < self.failure_rate
+        return (used_weight <= self.weight_limit, used_weight, 
+                (window + 1) * self.weight_window - now, failed)
+
+    def get_klines(self, query: Dict[str, str]) -> bytes:
+        """Return the JSON klines answering query, encoding each kline once."""
+        interval_ms = INTERVAL_MILLISECONDS[query['interval']]
+        now = int(time.time() * 1000)
+        listing_time = self.listings.get(query['symbol'], self.listed)
+        start_time = max(int(query.get('startTime', 0)), listing_time)
+        end_time = min(int(query.get('endTime', now)), now)
+        first = -(-start_time // interval_ms) * interval_ms
+        open_times = np.arange(first, end_time + 1, interval_ms, dtype=np.int64)
+        open_times = open_times[:min(int(query.get('limit', 500)), 1000)]
+        keys = [(query['symbol'], interval_ms, open_time) for open_time in open_times.tolist()]
+        missing = [key[2] for key in keys if key not in self.klines]
+        if len(missing) > 0:
+            klines = make_klines(query['symbol'], np.array(missing, dtype=np.int64), interval_ms)
+            for (open_time, kline) in zip(missing, klines):
+                self.klines[(query['symbol'], interval_ms, open_time)] = \
+                    json.dumps(kline, separators=(',', ':')).encode()
+        return b'[' + b','.join([self.klines[key] for key in keys]) + b']'
+
+    def get_handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1' # Keep-alive, as Binance.
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def answer(self, status: int, payload: object, headers: Dict[str, str]) -> None:
+                body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for (name, value) in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self) -> None:
+                url = urlparse(self.path)
+                query = {name: values[-1] for (name, values) in parse_qs(url.query).items()}
+                if server.latency > 0:
+                    time.sleep(server.latency)
+                if url.path == '/api/v3/ping':
+                    return self.answer(200, {}, {})
+                if url.path == '/stats':
+                    with server.lock:
+                        return self.answer(200, dict(server.stats), {})
+                if url.path != '/api/v3/klines':
+                    return self.answer(404, {'code': -1, 'msg': 'Not found.'}, {})
+                (accepted, used_weight, retry_after, failed) = server.take_weight(2)
+                headers = {'X-MBX-USED-WEIGHT-1M': str(used_weight)}
+                with server.lock:
+                    server.stats['requests'] += 1
+                    server.stats['rejected'] += not accepted
+                    server.stats['failed'] += accepted and failed
+                if not accepted:
+                    headers['Retry-After'] = str(int(np.ceil(retry_after)))
+                    return self.answer(429, {'code': -1003, 'msg': 'Too many requests.'}, headers)
+                if failed:
+                    return self.answer(503, {'code': -1001, 'msg': 'Service unavailable.'}, headers)
+                self.answer(200, server.get_klines(query), headers)
+
+        return Handler
+
+# Function definitions.
+def serve(port: int, parameters: Dict[str, object]) -> None:
+    Fake_kline_server(port=port, **parameters).server.serve_forever()
+
+def start_server_process(**parameters) -> Tuple[Process, str]:
+    """Start a Fake_kline_server in its own process (off the client's GIL) and return it with its URL."""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    process = Process(target=serve, args=(port, parameters), daemon=True)
+    process.start()
+    url = 'http://127.0.0.1:{}'.format(port)
+    for _ in range(100):
+        try:
+            requests.get(url + '/api/v3/ping', timeout=1)
+            return (process, url)
+        except requests.ConnectionError:
+            time.sleep(0.05)
+    process.terminate()
+    raise RuntimeError('The fake kline server did not start on port {}.'.format(port))
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--weight-limit', type=int, default=6000)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    args = parser.parse_args()
+    server = Fake_kline_server(port=args.port, weight_limit=args.weight_limit, 
+                               latency=args.latency, failure_rate=args.failure_rate)
+    print('Serving /api/v3/klines on {}'.format(server.url))
+    server.server.serve_forever()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        benchmarks/synthetic_market.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Synthetic Binance-like market generators for offline benchmarks.
+
+# Library imports.
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+# Variable definitions.
+QUOTE_ASSETS = ['USDT', 'BTC', 'BUSD', 'ETH', 'BNB', 'TRY', 'EUR', 'BRL', 'AUD']
+QUOTE_WEIGHTS = [0.35, 0.25, 0.15, 0.08, 0.07, 0.04, 0.03, 0.02, 0.01]
+QUOTE_USDT_VALUES = {'USDT': 1.0, 'BTC': 20000.0, 'BUSD': 1.0, 'ETH': 1500.0, 
+                     'BNB': 300.0, 'TRY': 0.05, 'EUR': 1.05, 'BRL': 0.2, 
+                     'AUD': 0.7}
+
+# Function definitions.
+def make_asset_names(n_assets: int) -> List[str]:
+    """Return n_assets unique upper-case asset names (AAA, AAB, ...)."""
+    letters = [chr(ord('A') + i) for i in range(26)]
+    names = []
+    for i in range(n_assets):
+        name = ''
+        j = i
+        for _ in range(3):
+            name = letters[j % 26] + name
+            j //= 26
+        names.append('X' + name)
+    return names
+
+def make_exchange_info(n_symbols: int = 2000, seed: int = 0) -> pd.DataFrame:
+    """Return an exchange_info DataFrame shaped like Cryptocurrency_exchange.info.
+
+    Keyword arguments:
+    n_symbols -- The number of tradable symbols to generate.
+    seed -- The random seed.
+    """
+    rng = np.random.default_rng(seed)
+    rows = [('BTC', 'USDT'), ('ETH', 'USDT'), ('BNB', 'USDT'), ('BUSD', 'USDT'), 
+            ('ETH', 'BTC'), ('BNB', 'BTC'), ('BNB', 'ETH'), ('BTC', 'BUSD'), 
+            ('ETH', 'BUSD'), ('BNB', 'BUSD'), ('USDT', 'TRY'), ('BTC', 'TRY'), 
+            ('EUR', 'USDT'), ('BTC', 'EUR'), ('USDT', 'BRL'), ('BTC', 'BRL'), 
+            ('AUD', 'USDT'), ('BTC', 'AUD')]
+    n_base_assets = max((n_symbols - len(rows)) // 3, 1)
+    base_assets = make_asset_names(n_base_assets)
+    seen = set(rows)
+    while len(rows) < n_symbols:
+        base_asset = base_assets[rng.integers(len(base_assets))]
+        quote_asset = QUOTE_ASSETS[rng.choice(len(QUOTE_ASSETS), p=QUOTE_WEIGHTS)]
+        if (base_asset, quote_asset) not in seen:
+            seen.add((base_asset, quote_asset))
+            rows.append((base_asset, quote_asset))
+    exchange_info = pd.DataFrame(rows, columns=['base_asset', 'quote_asset'])
+    exchange_info['symbol'] = exchange_info['base_asset'] + exchange_info['quote_asset']
+    exponents = rng.integers(2, 9, size=exchange_info.shape[0])
+    exchange_info['base_asset_precision'] = 8
+    exchange_info['quote_precision'] = 8
+    exchange_info['quote_asset_precision'] = 8
+    exchange_info['min_price'] = 10.0 ** -exponents
+    exchange_info['max_price'] = 1000000.0
+    exchange_info['tick_size'] = 10.0 ** -exponents
+    exchange_info['step_size'] = 10.0 ** -(8 - exponents // 2)
+    return exchange_info[['symbol', 'base_asset', 'base_asset_precision', 
+                          'quote_asset', 'quote_precision', 
+                          'quote_asset_precision', 'min_price', 'max_price', 
+                          'tick_size', 'step_size']]
+
+def make_asset_values(exchange_info: pd.DataFrame, seed: int = 0) -> Dict[str, float]:
+    """Return a USDT value for every asset in exchange_info."""
+    rng = np.random.default_rng(seed)
+    assets = pd.unique(exchange_info[['base_asset', 'quote_asset']].values.ravel())
+    values = {asset: float(np.exp(rng.uniform(-8, 6))) for asset in assets}
+    values.update(QUOTE_USDT_VALUES)
+    return values
+
+def make_ticker(exchange_info: pd.DataFrame, 
+                seed: int = 0, 
+                t: int = 0, 
+                now_ms: Optional[int] = None, 
+                asset_values: Optional[Dict[str, float]] = None) -> List[Dict[str, object]]:
+    """Return a list of dicts shaped like python-binance's client.get_ticker().
+
+    Keyword arguments:
+    exchange_info -- The exchange_info DataFrame from make_exchange_info.
+    seed -- The random seed for the market (asset values).
+    t -- The tick number (drives the random walk and trade counts).
+    now_ms -- The epoch in milliseconds of tick 0.
+    asset_values -- Optional precomputed asset USDT values.
+    """
+    if asset_values is None:
+        asset_values = make_asset_values(exchange_info, seed=seed)
+    if now_ms is None:
+        now_ms = 1670000000000
+    rng = np.random.default_rng(seed * 1000003 + t)
+    n = exchange_info.shape[0]
+    base_values = exchange_info['base_asset'].map(asset_values).to_numpy()
+    quote_values = exchange_info['quote_asset'].map(asset_values).to_numpy()
+    close = base_values / quote_values * np.exp(rng.normal(0, 0.01, size=n))
+    open_ = close * np.exp(rng.normal(0, 0.05, size=n))
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 0.02, size=n)))
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 0.02, size=n)))
+    spread = np.abs(rng.normal(0, 0.001, size=n))
+    base_volume = np.exp(rng.uniform(2, 14, size=n)) / np.maximum(base_values, 1e-9) * 1e-2
+    first_id = rng.integers(1, 10 ** 8, size=n)
+    count = rng.integers(0, 10 ** 5, size=n) + t * rng.integers(0, 5, size=n)
+    close_time = now_ms + t * 5000 - rng.integers(0, 4000, size=n)
+    def fmt(values):
+        return ['{:.8f}'.format(value) for value in values]
+    columns = {
+        'symbol': exchange_info['symbol'].tolist(), 
+        'priceChange': fmt(close - open_), 
+        'priceChangePercent': ['{:.3f}'.format(value) for value in
+                               (close - open_) / open_ * 100], 
+        'weightedAvgPrice': fmt((high + low + close) / 3), 
+        'prevClosePrice': fmt(open_), 
+        'lastPrice': fmt(close), 
+        'lastQty': fmt(base_volume / 1000), 
+        'bidPrice': fmt(close * (1 - spread)), 
+        'bidQty': fmt(base_volume / 500), 
+        'askPrice': fmt(close * (1 + spread)), 
+        'askQty': fmt(base_volume / 500), 
+        'openPrice': fmt(open_), 
+        'highPrice': fmt(high), 
+        'lowPrice': fmt(low), 
+        'volume': fmt(base_volume), 
+        'quoteVolume': fmt(base_volume * close), 
+        'openTime': (close_time - 86400000).tolist(), 
+        'closeTime': close_time.tolist(), 
+        'firstId': first_id.tolist(), 
+        'lastId': (first_id + count).tolist(), 
+        'count': count.tolist()}
+    return pd.DataFrame(columns).to_dict(orient='records')
+
+def make_shortest_paths_to_USDT(exchange_info: pd.DataFrame, 
+                                priority: str = 'accuracy') -> Dict[str, Dict[str, Dict[str, list]]]:
+    """Return a shortest_paths dict holding only the paths to USDT."""
+    from utils.conversion import get_shortest_pair_path_between_assets
+    assets = pd.unique(exchange_info[['base_asset', 'quote_asset']].values.ravel())
+    shortest_paths = {priority: {}}
+    for asset in assets:
+        if asset != 'USDT':
+            shortest_paths[priority][asset] = {
+                'USDT': get_shortest_pair_path_between_assets(
+                    from_asset=asset, to_asset='USDT', 
+                    exchange_info=exchange_info, priority=priority)}
+    return shortest_paths
+
+def make_exchange_info_payload(exchange_info: pd.DataFrame) -> Dict[str, object]:
+    """Return a dict shaped like python-binance's client.get_exchange_info() for exchange_info."""
+    def fmt(value):
+        return '{:.8f}'.format(value)
+    symbols = []
+    for row in exchange_info.itertuples(index=False):
+        symbols.append({
+            'symbol': row.symbol, 'status': 'TRADING', 
+            'baseAsset': row.base_asset, 'baseAssetPrecision': int(row.base_asset_precision), 
+            'quoteAsset': row.quote_asset, 'quotePrecision': int(row.quote_precision), 
+            'quoteAssetPrecision': int(row.quote_asset_precision), 
+            'baseCommissionPrecision': 8, 'quoteCommissionPrecision': 8, 
+            'orderTypes': ['LIMIT', 'LIMIT_MAKER', 'MARKET', 'STOP_LOSS_LIMIT', 'TAKE_PROFIT_LIMIT'], 
+            'icebergAllowed': True, 'ocoAllowed': True, 'quoteOrderQtyMarketAllowed': True, 
+            'allowTrailingStop': True, 'cancelReplaceAllowed': True, 
+            'isSpotTradingAllowed': True, 'isMarginTradingAllowed': False, 
+            'filters': [{'filterType': 'PRICE_FILTER', 'minPrice': fmt(row.min_price), 
+                         'maxPrice': fmt(row.max_price), 'tickSize': fmt(row.tick_size)}, 
+                        {'filterType': 'LOT_SIZE', 'minQty': fmt(row.step_size), 
+                         'maxQty': '9000000.00000000', 'stepSize': fmt(row.step_size)}, 
+                        {'filterType': 'PERCENT_PRICE_BY_SIDE', 'bidMultiplierUp': '5', 
+                         'bidMultiplierDown': '0.2', 'askMultiplierUp': '5', 
+                         'askMultiplierDown': '0.2', 'avgPriceMins': 5}], 
+            'permissions': ['SPOT']})
+    return {'timezone': 'UTC', 'serverTime': 1670000000000, 'rateLimits': [], 
+            'exchangeFilters': [], 'symbols': symbols}
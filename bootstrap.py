@@ -15,12 +15,27 @@ from utils.conversion import get_timezone_offset_in_seconds
 from utils.conversion import precompute_shortest_paths
 from utils.conversion_table import get_conversion_table, get_new_tickers
 from utils.ohlcvs import download_pairs_bootstrapped
+from utils.kline_downloader import Kline_downloader
+from utils.kline_store import Kline_store
 from utils.bootstrap import bootstrap_loggers
 import os
 import shutil
 import threading
 import pandas as pd
 
+KEPT_LOGS = ['klines', 'shortest_paths.npz', 'crypto_exchange_info.txt']
+
+def clear_logger_buffers(directory: str) -> None:
+    """Delete the buffers of the previous run, keeping the kline store, shortest paths and exchange info."""
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name in KEPT_LOGS:
+            continue
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+
 shortest_paths = None
 def precompute_shortest_paths_thread(
     client: Client, assets: List[str], offset_s: Optional[float] = 0) \
@@ -29,7 +44,7 @@ def precompute_shortest_paths_thread(
     print('Started precompute_shortest_paths thread.')
     shortest_paths = precompute_shortest_paths(
         exchange_info, priority=None, 
-        shortest_paths_file='crypto_logs/shortest_paths.pkl')
+        shortest_paths_file='crypto_logs/shortest_paths.npz')
     print('Finished precompute_shortest_paths thread.')
 
 #downloaded_pairs_1d = None
@@ -62,7 +77,7 @@ def download_pairs_1min(
     print('Started downloaded_pairs_1min thread.')
     downloaded_pairs_1min = download_pairs_bootstrapped(
         client=client, assets=assets, interval='1m', 
-        offset_s=offset_s)
+        offset_s=offset_s, downloader=Kline_store(Kline_downloader()))
     print('Finished downloaded_pairs_1min thread.')
 
 def main():
@@ -73,8 +88,9 @@ def main():
     as_pair = False
     directory = 'crypto_logs'
     if os.path.exists(directory):
-        shutil.rmtree(directory)
-    os.mkdir(directory)
+        clear_logger_buffers(directory)
+    else:
+        os.mkdir(directory)
     authenticator = Cryptocurrency_authenticator(use_keys=False, testnet=False)
     client = authenticator.spot_client
     exchange = Cryptocurrency_exchange(client=client, directory=directory)
@@ -86,7 +102,7 @@ def main():
         convert_to_USDT=True, shortest_paths=None)
     assets = get_new_tickers(conversion_table=conversion_table)
 
-    shortest_paths_file = 'crypto_logs/shortest_paths.pkl'
+    shortest_paths_file = 'crypto_logs/shortest_paths.npz'
     if os.path.exists(shortest_paths_file):
         shortest_paths_thread_started = False
         shortest_paths = precompute_shortest_paths(
@@ -53,7 +53,7 @@ exchange_info = exchange.info
 # Pre-compute pair paths.
 shortest_paths = precompute_shortest_paths(exchange_info, 
                                    priority=None, 
-                                   shortest_paths_file='crypto_logs/shortest_paths.pkl')
+                                   shortest_paths_file='crypto_logs/shortest_paths.npz')
 
 # Precalculate UTC offset for inter-server communication coherence.
 offset_s = get_timezone_offset_in_seconds()
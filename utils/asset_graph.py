@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        utils/asset_graph.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Asset graph and compact shortest pair paths between assets.
+
+# Library imports.
+from typing import Dict, Iterator, List, Optional, Tuple
+from collections import deque
+from collections.abc import Mapping
+from os import replace
+from tqdm import tqdm
+from .exchange_index import ExchangeIndex
+import numpy as np
+import pandas as pd
+
+# Variable definitions.
+PRIORITIES = {'accuracy': ['USDT', 'BTC', 'BUSD', 'ETH', 'BNB'], 
+              'fees': ['BUSD', 'BTC', 'BNB', 'ETH', 'USDT'], 
+              'wallet': ['BTC', 'ETH', 'BUSD', 'BNB', 'USDT']}
+EXTRA_PRIORITY = ['BRL', 'AUD']
+SCHEMA_VERSION = 1
+
+# Function definitions.
+def get_priority_order(priority: str) -> List[str]:
+    """Return the assets to visit first, in order, for a given priority."""
+    return PRIORITIES[priority] + EXTRA_PRIORITY
+
+def walk_parent_edges(parent_edges: np.ndarray, 
+                      source: int, 
+                      target: int, 
+                      edge_bases: np.ndarray, 
+                      edge_quotes: np.ndarray, 
+                      assets: List[str]) -> List[Tuple[str, str]]:
+    """Return the (base_asset, quote_asset) hops from source to target."""
+    path = []
+    node = target
+    while node != source:
+        edge = parent_edges[node]
+        if edge < 0:
+            return []
+        base, quote = edge_bases[edge], edge_quotes[edge]
+        path.append((assets[base], assets[quote]))
+        node = quote if node == base else base
+    path.reverse()
+    return path
+
+# Class definitions.
+class ShortestPaths(Mapping):
+    """Shortest pair paths between every pair of assets, for every priority.
+
+    Paths are stored as BFS parent arrays: parent_edges[p, s, v] is the pair
+    (edge) through which v was reached from source s for priority p (-1 for
+    the source itself and unreachable assets) and distances[p, s, v] is the
+    number of hops (-1 when unreachable). Lookups keep the nested dict API
+    of the former precomputed dict, shortest_paths[priority][from_asset][to_asset]
+    returning the list of (base_asset, quote_asset) hops.
+    """
+    def __init__(self, 
+                 assets: List[str], 
+                 priorities: List[str], 
+                 edge_bases: np.ndarray, 
+                 edge_quotes: np.ndarray, 
+                 parent_edges: np.ndarray, 
+                 distances: np.ndarray, 
+                 digest: str = ''):
+        self.assets = list(assets)
+        self.asset_positions = {asset: i for (i, asset) in enumerate(self.assets)}
+        self.priorities = list(priorities)
+        self.edge_bases = edge_bases
+        self.edge_quotes = edge_quotes
+        self.parent_edges = parent_edges
+        self.distances = distances
+        self.digest = digest
+
+    def __getitem__(self, priority: str) -> 'PriorityPaths':
+        if priority not in self.priorities:
+            raise KeyError(priority)
+        return PriorityPaths(self, self.priorities.index(priority))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.priorities)
+
+    def __len__(self) -> int:
+        return len(self.priorities)
+
+    def get_path(self, 
+                 priority: str, 
+                 from_asset: str, 
+                 to_asset: str) -> List[Tuple[str, str]]:
+        """Return the (base_asset, quote_asset) hops from from_asset to to_asset."""
+        return self[priority][from_asset][to_asset]
+
+    def _get_path(self, p: int, source: int, target: int) -> List[Tuple[str, str]]:
+        return walk_parent_edges(self.parent_edges[p, source], source, target, 
+                                 self.edge_bases, self.edge_quotes, self.assets)
+
+    def get_edges(self) -> List[Tuple[str, str]]:
+        """Return the (base_asset, quote_asset) pair of every edge."""
+        return [(self.assets[base], self.assets[quote]) 
+                for (base, quote) in zip(self.edge_bases, self.edge_quotes)]
+
+    def save(self, shortest_paths_file: str) -> None:
+        """Write the paths to an uncompressed .npz file tagged with SCHEMA_VERSION."""
+        temporary_file = shortest_paths_file + '.tmp'
+        with open(temporary_file, 'wb') as f:
+            np.savez(f, 
+                     schema_version=np.array(SCHEMA_VERSION), 
+                     digest=np.array(self.digest), 
+                     assets=np.array(self.assets, dtype=str), 
+                     priorities=np.array(self.priorities, dtype=str), 
+                     edge_bases=self.edge_bases, 
+                     edge_quotes=self.edge_quotes, 
+                     parent_edges=self.parent_edges, 
+                     distances=self.distances)
+        replace(temporary_file, shortest_paths_file)
+
+    @classmethod
+    def load(cls, shortest_paths_file: str) -> Optional['ShortestPaths']:
+        """Read paths written by save (None if unreadable or of another schema)."""
+        try:
+            with np.load(shortest_paths_file, allow_pickle=False) as arrays:
+                if int(arrays['schema_version']) != SCHEMA_VERSION:
+                    return None
+                return cls(arrays['assets'].tolist(), 
+                           arrays['priorities'].tolist(), 
+                           arrays['edge_bases'], 
+                           arrays['edge_quotes'], 
+                           arrays['parent_edges'], 
+                           arrays['distances'], 
+                           digest=str(arrays['digest']))
+        except Exception as e:
+            print(e)
+        return None
+
+class PriorityPaths(Mapping):
+    """shortest_paths[priority]: the paths from every asset."""
+    def __init__(self, shortest_paths: ShortestPaths, p: int):
+        self.shortest_paths = shortest_paths
+        self.p = p
+
+    def __getitem__(self, from_asset: str) -> 'SourcePaths':
+        return SourcePaths(self.shortest_paths, self.p, 
+                           self.shortest_paths.asset_positions[from_asset])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.shortest_paths.assets)
+
+    def __len__(self) -> int:
+        return len(self.shortest_paths.assets)
+
+class SourcePaths(Mapping):
+    """shortest_paths[priority][from_asset]: the paths to every asset."""
+    def __init__(self, shortest_paths: ShortestPaths, p: int, source: int):
+        self.shortest_paths = shortest_paths
+        self.p = p
+        self.source = source
+
+    def __getitem__(self, to_asset: str) -> List[Tuple[str, str]]:
+        target = self.shortest_paths.asset_positions[to_asset]
+        return self.shortest_paths._get_path(self.p, self.source, target)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.shortest_paths.assets)
+
+    def __len__(self) -> int:
+        return len(self.shortest_paths.assets)
+
+class AssetGraph:
+    """Undirected graph of assets (nodes) connected by tradable pairs (edges).
+
+    Build it through AssetGraph.from_info(exchange_info), which reuses the
+    graph already built for that same exchange_info object. Neighbours are
+    visited with the priority assets first, in priority order, then the
+    remaining assets alphabetically, so a single-source BFS per asset and
+    priority gives the same paths as the per-pair search it replaces.
+    """
+    _cache: Dict[int, Tuple[pd.DataFrame, 'AssetGraph']] = {}
+    _cache_size = 4
+
+    def __init__(self, exchange_info: pd.DataFrame):
+        index = ExchangeIndex.from_info(exchange_info)
+        self.assets = sorted(set(index.base_assets) | set(index.quote_assets))
+        self.asset_positions = {asset: i for (i, asset) in enumerate(self.assets)}
+        edge_ids = {}
+        edge_bases = []
+        edge_quotes = []
+        adjacency = [[] for _ in self.assets]
+        for (base_asset, quote_asset) in zip(index.base_assets, index.quote_assets):
+            base = self.asset_positions[base_asset]
+            quote = self.asset_positions[quote_asset]
+            key = (min(base, quote), max(base, quote))
+            if key not in edge_ids:
+                edge_ids[key] = len(edge_bases)
+                edge_bases.append(base)
+                edge_quotes.append(quote)
+                adjacency[base].append((quote, edge_ids[key]))
+                adjacency[quote].append((base, edge_ids[key]))
+        self.edge_bases = np.array(edge_bases, dtype=np.int32)
+        self.edge_quotes = np.array(edge_quotes, dtype=np.int32)
+        self.edge_dtype = np.int16 if len(edge_bases) < 2 ** 15 else np.int32
+        self.adjacency = adjacency
+        self.digest = index.digest
+        self._ordered_adjacency = {}
+        self._bfs_cache = {}
+
+    @classmethod
+    def from_info(cls, exchange_info: pd.DataFrame) -> 'AssetGraph':
+        """Return the graph of exchange_info, building it on first use."""
+        cached = cls._cache.get(id(exchange_info))
+        if cached is not None and cached[0] is exchange_info:
+            return cached[1]
+        graph = cls(exchange_info)
+        if len(cls._cache) >= cls._cache_size:
+            cls._cache.pop(next(iter(cls._cache)))
+        cls._cache[id(exchange_info)] = (exchange_info, graph)
+        return graph
+
+    def get_ordered_adjacency(self, priority: str) -> List[List[Tuple[int, int]]]:
+        """Return the (neighbour, edge) lists of every asset in visiting order."""
+        if priority not in self._ordered_adjacency:
+            order = get_priority_order(priority)
+            rank = {asset: i for (i, asset) in enumerate(order)}
+            def key(neighbour: Tuple[int, int]) -> Tuple[int, str]:
+                asset = self.assets[neighbour[0]]
+                return rank.get(asset, len(order)), asset
+            self._ordered_adjacency[priority] = \
+                [sorted(neighbours, key=key) for neighbours in self.adjacency]
+        return self._ordered_adjacency[priority]
+
+    def get_connected_assets(self, asset: str, priority: str = 'accuracy') -> List[str]:
+        """Return the assets sharing a pair with asset, in visiting order."""
+        position = self.asset_positions.get(asset)
+        if position is None:
+            return []
+        adjacency = self.get_ordered_adjacency(priority)
+        return [self.assets[neighbour] for (neighbour, _) in adjacency[position]]
+
+    def bfs(self, source: int, priority: str = 'accuracy') -> Tuple[np.ndarray, np.ndarray]:
+        """Return the (parent_edges, distances) arrays of a BFS from source."""
+        adjacency = self.get_ordered_adjacency(priority)
+        n = len(self.assets)
+        parent_edges = [-1] * n
+        distances = [-1] * n
+        distances[source] = 0
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            distance = distances[node] + 1
+            for (neighbour, edge) in adjacency[node]:
+                if distances[neighbour] < 0:
+                    distances[neighbour] = distance
+                    parent_edges[neighbour] = edge
+                    queue.append(neighbour)
+        return (np.array(parent_edges, dtype=self.edge_dtype), 
+                np.array(distances, dtype=np.int16))
+
+    def get_path(self, 
+                 from_asset: str, 
+                 to_asset: str, 
+                 priority: str = 'accuracy') -> List[Tuple[str, str]]:
+        """Return the (base_asset, quote_asset) hops from from_asset to to_asset."""
+        source = self.asset_positions.get(from_asset)
+        target = self.asset_positions.get(to_asset)
+        if source is None or target is None:
+            return []
+        if (priority, source) not in self._bfs_cache:
+            self._bfs_cache[(priority, source)] = self.bfs(source, priority=priority)
+        parent_edges, _ = self._bfs_cache[(priority, source)]
+        return walk_parent_edges(parent_edges, source, target, 
+                                 self.edge_bases, self.edge_quotes, self.assets)
+
+    def get_edges(self) -> List[Tuple[str, str]]:
+        """Return the (base_asset, quote_asset) pair of every edge."""
+        return [(self.assets[base], self.assets[quote]) 
+                for (base, quote) in zip(self.edge_bases, self.edge_quotes)]
+
+    def get_shortest_paths(self, 
+                           priorities: Optional[List[str]] = None, 
+                           verbose: bool = False) -> ShortestPaths:
+        """Run one BFS per asset and priority and return every shortest path."""
+        if priorities is None:
+            priorities = list(PRIORITIES)
+        n = len(self.assets)
+        parent_edges = np.full((len(priorities), n, n), -1, dtype=self.edge_dtype)
+        distances = np.full((len(priorities), n, n), -1, dtype=np.int16)
+        for (p, priority) in enumerate(priorities):
+            sources = range(n)
+            if verbose:
+                sources = tqdm(sources, unit='asset')
+            for source in sources:
+                parent_edges[p, source], distances[p, source] = \
+                    self.bfs(source, priority=priority)
+        return ShortestPaths(self.assets, priorities, self.edge_bases, 
+                             self.edge_quotes, parent_edges, distances, 
+                             digest=self.digest)
+
+    def get_stale_sources(self, 
+                          previous: ShortestPaths, 
+                          p: int) -> np.ndarray:
+        """Return which sources of previous (priority p) this graph changes.
+
+        Neighbours are visited in an order that only depends on asset names, 
+        so a source keeps its BFS tree unless one of its tree edges was 
+        removed or an added pair joins two assets at different distances 
+        from it (including reachable to unreachable).
+        """
+        edges = set(self.get_edges())
+        previous_edges = previous.get_edges()
+        removed = [e for (e, edge) in enumerate(previous_edges) if edge not in edges]
+        parent_edges = previous.parent_edges[p]
+        stale = np.isin(parent_edges, removed).any(axis=1)
+        previous_edges = set(previous_edges)
+        distances = previous.distances[p]
+        unreachable = np.full(len(previous.assets), -1, dtype=distances.dtype)
+        for edge in self.get_edges():
+            if edge not in previous_edges:
+                base, quote = [distances[:, previous.asset_positions[asset]] 
+                               if asset in previous.asset_positions else unreachable 
+                               for asset in edge]
+                stale |= base != quote
+        return stale
+
+    def update_shortest_paths(self, 
+                              previous: ShortestPaths, 
+                              priorities: Optional[List[str]] = None, 
+                              verbose: bool = False) -> Tuple[ShortestPaths, int]:
+        """Return every shortest path, reusing the unchanged sources of previous.
+
+        Returns the paths and the number of (priority, source) BFS recomputed.
+        """
+        if priorities is None:
+            priorities = list(PRIORITIES)
+        n = len(self.assets)
+        edge_ids = {edge: e for (e, edge) in enumerate(self.get_edges())}
+        edge_map = np.array([edge_ids.get(edge, -1) for edge in previous.get_edges()] + [-1], 
+                            dtype=self.edge_dtype)
+        node_map = np.array([self.asset_positions.get(asset, -1) 
+                             for asset in previous.assets], dtype=np.int64)
+        kept_nodes = np.flatnonzero(node_map >= 0)
+        parent_edges = np.full((len(priorities), n, n), -1, dtype=self.edge_dtype)
+        distances = np.full((len(priorities), n, n), -1, dtype=np.int16)
+        recomputed = 0
+        for (p, priority) in enumerate(priorities):
+            sources = np.ones(n, dtype=bool)
+            if priority in previous.priorities:
+                previous_p = previous.priorities.index(priority)
+                stale = self.get_stale_sources(previous, previous_p)
+                reused = kept_nodes[~stale[kept_nodes]]
+                rows = node_map[reused][:, None]
+                columns = node_map[kept_nodes][None, :]
+                previous_parents = previous.parent_edges[previous_p][np.ix_(reused, kept_nodes)]
+                parent_edges[p][rows, columns] = edge_map[previous_parents]
+                distances[p][rows, columns] = \
+                    previous.distances[previous_p][np.ix_(reused, kept_nodes)]
+                sources[node_map[reused]] = False
+            sources = np.flatnonzero(sources)
+            recomputed += len(sources)
+            if verbose:
+                sources = tqdm(sources, unit='asset')
+            for source in sources:
+                parent_edges[p, source], distances[p, source] = \
+                    self.bfs(source, priority=priority)
+        shortest_paths = ShortestPaths(self.assets, priorities, self.edge_bases, 
+                                       self.edge_quotes, parent_edges, distances, 
+                                       digest=self.digest)
+        return shortest_paths, recomputed
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        utils/binance_replay.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Record get_ticker/get_exchange_info payloads and replay them with a fake python-binance client.
+
+# Library imports.
+from typing import Dict, List, Optional, Tuple
+from binance.client import Client
+from os import mkdir
+from os.path import exists, join
+import gzip
+import json
+import time
+
+# Variable definitions.
+TICKER_RECORDING = 'get_ticker.jsonl.gz'
+EXCHANGE_INFO_RECORDING = 'get_exchange_info.json.gz'
+
+# Function definitions.
+def write_exchange_info(exchange_info: Dict, directory: str) -> None:
+    with gzip.open(join(directory, EXCHANGE_INFO_RECORDING), 'wt') as f:
+        json.dump(exchange_info, f)
+
+def read_exchange_info(directory: str) -> Dict:
+    with gzip.open(join(directory, EXCHANGE_INFO_RECORDING), 'rt') as f:
+        return json.load(f)
+
+def append_ticker(tickers: List[Dict], directory: str, t: Optional[float] = None) -> None:
+    """Append one get_ticker payload, with its time, to the recording."""
+    with gzip.open(join(directory, TICKER_RECORDING), 'at') as f:
+        f.write(json.dumps({'t': time.time() if t is None else t, 'm': tickers}) + '\n')
+
+def read_tickers(directory: str) -> List[Tuple[float, List[Dict]]]:
+    with gzip.open(join(directory, TICKER_RECORDING), 'rt') as f:
+        return [(record['t'], record['m']) for record in map(json.loads, f)]
+
+# Class definition.
+class Replay_exhausted(Exception):
+    """Raised by Replay_client.get_ticker past the last payload."""
+
+class Recording_client:
+    """python-binance Client proxy recording its get_ticker and get_exchange_info payloads.
+
+    Only the all-market get_ticker() calls are recorded. The exchange info
+    is recorded once up front, since Cryptocurrency_exchange only refetches
+    it when its cache is stale.
+    """
+    def __init__(self, client: Client, directory: str = 'crypto_recordings'):
+        """
+        :param client: python-binance client doing the calls.
+        :param directory: directory of the compressed recordings.
+        """
+        self.client = client
+        self.directory = directory
+        if not exists(directory):
+            mkdir(directory)
+        if not exists(join(directory, EXCHANGE_INFO_RECORDING)):
+            self.get_exchange_info()
+
+    def __getattr__(self, name: str):
+        return getattr(self.client, name)
+
+    def get_ticker(self, **kwargs) -> List[Dict]:
+        tickers = self.client.get_ticker(**kwargs)
+        if len(kwargs) == 0:
+            append_ticker(tickers, self.directory)
+        return tickers
+
+    def get_exchange_info(self) -> Dict:
+        exchange_info = self.client.get_exchange_info()
+        write_exchange_info(exchange_info, self.directory)
+        return exchange_info
+
+class Replay_client:
+    """Fake python-binance Client serving recorded payloads in order.
+
+    get_ticker waits for the recorded spacing divided by speed since the
+    previous call returned (1 replays in real time, 0 as fast as possible),
+    and raises Replay_exhausted past the last payload unless repeat is set.
+    """
+    def __init__(self, 
+                 directory: str = 'crypto_recordings', 
+                 speed: float = 1.0, 
+                 repeat: bool = False):
+        """
+        :param directory: directory of the recordings made by Recording_client.
+        :param speed: replay speed factor.
+        :param repeat: whether to restart from the first payload when done.
+        """
+        self.directory = directory
+        self.speed = speed
+        self.repeat = repeat
+        self.tickers = read_tickers(directory)
+        self.exchange_info = read_exchange_info(directory)
+        self.position = 0
+        self.last_call = None
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def get_ticker(self, **kwargs) -> List[Dict]:
+        if self.position == len(self.tickers):
+            if not self.repeat or len(self.tickers) == 0:
+                raise Replay_exhausted('Replayed all {} get_ticker payloads.'.format(len(self.tickers)))
+            self.position = 0
+            self.last_call = None
+        (t, tickers) = self.tickers[self.position]
+        if self.speed > 0 and self.last_call is not None and self.position > 0:
+            delay = (t - self.tickers[self.position - 1][0]) / self.speed
+            delay -= time.perf_counter() - self.last_call
+            if delay > 0:
+                time.sleep(delay)
+        self.position += 1
+        self.last_call = time.perf_counter()
+        return tickers
+
+    def get_exchange_info(self) -> Dict:
+        return self.exchange_info
@@ -10,6 +10,7 @@
 from .conversion_ohlcv import convert_ohlcvs_from_pairs_to_assets
 from .ohlcvs import download_pairs
 from .resample import resample
+from .storage import DEFAULT_LOG_STORAGE, get_log_storage
 from .volume_conversion import add_rolling_volumes
 from typing import Dict, List, Tuple, Optional
 from binance.client import Client
@@ -26,7 +27,8 @@ def bootstrap_loggers(client: Client,
                       additional_intervals: Optional[List[str]] = None, 
                       upsampled_intervals: Optional[List[str]] = None, 
                       shortest_paths: Optional[Dict[str, Dict[str, Dict[str, 
-                          List[Tuple[str, str]]]]]] = None) \
+                          List[Tuple[str, str]]]]]] = None, 
+                      storage: str = DEFAULT_LOG_STORAGE) \
         -> Dict[str, pd.DataFrame]:
     base_interval = download_interval + 'in' \
         if download_interval[-1] == 'm' else download_interval
@@ -42,17 +44,18 @@ def bootstrap_loggers(client: Client,
         pairs[base_interval] = \
             pairs[base_interval].loc[
                 pairs[base_interval].dropna().first_valid_index():]
-    log_file = 'crypto_logs/crypto_output_log_{}.txt'
+    storage = get_log_storage(storage)
+    log_file = storage.get_path('crypto_logs/crypto_output_log_{}')
     if additional_intervals is not None:
         for additional_interval in tqdm(additional_intervals, unit=' pair'):
             pairs[additional_interval] = resample(
                 pairs[base_interval].copy(), interval=additional_interval)
             pairs[additional_interval] = pairs[additional_interval].tail(60)
-            pairs[additional_interval].to_csv(
-                log_file.format(additional_interval))
+            storage.write(pairs[additional_interval], 
+                          log_file.format(additional_interval))
     truncated_frequency = 60 if frequency > frequency_1min else 1500
     pairs[base_interval] = pairs[base_interval].tail(truncated_frequency)
-    pairs[base_interval].to_csv(log_file.format(base_interval))
+    storage.write(pairs[base_interval], log_file.format(base_interval))
     if upsampled_intervals is not None:
         for subminute_interval in tqdm(upsampled_intervals, unit=' pair'):
             pairs[subminute_interval] = pairs[base_interval].tail(25)
@@ -61,6 +64,6 @@ def bootstrap_loggers(client: Client,
                     subminute_interval).agg('max')
             pairs[subminute_interval] = \
                 pairs[subminute_interval].fillna(method='pad').tail(60)
-            pairs[subminute_interval].to_csv(log_file.format(
-                subminute_interval))
+            storage.write(pairs[subminute_interval], 
+                          log_file.format(subminute_interval))
     return pairs
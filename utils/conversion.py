@@ -8,24 +8,21 @@
 
 # Library imports.
 from typing import Dict, List, Tuple, Optional, Union
+from collections.abc import Mapping
 from os.path import exists
 from decimal import Decimal
-from tqdm import tqdm
 from .timezone import get_timezone_offset_in_seconds
-import pickle
+from .asset_graph import AssetGraph, PRIORITIES, ShortestPaths
+from .exchange_index import ExchangeIndex
+import numpy as np
 import pandas as pd
 
 # Function definitions.
 def get_assets_from_pair(pair: str, exchange_info: pd.DataFrame) -> Optional[List[str]]:
-     try:
-         pair_info = exchange_info[exchange_info['symbol'] == pair]
-         base_asset = pair_info['base_asset'].iat[-1]
-         quote_asset = pair_info['quote_asset'].iat[-1]
-         return base_asset, quote_asset
-     except Exception as e:
-         print(e)
-         print(pair_info)
-     return None
+    assets = ExchangeIndex.from_info(exchange_info).get_assets(pair)
+    if assets is None:
+        print('Pair not found in exchange info:', pair)
+    return assets
 
 def get_base_asset_from_pair(pair: str, exchange_info: pd.DataFrame) -> Optional[str]:
     asset = get_assets_from_pair(pair, exchange_info=exchange_info)
@@ -49,38 +46,13 @@ def get_connected_assets(asset: str, exchange_info: pd.DataFrame, priority: str
     exchange_info -- A pandas DataFrame containing the exchange info.
     priority -- The order in which to prioritize assets.
     """
-    def reorder(connected_assets: List[str], priority: str) -> List[str]:
-        prioritized = \
-            [asset for asset in priority if asset in connected_assets]
-        order = {asset: i for i, asset in enumerate(prioritized)}
-        connected_assets_items = \
-            [asset for asset in connected_assets if asset in order]
-        connected_assets_items.sort(key=order.get)
-        connected_assets_iter = iter(connected_assets_items)
-        return [next(connected_assets_iter) if asset in order 
-                else asset for asset in connected_assets]
-    if priority == 'accuracy':
-        priority = ['USDT', 'BTC', 'BUSD', 'ETH', 'BNB']
-    elif priority == 'fees':
-        priority = ['BUSD', 'BTC', 'BNB', 'ETH', 'USDT']
-    elif priority == 'wallet':
-        priority = ['BTC', 'ETH', 'BUSD', 'BNB', 'USDT']
-    priority += ['BRL', 'AUD']
-    connected_base_assets = exchange_info['quote_asset'] == asset
-    connected_base_assets = exchange_info[connected_base_assets]
-    connected_base_assets = connected_base_assets['base_asset'].tolist()
-    connected_quote_assets = exchange_info['base_asset'] == asset
-    connected_quote_assets = exchange_info[connected_quote_assets]
-    connected_quote_assets = connected_quote_assets['quote_asset'].tolist()
-    connected_assets = list(set(connected_base_assets + connected_quote_assets))
-    connected_assets = reorder(connected_assets, priority=priority)
-    return connected_assets
+    return AssetGraph.from_info(exchange_info).get_connected_assets(asset, priority=priority)
 
 def select_pair_with_highest_quote_volume_from_base_asset(base_asset: str, 
                                                           conversion_table: pd.DataFrame, 
                                                           exchange_info: pd.DataFrame) -> str:
-    connected_pairs = exchange_info[exchange_info['base_asset'] == base_asset]
-    connected_pairs = connected_pairs['symbol']
+    connected_pairs = \
+        ExchangeIndex.from_info(exchange_info).get_base_asset_pairs(base_asset)
     connected_pairs = \
         conversion_table[conversion_table['symbol'].isin(connected_pairs)]
     connected_pairs = connected_pairs.sort_values(by='rolling_quote_volume', 
@@ -90,116 +62,58 @@ def select_pair_with_highest_quote_volume_from_base_asset(base_asset: str,
 def get_shortest_pair_path_between_assets(from_asset: str, 
                                           to_asset: str, 
                                           exchange_info: pd.DataFrame, 
-                                          priority: str = 'accuracy'):
-    def get_shortest_path_between_assets(priority: str) -> List[Union[str, None]]:
-        path_list = [[from_asset]]
-        path_index = 0
-        previous_nodes = [from_asset]
-        if from_asset == to_asset:
-            return path_list[0]
-        while path_index < len(path_list):
-            current_path = path_list[path_index]
-            last_node = current_path[-1]
-            next_nodes = get_connected_assets(last_node, 
-                                              exchange_info=exchange_info, 
-                                              priority=priority)
-            if to_asset in next_nodes:
-                current_path.append(to_asset)
-                return current_path
-            for next_node in next_nodes:
-                if not next_node in previous_nodes:
-                    new_path = current_path[:]
-                    new_path.append(next_node)
-                    path_list.append(new_path)
-                    previous_nodes.append([next_node])
-            path_index += 1
-        return []
-    def get_pair_from_assets(from_asset: str, to_asset: str) -> Optional[str]:
-        from_asset_is_base = exchange_info['base_asset'] == from_asset
-        from_asset_is_quote = exchange_info['quote_asset'] == from_asset
-        to_asset_is_base = exchange_info['base_asset'] == to_asset
-        to_asset_is_quote = exchange_info['quote_asset'] == to_asset
-        from_asset_is_base_and_to_asset_is_quote = \
-            from_asset_is_base & to_asset_is_quote
-        from_asset_is_quote_and_to_asset_is_base = \
-            from_asset_is_quote & to_asset_is_base
-        pair = from_asset_is_base_and_to_asset_is_quote
-        pair |= from_asset_is_quote_and_to_asset_is_base
-        if pair.any():
-            pair = exchange_info[pair]
-            base_asset = pair['base_asset'].iat[0]
-            quote_asset = pair['quote_asset'].iat[0]
-            return base_asset, quote_asset
-        else:
-            return None
-    shortest_path = get_shortest_path_between_assets(priority=priority)
-    pairs = []
-    while len(shortest_path) > 1:
-        base_asset, quote_asset = \
-            get_pair_from_assets(shortest_path[0], shortest_path[1])
-        pairs += [(base_asset, quote_asset)]
-        shortest_path = shortest_path[1:]
-    return pairs
+                                          priority: str = 'accuracy') -> List[Tuple[str, str]]:
+    return AssetGraph.from_info(exchange_info).get_path(
+        from_asset, to_asset, priority=priority)
 
 def precompute_shortest_paths(exchange_info: pd.DataFrame, 
                               priority: Optional[str] = None, 
-                              shortest_paths_file: Optional[str] = 'crypto_logs/shortest_paths.pkl') \
-        -> Dict[str, Dict[str, Dict[str, List[Tuple[str, str]]]]]:
-    if exists(shortest_paths_file):
-        with open(shortest_paths_file, 'rb') as f:
-            shortest_paths = pickle.load(f)
+                              shortest_paths_file: Optional[str] = 'crypto_logs/shortest_paths.npz') \
+        -> ShortestPaths:
+    """Return the shortest paths of exchange_info, cached in shortest_paths_file.
+
+    The cache is keyed by the digest of the listed pairs: it is used as is when 
+    the digest matches and updated incrementally (only the sources whose BFS 
+    tree changed are recomputed) when pairs were listed or delisted.
+    """
+    graph = AssetGraph.from_info(exchange_info)
+    priorities = list(PRIORITIES) if priority is None else [priority]
+    shortest_paths = None
+    if shortest_paths_file is not None and exists(shortest_paths_file):
+        shortest_paths = ShortestPaths.load(shortest_paths_file)
+    if shortest_paths is not None and shortest_paths.digest == graph.digest and \
+            all([priority in shortest_paths.priorities for priority in priorities]):
+        return shortest_paths
+    if shortest_paths is None:
+        shortest_paths = graph.get_shortest_paths(priorities=priorities, verbose=True)
     else:
-        shortest_paths = {}
-        base_assets = exchange_info['base_asset'].tolist()
-        quote_assets = exchange_info['quote_asset'].tolist()
-        assets = list(set(base_assets + quote_assets))
-        priorities = ['accuracy', 'fees', 'wallet'] if priority is None else [priority]
-        for priority in priorities:
-            shortest_paths[priority] = {}
-            for from_asset in tqdm(assets, unit='asset'):
-                shortest_paths[priority][from_asset] = {}
-                for to_asset in assets:
-                    if from_asset != to_asset:
-                        precomputed_pair_path = None
-                        if shortest_paths[priority].get(to_asset, None) is not None:
-                            precomputed_pair_path = \
-                                shortest_paths[priority][to_asset].get(from_asset, None)
-                        if precomputed_pair_path is None:
-                            shortest_paths[priority][from_asset][to_asset] = \
-                                get_shortest_pair_path_between_assets(
-                                    from_asset=from_asset, 
-                                    to_asset=to_asset, 
-                                    exchange_info=exchange_info, 
-                                    priority=priority)
-                        else:
-                            precomputed_pair_path_reversed = \
-                                precomputed_pair_path.copy()
-                            precomputed_pair_path_reversed.reverse()
-                            shortest_paths[priority][from_asset][to_asset] = \
-                                precomputed_pair_path_reversed
-        with open(shortest_paths_file, 'wb') as f:
-            pickle.dump(shortest_paths, f)
+        shortest_paths, recomputed = graph.update_shortest_paths(
+            shortest_paths, priorities=priorities)
+        print('Exchange info changed, recomputed', recomputed, 'of', 
+              len(priorities) * len(graph.assets), 'shortest path sources.')
+    if shortest_paths_file is not None:
+        shortest_paths.save(shortest_paths_file)
     return shortest_paths
 
+def compact_float_string(number: Union[str, float], precision: int) -> str:
+    return "{:0.0{}f}".format(number, precision).rstrip('0').rstrip('.')
+
+def round_step_size(quantity: Union[float, Decimal], 
+                    step_size: Union[float, Decimal]) -> float:
+    """Rounds a given quantity to a specific step size
+    :param quantity: required
+    :param step_size: required
+    :return: decimal
+    """
+    quantity = Decimal(str(quantity))
+    return float(quantity - quantity % Decimal(str(step_size)))
+
 def make_tradable_quantity(pair: str, 
                            coins_available: Union[float, str], 
                            exchange_info: pd.DataFrame, 
                            subtract: float = 0) -> float:
-    def compact_float_string(number: Union[str, float], precision: int) -> str:
-        return "{:0.0{}f}".format(number, precision).rstrip('0').rstrip('.')
-    def round_step_size(quantity: Union[float, Decimal], 
-                        step_size: Union[float, Decimal]) -> float:
-        """Rounds a given quantity to a specific step size
-        :param quantity: required
-        :param step_size: required
-        :return: decimal
-        """
-        quantity = Decimal(str(quantity))
-        return float(quantity - quantity % Decimal(str(step_size)))
-    pair_exchange_info = exchange_info[exchange_info['symbol'] == pair].iloc[0]
-    tick_size = float(pair_exchange_info['tick_size'])
-    step_size = float(pair_exchange_info['step_size'])
-    precision = pair_exchange_info['quote_precision']
+    _, _, tick_size, step_size, precision = \
+        ExchangeIndex.from_info(exchange_info).get_symbol_info(pair)
     coins_available = float(coins_available) - subtract * tick_size
     quantity = round_step_size(quantity=coins_available, step_size=tick_size)
     return compact_float_string(float(quantity), precision)
@@ -220,7 +134,7 @@ def convert_price(size: Union[float, str],
             shortest_path = get_shortest_pair_path_between_assets(
                 from_asset=from_asset, to_asset=to_asset, 
                 exchange_info=exchange_info, priority=priority)
-        elif type(shortest_path) is dict:
+        elif isinstance(shortest_path, Mapping):
             shortest_path = shortest_path[priority][from_asset][to_asset]
         for (base_asset, quote_asset) in shortest_path:
             to_asset = quote_asset if from_asset == base_asset else base_asset
@@ -233,3 +147,87 @@ def convert_price(size: Union[float, str],
                                       exchange_info=exchange_info)
     return size
 
+def convert_prices(from_assets: List[str], 
+                   to_asset: str, 
+                   conversion_table: pd.DataFrame, 
+                   exchange_info: pd.DataFrame, 
+                   keys: Tuple[str, ...] = ('close',), 
+                   priority: str = 'accuracy', 
+                   shortest_paths: Optional[Dict[str, Dict[str, Dict[str, 
+                                   List[Tuple[str, str]]]]]] = None) -> pd.DataFrame:
+    """Return the price of one unit of every from_asset in to_asset.
+
+    Batched equivalent of convert_price(size=1, ...) for many assets at once.
+    The ticker snapshot is indexed by symbol once, every hop of every path is
+    gathered with a single take per key and the hops are applied column-wise, 
+    so the snapshot is never filtered per asset.
+
+    Keyword arguments:
+    from_assets -- The assets to price.
+    to_asset -- The asset to price into (usually 'USDT').
+    conversion_table -- The ticker snapshot with a 'symbol' column and the keys.
+    exchange_info -- A pandas DataFrame containing the exchange info.
+    keys -- The conversion_table columns to convert (e.g. 'open', 'close').
+    priority -- The shortest path priority.
+    shortest_paths -- Precomputed shortest paths (computed per asset if None).
+
+    Returns a DataFrame indexed by from_assets with one column per key, holding 
+    the same tradable quantity strings convert_price returns (1 for to_asset 
+    itself and NaN when a hop is missing from the snapshot or when there is 
+    no path to to_asset).
+    """
+    paths = []
+    for from_asset in from_assets:
+        if from_asset == to_asset:
+            paths.append([])
+        elif shortest_paths is None:
+            paths.append(get_shortest_pair_path_between_assets(
+                from_asset=from_asset, to_asset=to_asset, 
+                exchange_info=exchange_info, priority=priority))
+        else:
+            paths.append(shortest_paths[priority][from_asset][to_asset])
+    n_hops = max([len(path) for path in paths], default=0)
+    hop_symbols = np.full((len(paths), n_hops), '', dtype=object)
+    hop_is_base = np.ones((len(paths), n_hops), dtype=bool)
+    for (i, (from_asset, path)) in enumerate(zip(from_assets, paths)):
+        for (j, (base_asset, quote_asset)) in enumerate(path):
+            hop_symbols[i, j] = base_asset + quote_asset
+            hop_is_base[i, j] = base_asset == from_asset
+            from_asset = quote_asset if from_asset == base_asset else base_asset
+    is_first = ~conversion_table['symbol'].duplicated(keep='first').to_numpy()
+    symbol_rows = np.flatnonzero(is_first)
+    symbol_index = pd.Index(conversion_table['symbol'].to_numpy()[is_first])
+    hop_rows = symbol_index.get_indexer(hop_symbols.ravel())
+    hop_found = (hop_rows >= 0) | (hop_symbols.ravel() == '')
+    hop_rows = np.where(hop_rows >= 0, symbol_rows[hop_rows], -1)
+    hop_rows = hop_rows.reshape(hop_symbols.shape)
+    hop_found = hop_found.reshape(hop_symbols.shape).all(axis=1)
+    last_symbols = [path[-1][0] + path[-1][1] if len(path) > 0 else None 
+                    for path in paths]
+    exchange_index = ExchangeIndex.from_info(exchange_info)
+    last_positions = exchange_index.get_positions(last_symbols)
+    hop_found &= last_positions >= 0
+    tick_sizes = exchange_index.tick_sizes[last_positions].tolist()
+    precisions = exchange_index.precisions[last_positions].tolist()
+    prices = pd.DataFrame(index=pd.Index(from_assets, name='asset'))
+    for key in keys:
+        values = conversion_table[key].to_numpy(dtype=float)
+        hop_values = np.where(hop_rows >= 0, values[hop_rows], 1.0)
+        size = np.ones(len(paths), dtype=float)
+        for j in range(n_hops):
+            size = np.where(hop_is_base[:, j], 
+                            size * hop_values[:, j], 
+                            size / hop_values[:, j])
+        quantities = []
+        for (i, (from_asset, path)) in enumerate(zip(from_assets, paths)):
+            if from_asset == to_asset:
+                quantities.append(1)
+            elif len(path) == 0 or not hop_found[i]:
+                quantities.append(np.nan)
+            else:
+                quantity = round_step_size(quantity=float(size[i]), 
+                                           step_size=tick_sizes[i])
+                quantities.append(compact_float_string(float(quantity), 
+                                                       precisions[i]))
+        prices[key] = pd.Series(quantities, index=prices.index, dtype=object)
+    return prices
@@ -9,9 +9,10 @@
 # Library imports.
 from .conversion import get_assets_from_pair, get_base_asset_from_pair
 from .conversion import get_quote_asset_from_pair, get_shortest_pair_path_between_assets
-from .ohlcvs import named_pairs_to_df
-from .ohlcv_cleaning import clean_data
+from .ohlcv_cleaning import clean_data, get_feature_positions
+from .frame_assembly import assemble_frame
 from tqdm import tqdm
+import numpy as np
 import pandas as pd
 
 # Function definitions.
@@ -118,88 +119,105 @@ def convert_ohlcv(from_asset, to_asset, conversion_table, exchange_info, shortes
     return size.fillna(method='pad')
 '''
 
-def convert_ohlcvs(to_asset, conversion_table, exchange_info, shortest_paths=None):
-    def convert_ohlcv_prices(from_asset, to_asset, conversion_table, exchange_info, shortest_paths=None):
-        if shortest_paths is None:
-            shortest_path = get_shortest_pair_path_between_assets(from_asset=from_asset, 
-                                                                  to_asset=to_asset, 
-                                                                  exchange_info=exchange_info, 
-                                                                  priority='accuracy')
-        else:
-            shortest_path = shortest_paths['accuracy'][from_asset][to_asset]
-        base_asset, quote_asset = shortest_path[0]
+def get_conversion_hops(from_asset, shortest_path):
+    """Return (symbol, multiply) of every hop of shortest_path, walked as the per-symbol conversion did."""
+    base_asset, quote_asset = shortest_path[0]
+    hops = [(base_asset + quote_asset, True)]
+    for (base_asset, quote_asset) in shortest_path[1:]:
         to_asset = quote_asset if from_asset == base_asset else base_asset
-        symbol = base_asset + quote_asset
-        size = conversion_table[symbol].copy()
-        for (base_asset, quote_asset) in shortest_path[1:]:
-            to_asset = quote_asset if from_asset == base_asset else base_asset
-            symbol = base_asset + quote_asset
-            connection = conversion_table[symbol]
-            if base_asset == from_asset:
-                size['open'] = size['open'] * connection['open']
-                size['high'] = size['close'] * connection['high']
-                size['low'] = size['close'] * connection['low']
-                size['close'] = size['close'] * connection['close']
-            else:
-                size['open'] = size['open'] / connection['open']
-                size['high'] = size['close'] / connection['high']
-                size['low'] = size['close'] / connection['low']
-                size['close'] = size['close'] / connection['close']
-            from_asset = to_asset
-        return size
-    def convert_ohlcv_volumes(symbol, price_conversion_table, 
-                              volume_conversion_table, exchange_info):
-        from_asset = get_base_asset_from_pair(symbol, exchange_info)
-        price_size = price_conversion_table[symbol].copy()
-        volume_size = volume_conversion_table[symbol].copy()
-        volume_size['quote_volume'] = volume_size['quote_volume'] / volume_size['close']
-        price_size['base_volume'] = price_size['close'] * volume_size['base_volume']
-        price_size['quote_volume'] = price_size['close'] * volume_size['quote_volume']
-        price_size.replace([float('inf'), float('-inf')], float('nan'), inplace=True)
-        #price_size.loc[:, ['base_volume', 'quote_volume']] = \
-        #    price_size.loc[:, ['base_volume', 'quote_volume']].fillna(0)
-        #return price_size.fillna(method='pad')
-        return price_size
-    def convert_ohlcv_prices_helper(symbol, size, shortest_paths=None):
+        hops.append((base_asset + quote_asset, base_asset == from_asset))
+        from_asset = to_asset
+    return tuple(hops)
+
+def convert_ohlcvs(to_asset, conversion_table, exchange_info, shortest_paths=None):
+    """Convert the OHLCV of every symbol of conversion_table to to_asset.
+
+    The prices of a symbol are those of the first pair of its base asset's
+    shortest path to to_asset, multiplied or divided by the prices of the
+    next pairs, and its volumes are its own at the converted close. Symbols
+    are grouped by path: every distinct path is converted once, all the
+    paths of a length together on (time x path) matrices gathered from the
+    conversion table, so a hop shared by many paths (as BTCUSDT) is one
+    column read for all of them. Same output as the per-symbol conversion.
+    """
+    conversion_table = conversion_table.astype(float)
+    symbols = pd.Index(conversion_table.columns.get_level_values(0).unique())
+    features = conversion_table[symbols[0]].columns.tolist()
+    positions = get_feature_positions(conversion_table.columns, symbols, features)
+    values = conversion_table.to_numpy()
+    def get_matrix(pairs, feature):
+        pair_positions = symbols.get_indexer(pairs)
+        if (pair_positions < 0).any():
+            raise KeyError(pairs[np.flatnonzero(pair_positions < 0)[0]])
+        return values[:, positions[pair_positions, features.index(feature)]]
+
+    asset_paths = {}
+    paths = {}
+    sources = []
+    for symbol in symbols:
         from_asset = get_base_asset_from_pair(symbol, exchange_info)
         if from_asset == to_asset:
-            size = size[symbol].copy()
-        else:
-            size = convert_ohlcv_prices(
-                from_asset, to_asset, size, exchange_info, shortest_paths=shortest_paths)
-        return size
-    volume_conversion_table = conversion_table.astype(float).copy()
-    price_conversion_table = conversion_table.astype(float).copy()
-    symbols = volume_conversion_table.columns.get_level_values(0).unique().tolist()
-    price_conversion_table = [convert_ohlcv_prices_helper(symbol, 
-                                                          price_conversion_table, 
-                                                          shortest_paths=shortest_paths) 
-                              for symbol in tqdm(symbols, unit=' pair conversion')]
-    price_conversion_table = named_pairs_to_df(symbols, price_conversion_table)
-    volume_conversion_table = [convert_ohlcv_volumes(symbol, 
-                                                     price_conversion_table, 
-                                                     volume_conversion_table, 
-                                                     exchange_info) 
-                               for symbol in tqdm(symbols, unit=' pair conversion')]
-    volume_conversion_table = named_pairs_to_df(symbols, volume_conversion_table)
-    volume_conversion_table = clean_data(volume_conversion_table)
-    return volume_conversion_table
+            sources.append(-1)
+            continue
+        if from_asset not in asset_paths:
+            if shortest_paths is None:
+                shortest_path = get_shortest_pair_path_between_assets(from_asset=from_asset, 
+                                                                      to_asset=to_asset, 
+                                                                      exchange_info=exchange_info, 
+                                                                      priority='accuracy')
+            else:
+                shortest_path = shortest_paths['accuracy'][from_asset][to_asset]
+            hops = get_conversion_hops(from_asset, shortest_path)
+            asset_paths[from_asset] = paths.setdefault(hops, len(paths))
+        sources.append(asset_paths[from_asset])
+    sources = np.array(sources, dtype=int)
+    paths = list(paths)
+
+    ohlc = ['open', 'high', 'low', 'close']
+    path_prices = {feature: np.empty((values.shape[0], len(paths))) for feature in ohlc}
+    lengths = {}
+    for (path, hops) in enumerate(paths):
+        lengths.setdefault(len(hops), []).append(path)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for (length, group) in lengths.items():
+            prices = {feature: get_matrix([paths[path][0][0] for path in group], feature) 
+                      for feature in ohlc}
+            for k in range(1, length):
+                hop = {feature: get_matrix([paths[path][k][0] for path in group], feature) 
+                       for feature in ohlc}
+                multiply = np.array([paths[path][k][1] for path in group])
+                close = prices['close'] # High and low follow the previous close.
+                prices = {feature: np.where(multiply, price * hop[feature], price / hop[feature]) 
+                          for (feature, price) in zip(ohlc, [prices['open'], close, close, close])}
+            for feature in ohlc:
+                path_prices[feature][:, group] = prices[feature]
+
+        first_pairs = [symbol if source < 0 else paths[source][0][0] 
+                       for (symbol, source) in zip(symbols, sources)]
+        converted = np.empty((values.shape[0], len(symbols), len(features)))
+        for (i, feature) in enumerate(features):
+            converted[:, :, i] = get_matrix(first_pairs, feature)
+        on_path = sources >= 0
+        for feature in ohlc:
+            converted[:, on_path, features.index(feature)] = path_prices[feature][:, sources[on_path]]
+        close = converted[:, :, features.index('close')]
+        converted[:, :, features.index('base_volume')] = close * get_matrix(symbols, 'base_volume')
+        converted[:, :, features.index('quote_volume')] = \
+            close * (get_matrix(symbols, 'quote_volume') / get_matrix(symbols, 'close'))
+    converted[np.isinf(converted)] = np.nan
+    columns = pd.MultiIndex.from_product([symbols, features], names=['symbol', 'feature'])
+    converted = pd.DataFrame(converted.reshape(values.shape[0], -1), 
+                             index=conversion_table.index, columns=columns)
+    return clean_data(converted)
 
 def convert_ohlcvs_from_pairs_to_assets(conversion_table, exchange_info, shortest_paths=None):
     # Statically-typed python function.
     def add_base_asset_level_to_pairs(df, exchange_info):
         # Statically-typed python function.
         def named_pairs_to_5dim_df(symbols, pairs):
-            df = pd.DataFrame()
-            column_names = pairs[0].columns.tolist()
-            for (symbol, pair) in tqdm(zip(symbols, pairs), unit=' named pair'):
-                columns = [('not_inverted', get_base_asset_from_pair(symbol, exchange_info), 
-                            symbol, column) for column in column_names]
-                pair.columns = pd.MultiIndex.from_tuples(
-                    columns, names=['is_inverted', 'asset', 'symbol', 'feature']
-                )
-                df = pd.concat([df, pair], axis='columns')
-            return df
+            keys = [('not_inverted', get_base_asset_from_pair(symbol, exchange_info), symbol) 
+                    for symbol in symbols]
+            return assemble_frame(keys, pairs, names=['is_inverted', 'asset', 'symbol', 'feature'])
         df = df.astype(float).copy()
         symbols = df.columns.get_level_values(0).unique().tolist()
         df = [df[symbol] for symbol in tqdm(symbols, unit=' pair')]
@@ -212,17 +230,9 @@ def convert_ohlcvs_from_pairs_to_assets(conversion_table, exchange_info, shortes
             return quote_asset + base_asset
         # Statically-typed python.
         def named_pairs_to_5dim_df(symbols, pairs):
-            df = pd.DataFrame()
-            column_names = pairs[0].columns.tolist()
-            for (symbol, pair) in tqdm(zip(symbols, pairs), unit=' named pair'):
-                columns = [('inverted', get_quote_asset_from_pair(symbol, exchange_info), 
-                            invert_symbol(symbol, exchange_info), column) 
-                           for column in column_names]
-                pair.columns = pd.MultiIndex.from_tuples(
-                    columns, names=['is_inverted', 'asset', 'symbol', 'feature']
-                )
-                df = pd.concat([df, pair], axis='columns')
-            return df
+            keys = [('inverted', get_quote_asset_from_pair(symbol, exchange_info), 
+                     invert_symbol(symbol, exchange_info)) for symbol in symbols]
+            return assemble_frame(keys, pairs, names=['is_inverted', 'asset', 'symbol', 'feature'])
         df = df.astype(float).copy()
         symbols = df.columns.get_level_values(0).unique().tolist()
         df = [df[symbol] for symbol in tqdm(symbols, unit=' pair')]
@@ -233,19 +243,17 @@ def convert_ohlcvs_from_pairs_to_assets(conversion_table, exchange_info, shortes
         def invert_symbol(symbol, exchange_info):
             base_asset, quote_asset = get_assets_from_pair(symbol, exchange_info)
             return quote_asset + base_asset
-        conversion_table_swapped = conversion_table.copy()
-        conversion_table_swapped.columns = \
-            conversion_table_swapped.columns.swaplevel(0, 1)
-        conversion_table_swapped.loc[:, ['open', 'high', 'low', 'close', 
-                                         'base_volume', 'quote_volume']] = \
-            conversion_table_swapped.loc[:, ['open', 'high', 'low', 'close', 
-                                             'quote_volume', 'base_volume']].values
-        conversion_table_swapped.loc[:, ['open', 'high', 'low', 'close']] = \
-            1 / conversion_table_swapped.loc[:, ['open', 'high', 'low', 'close']]
-        conversion_table_swapped.columns = \
-            conversion_table_swapped.columns.swaplevel(0, 1)
-        conversion_table_swapped = conversion_table_swapped.astype(float).copy()
-        symbols = conversion_table_swapped.columns.get_level_values(0).unique().tolist()
+        symbols = pd.Index(conversion_table.columns.get_level_values(0).unique())
+        positions = get_feature_positions(conversion_table.columns, symbols, 
+                                          ['open', 'high', 'low', 'close', 'base_volume', 'quote_volume'])
+        values = conversion_table.to_numpy(dtype=float)
+        swapped = values.copy()
+        with np.errstate(divide='ignore'):
+            swapped[:, positions[:, :4].ravel()] = 1 / values[:, positions[:, :4].ravel()]
+        swapped[:, positions[:, 4]] = values[:, positions[:, 5]]
+        swapped[:, positions[:, 5]] = values[:, positions[:, 4]]
+        conversion_table_swapped = pd.DataFrame(swapped, index=conversion_table.index, 
+                                                columns=conversion_table.columns)
         return add_quote_asset_level_to_pairs_and_reverse(conversion_table_swapped, 
                                                           exchange_info)
     to_asset = 'USDT'
@@ -264,19 +272,17 @@ def convert_ohlcvs_from_pairs_to_assets(conversion_table, exchange_info, shortes
     conversion_table_mixed.columns = conversion_table_mixed.columns.swaplevel(0, 3)
     conversion_table_mixed.columns = conversion_table_mixed.columns.swaplevel(0, 1)
     conversion_table_mixed.columns = conversion_table_mixed.columns.swaplevel(1, 2)
-    assets = conversion_table_mixed.columns.get_level_values(0).unique().tolist()
-    new_columns = []
-    for asset in tqdm(assets, unit=' asset'):
-        symbols = conversion_table_mixed[asset].columns.get_level_values(0)
-        trading_base_volume = \
-            conversion_table_mixed.loc[:, (asset, slice(None), 'base_volume')].sum(axis='columns')
-        trading_quote_volume = \
-            conversion_table_mixed.loc[:, (asset, slice(None), 'quote_volume')].sum(axis='columns')
-        new_columns.append(symbols[0])
-        for symbol in symbols:
-            # Fix this warning (PerformanceWarning: indexing past lexsort depth may impact performance).
-            conversion_table_mixed.loc[:, (asset, symbol, 'base_volume')] = trading_base_volume
-            conversion_table_mixed.loc[:, (asset, symbol, 'quote_volume')] = trading_quote_volume
+    columns = conversion_table_mixed.columns
+    (asset_codes, assets) = pd.factorize(columns.get_level_values(0))
+    values = conversion_table_mixed.to_numpy(copy=True)
+    for feature in ['base_volume', 'quote_volume']:
+        selected = np.flatnonzero(columns.get_level_values(2) == feature)
+        volumes = values[:, selected]
+        trading_volumes = np.zeros((len(assets), values.shape[0]))
+        np.add.at(trading_volumes, asset_codes[selected], np.where(np.isnan(volumes), 0.0, volumes).T)
+        values[:, selected] = trading_volumes[asset_codes[selected]].T
+    conversion_table_mixed = pd.DataFrame(values, index=conversion_table_mixed.index, columns=columns)
+    new_columns = columns.get_level_values(1)[np.unique(asset_codes, return_index=True)[1]].tolist()
     conversion_table_mixed.columns = conversion_table_mixed.columns.swaplevel(0, 1)
     conversion_table_mixed = conversion_table_mixed[new_columns]
     conversion_table_mixed.columns = conversion_table_mixed.columns.swaplevel(0, 3)
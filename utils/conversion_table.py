@@ -9,24 +9,55 @@
 # Library imports.
 from typing import Dict, List, Tuple, Union, Optional
 from binance.client import Client
-from .conversion import convert_price
-from .conversion import get_base_asset_from_pair, get_quote_asset_from_pair
+from .conversion import convert_prices
+from .exchange_index import ExchangeIndex
 import datetime
+import numpy as np
 import pandas as pd
 
 # Function definitions.
+def broadcast_group_aggregates(conversion_table: pd.DataFrame, 
+                               codes: np.ndarray, 
+                               aggregations: Dict[str, str]) -> pd.DataFrame:
+    """Aggregate columns per group once and scatter the result back to every row.
+
+    Keyword arguments:
+    conversion_table -- The table holding the columns to aggregate.
+    codes -- Integer group codes of every row (e.g. from pd.factorize).
+    aggregations -- Column name to pandas aggregation name (e.g. 'sum').
+    """
+    aggregated = conversion_table[list(aggregations)].groupby(codes).agg(aggregations)
+    aggregated = aggregated.reindex(np.arange(codes.max(initial=-1) + 1))
+    return pd.DataFrame({column: aggregated[column].to_numpy()[codes] 
+                         for column in aggregations}, index=conversion_table.index)
+
+def broadcast_group_absolute_maximum(values: pd.Series, codes: np.ndarray) -> np.ndarray:
+    """Return, for every row, the value of largest magnitude within its group."""
+    values = values.to_numpy(dtype=float)
+    magnitudes = np.nan_to_num(np.abs(values), nan=-1.0)
+    order = np.lexsort((np.arange(values.size), -magnitudes, codes))
+    is_first = np.ones(order.size, dtype=bool)
+    is_first[1:] = codes[order][1:] != codes[order][:-1]
+    group_values = np.empty(codes.max(initial=-1) + 1, dtype=float)
+    group_values[codes[order][is_first]] = values[order][is_first]
+    return group_values[codes]
+
 def get_conversion_table_from_binance(client: Client, 
                                       exchange_info: pd.DataFrame, 
                                       offset_s: float = 0, 
-                                      dump_raw: bool = False) -> pd.DataFrame:
-    conversion_table = pd.DataFrame(client.get_ticker())
-    conversion_table = conversion_table[conversion_table['symbol'].isin(
-        exchange_info['symbol'])]
-
-    conversion_table['base_asset'] = conversion_table['symbol'].apply(
-        lambda x: get_base_asset_from_pair(x, exchange_info=exchange_info))
-    conversion_table['quote_asset'] = conversion_table['symbol'].apply(
-        lambda x: get_quote_asset_from_pair(x, exchange_info=exchange_info))
+                                      dump_raw: bool = False, 
+                                      tickers: Optional[List[Dict[str, object]]] = None) -> pd.DataFrame:
+    """tickers (e.g. a Ticker_stream snapshot) replaces the client.get_ticker() call."""
+    exchange_index = ExchangeIndex.from_info(exchange_info)
+    if tickers is None:
+        tickers = client.get_ticker()
+    conversion_table = pd.DataFrame(tickers)
+    positions = exchange_index.get_positions(conversion_table['symbol'])
+    conversion_table = conversion_table[positions >= 0].copy()
+    positions = positions[positions >= 0]
+
+    conversion_table['base_asset'] = exchange_index.base_assets[positions]
+    conversion_table['quote_asset'] = exchange_index.quote_assets[positions]
 
     conversion_table = conversion_table.rename(columns={
         'openPrice': 'open', 'highPrice': 'high', 'lowPrice': 'low', 
@@ -175,40 +206,17 @@ def process_conversion_table(conversion_table: pd.DataFrame,
             (((conversion_table['ask_price'] - conversion_table['close']) / \
               conversion_table['close']) + 1)
 
+        keys = ['close'] if super_extra_minimal else ['open', 'close']
+        USDT_prices = convert_prices(
+            from_assets=conversion_table['base_asset'].unique().tolist(), 
+            to_asset='USDT', conversion_table=conversion_table, 
+            exchange_info=exchange_info, keys=keys, priority='accuracy', 
+            shortest_paths=shortest_paths)
         if not super_extra_minimal:
-            temp_conversion_table = conversion_table[[
-                'base_asset', 'open']]
-            temp_conversion_table = temp_conversion_table.drop_duplicates(
-                subset=['base_asset'], keep='first')
             conversion_table['USDT_open'] = \
-                temp_conversion_table.apply(
-                    lambda x: convert_price(
-                        size=1, from_asset=x['base_asset'], 
-                        to_asset='USDT', 
-                        conversion_table=conversion_table, 
-                        exchange_info=exchange_info, 
-                        shortest_path=shortest_paths, 
-                        key='open', priority='accuracy'), axis='columns')
-            conversion_table['USDT_open'] = conversion_table[[
-                'base_asset', 'USDT_open']].groupby(
-                    by=['base_asset']).fillna(method='pad')['USDT_open']
-
-        temp_conversion_table = conversion_table[[
-            'base_asset', 'close']]
-        temp_conversion_table = temp_conversion_table.drop_duplicates(
-            subset=['base_asset'], keep='first')
+                conversion_table['base_asset'].map(USDT_prices['open'])
         conversion_table['USDT_price'] = \
-            temp_conversion_table.apply(
-                lambda x: convert_price(
-                    size=1, from_asset=x['base_asset'], 
-                    to_asset='USDT', 
-                    conversion_table=conversion_table, 
-                    exchange_info=exchange_info, 
-                    shortest_path=shortest_paths, 
-                    key='close', priority='accuracy'), axis='columns')
-        conversion_table['USDT_price'] = conversion_table[[
-            'base_asset', 'USDT_price']].groupby(
-                by=['base_asset']).fillna(method='pad')['USDT_price']
+            conversion_table['base_asset'].map(USDT_prices['close'])
 
         if not extra_minimal:
             conversion_table['USDT_high'] = \
@@ -239,13 +247,10 @@ def process_conversion_table(conversion_table: pd.DataFrame,
             conversion_table['USDT_price'].astype(float)
 
         if super_extra_minimal:
-            price_change_percent = conversion_table[[
-                'base_asset', 'price_change_percent']].groupby(
-                    by='base_asset').agg(lambda x: x.iloc[x.abs().argmax()])
+            codes, _ = pd.factorize(conversion_table['base_asset'])
             conversion_table['price_change_percent'] = \
-                conversion_table.apply(
-                    lambda x: price_change_percent.loc[x['base_asset']], 
-                    axis='columns')
+                broadcast_group_absolute_maximum(
+                    conversion_table['price_change_percent'], codes)
         else:
             conversion_table['USDT_price_change'] = \
                 (conversion_table['USDT_price'].astype(float) - \
@@ -360,27 +365,20 @@ def process_conversion_table(conversion_table: pd.DataFrame,
             pd.concat([conversion_table, conversion_table_swapped], 
                       join='outer', axis='index')
 
-        traded_volume = conversion_table[[
-            'base_asset', 'rolling_USDT_base_volume']].groupby(
-                by='base_asset').agg('sum')['rolling_USDT_base_volume']
+        codes, _ = pd.factorize(conversion_table['base_asset'])
+        aggregations = {'rolling_USDT_base_volume': 'sum'}
+        if not extra_minimal:
+            aggregations.update({'USDT_bid_volume': 'sum', 
+                                 'USDT_ask_volume': 'sum'})
+        traded_volumes = broadcast_group_aggregates(
+            conversion_table, codes, aggregations=aggregations)
         conversion_table['rolling_traded_volume'] = \
-            conversion_table.apply(
-                lambda x: traded_volume.loc[x['base_asset']], axis='columns')
+            traded_volumes['rolling_USDT_base_volume']
         if not extra_minimal:
-            traded_bid_volume = conversion_table[[
-                'base_asset', 'USDT_bid_volume']].groupby(
-                    by='base_asset').agg('sum')['USDT_bid_volume']
             conversion_table['traded_bid_volume'] = \
-                conversion_table.apply(
-                    lambda x: traded_bid_volume.loc[x['base_asset']], 
-                    axis='columns')
-            traded_ask_volume = conversion_table[[
-                'base_asset', 'USDT_ask_volume']].groupby(
-                    by='base_asset').agg('sum')['USDT_ask_volume']
+                traded_volumes['USDT_bid_volume']
             conversion_table['traded_ask_volume'] = \
-                conversion_table.apply(
-                    lambda x: traded_ask_volume.loc[x['base_asset']], 
-                    axis='columns')
+                traded_volumes['USDT_ask_volume']
 
         conversion_table['importance'] = \
             conversion_table['rolling_USDT_base_volume'] / \
@@ -389,6 +387,7 @@ def process_conversion_table(conversion_table: pd.DataFrame,
             conversion_table['USDT_price'].astype(float) * \
             conversion_table['importance']
 
+        aggregations = {'importance_weighted_price': 'sum'}
         if not extra_minimal:
             conversion_table['importance_weighted_bid_price'] = \
                 conversion_table['USDT_bid_price'].astype(float) * \
@@ -396,27 +395,19 @@ def process_conversion_table(conversion_table: pd.DataFrame,
             conversion_table['importance_weighted_ask_price'] = \
                 conversion_table['USDT_ask_price'].astype(float) * \
                 conversion_table['importance']
+            aggregations.update({'importance_weighted_bid_price': 'sum', 
+                                 'importance_weighted_ask_price': 'sum'})
 
-        importance_weighted_price = conversion_table[[
-            'base_asset', 'importance_weighted_price']].groupby(
-                by='base_asset').agg('sum')['importance_weighted_price']
-        conversion_table['traded_price'] = conversion_table.apply(
-            lambda x: importance_weighted_price.loc[x['base_asset']], 
-            axis='columns')
+        traded_prices = broadcast_group_aggregates(
+            conversion_table, codes, aggregations=aggregations)
+        conversion_table['traded_price'] = \
+            traded_prices['importance_weighted_price']
 
         if not extra_minimal:
-            importance_weighted_bid_price = conversion_table[[
-                'base_asset', 'importance_weighted_bid_price']].groupby(
-                    by='base_asset').agg('sum')['importance_weighted_bid_price']
-            conversion_table['traded_bid_price'] = conversion_table.apply(
-                lambda x: importance_weighted_bid_price.loc[x['base_asset']], 
-                axis='columns')
-            importance_weighted_ask_price = conversion_table[[
-                'base_asset', 'importance_weighted_ask_price']].groupby(
-                    by='base_asset').agg('sum')['importance_weighted_ask_price']
-            conversion_table['traded_ask_price'] = conversion_table.apply(
-                lambda x: importance_weighted_ask_price.loc[x['base_asset']], 
-                axis='columns')
+            conversion_table['traded_bid_price'] = \
+                traded_prices['importance_weighted_bid_price']
+            conversion_table['traded_ask_price'] = \
+                traded_prices['importance_weighted_ask_price']
 
             conversion_table['traded_bid_ask_percent_change'] = \
                 ((conversion_table['traded_ask_price'] - \
@@ -535,34 +526,18 @@ def process_conversion_table(conversion_table: pd.DataFrame,
             conversion_table['symbol'] = conversion_table['base_asset'].copy()
             conversion_table['quote_asset'] = \
                 conversion_table['base_asset'].copy()
+            codes, _ = pd.factorize(conversion_table['base_asset'])
             if minimal:
-                df = conversion_table[[
-                    'base_asset', 'date', 'count']].groupby(by=[
-                        'base_asset']).agg({'date': 'max', 'count': 'max'})
-                conversion_table[['date', 'count']] = \
-                    conversion_table.apply(lambda x: df.loc[x['base_asset']], 
-                                           axis='columns')
+                aggregations = {'date': 'max', 'count': 'max'}
                 if super_extra_minimal:
-                    df = conversion_table[[
-                        'base_asset', 'bid_ask_percent_change', 
-                        'bid_ask_volume_percent_change']].groupby(by=[
-                            'base_asset']).agg({
-                                'bid_ask_percent_change': 'min', 
-                                'bid_ask_volume_percent_change': 'max'})
-                    conversion_table.loc[:, [
-                        'bid_ask_percent_change', 
-                        'bid_ask_volume_percent_change']] = \
-                            conversion_table.apply(
-                                lambda x: df.loc[x['base_asset']], 
-                                axis='columns')
+                    aggregations.update({
+                        'bid_ask_percent_change': 'min', 
+                        'bid_ask_volume_percent_change': 'max'})
             else:
-                df = conversion_table[[
-                    'base_asset', 'date', 'last_ID', 'count']].groupby(
-                        by=['base_asset']).agg({
-                            'date': 'max', 'last_ID': 'sum', 'count': 'sum'})
-                conversion_table.loc[:, ['date', 'last_ID', 'count']] = \
-                    conversion_table.apply(lambda x: df.loc[x['base_asset']], 
-                                           axis='columns')
+                aggregations = {'date': 'max', 'last_ID': 'sum', 'count': 'sum'}
+            df = broadcast_group_aggregates(
+                conversion_table, codes, aggregations=aggregations)
+            conversion_table[list(aggregations)] = df
             conversion_table = conversion_table.drop_duplicates(
                 subset=['base_asset'], keep='first')
         conversion_table = conversion_table.reset_index(drop=True)
@@ -580,11 +555,12 @@ def get_conversion_table(client: Client,
                          super_extra_minimal: bool = False, 
                          convert_to_USDT: bool = False, 
                          shortest_paths: Optional[Dict[str, Dict[str, Dict[str, 
-                                         List[Tuple[str, str]]]]]] = None) \
+                                         List[Tuple[str, str]]]]]] = None, 
+                         tickers: Optional[List[Dict[str, object]]] = None) \
         -> pd.DataFrame:
     conversion_table = get_conversion_table_from_binance(
         client=client, exchange_info=exchange_info, offset_s=offset_s, 
-        dump_raw=dump_raw)
+        dump_raw=dump_raw, tickers=tickers)
     return process_conversion_table(
         conversion_table=conversion_table, exchange_info=exchange_info, 
         as_pair=as_pair, minimal=minimal, extra_minimal=extra_minimal, 
@@ -9,7 +9,9 @@
 # Library imports.
 from typing import List, Tuple, Union
 from decimal import Decimal
-from .resample import resample
+from .resample import Incremental_resampler, resample
+from .storage import CSV_log_storage, DEFAULT_LOG_STORAGE, get_log_storage
+from .profiling import PROFILER
 from abc import abstractmethod, ABC
 from os.path import exists, join
 from os import mkdir
@@ -26,7 +28,8 @@ class Crypto_logger_base(ABC):
                  input_log_name: str = '', 
                  raw: bool = False, 
                  append: bool = False, 
-                 roll: int = 0):
+                 roll: int = 0, 
+                 storage: str = DEFAULT_LOG_STORAGE):
         """
         :param interval: OHLCV interval to log. Default is 15 seconds.
         :param interval_input: OHLCV interval from input log. Default is 15 seconds.
@@ -37,6 +40,9 @@ class Crypto_logger_base(ABC):
         :param raw: whether the log dumps raw (instantaneous) or OHLCV data.
         :param append: whether to append the latest screened data to the log dumps or not.
         :param roll: buffer size to cut oldest data (0 means don't cut).
+        :param storage: storage backend of the (input and output) buffers, 
+                        'segments', 'npz' or 'csv'.
+                        Screened logs are always CSV.
         """
         input_log_name = 'crypto_' + input_log_name + '_log_' + interval_input
 
@@ -47,12 +53,17 @@ class Crypto_logger_base(ABC):
         self.raw = raw
         self.append = append
         self.roll = roll
+        self.storage = get_log_storage(storage, max_rows=buffer_size)
+        self.screened_storage = CSV_log_storage()
+        self.resampler = Incremental_resampler(interval=interval, buffer_size=buffer_size)
+        self.profiler = PROFILER
+        self.profiler_name = log_name
 
         self.connected_to_raw = self.interval_input == self.interval
-        self.input_log_name = join(directory, input_log_name + '.txt')
+        self.input_log_name = self.storage.get_path(join(directory, input_log_name))
         self.input_log_screened_name = join(directory, input_log_name + '_screened.txt')
 
-        self.log_name = join(directory, log_name + '.txt')
+        self.log_name = self.storage.get_path(join(directory, log_name))
         self.log_screened_name = join(directory, log_name + '_screened.txt')
 
         if not exists(directory):
@@ -89,11 +100,9 @@ class Crypto_logger_base(ABC):
                     else:
                         header = [0, 1]
             if dataset is not None:
-                if exists(dataset):
-                    dataset = pd.read_csv(dataset, header=header, index_col=0)
-                    dataset.index = pd.DatetimeIndex(dataset.index)
-                else:
-                    dataset = None
+                storage = self.screened_storage if screened else self.storage
+                with self.profiler.span(self.profiler_name, 'read'):
+                    dataset = storage.read(dataset, header=header)
         return dataset
 
     @abstractmethod
@@ -111,28 +120,34 @@ class Crypto_logger_base(ABC):
         dataset = self.maybe_get_from_file(dataset=dataset, inputs=self.raw, screened=False)
         if self.raw:
             dataset = self.get()
-            if old_dataset is not None:
-                dataset = pd.concat([old_dataset, dataset], axis='index', join='outer')
-            dataset = dataset.copy().reset_index()
-            dataset = dataset.drop_duplicates(subset=['symbol', 'count'], 
-                                              keep='first', ignore_index=True)
-            dataset = dataset.set_index('date')
-            if not self.raw:
-                dataset = resample(dataset, self.interval)
-            dataset = dataset.tail(self.buffer_size)
-        else:
-            if dataset is None:
-                if old_dataset is not None:
-                    dataset = old_dataset
-            else:
-                dataset = self.get(dataset)
+            with self.profiler.span(self.profiler_name, 'concat'):
                 if old_dataset is not None:
                     dataset = pd.concat([old_dataset, dataset], axis='index', join='outer')
                 dataset = dataset.copy().reset_index()
-                dataset = dataset.drop_duplicates(keep='last', ignore_index=True)
+                dataset = dataset.drop_duplicates(subset=['symbol', 'count'], 
+                                                  keep='first', ignore_index=True)
                 dataset = dataset.set_index('date')
-                dataset = resample(dataset, self.interval)
+                if not self.raw:
+                    dataset = resample(dataset, self.interval)
                 dataset = dataset.tail(self.buffer_size)
+        else:
+            if dataset is None:
+                if old_dataset is not None:
+                    dataset = old_dataset
+            else:
+                self.put_next(self.get(dataset), old_dataset=old_dataset)
+                dataset = self.resampler.to_frame()
+        return dataset
+
+    def put_next(self, 
+                 dataset: Union[pd.DataFrame, None], 
+                 old_dataset: Union[pd.DataFrame, None] = None) -> pd.DataFrame:
+        """Fold new input bars in the buffer and return the bars that changed."""
+        with self.profiler.span(self.profiler_name, 'resample'):
+            if len(self.resampler) == 0 and old_dataset is not None:
+                self.resampler.put_frame(old_dataset)
+            dataset = self.resampler.update(dataset)
+        self.profiler.set_buffer_bytes(self.profiler_name, self.resampler.get_nbytes())
         return dataset
 
     def screen_next(self, 
@@ -144,9 +159,10 @@ class Crypto_logger_base(ABC):
         if not self.raw:
             dataset_screened = self.maybe_get_from_file(
                 dataset=dataset_screened, inputs=True, screened=True)
-        dataset_screened, live_filtered = \
-            self.screen(dataset, dataset_screened=dataset_screened, 
-                        live_filtered=live_filtered)
+        with self.profiler.span(self.profiler_name, 'screen'):
+            dataset_screened, live_filtered = \
+                self.screen(dataset, dataset_screened=dataset_screened, 
+                            live_filtered=live_filtered)
         if dataset_screened is not None:
             dataset_screened = dataset_screened.sort_index(axis='index')
             if self.append and dataset_screened is not None:
@@ -162,7 +178,8 @@ class Crypto_logger_base(ABC):
                  dataset: Union[pd.DataFrame, None] = None, 
                  dataset_screened: Union[pd.DataFrame, None] = None) -> None:
         """Log dataset in main logger loop."""
-        if dataset is not None:
-            dataset.to_csv(self.log_name)
-        if dataset_screened is not None:
-            dataset_screened.to_csv(self.log_screened_name)
+        with self.profiler.span(self.profiler_name, 'io'):
+            if dataset is not None:
+                self.storage.write(dataset, self.log_name)
+            if dataset_screened is not None:
+                self.screened_storage.write(dataset_screened, self.log_screened_name)
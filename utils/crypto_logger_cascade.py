@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        utils/crypto_logger_cascade.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Chain of Crypto_logger_output timeframes updated in one pass.
+
+# Library imports.
+from typing import Dict, List, Optional, Union
+from .crypto_logger_output import Crypto_logger_output
+from .storage import DEFAULT_LOG_STORAGE
+import pandas as pd
+
+# Class definition.
+class Crypto_logger_cascade:
+    def __init__(self, 
+                 intervals: List[str], 
+                 interval_input: str = '5s', 
+                 input_log_name: str = 'input', 
+                 buffer_sizes: Optional[Dict[str, int]] = None, 
+                 roll: int = 1000, 
+                 storage: str = DEFAULT_LOG_STORAGE):
+        """
+        :param intervals: OHLCV intervals logged, each one folded from the previous one.
+        :param interval_input: interval of the input of the first timeframe.
+        :param input_log_name: 'input' when the first timeframe is fed raw ticker
+                               windows, 'output' when it is fed another output log.
+        :param buffer_sizes: buffer size per interval (60, or 1500 for 1min, by default).
+        :param roll: buffer size to cut oldest screened data (0 means don't cut).
+        :param storage: storage backend of the buffers, 'segments', 'npz' or 'csv'.
+        """
+        if buffer_sizes is None:
+            buffer_sizes = {}
+        self.loggers = {}
+        for interval in intervals:
+            buffer_size = buffer_sizes.get(interval, 1500 if interval == '1min' else 60)
+            self.loggers['output_' + interval] = Crypto_logger_output(
+                interval_input=interval_input, interval=interval, buffer_size=buffer_size, 
+                input_log_name=input_log_name, append=False, roll=roll, storage=storage)
+            interval_input = interval
+            input_log_name = 'output'
+        self.datasets = {}
+        self.datasets_screened = {}
+        for (name, logger) in self.loggers.items():
+            self.datasets[name] = logger.maybe_get_from_file(
+                dataset=None, inputs=False, screened=False)
+            self.datasets_screened[name] = logger.maybe_get_from_file(
+                dataset=None, inputs=False, screened=True)
+
+    def get_and_put_next(self, 
+                         dataset: Union[pd.DataFrame, None] = None) -> Dict[str, pd.DataFrame]:
+        """Fold the input in the first timeframe, then only the changed bars in the next ones."""
+        if dataset is None:
+            return self.datasets
+        bars = None
+        for (name, logger) in self.loggers.items():
+            if bars is None:
+                bars = logger.get(dataset)
+            bars = logger.put_next(bars, old_dataset=self.datasets[name])
+            self.datasets[name] = logger.resampler.to_frame()
+        return self.datasets
+
+    def screen_next(self, 
+                    dataset_screened: Union[pd.DataFrame, None] = None, 
+                    live_filtered: Union[List[str], None] = None, 
+                    datasets: Optional[Dict[str, pd.DataFrame]] = None) -> Dict[str, pd.DataFrame]:
+        """Screen every timeframe with the assets screened by the previous one.
+
+        datasets defaults to the buffers, pass copies to screen while they are updated.
+        """
+        if datasets is None:
+            datasets = self.datasets
+        for (name, logger) in self.loggers.items():
+            dataset_screened, live_filtered = \
+                logger.screen_next(old_dataset_screened=self.datasets_screened[name], 
+                                   dataset_screened=dataset_screened, 
+                                   dataset=datasets[name], 
+                                   live_filtered=live_filtered)
+            self.datasets_screened[name] = dataset_screened
+        return self.datasets_screened
+
+    def log_next(self, 
+                 datasets: bool = True, 
+                 screened: bool = True, 
+                 names: Optional[List[str]] = None) -> None:
+        """Log the buffers and/or screened data of the given (default all) timeframes."""
+        for (name, logger) in self.loggers.items():
+            if names is None or name in names:
+                logger.log_next(dataset=self.datasets[name] if datasets else None, 
+                                dataset_screened=self.datasets_screened[name] if screened else None)
+
+    def get_bar_counts(self) -> Dict[str, Dict[str, int]]:
+        """Observed, padded and backfilled bars of the timeframes resampled from raw tickers."""
+        return {name: dict(logger.bar_counts) for (name, logger) in self.loggers.items() 
+                if logger.connected_to_raw}
+
+    def get_last_screened(self) -> Union[pd.DataFrame, None]:
+        """Return the screened data of the highest timeframe."""
+        return list(self.datasets_screened.values())[-1]
@@ -7,13 +7,18 @@
 # Description: Simple Binance logger circular buffered for N time precision.
 
 # Library imports.
-from typing import List, Tuple, Union
+from typing import List, Optional, Tuple, Union
 from .crypto_logger_base import Crypto_logger_base
+from .storage import DEFAULT_LOG_STORAGE
 from .authentication import Cryptocurrency_authenticator
 from .exchange import Cryptocurrency_exchange
 from .conversion import get_timezone_offset_in_seconds
 from .conversion import precompute_shortest_paths
-from .conversion_table import get_conversion_table, get_tradable_tickers_info
+from .conversion_table import get_conversion_table_from_binance, get_tradable_tickers_info
+from .conversion_table import process_conversion_table
+from .ring_buffer import Ticker_ring_buffer, filter_movers, get_tradable_tickers
+from .ticker_stream import Ticker_stream
+from binance.client import Client
 import pandas as pd
 
 # Class definition.
@@ -25,32 +30,53 @@ class Crypto_logger_input(Crypto_logger_base):
                  volume_percent: float = 0.0, 
                  as_pair: bool = False, 
                  append: bool = False, 
-                 roll: int = 1000):
+                 roll: int = 1000, 
+                 storage: str = DEFAULT_LOG_STORAGE, 
+                 slots: int = 32, 
+                 stream: bool = False, 
+                 stream_url: Optional[str] = None, 
+                 client: Optional[Client] = None):
         """
         :param interval: OHLCV interval to log. Default is 15 seconds.
         :param buffer_size: buffer size to avoid crashing on memory accesses.
         :param price_percent: price move percent.
         :param volume_percent: volume move percent.
+        :param storage: storage backend of the buffer, 'segments', 'npz' or 'csv'.
+        :param slots: initial ticks of the ring buffer, grown while the window needs them.
+        :param stream: whether to snapshot the all-market ticker websocket streams 
+                       instead of polling client.get_ticker().
+        :param stream_url: websocket URL of the streams (Binance by default).
+        :param client: python-binance client (or a Recording_client or Replay_client), 
+                       an unauthenticated spot client by default.
         """
         self.price_percent = price_percent
         self.volume_percent = volume_percent
         self.as_pair = as_pair
+        self.ring = Ticker_ring_buffer(slots=slots, max_rows=buffer_size)
         super().__init__(interval=interval, interval_input='', buffer_size=buffer_size, 
                          directory='crypto_logs', log_name='crypto_input_log_' + interval, 
-                         input_log_name='', raw=True, append=append, roll=roll)
+                         input_log_name='', raw=True, append=append, roll=roll, 
+                         storage=storage)
 
-        authenticator = Cryptocurrency_authenticator(use_keys=False, testnet=False)
-        self.client = authenticator.spot_client
+        if client is None:
+            authenticator = Cryptocurrency_authenticator(use_keys=False, testnet=False)
+            client = authenticator.spot_client
+        self.client = client
 
         exchange = Cryptocurrency_exchange(client=self.client, directory=self.directory)
         self.exchange_info = exchange.info
 
         self.shortest_paths = precompute_shortest_paths(self.exchange_info, 
                                                 priority=None, 
-                                                shortest_paths_file='crypto_logs/shortest_paths.pkl')
+                                                shortest_paths_file='crypto_logs/shortest_paths.npz')
 
         self.offset_s = get_timezone_offset_in_seconds()
 
+        self.stream = None
+        if stream:
+            self.stream = Ticker_stream(url=stream_url, client=self.client)
+            self.stream.start()
+
     def filter_movers(self, 
                       dataset: pd.DataFrame, 
                       count: int = 1000, 
@@ -93,6 +119,11 @@ class Crypto_logger_input(Crypto_logger_base):
                live_filtered: Union[pd.DataFrame, None] = None) -> Tuple[pd.DataFrame, List[str]]:
         if dataset is None:
             live_filtered = []
+        elif dataset is self.ring.frame or dataset is self.ring.tail_frame:
+            live_filtered = get_tradable_tickers(self.ring)
+            dataset_screened = filter_movers(self.ring, count=1000, 
+                                             price_percent=self.price_percent, 
+                                             volume_percent=self.volume_percent)
         else:
             dataset, live_filtered = get_tradable_tickers_info(dataset)
             dataset_screened = self.filter_movers(dataset, count=1000, 
@@ -100,11 +131,40 @@ class Crypto_logger_input(Crypto_logger_base):
                                                   volume_percent=self.volume_percent)
         return dataset_screened, live_filtered
 
+    def get_and_put_next(self, 
+                         old_dataset: Union[pd.DataFrame, None] = None, 
+                         dataset: Union[pd.DataFrame, None] = None) -> pd.DataFrame:
+        """Put the next tick in the ring buffer and return the rows the outputs fold."""
+        return self.put_next(self.get(), old_dataset=old_dataset)
+
+    def put_next(self, 
+                 dataset: pd.DataFrame, 
+                 old_dataset: Union[pd.DataFrame, None] = None) -> pd.DataFrame:
+        """Put a tick fetched by get in the ring buffer and return the rows the outputs fold.
+
+        Only the rows the last two resampled bars depend on are gathered 
+        (ring.to_tail_frame), the screening reads the ring buffer itself and 
+        the whole window (ring.to_frame) is only built to be logged.
+        """
+        with self.profiler.span(self.profiler_name, 'put'):
+            if len(self.ring) == 0 and old_dataset is not None:
+                self.ring.put_frame(old_dataset)
+            self.ring.put(dataset)
+            dataset = self.ring.to_tail_frame()
+        self.profiler.set_buffer_bytes(self.profiler_name, self.ring.get_nbytes())
+        return dataset
+
     def get(self, dataset: Union[pd.DataFrame, None] = None) -> pd.DataFrame:
         """Get all pairs data from Binance API."""
-        dataset = get_conversion_table(client=self.client, exchange_info=self.exchange_info, 
-                                       offset_s=self.offset_s, dump_raw=False, as_pair=self.as_pair, 
-                                       minimal=False, extra_minimal=True, super_extra_minimal=False, 
-                                       convert_to_USDT=False, shortest_paths=self.shortest_paths)
-        dataset.index = dataset.index.round(self.interval)
+        with self.profiler.span(self.profiler_name, 'fetch'):
+            dataset = get_conversion_table_from_binance(
+                client=self.client, exchange_info=self.exchange_info, offset_s=self.offset_s, 
+                dump_raw=False, tickers=None if self.stream is None else self.stream.get_tickers())
+        with self.profiler.span(self.profiler_name, 'process_conversion_table'):
+            dataset = process_conversion_table(dataset, exchange_info=self.exchange_info, 
+                                               as_pair=self.as_pair, minimal=False, 
+                                               extra_minimal=True, super_extra_minimal=False, 
+                                               convert_to_USDT=False, 
+                                               shortest_paths=self.shortest_paths)
+            dataset.index = dataset.index.round(self.interval)
         return dataset
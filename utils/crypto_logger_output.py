@@ -9,7 +9,8 @@
 # Library imports.
 from typing import List, Tuple, Union
 from .crypto_logger_base import Crypto_logger_base
-from .indicators import filter_in_market, screen_one
+from .storage import DEFAULT_LOG_STORAGE
+from .screener import screen_all
 import pandas as pd
 
 # Class definition.
@@ -20,7 +21,8 @@ class Crypto_logger_output(Crypto_logger_base):
                  buffer_size: int = 60, 
                  input_log_name: str = 'input', 
                  append: bool = True, 
-                 roll: int = 60):
+                 roll: int = 60, 
+                 storage: str = DEFAULT_LOG_STORAGE):
         """
         :param interval_input: OHLCV interval from input log. Default is 15 seconds.
         :param interval: OHLCV interval to log. Default is 15 seconds.
@@ -28,10 +30,14 @@ class Crypto_logger_output(Crypto_logger_base):
         :param input_log_name: either input or output (this ends up in the log file name).
         :param append: whether to append the latest screened data to the log dumps or not.
         :param roll: buffer size to cut oldest data (0 means don't cut).
+        :param storage: storage backend of the buffers, 'segments', 'npz' or 'csv'.
         """
         super().__init__(interval=interval, interval_input=interval_input, buffer_size=buffer_size, 
                          directory='crypto_logs', log_name='crypto_output_log_' + interval, 
-                         input_log_name=input_log_name, raw=False, append=append, roll=roll)
+                         input_log_name=input_log_name, raw=False, append=append, roll=roll, 
+                         storage=storage)
+        self.bar_counts = {'observed': 0, 'padded': 0, 'backfilled': 0}
+        self.last_counted = None
 
     def screen(self, 
                dataset: Union[pd.DataFrame, None], 
@@ -44,7 +50,7 @@ class Crypto_logger_output(Crypto_logger_base):
                 new_columns = (input_filter & old_columns)
                 if live_filtered is not None:
                     new_columns = (new_columns & set(live_filtered))
-                assets = filter_in_market(screen_one, dataset[list(new_columns)])
+                assets = screen_all(dataset[list(new_columns)])
                 dataset_screened = dataset_screened[dataset_screened['symbol'].isin(assets)]
         return dataset_screened, None
 
@@ -61,15 +67,29 @@ class Crypto_logger_output(Crypto_logger_base):
         df.columns = df.columns.droplevel(0)
         df = df.sort_index(axis='index').iloc[1:]
         df.columns.names = ['feature', 'symbol']
+        self.count_bars(df['close'])
         df['base_volume'] = df['base_volume'].fillna(0)
         df['quote_volume'] = df['quote_volume'].fillna(0)
         df = df.fillna(method='pad').fillna(method='backfill') # Last resort.
         df.columns = df.columns.swaplevel('feature', 'symbol')
         return df
 
+    def count_bars(self, close: pd.DataFrame) -> None:
+        """Count the (symbol) bars of the last closed bucket observed, padded or backfilled."""
+        if close.shape[0] < 2 or (self.last_counted is not None and 
+                                  close.index[-2] <= self.last_counted):
+            return
+        observed = close.iloc[-2].notna()
+        leading = ~close.iloc[:-2].notna().any(axis='index')
+        self.bar_counts['observed'] += int(observed.sum())
+        self.bar_counts['padded'] += int((~observed & ~leading).sum())
+        self.bar_counts['backfilled'] += int((~observed & leading).sum())
+        self.last_counted = close.index[-2]
+
     def get(self, dataset: Union[pd.DataFrame, None] = None) -> Union[pd.DataFrame, None]:
         if dataset is not None:
             if self.connected_to_raw:
-                dataset = self.resample_from_raw(dataset)
+                with self.profiler.span(self.profiler_name, 'resample_from_raw'):
+                    dataset = self.resample_from_raw(dataset)
             dataset = dataset.tail(2)
         return dataset
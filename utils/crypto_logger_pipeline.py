@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        utils/crypto_logger_pipeline.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Fetch, aggregation, screening and persistence of the loggers run as concurrent stages.
+
+# Library imports.
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+from collections import deque
+from queue import Empty, Full, Queue
+from threading import Event, Lock, Thread
+from .crypto_logger_input import Crypto_logger_input
+from .crypto_logger_cascade import Crypto_logger_cascade
+from .scheduler import Interval_scheduler
+import time
+import numpy as np
+import pandas as pd
+
+# Class definition.
+class Stage_metrics:
+    def __init__(self, 
+                 name: str, 
+                 queue: Optional[Queue] = None, 
+                 window: int = 1000):
+        """
+        :param name: stage name.
+        :param queue: input queue of the stage (None for the fetcher).
+        :param window: latencies kept for the statistics.
+        """
+        self.name = name
+        self.queue = queue
+        self.latencies = deque(maxlen=window)
+        self.count = 0
+        self.dropped = 0
+        self.max_queue_depth = 0
+        self.lock = Lock()
+
+    def add(self, start: float) -> None:
+        """Record one item processed since start (time.perf_counter)."""
+        with self.lock:
+            self.latencies.append(time.perf_counter() - start)
+            self.count += 1
+
+    def add_queue_depth(self) -> None:
+        if self.queue is not None:
+            self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+
+    def get_summary(self) -> Dict[str, float]:
+        with self.lock:
+            latencies = np.array(self.latencies) * 1000
+        summary = {'count': self.count, 'dropped': self.dropped, 
+                   'queue_depth': 0 if self.queue is None else self.queue.qsize(), 
+                   'max_queue_depth': self.max_queue_depth, 
+                   'last_ms': np.nan, 'mean_ms': np.nan, 'max_ms': np.nan}
+        if latencies.shape[0] > 0:
+            summary.update({'last_ms': latencies[-1], 'mean_ms': latencies.mean(), 
+                            'max_ms': latencies.max()})
+        return summary
+
+class Crypto_logger_pipeline:
+    """Crypto_logger_input and Crypto_logger_cascade loop as four threads.
+
+    fetch -> aggregate -> screen -> persist, linked by bounded queues.
+    The fetcher polls on the input interval boundaries (Interval_scheduler),
+    so a slow stage only fills its queue instead of delaying the next poll.
+    When behind, the fetcher skips the poll while the aggregator queue is
+    full and the screener skips the snapshots already superseded by a
+    queued one. Every stage works on snapshots: the aggregator
+    hands copies of the output buffers downstream. The persist queue keeps
+    the latest snapshots only, since every write holds whole buffers.
+    The fetcher only hands the aggregator the input rows its bars depend
+    on; the screener and the persister read the input ring buffer itself,
+    under a lock, at its latest tick.
+    """
+    stages = ['fetch', 'aggregate', 'screen', 'persist']
+
+    def __init__(self, 
+                 input_logger: Crypto_logger_input, 
+                 outputs: Crypto_logger_cascade, 
+                 old_dataset: Union[pd.DataFrame, None] = None, 
+                 old_dataset_screened: Union[pd.DataFrame, None] = None, 
+                 queue_size: int = 2):
+        """
+        :param input_logger: raw ticker logger polled by the fetcher.
+        :param outputs: output timeframes folded from the input window.
+        :param old_dataset: input window to resume from.
+        :param old_dataset_screened: input screened data to resume from.
+        :param queue_size: items waiting in front of each stage.
+        """
+        self.input_logger = input_logger
+        self.outputs = outputs
+        self.dataset = old_dataset
+        self.dataset_screened = old_dataset_screened
+        self.scheduler = Interval_scheduler(interval=input_logger.interval)
+        self.queues = {name: Queue(maxsize=queue_size) for name in self.stages[1:]}
+        self.metrics = {name: Stage_metrics(name, queue=self.queues.get(name))
+                        for name in self.stages}
+        # Input screening reads the ring buffer while the fetcher writes it.
+        self.ring_lock = Lock()
+        self.stopping = Event()
+        self.threads = []
+        self.errors = []
+
+    def put(self, name: str, item: Any) -> None:
+        queue = self.queues[name]
+        if name == 'persist' and item is not None:
+            while True:
+                try:
+                    queue.put_nowait(item)
+                    break
+                except Full:
+                    try:
+                        queue.get_nowait()
+                        self.metrics[name].dropped += 1
+                    except Empty:
+                        pass
+        else:
+            queue.put(item)
+        self.metrics[name].add_queue_depth()
+
+    def fetch(self) -> None:
+        """Poll the input on interval boundaries until stopped."""
+        while True:
+            if self.scheduler.wait(self.stopping) is None:
+                break
+            if self.queues['aggregate'].full():
+                self.scheduler.skip('fetch')
+                continue
+            start = time.perf_counter()
+            try:
+                dataset = self.input_logger.get()
+                with self.ring_lock:
+                    self.dataset = self.input_logger.put_next(dataset, old_dataset=self.dataset)
+                self.put('aggregate', self.dataset)
+                self.metrics['fetch'].add(start)
+            except Exception as e:
+                self.fail(e)
+            self.scheduler.finish()
+        self.put('aggregate', None)
+
+    def aggregate(self, dataset: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, pd.DataFrame]]:
+        datasets = self.outputs.get_and_put_next(dataset=dataset)
+        datasets = {name: None if frame is None else frame.copy()
+                    for (name, frame) in datasets.items()}
+        return dataset, datasets
+
+    def screen(self, item: Tuple[pd.DataFrame, Dict[str, pd.DataFrame]]) -> Tuple:
+        (dataset, datasets) = item
+        if not self.queues['screen'].empty():
+            self.scheduler.skip('screen')
+            return dataset, self.dataset_screened, datasets, dict(self.outputs.datasets_screened)
+        with self.ring_lock:
+            # Screens the ring buffer, which holds a newer tick when the fetcher already moved on.
+            self.dataset_screened, live_filtered = \
+                self.input_logger.screen_next(old_dataset_screened=self.dataset_screened, 
+                                              dataset_screened=None, 
+                                              dataset=self.input_logger.ring.to_tail_frame(), 
+                                              live_filtered=None)
+        datasets_screened = self.outputs.screen_next(dataset_screened=self.dataset_screened, 
+                                                     live_filtered=live_filtered, 
+                                                     datasets=datasets)
+        return dataset, self.dataset_screened, datasets, dict(datasets_screened)
+
+    def persist(self, item: Tuple) -> None:
+        (dataset, dataset_screened, datasets, datasets_screened) = item
+        with self.ring_lock:
+            # The whole input window is only gathered here, from the latest tick.
+            dataset = self.input_logger.ring.to_frame()
+        self.input_logger.log_next(dataset=dataset, dataset_screened=dataset_screened)
+        for (name, logger) in self.outputs.loggers.items():
+            logger.log_next(dataset=datasets[name], dataset_screened=datasets_screened[name])
+
+    def run_stage(self, 
+                  name: str, 
+                  process: Callable[[Any], Any], 
+                  next_name: Optional[str] = None) -> None:
+        """Process the items of a queue until the None sent by the previous stage."""
+        queue = self.queues[name]
+        while True:
+            item = queue.get()
+            if item is None:
+                break
+            start = time.perf_counter()
+            try:
+                item = process(item)
+                self.metrics[name].add(start)
+                if next_name is not None:
+                    self.put(next_name, item)
+            except Exception as e:
+                self.fail(e)
+        if next_name is not None:
+            self.put(next_name, None)
+
+    def fail(self, error: Exception) -> None:
+        """Stop the fetcher, the queued items still drain through the other stages."""
+        print(error)
+        self.errors.append(error)
+        self.stopping.set()
+
+    def start(self) -> None:
+        self.stopping.clear()
+        self.threads = [
+            Thread(target=self.fetch, name='fetch', daemon=True), 
+            Thread(target=self.run_stage, args=('aggregate', self.aggregate, 'screen'), 
+                   name='aggregate', daemon=True), 
+            Thread(target=self.run_stage, args=('screen', self.screen, 'persist'), 
+                   name='screen', daemon=True), 
+            Thread(target=self.run_stage, args=('persist', self.persist), 
+                   name='persist', daemon=True)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """Stop polling and wait for the last snapshot to be written."""
+        self.stopping.set()
+        for thread in self.threads:
+            thread.join()
+
+    def is_running(self) -> bool:
+        return not self.stopping.is_set()
+
+    def get_metrics(self) -> Dict[str, Dict[str, float]]:
+        metrics = {name: metrics.get_summary() for (name, metrics) in self.metrics.items()}
+        metrics['scheduler'] = self.scheduler.get_summary()
+        metrics.update({'bars_' + name: counts 
+                        for (name, counts) in self.outputs.get_bar_counts().items()})
+        return metrics
+
+    def format_metrics(self) -> str:
+        lines = ['{:10s} {:>7s} {:>9s} {:>9s} {:>9s} {:>6s} {:>6s} {:>8s}'.format(
+            'stage', 'count', 'last ms', 'mean ms', 'max ms', 'queue', 'max q', 'dropped')]
+        for name in self.stages:
+            summary = self.metrics[name].get_summary()
+            lines.append('{:10s} {:7d} {:9.1f} {:9.1f} {:9.1f} {:6d} {:6d} {:8d}'.format(
+                name, summary['count'], summary['last_ms'], summary['mean_ms'], 
+                summary['max_ms'], summary['queue_depth'], summary['max_queue_depth'], 
+                summary['dropped']))
+        lines.append(self.scheduler.format_summary())
+        for (name, counts) in self.outputs.get_bar_counts().items():
+            lines.append('{} bars: {} observed, {} padded, {} backfilled'.format(
+                name, counts['observed'], counts['padded'], counts['backfilled']))
+        return '\n'.join(lines)
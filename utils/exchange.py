@@ -9,26 +9,59 @@
 from typing import Optional
 from binance.client import Client
 from os import mkdir
-from os.path import exists, join
+from os.path import exists, getmtime, join
+from time import time
+from .exchange_index import ExchangeIndex, get_exchange_info_digest
+from .frame_assembly import assemble_rows
 import pandas as pd
 
 # Class definition.
 class Cryptocurrency_exchange:
     def __init__(self, 
                  client: Optional[Client] = None, 
-                 directory: str = 'crypto_logs'):
+                 directory: str = 'crypto_logs', 
+                 max_age_s: Optional[float] = 86400):
+        """
+        :param client: python-binance client used to (re)fetch the exchange info.
+        :param directory: directory holding crypto_exchange_info.txt.
+        :param max_age_s: refetch the cached exchange info once older than this 
+                          (never when None or without a client).
+        """
         self.client = client
         self.info_path = join('crypto_logs', 'crypto_exchange_info.txt')
         if not exists(directory):
             mkdir(directory)
+        self.info = None
         if exists(self.info_path):
             self.info = pd.read_csv(self.info_path, index_col=0)
-        else:
+        if self.info is None or self.is_stale(max_age_s):
+            self.refresh_exchange_info()
+        self.index = ExchangeIndex.from_info(self.info)
+
+    def is_stale(self, max_age_s: Optional[float]) -> bool:
+        if self.client is None or max_age_s is None:
+            return False
+        return time() - getmtime(self.info_path) > max_age_s
+
+    def refresh_exchange_info(self) -> None:
+        """Fetch the exchange info, falling back on the cached one if that fails."""
+        cached_info = self.info
+        try:
             self.get_exchange_info()
-            self.info.to_csv(self.info_path)
+        except Exception as e:
+            if cached_info is None:
+                raise
+            print(e)
+            print('Keeping cached exchange info.')
+            self.info = cached_info
+            return
+        if cached_info is not None and \
+                get_exchange_info_digest(cached_info) != get_exchange_info_digest(self.info):
+            print('Listed pairs changed since the cached exchange info.')
+        self.info.to_csv(self.info_path)
 
     def get_exchange_info(self) -> None:
-        def build_filters(symbols_info: pd.DataFrame, index: int) -> pd.DataFrame:
+        def build_filters(symbols_info: pd.DataFrame, index: int) -> list:
             symbol = symbols_info['symbol'].iat[index]
             df = pd.DataFrame(symbols_info['filters'].iat[index])
             min_price = df[df['filterType'] == 'PRICE_FILTER']['minPrice'].iat[0]
@@ -36,9 +69,7 @@ class Cryptocurrency_exchange:
             tick_size = df[df['filterType'] == 'PRICE_FILTER']['tickSize'].iat[0]
             step_size = df[df['filterType'] == 'LOT_SIZE']['stepSize'].iat[0]
             multiplier_up = df[df['filterType'] == 'PERCENT_PRICE_BY_SIDE']['avgPriceMins'].iat[0]
-            return pd.DataFrame([[symbol, min_price, max_price, tick_size, step_size, multiplier_up]], 
-                                columns=['symbol', 'min_price', 'max_price', 'tick_size', 'step_size', 
-                                         'multiplier_up'])
+            return [symbol, min_price, max_price, tick_size, step_size, multiplier_up]
         symbols_info = self.client.get_exchange_info()
         symbols_info = pd.DataFrame(pd.DataFrame([symbols_info])['symbols'].iat[0])
         symbols_info = symbols_info[symbols_info['status'] == 'TRADING']
@@ -50,9 +81,8 @@ class Cryptocurrency_exchange:
         symbols_info = symbols_info.set_index('symbol', drop=False)
         filters = [build_filters(symbols_info, i) for i in range(symbols_info.shape[0])]
         filters = [x for x in filters if x is not None]
-        df = pd.DataFrame()
-        for x in filters:
-            df = pd.concat([df, x], axis='index')
+        df = assemble_rows(filters, columns=['symbol', 'min_price', 'max_price', 'tick_size', 
+                                             'step_size', 'multiplier_up'])
         df = df.set_index('symbol')
         symbols_info = pd.concat([symbols_info, df], axis='columns')
         self.info = symbols_info.drop(columns=['symbol', 'filters']).reset_index('symbol')
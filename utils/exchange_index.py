@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        utils/exchange_index.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Compiled symbol and asset lookups over the Binance exchange info.
+
+# Library imports.
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import numpy as np
+import pandas as pd
+
+# Function definitions.
+def get_exchange_info_digest(exchange_info: pd.DataFrame) -> str:
+    """Return a digest of the (symbol, base_asset, quote_asset) set.
+
+    Only the listed pairs are hashed, so the digest changes exactly when
+    Binance lists or delists a pair, whatever the row order or filters.
+    """
+    triples = exchange_info[['symbol', 'base_asset', 'quote_asset']].astype(str)
+    triples = sorted(set(map(tuple, triples.to_numpy().tolist())))
+    content = '\n'.join([','.join(triple) for triple in triples])
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+# Class definition.
+class ExchangeIndex:
+    """O(1) symbol and asset lookups built once from the exchange info.
+
+    Build it through ExchangeIndex.from_info(exchange_info), which returns the
+    index already built for that same exchange_info object, so helpers taking
+    an exchange_info DataFrame can use it without re-scanning the frame.
+    """
+    _cache: Dict[int, Tuple[pd.DataFrame, 'ExchangeIndex']] = {}
+    _cache_size = 4
+
+    def __init__(self, exchange_info: pd.DataFrame):
+        info = exchange_info.drop_duplicates(subset=['symbol'], keep='first')
+        self.symbols = info['symbol'].to_numpy(dtype=object)
+        self.base_assets = info['base_asset'].to_numpy(dtype=object)
+        self.quote_assets = info['quote_asset'].to_numpy(dtype=object)
+        self.tick_sizes = info['tick_size'].to_numpy(dtype=float)
+        self.step_sizes = info['step_size'].to_numpy(dtype=float)
+        self.precisions = info['quote_precision'].to_numpy(dtype=int)
+        self.symbol_index = pd.Index(self.symbols)
+        self.symbol_positions = {symbol: i for (i, symbol) in enumerate(self.symbols)}
+        self.symbol_info = {
+            symbol: (base_asset, quote_asset, tick_size, step_size, precision)
+            for (symbol, base_asset, quote_asset, tick_size, step_size, precision)
+            in zip(self.symbols, self.base_assets, self.quote_assets, 
+                   self.tick_sizes, self.step_sizes, self.precisions)}
+        self.asset_pairs = {}
+        self.base_asset_pairs = {}
+        self.pairs_from_assets = {}
+        for (i, (symbol, base_asset, quote_asset)) in \
+                enumerate(zip(self.symbols, self.base_assets, self.quote_assets)):
+            self.asset_pairs.setdefault(base_asset, []).append(symbol)
+            self.asset_pairs.setdefault(quote_asset, []).append(symbol)
+            self.base_asset_pairs.setdefault(base_asset, []).append(symbol)
+            self.pairs_from_assets.setdefault((base_asset, quote_asset), i)
+        self.assets = list(self.asset_pairs)
+        self.digest = get_exchange_info_digest(exchange_info)
+
+    @classmethod
+    def from_info(cls, exchange_info: pd.DataFrame) -> 'ExchangeIndex':
+        """Return the index of exchange_info, building it on first use."""
+        if isinstance(exchange_info, cls):
+            return exchange_info
+        cached = cls._cache.get(id(exchange_info))
+        if cached is not None and cached[0] is exchange_info:
+            return cached[1]
+        index = cls(exchange_info)
+        if len(cls._cache) >= cls._cache_size:
+            cls._cache.pop(next(iter(cls._cache)))
+        cls._cache[id(exchange_info)] = (exchange_info, index)
+        return index
+
+    def get_positions(self, symbols: List[str]) -> np.ndarray:
+        """Return the position of every symbol (-1 when not listed)."""
+        return self.symbol_index.get_indexer(symbols)
+
+    def get_assets(self, pair: str) -> Optional[Tuple[str, str]]:
+        info = self.symbol_info.get(pair)
+        return None if info is None else (info[0], info[1])
+
+    def get_base_asset(self, pair: str) -> Optional[str]:
+        info = self.symbol_info.get(pair)
+        return None if info is None else info[0]
+
+    def get_quote_asset(self, pair: str) -> Optional[str]:
+        info = self.symbol_info.get(pair)
+        return None if info is None else info[1]
+
+    def get_symbol_info(self, pair: str) -> Optional[Tuple[str, str, float, float, int]]:
+        """Return (base_asset, quote_asset, tick_size, step_size, precision)."""
+        return self.symbol_info.get(pair)
+
+    def get_connected_pairs(self, asset: str) -> List[str]:
+        """Return every symbol where asset is either the base or the quote."""
+        return self.asset_pairs.get(asset, [])
+
+    def get_base_asset_pairs(self, asset: str) -> List[str]:
+        """Return every symbol where asset is the base."""
+        return self.base_asset_pairs.get(asset, [])
+
+    def get_pair_from_assets(self, from_asset: str, to_asset: str) -> Optional[Tuple[str, str]]:
+        """Return (base_asset, quote_asset) of the first pair trading both assets."""
+        position = self.pairs_from_assets.get((from_asset, to_asset))
+        swapped_position = self.pairs_from_assets.get((to_asset, from_asset))
+        if position is None and swapped_position is None:
+            return None
+        if swapped_position is None or \
+                (position is not None and position < swapped_position):
+            return from_asset, to_asset
+        return to_asset, from_asset
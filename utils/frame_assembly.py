@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        utils/frame_assembly.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Assemble many blocks into one DataFrame in a single allocation, instead of growing it with pd.concat.
+
+# Library imports.
+from typing import List, Sequence
+import numpy as np
+import pandas as pd
+
+# Function definitions.
+def get_combined_index(blocks: List[pd.DataFrame]) -> pd.Index:
+    """Return the index pd.concat(blocks, axis='columns') aligns the blocks on."""
+    index = blocks[0].index
+    for block in blocks[1:]:
+        if not block.index.equals(index):
+            index = index.union(block.index)
+    return index
+
+def assemble_frame(keys: List[tuple], 
+                   blocks: List[pd.DataFrame], 
+                   names: List[str]) -> pd.DataFrame:
+    """Return the blocks side by side, the columns of blocks[k] under the key keys[k].
+
+    Same frame as growing a DataFrame with pd.concat([df, block],
+    axis='columns') and blocks[k].columns set to keys[k] + (column,), as the
+    loops it replaces did: every block is labelled with the columns of
+    blocks[0] (by position), names names the levels and the blocks are
+    aligned on the union of their indexes (missing rows are NaN). Blocks of
+    one dtype are copied into one contiguous 2-D array, allocated once;
+    otherwise the frame is a single pd.concat. The blocks are left untouched.
+    """
+    if len(blocks) == 0:
+        return pd.DataFrame()
+    column_names = blocks[0].columns.tolist()
+    width = len(column_names)
+    levels = [np.repeat(np.array([key[level] for key in keys], dtype=object), width)
+              for level in range(len(names) - 1)]
+    levels.append(np.tile(np.array(column_names, dtype=object), len(keys)))
+    columns = pd.MultiIndex.from_arrays(levels, names=names)
+    index = get_combined_index(blocks)
+    blocks = [block if block.index.equals(index) else block.reindex(index) for block in blocks]
+    dtypes = {dtype for block in blocks for dtype in block.dtypes}
+    if len(dtypes) != 1:
+        blocks = [block.set_axis(columns[k * width:(k + 1) * width], axis='columns')
+                  for (k, block) in enumerate(blocks)]
+        return pd.concat(blocks, axis='columns')
+    values = np.empty((len(index), len(columns)), dtype=dtypes.pop())
+    for (k, block) in enumerate(blocks):
+        values[:, k * width:(k + 1) * width] = block.to_numpy()
+    return pd.DataFrame(values, index=index, columns=columns)
+
+def assemble_rows(rows: List[Sequence], columns: List[str]) -> pd.DataFrame:
+    """Return the rows as one frame, built at once instead of by pd.concat of one-row frames."""
+    return pd.DataFrame(rows, columns=columns)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        utils/indicator_cache.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Memoized pandas_ta indicators shared by the triggers, keyed by (symbol, bar range, indicator, parameters).
+
+# Library imports.
+from typing import Dict, Hashable, Optional, Tuple
+from copy import copy
+import pandas as pd
+
+# Class definition.
+class Indicator_cache:
+    """Memoized data.ta indicators, shared by every trigger of a screening pass.
+
+    Entries are keyed by (symbol, bar range, indicator, parameters), the bar
+    range being the first and last dates, the row count and the last bar
+    (which changes while the bar is being formed). A symbol's entries are
+    evicted as soon as it is seen with another bar range, so the cache holds
+    one bar range per symbol and can live across screening passes.
+    """
+    def __init__(self, heikin_ashi: bool = False):
+        """
+        :param heikin_ashi: compute the indicators on Heikin-Ashi bars.
+        """
+        self.heikin_ashi = heikin_ashi
+        self.entries = {}
+        self.ranges = {}
+        self.stats = {}
+        self.evictions = [0] # Shared with the Heikin-Ashi copies.
+
+    def get_heikin_ashi(self) -> 'Indicator_cache':
+        """Return a cache on Heikin-Ashi bars sharing the entries and statistics of this one."""
+        cache = copy(self)
+        cache.heikin_ashi = True
+        return cache
+
+    def get_bar_range(self, data: pd.DataFrame) -> Tuple[Hashable, ...]:
+        if data.shape[0] == 0:
+            return (0,)
+        return (data.index[0], data.index[-1], data.shape[0], 
+                data.iloc[-1].to_numpy(dtype=float).tobytes())
+
+    def count(self, name: str, outcome: str) -> None:
+        stats = self.stats.setdefault(name, {'hits': 0, 'misses': 0})
+        stats[outcome] += 1
+
+    def get(self, 
+            symbol: Hashable, 
+            data: pd.DataFrame, 
+            name: str, 
+            **parameters) -> object:
+        """Return data.ta.<name>(**parameters), computed once per bar range."""
+        bar_range = self.get_bar_range(data)
+        if self.ranges.get(symbol) != bar_range:
+            if symbol in self.entries:
+                self.evictions[0] += 1
+                del self.entries[symbol]
+            self.ranges[symbol] = bar_range
+        entries = self.entries.setdefault(symbol, {})
+        key = (self.heikin_ashi, name, tuple(sorted(parameters.items())))
+        if key in entries:
+            self.count(name, 'hits')
+        else:
+            self.count(name, 'misses')
+            entries[key] = getattr(self.get_bars(symbol, data).ta, name)(**parameters)
+        return entries[key]
+
+    def get_bars(self, symbol: Hashable, data: pd.DataFrame) -> pd.DataFrame:
+        """Return data, or its Heikin-Ashi bars (with the volume of data) if heikin_ashi."""
+        if not self.heikin_ashi:
+            return data
+        entries = self.entries[symbol]
+        key = (True, 'bars', ())
+        if key not in entries:
+            heikin_ashi = data.ta.ha(talib=True)
+            heikin_ashi = heikin_ashi.rename(columns={'HA_open': 'open', 
+                                                      'HA_high': 'high', 
+                                                      'HA_low': 'low', 
+                                                      'HA_close': 'close'})
+            if 'volume' in data:
+                heikin_ashi['volume'] = data['volume']
+            entries[key] = heikin_ashi
+        return entries[key]
+
+    def view(self, symbol: Hashable, data: pd.DataFrame) -> 'Cached_indicators':
+        return Cached_indicators(self, symbol, data)
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Return the hits, misses and hit rate per indicator."""
+        stats = {}
+        for (name, counts) in self.stats.items():
+            lookups = counts['hits'] + counts['misses']
+            stats[name] = dict(counts, hit_rate=counts['hits'] / lookups if lookups > 0 else 0.0)
+        return stats
+
+    def get_hit_rate(self) -> float:
+        hits = sum(counts['hits'] for counts in self.stats.values())
+        misses = sum(counts['misses'] for counts in self.stats.values())
+        return hits / (hits + misses) if hits + misses > 0 else 0.0
+
+    def format_stats(self) -> str:
+        lines = ['{:12s} {:>8s} {:>8s} {:>9s}'.format('indicator', 'hits', 'misses', 'hit rate')]
+        for (name, stats) in sorted(self.get_stats().items()):
+            lines.append('{:12s} {:8d} {:8d} {:8.1f}%'.format(
+                name, stats['hits'], stats['misses'], 100 * stats['hit_rate']))
+        lines.append('{:12s} {:8.1f}% over {} symbols, {} evictions'.format(
+            'total', 100 * self.get_hit_rate(), len(self.entries), self.evictions[0]))
+        return '\n'.join(lines)
+
+class Cached_indicators:
+    """The cached indicators of one symbol, queried like the pandas_ta accessor (data.ta)."""
+    def __init__(self, 
+                 cache: Indicator_cache, 
+                 symbol: Optional[Hashable], 
+                 data: pd.DataFrame):
+        """
+        :param cache: shared cache.
+        :param symbol: symbol of data.
+        :param data: OHLCV bars of the symbol.
+        """
+        self.cache = cache
+        self.symbol = symbol
+        self.data = data
+
+    def get_heikin_ashi(self) -> 'Cached_indicators':
+        return self.cache.get_heikin_ashi().view(self.symbol, self.data)
+
+    def __getattr__(self, name: str):
+        if name.startswith('_') or not hasattr(self.data.ta, name):
+            raise AttributeError(name)
+
+        def get(**parameters):
+            return self.cache.get(self.symbol, self.data, name, **parameters)
+        return get
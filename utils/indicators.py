@@ -8,6 +8,7 @@
 
 # Library imports.
 from .renko import get_renko_trigger
+from .indicator_cache import Indicator_cache
 from sys import float_info as sflt
 from numpy import log
 from pandas_ta.utils._core import signed_series, recent_minimum_index
@@ -15,12 +16,18 @@ import pandas_ta as ta
 import pandas as pd
 
 # Function definitions.
-def filter_in_market(function, dataset):
-    def f(x):
+def filter_in_market(function, dataset, indicators=None):
+    """
+    indicators: optional Streaming_indicators or Indicator_cache, passed to function 
+                as a per-ticker view.
+    """
+    def f(x, ticker):
         x = x.loc[:,~x.columns.duplicated()]
+        if indicators is not None:
+            return function(x, indicators=indicators.view(ticker, x))
         return function(x)
     tickers_list = dataset.columns.get_level_values(0).unique().tolist()
-    return pd.Series([ticker for ticker in tickers_list if f(dataset[ticker])], dtype='str')
+    return pd.Series([ticker for ticker in tickers_list if f(dataset[ticker], ticker)], dtype='str')
 
 def get_relative_volume_levels_smoothed_trigger(data, average1=26, average2=14, threshold=0.1):
     """
@@ -90,20 +97,27 @@ def get_not_square_wave_triggers(data, multiplications=10):
 def get_bullish_price_trigger(data):
     return (data['close'] > data['high'].shift(1)).iat[-1]
 
-def get_positive_RSI_trigger(data):
-    RSI_6 = data.ta.rsi(length=6, talib=True)
-    RSI_12 = data.ta.rsi(length=12, talib=True)
-    RSI_24 = data.ta.rsi(length=24, talib=True)
+def get_positive_RSI_trigger(data, indicators=None):
+    """
+    indicators: optional per-ticker view (Streaming_indicators or Indicator_cache) 
+                read instead of data.ta.
+    """
+    source = data.ta if indicators is None else indicators
+    RSI_6 = source.rsi(length=6, talib=True)
+    RSI_12 = source.rsi(length=12, talib=True)
+    RSI_24 = source.rsi(length=24, talib=True)
     data = ((RSI_6 > RSI_12) | (RSI_6 > RSI_24) | (RSI_12 > RSI_24))
     return data.iat[-1]
 
-def get_positive_momentum_trigger(data):
-    KDJ = data.ta.kdj(length=5, signal=3, talib=True)
+def get_positive_momentum_trigger(data, indicators=None):
+    source = data.ta if indicators is None else indicators
+    KDJ = source.kdj(length=5, signal=3, talib=True)
     return ((KDJ['J_5_3'] > KDJ['D_5_3']) & (KDJ['J_5_3'] > KDJ['K_5_3'])).iat[-1]
 
-def get_positive_JMA_trigger(data):
-    JMA = data.ta.jma(length=7, phase=0, talib=True)
-    return (data['close'] < JMA).iat[-1]
+def get_positive_JMA_trigger(data, indicators=None):
+    source = data.ta if indicators is None else indicators
+    JMA = source.jma(length=7, phase=0, talib=True)
+    return data['close'].iat[-1] < JMA.iat[-1]
 
 def get_ease_of_movement(data):
     eom = ((data['high'] - data['low']) / (2 * data['volume'] + 1))
@@ -167,8 +181,13 @@ def get_rising_volume_trigger(data):
     return (data['rolling_base_volume'].diff(1) > 0).iat[-1]
 
 def get_RSI_reversal_trigger(data, rsi_length=2, upper_threshold=95, 
-                             lower_threshold=5, positive=True):
-    RSI = data.ta.rsi(length=rsi_length, talib=True)
+                             lower_threshold=5, positive=True, indicators=None):
+    if hasattr(indicators, 'rsi_reversal'): # Streaming_indicators.
+        thresholds = indicators.rsi_reversal(length=rsi_length, 
+                                             upper_threshold=upper_threshold, 
+                                             lower_threshold=lower_threshold)
+        return thresholds.iat[-1] == (1 if positive else -1)
+    RSI = (data.ta if indicators is None else indicators).rsi(length=rsi_length, talib=True)
     RSI_prev = RSI.shift(1)
     thresholds_bear_up = (RSI_prev >= upper_threshold)
     thresholds_bull_up = (RSI_prev <= lower_threshold)
@@ -182,36 +201,49 @@ def get_RSI_reversal_trigger(data, rsi_length=2, upper_threshold=95,
     thresholds = thresholds.replace(to_replace=0, method='pad')
     return (thresholds == (1 if positive else -1)).iat[-1]
 
-def get_heikin_ashi_trigger(data):
+def get_heikin_ashi_trigger(data, indicators=None):
+    """
+    indicators: optional view of an Indicator_cache, or of Streaming_indicators(
+                heikin_ashi=True, indicators=HEIKIN_ASHI_INDICATORS). Without one, 
+                a cache local to the call still computes each indicator once.
+    """
+    if indicators is None:
+        indicators = Indicator_cache(heikin_ashi=True).view(None, data)
+    elif hasattr(indicators, 'get_heikin_ashi'): # Indicator_cache.
+        indicators = indicators.get_heikin_ashi()
+
+    def get_ta(data):
+        return indicators
+
     def get_positive_trend_strength_trigger(data):
-        ADX = data.ta.adx(talib=True)
+        ADX = get_ta(data).adx(talib=True)
         return (ADX['ADX_14'] < 0.20).iat[-3] and (ADX['ADX_14'] > 0.20).iat[-2]
     
     def get_negative_trend_strength_trigger(data):
-        ADX = data.ta.adx(talib=True)
+        ADX = get_ta(data).adx(talib=True)
         return (ADX['DMP_14'] > ADX['DMN_14']).iloc[-1]
 
     def get_not_negative_trend_strength_trigger(data):
-        ADX = data.ta.adx(length=14, lensig=8, talib=True)
-        return ((ADX['DMP_14'] > ADX['DMN_14']) and (ADX['ADX_14'] > 0.30)).iat[-1]
+        ADX = get_ta(data).adx(length=14, lensig=8, talib=True)
+        return (ADX['DMP_14'].iat[-1] > ADX['DMN_14'].iat[-1]) and (ADX['ADX_8'].iat[-1] > 0.30)
 
     def get_not_negative_rebound_trigger(data):
-        CCI = data.ta.cci(length=22, talib=True)
-        MFI = data.ta.mfi(length=11, talib=True)
-        return ((CCI > 0) or (MFI > 20)).iat[-1]
+        CCI = get_ta(data).cci(length=22, talib=True)
+        MFI = get_ta(data).mfi(length=11, talib=True)
+        return (CCI.iat[-1] > 0) or (MFI.iat[-1] > 20)
 
     def get_positive_choppiness_trigger(data):
-        CHOP = data.ta.chop(talib=True)
+        CHOP = get_ta(data).chop(talib=True)
         return CHOP.iat[-1] < 38.2
 
     def get_positive_phase_trigger(data):
-        MACD = data.ta.macd(talib=True)
+        MACD = get_ta(data).macd(talib=True)
         histogram = MACD['MACDs_12_26_9'] - MACD['MACD_12_26_9']
         return ((histogram.iat[-1] > histogram.iat[-2]) or \
                 (MACD['MACD_12_26_9'].iat[-1] > MACD['MACDs_12_26_9'].iat[-1]))
 
     def get_positive_RSI_trigger(data):
-        RSI_5 = data.ta.rsi(length=5, talib=True)
+        RSI_5 = get_ta(data).rsi(length=5, talib=True)
         return ((RSI_5 >= 60) & (RSI_5 <= 65)).iat[-1]
 
     def get_negative_PVR_trigger(data):
@@ -230,11 +262,7 @@ def get_heikin_ashi_trigger(data):
                  (not get_positive_phase_trigger(data))) or \
                 get_not_negative_rebound_trigger(data))
 
-    heikin_ashi = data.ta.ha(talib=True)
-    heikin_ashi_dataset_1 = heikin_ashi.rename(columns={'HA_open': 'open', 
-                                                        'HA_high': 'high', 
-                                                        'HA_low': 'low', 
-                                                        'HA_close': 'close'})
+    heikin_ashi_dataset_1 = data # The indicators read the Heikin-Ashi bars of data.
     #heikin_ashi = heikin_ashi_dataset_1.ta.ha(talib=True)
     #heikin_ashi_dataset_2 = heikin_ashi.rename(columns={'HA_open': 'open', 
     #                                                    'HA_high': 'high', 
@@ -251,12 +279,15 @@ def get_heikin_ashi_trigger(data):
         else (get_not_negative_rebound_trigger(heikin_ashi_dataset_1) or \
               get_not_negative_trend_strength_trigger(heikin_ashi_dataset_1))
 
-def screen_one(pair):
+def screen_one(pair, indicators=None):
+    """
+    indicators: optional per-ticker view shared by the triggers (see filter_in_market).
+    """
     if get_not_square_wave_triggers(pair, multiplications=10):
         frequency = (pair.index[1:] - pair.index[:-1]).min()
         frequency = pd.tseries.frequencies.to_offset(frequency)
         frequency_1min = pd.tseries.frequencies.to_offset('1min')
-        #frequency_30min = pd.tseries.frequencies.to_offset('30min')
+        frequency_30min = pd.tseries.frequencies.to_offset('30min')
         #frequency_1h = pd.tseries.frequencies.to_offset('1h')
         frequency_1d = pd.tseries.frequencies.to_offset('1d')
         pair['volume'] = pair['rolling_base_volume'].copy() \
@@ -269,14 +300,14 @@ def screen_one(pair):
                     #if get_bullish_price_trigger(pair):
                     if get_minute_daily_volume_minimum_trigger(pair):
                         if get_minute_daily_volume_change_trigger(pair, threshold=0):
-                            #if get_heikin_ashi_trigger(pair):
+                            #if get_heikin_ashi_trigger(pair, indicators=indicators):
                             return True
-                #if frequency == frequency_30min:
-                #    if get_renko_trigger(pair, compress=False, 
-                #                         direction_type='long', 
-                #                         trigger_type='simple', 
-                #                         method='auto_atr', plot=False):
-                #        return True
+                elif frequency == frequency_30min:
+                    if get_renko_trigger(pair, compress=False, 
+                                         direction_type='long', 
+                                         trigger_type='simple', 
+                                         method='auto_atr', plot=False):
+                        return True
                 #elif frequency == frequency_1h:
                 #    if get_relative_volume_levels_at_time_smoothed_thresholded(pair):
                 #        return True
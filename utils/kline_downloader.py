@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        utils/kline_downloader.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Concurrent historical kline downloads within the Binance request weight, streamed into one OHLCV frame.
+
+# Library imports.
+from typing import Dict, Iterator, List, Optional, Tuple
+from binance.helpers import interval_to_milliseconds
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import Counter
+from datetime import datetime
+from tqdm import tqdm
+from .ohlcv import fix_DST_bug
+import random
+import threading
+import time
+import numpy as np
+import pandas as pd
+import requests
+
+# Variable definitions.
+API_URL = 'https://api.binance.com'
+KLINES_ENDPOINT = '/api/v3/klines'
+KLINES_LIMIT = 1000
+KLINES_WEIGHT = 2
+REQUEST_WEIGHT_LIMIT = 6000 # Per minute and IP.
+USED_WEIGHT_HEADER = 'X-MBX-USED-WEIGHT-1M'
+RETRIED_STATUS_CODES = [418, 429, 500, 502, 503, 504]
+FEATURES = ['open', 'high', 'low', 'close', 'base_volume', 'quote_volume']
+
+# Class definition.
+class Token_bucket:
+    """Thread-safe token bucket of request weight.
+
+    Holds up to capacity tokens refilled at rate tokens per second, acquire
+    blocking until the requested weight is available. pause empties the
+    bucket and stops the refill for a while (Retry-After, or the weight
+    reported by the server running out).
+    """
+    def __init__(self, capacity: float, rate: float):
+        """
+        :param capacity: largest burst of weight.
+        :param rate: weight refilled per second.
+        """
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def refill(self, now: float) -> None:
+        if now > self.last:
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+
+    def acquire(self, weight: float = 1) -> float:
+        """Take weight tokens, waiting for them if needed, and return the time waited."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.refill(now)
+                if now >= self.last and self.tokens >= weight:
+                    self.tokens -= weight
+                    return waited
+                delay = max(self.last - now, 0.0) + max(weight - self.tokens, 0.0) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float) -> None:
+        with self.lock:
+            self.tokens = 0.0
+            self.last = max(self.last, time.monotonic() + seconds)
+
+class Kline_block:
+    """The (time x symbol x feature) klines of the last period intervals, filled as pages arrive."""
+    def __init__(self, 
+                 symbols: List[str], 
+                 interval: str, 
+                 period: int, 
+                 end_time: Optional[int] = None):
+        """
+        :param symbols: symbols of the block.
+        :param interval: kline interval.
+        :param period: intervals up to end_time.
+        :param end_time: end of the block in ms (now when None).
+        """
+        self.symbols = symbols
+        self.interval_ms = interval_to_milliseconds(interval)
+        end_time = int(time.time() * 1000) if end_time is None else end_time
+        self.first_time = -(-(end_time - period * self.interval_ms) // self.interval_ms) * self.interval_ms
+        self.last_time = end_time // self.interval_ms * self.interval_ms # Open time of the current kline.
+        n_rows = max((self.last_time - self.first_time) // self.interval_ms + 1, 0)
+        self.values = np.full((n_rows, len(symbols), len(FEATURES)), np.nan)
+        self.present = np.zeros(n_rows, dtype=bool)
+
+    def write(self, position: int, open_times: np.ndarray, values: np.ndarray) -> None:
+        """Write the klines of symbols[position] falling in the block."""
+        rows = (open_times - self.first_time) // self.interval_ms
+        inside = (rows >= 0) & (rows < self.values.shape[0])
+        self.values[rows[inside], position] = values[inside]
+        self.present[rows[inside]] = True
+
+    def to_frame(self, offset_s: float = 0) -> pd.DataFrame:
+        """Return the block as a (date x (symbol, feature)) frame without the dates lacking any kline."""
+        rows = np.flatnonzero(self.present)
+        dates = pd.DatetimeIndex([datetime.fromtimestamp((self.first_time + row * self.interval_ms) / 1000 + 
+                                                         int(offset_s)) 
+                                  for row in rows], name='date')
+        columns = pd.MultiIndex.from_product([self.symbols, FEATURES], names=['symbol', 'feature'])
+        pairs = pd.DataFrame(self.values[rows].reshape(rows.shape[0], -1), index=dates, columns=columns)
+        return fix_DST_bug(pairs)
+
+class Kline_downloader:
+    """Concurrent /api/v3/klines downloads within the request weight limit.
+
+    Every page of every symbol is a task of a thread pool, each worker thread
+    keeping one keep-alive requests.Session. Requests take their weight from
+    a token bucket holding one window of weight_limit, and the used weight
+    the server reports (for every client of the IP) pauses the bucket until
+    the next window once within the weight the workers may have in flight of
+    the limit, so that the server never rejects a request. Connection
+    errors, timeouts, 418, 429 and 5xx are retried with exponential backoff
+    and full jitter, honouring Retry-After. Pages are written into one
+    (time x symbol x feature) array as they arrive.
+    """
+    def __init__(self, 
+                 api_url: str = API_URL, 
+                 workers: int = 8, 
+                 weight_limit: int = REQUEST_WEIGHT_LIMIT, 
+                 weight_window: float = 60.0, 
+                 retries: int = 5, 
+                 backoff: float = 0.5, 
+                 max_backoff: float = 30.0, 
+                 timeout: float = 10.0, 
+                 progress: bool = True):
+        """
+        :param api_url: base URL of the Binance API (or of a fake kline server).
+        :param workers: concurrent requests.
+        :param weight_limit: request weight allowed per weight window.
+        :param weight_window: length in seconds of the server's weight window.
+        :param retries: retries of a page before giving up.
+        :param backoff: first backoff in seconds, doubled at each retry.
+        :param max_backoff: largest backoff in seconds.
+        :param timeout: timeout of a request in seconds.
+        :param progress: show a tqdm progress bar of the pages.
+        """
+        self.api_url = api_url.rstrip('/')
+        self.workers = workers
+        self.weight_limit = weight_limit
+        self.weight_window = weight_window
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.progress = progress
+        self.bucket = Token_bucket(capacity=weight_limit, rate=weight_limit / weight_window)
+        self.headroom = 2 * workers * KLINES_WEIGHT
+        self.local = threading.local()
+        self.stats = Counter()
+        self.stats_lock = threading.Lock()
+
+    def count(self, name: str, value: float = 1) -> None:
+        with self.stats_lock:
+            self.stats[name] += value
+
+    def get_session(self) -> requests.Session:
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def get_backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def observe(self, response: requests.Response) -> None:
+        """Pause until the next weight window when the server reports the weight nearly used up."""
+        used_weight = response.headers.get(USED_WEIGHT_HEADER)
+        if used_weight is not None and int(used_weight) >= self.weight_limit - self.headroom:
+            self.bucket.pause(self.weight_window - time.time() % self.weight_window)
+        retry_after = response.headers.get('Retry-After')
+        if retry_after is not None:
+            self.bucket.pause(float(retry_after))
+
+    def get_klines(self, params: Dict[str, object]) -> List[list]:
+        """Return one page of klines, retrying transient failures."""
+        for attempt in range(self.retries + 1):
+            self.count('throttled_s', self.bucket.acquire(KLINES_WEIGHT))
+            self.count('requests')
+            try:
+                response = self.get_session().get(self.api_url + KLINES_ENDPOINT, 
+                                                  params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            else:
+                self.observe(response)
+                if response.status_code == 200:
+                    return response.json()
+                if response.status_code not in RETRIED_STATUS_CODES:
+                    response.raise_for_status()
+                error = requests.HTTPError('{} {} for {}'.format(
+                    response.status_code, response.reason, params['symbol']), response=response)
+            if attempt == self.retries:
+                raise error
+            self.count('retries')
+            time.sleep(self.get_backoff(attempt))
+
+    def get_page(self, params: Dict[str, object]) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the open times and the FEATURES (time x feature) of one page of klines."""
+        klines = self.get_klines(params)
+        open_times = np.array([kline[0] for kline in klines], dtype=np.int64)
+        values = np.array([[kline[1], kline[2], kline[3], kline[4], kline[5], kline[7]]
+                           for kline in klines], dtype=float).reshape(-1, len(FEATURES))
+        return (open_times, values)
+
+    def get_pages(self, 
+                  symbols: List[str], 
+                  interval: str, 
+                  start_times: List[int], 
+                  end_time: int) -> List[Tuple[int, Dict[str, object]]]:
+        """Return (symbol position, request parameters) of every page, each page a disjoint time range."""
+        page_length = KLINES_LIMIT * interval_to_milliseconds(interval)
+        return [(position, {'symbol': symbol, 'interval': interval, 'startTime': start_time, 
+                            'endTime': min(start_time + page_length - 1, end_time), 
+                            'limit': KLINES_LIMIT})
+                for (position, (symbol, first_time)) in enumerate(zip(symbols, start_times))
+                for start_time in range(first_time, end_time + 1, page_length)]
+
+    def iterate_pages(self, 
+                      pages: List[Tuple[int, Dict[str, object]]]) \
+            -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+        """Download pages concurrently, yielding (symbol position, open times, values) as they arrive."""
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            futures = {executor.submit(self.get_page, params): position 
+                       for (position, params) in pages}
+            for future in tqdm(as_completed(futures), total=len(futures), 
+                               unit=' page', disable=not self.progress):
+                yield (futures[future],) + future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def download(self, 
+                 symbols: List[str], 
+                 interval: str = '1m', 
+                 period: int = 2880, 
+                 offset_s: float = 0, 
+                 end_time: Optional[int] = None) -> pd.DataFrame:
+        """Return the last period klines of every symbol as a (date x (symbol, feature)) frame.
+
+        Same frame as named_pairs_to_df over download_pair(period=period) for
+        the OHLCV features: dates with no kline for a symbol are NaN and dates
+        without any kline are dropped. end_time (ms) defaults to now.
+        """
+        block = Kline_block(symbols, interval, period, end_time=end_time)
+        pages = self.get_pages(symbols, interval, [block.first_time] * len(symbols), block.last_time)
+        for (position, open_times, values) in self.iterate_pages(pages):
+            block.write(position, open_times, values)
+        return block.to_frame(offset_s=offset_s)
+
+    def get_stats(self) -> Dict[str, float]:
+        with self.stats_lock:
+            return dict(self.stats)
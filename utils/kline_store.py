@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        utils/kline_store.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Persistent per-symbol store of closed klines, so bootstraps only download the gap since the last one.
+
+# Library imports.
+from typing import Dict, List, Optional
+from collections import Counter
+from os import makedirs, replace
+from os.path import exists, join
+from zipfile import BadZipFile
+from .kline_downloader import FEATURES, Kline_block, Kline_downloader
+import numpy as np
+import pandas as pd
+
+# Variable definitions.
+KLINE_STORE_DIRECTORY = 'crypto_logs/klines'
+
+# Class definition.
+class Kline_store:
+    """Closed klines of every symbol, one file per (interval, symbol), in front of a Kline_downloader.
+
+    <directory>/<interval>/<symbol>.npz holds the open times and FEATURES of
+    the symbol's closed klines, with the time range they cover (start time
+    and last close time, so a symbol without klines is covered too). download
+    fetches every symbol from its last close on, or the whole period when the
+    file is missing or starts too late, and saves each symbol as soon as its
+    pages are in, so a crashed bootstrap resumes with the symbols it had left.
+    The current kline is downloaded every time but never stored. Files keep
+    the last max_rows klines.
+    """
+    def __init__(self, 
+                 downloader: Optional[Kline_downloader] = None, 
+                 directory: str = KLINE_STORE_DIRECTORY, 
+                 max_rows: int = 2880):
+        """
+        :param downloader: downloader of the missing klines.
+        :param directory: directory of the per-interval directories of symbol files.
+        :param max_rows: closed klines kept per symbol.
+        """
+        self.downloader = Kline_downloader() if downloader is None else downloader
+        self.directory = directory
+        self.max_rows = max_rows
+        self.stats = Counter()
+
+    def get_path(self, symbol: str, interval: str) -> str:
+        return join(self.directory, interval, symbol + '.npz')
+
+    def read(self, symbol: str, interval: str) -> Optional[Dict[str, np.ndarray]]:
+        """Return the stored open_times, values, start_time and last_close of symbol (None if unreadable)."""
+        path = self.get_path(symbol, interval)
+        if not exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as arrays:
+                stored = {key: arrays[key] for key in ['open_times', 'values', 'start_time', 'last_close']}
+        except (BadZipFile, KeyError, OSError, ValueError):
+            return None
+        stored['start_time'] = int(stored['start_time'])
+        stored['last_close'] = int(stored['last_close'])
+        return stored
+
+    def write(self, symbol: str, interval: str, stored: Dict[str, np.ndarray]) -> None:
+        """Write stored to the file of symbol, replacing it atomically."""
+        path = self.get_path(symbol, interval)
+        makedirs(join(self.directory, interval), exist_ok=True)
+        temporary_path = path + '.tmp'
+        with open(temporary_path, 'wb') as f:
+            np.savez(f, open_times=stored['open_times'], values=stored['values'], 
+                     start_time=np.int64(stored['start_time']), last_close=np.int64(stored['last_close']))
+        replace(temporary_path, path)
+
+    def merge(self, 
+              stored: Optional[Dict[str, np.ndarray]], 
+              pages: List[tuple], 
+              block: Kline_block) -> Dict[str, np.ndarray]:
+        """Return stored extended with the closed klines of pages, up to the current kline of block."""
+        open_times = [page[0] for page in pages]
+        values = [page[1] for page in pages]
+        start_time = block.first_time
+        if stored is not None and stored['start_time'] <= block.first_time:
+            open_times.insert(0, stored['open_times'])
+            values.insert(0, stored['values'])
+            start_time = stored['start_time']
+        open_times = np.concatenate(open_times) if len(open_times) > 0 else np.zeros(0, dtype=np.int64)
+        values = np.concatenate(values) if len(values) > 0 else np.zeros((0, len(FEATURES)))
+        order = np.argsort(open_times, kind='stable')
+        (open_times, values) = (open_times[order], values[order])
+        start_time = max(start_time, block.last_time - self.max_rows * block.interval_ms)
+        kept = (open_times >= start_time) & (open_times < block.last_time)
+        return {'open_times': open_times[kept], 'values': values[kept], 
+                'start_time': start_time, 'last_close': block.last_time - 1}
+
+    def download(self, 
+                 symbols: List[str], 
+                 interval: str = '1m', 
+                 period: int = 2880, 
+                 offset_s: float = 0, 
+                 end_time: Optional[int] = None) -> pd.DataFrame:
+        """Kline_downloader.download, downloading only the klines missing from the store."""
+        block = Kline_block(symbols, interval, period, end_time=end_time)
+        stored = {}
+        start_times = []
+        for (position, symbol) in enumerate(symbols):
+            stored[position] = self.read(symbol, interval)
+            if stored[position] is not None and stored[position]['start_time'] <= block.first_time:
+                block.write(position, stored[position]['open_times'], stored[position]['values'])
+                start_times.append(max(stored[position]['last_close'] + 1, block.first_time))
+                self.stats['resumed'] += 1
+            else:
+                start_times.append(block.first_time)
+                self.stats['downloaded'] += 1
+        pages = self.downloader.get_pages(symbols, interval, start_times, block.last_time)
+        pending = Counter(position for (position, _) in pages)
+        downloaded = {position: [] for position in range(len(symbols))}
+        for position in range(len(symbols)):
+            if pending[position] == 0:
+                self.write(symbols[position], interval, self.merge(stored[position], [], block))
+        for (position, open_times, values) in self.downloader.iterate_pages(pages):
+            block.write(position, open_times, values)
+            downloaded[position].append((open_times, values))
+            self.stats['pages'] += 1
+            pending[position] -= 1
+            if pending[position] == 0:
+                self.write(symbols[position], interval, 
+                           self.merge(stored[position], downloaded.pop(position), block))
+        return block.to_frame(offset_s=offset_s)
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.stats)
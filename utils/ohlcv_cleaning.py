@@ -7,49 +7,72 @@
 # Description: Provides whole market OHLCV data cleaning.
 
 # Library imports.
+from .screener import forward_fill
+import numpy as np
 import pandas as pd
 
 # Function definitions.
+def fill(values: np.ndarray) -> np.ndarray:
+    """fillna(method='pad').fillna(method='backfill') along the time axis."""
+    return forward_fill(forward_fill(values)[::-1])[::-1]
+
+def get_feature_positions(columns: pd.MultiIndex, 
+                          tickers: pd.Index, 
+                          features: list) -> np.ndarray:
+    """Return the (symbol x feature) positions of features in columns, every symbol needing them all."""
+    positions = columns.get_indexer(pd.MultiIndex.from_product([tickers, features]))
+    if (positions < 0).any():
+        missing = np.flatnonzero(positions < 0)[0]
+        raise KeyError((tickers[missing // len(features)], features[missing % len(features)]))
+    return positions.reshape(len(tickers), len(features))
+
 def clean_data(data):
-    def clean_ticker(data, main_ticker, volume_columns=None, 
-                     rolling_volume_columns=None):
-        df = data[main_ticker].copy()
-        data = data.sort_index(axis='columns')
-        data = data.drop(columns=[main_ticker])
-        if volume_columns is not None and len(volume_columns) > 0:
-            df[volume_columns] = df[volume_columns].fillna(value=0.0)
-        if rolling_volume_columns is not None and \
-                len(rolling_volume_columns) > 0:
-            df[rolling_volume_columns] = \
-                df[rolling_volume_columns].fillna(method='pad').fillna(method='backfill')
-
-        s = pd.concat([df['open'], df['close']])
-        s = s.sort_index(kind='merge')
-        s = s.fillna(method='pad')
-        s = s.fillna(method='backfill')
-        df['open'] = s.iloc[0::2]
-        df['close'] = s.iloc[1::2]
-        df.loc[df['high'].isna(),'high'] = \
-            df.loc[df['high'].isna(),['open', 'high', 'low', 'close']].max(axis='columns')
-        df.loc[df['low'].isna(),'low'] = \
-            df.loc[df['low'].isna(),['open', 'high', 'low', 'close']].min(axis='columns')
-
-        column_names = df.columns.tolist()
-        columns = [(main_ticker, column) for column in column_names]
-        df.columns = pd.MultiIndex.from_tuples(columns)
-        df.columns = df.columns.set_names(['symbol', 'feature'])
-        data = pd.concat([data, df], axis='columns')
-        return data
+    """Clean every symbol of an OHLCV frame at once.
+
+    Volumes are 0 where missing, rolling volumes padded then backfilled,
+    opens and closes padded then backfilled as one interleaved series in
+    time order (open, close, next open...) and missing highs and lows
+    repaired from the row's OHLC. Works on a (time x symbol) matrix per
+    feature, with the same output as the former per-ticker loop.
+    """
     data.columns = data.columns.set_names(['symbol', 'feature'])
-    columns = data.columns.tolist()
-    tickers_list = data.columns.get_level_values('symbol').unique().tolist()
+    tickers = data.columns.get_level_values('symbol').unique()
     features_list = data.columns.get_level_values('feature').unique().tolist()
     volume_columns = [feature for feature in features_list if feature.endswith('volume')]
     rolling_volume_columns = [feature for feature in volume_columns if feature.startswith('rolling_')]
     volume_columns = [feature for feature in volume_columns if not feature.startswith('rolling_')]
-    for main_ticker in tickers_list:
-        data = clean_ticker(data, main_ticker, volume_columns=volume_columns, 
-                            rolling_volume_columns=rolling_volume_columns)
-    #data = data.fillna(method='pad').fillna(method='backfill')
-    data = data[columns]
+    features = ['open', 'high', 'low', 'close'] + volume_columns + rolling_volume_columns
+    positions = get_feature_positions(data.columns, tickers, features)
+    matrices = {feature: data.iloc[:, positions[:, i]].to_numpy(dtype=float) 
+                for (i, feature) in enumerate(features)}
+
+    for feature in volume_columns:
+        matrices[feature] = np.where(np.isnan(matrices[feature]), 0.0, matrices[feature])
+    for feature in rolling_volume_columns:
+        matrices[feature] = fill(matrices[feature])
+
+    order = None if data.index.is_monotonic_increasing else np.argsort(data.index, kind='stable')
+    (open, close) = (matrices['open'], matrices['close'])
+    if order is not None:
+        (open, close) = (open[order], close[order])
+    interleaved = fill(np.stack([open, close], axis=1).reshape(-1, len(tickers)))
+    (open, close) = (interleaved[0::2], interleaved[1::2])
+    if order is not None:
+        (matrices['open'], matrices['close']) = (np.empty_like(open), np.empty_like(close))
+        (matrices['open'][order], matrices['close'][order]) = (open, close)
+    else:
+        (matrices['open'], matrices['close']) = (open, close)
+    (open, high, low, close) = [matrices[feature] for feature in ['open', 'high', 'low', 'close']]
+    high = np.where(np.isnan(high), np.fmax(np.fmax(open, low), close), high)
+    low = np.where(np.isnan(low), np.fmin(np.fmin(open, high), close), low)
+    (matrices['high'], matrices['low']) = (high, low)
+
+    if all(dtype == np.float64 for dtype in data.dtypes):
+        values = data.to_numpy(copy=True)
+        for (i, feature) in enumerate(features):
+            values[:, positions[:, i]] = matrices[feature]
+        return pd.DataFrame(values, index=data.index, columns=data.columns)
+    data = data.copy()
+    for (i, feature) in enumerate(features):
+        data.iloc[:, positions[:, i]] = matrices[feature]
     return data
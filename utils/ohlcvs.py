@@ -7,36 +7,37 @@
 # Description: Populate OHLCV DataFrames from the Binance API.
 
 # Library imports.
-from typing import List, Optional
+from typing import List, Optional, Union
 from binance.client import Client
 from .ohlcv import download_pair
+from .kline_downloader import Kline_downloader
+from .kline_store import Kline_store
 from tqdm import tqdm
 from .timezone import get_timezone_offset_in_seconds
 from .ohlcv_cleaning import clean_data
+from .frame_assembly import assemble_frame
 import time
 import pandas as pd
 
 # Function definitions.
 def named_pairs_to_df(assets: List[str], pairs: List[pd.DataFrame]) -> pd.DataFrame:
-    df = pd.DataFrame()
-    column_names = pairs[0].columns.tolist()
-    for (asset, pair) in tqdm(zip(assets, pairs), unit=' named pair'):
-        columns = [(asset, column) for column in column_names]
-        pair.columns = pd.MultiIndex.from_tuples(columns, names=['symbol', 'feature'])
-        df = pd.concat([df, pair], axis='columns')
-    return df
+    return assemble_frame([(asset,) for asset in assets], pairs, names=['symbol', 'feature'])
 
 def download_pairs(client: Client, 
                    assets: List[str], 
                    interval: str = '1m', 
                    period: int = 2880, 
                    second_period: Optional[int] = None, 
-                   offset_s: float = 0) -> pd.DataFrame:
+                   offset_s: float = 0, 
+                   downloader: Optional[Union[Kline_downloader, Kline_store]] = None) -> pd.DataFrame:
     def download_pairs_helper(period=2880, offset_s=0):
-        pairs = [download_pair(client=client, symbol=symbol, interval=interval, 
-                               period=period, offset_s=offset_s) 
-                 for symbol in tqdm(assets, unit=' pair')]
-        pairs = named_pairs_to_df(assets, pairs)
+        if downloader is None:
+            pairs = [download_pair(client=client, symbol=symbol, interval=interval, 
+                                   period=period, offset_s=offset_s) 
+                     for symbol in tqdm(assets, unit=' pair')]
+            pairs = named_pairs_to_df(assets, pairs)
+        else:
+            pairs = downloader.download(assets, interval=interval, period=period, offset_s=offset_s)
         pairs = pairs.sort_index(axis='index')
         pairs.columns = pairs.columns.swaplevel(0, 1)
         pairs = pairs[['open', 'high', 'low', 'close', 'base_volume', 'quote_volume']]
@@ -58,9 +59,11 @@ def download_pairs(client: Client,
     return pairs
 
 def download_pairs_bootstrapped(client: Client, assets: List[str], 
-                                interval: str = '1m', offset_s: float = 0) \
+                                interval: str = '1m', offset_s: float = 0, 
+                                downloader: Optional[Union[Kline_downloader, Kline_store]] = None) \
         -> pd.DataFrame:
     period = 2880 if interval == '1m' else 60
     second_period = 60 if interval == '1m' else None
     return download_pairs(client, assets, interval='1m', period=period, 
-                          second_period=second_period, offset_s=offset_s)
+                          second_period=second_period, offset_s=offset_s, 
+                          downloader=downloader)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        utils/profiling.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Per-stage timing spans of the loggers, exposed as rolling percentiles (Prometheus text or JSON).
+
+# Library imports.
+from typing import Dict, Tuple
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from os import replace
+import json
+import sys
+import time
+import numpy as np
+
+# Variable definitions.
+QUANTILES = [0.5, 0.9, 0.99]
+
+# Class definition.
+class Span_metrics:
+    def __init__(self, window: int = 1000):
+        """
+        :param window: spans kept for the percentiles.
+        """
+        self.durations = deque(maxlen=window)
+        self.blocks = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, duration: float, blocks: int) -> None:
+        self.durations.append(duration)
+        self.blocks.append(blocks)
+        self.count += 1
+        self.total += duration
+
+    def get_summary(self) -> Dict[str, float]:
+        durations = np.array(self.durations) * 1000
+        blocks = np.array(self.blocks)
+        summary = {'count': self.count, 'total_s': self.total}
+        for quantile in QUANTILES:
+            name = 'p{:g}'.format(100 * quantile)
+            summary[name + '_ms'] = np.percentile(durations, 100 * quantile) \
+                if durations.shape[0] > 0 else np.nan
+            summary[name + '_blocks'] = np.percentile(blocks, 100 * quantile) \
+                if blocks.shape[0] > 0 else np.nan
+        summary['max_ms'] = durations.max() if durations.shape[0] > 0 else np.nan
+        return summary
+
+class Profiler:
+    """Timing spans and buffer sizes keyed by (logger, stage).
+
+    A span records its duration and its net allocated blocks
+    (sys.getallocatedblocks, shared by all threads, so concurrent stages
+    blur each other's counts). Percentiles are taken over the last window spans.
+    """
+    def __init__(self, window: int = 1000, enabled: bool = True):
+        """
+        :param window: spans kept per stage for the percentiles.
+        :param enabled: whether spans are recorded.
+        """
+        self.window = window
+        self.enabled = enabled
+        self.spans = {}
+        self.buffer_bytes = {}
+        self.lock = Lock()
+
+    @contextmanager
+    def span(self, logger: str, stage: str):
+        if not self.enabled:
+            yield
+            return
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            blocks = sys.getallocatedblocks() - blocks
+            with self.lock:
+                key = (logger, stage)
+                if key not in self.spans:
+                    self.spans[key] = Span_metrics(window=self.window)
+                self.spans[key].add(duration, blocks)
+
+    def set_buffer_bytes(self, logger: str, nbytes: int) -> None:
+        if self.enabled:
+            self.buffer_bytes[logger] = int(nbytes)
+
+    def get_summaries(self) -> Dict[Tuple[str, str], Dict[str, float]]:
+        with self.lock:
+            return {key: metrics.get_summary() for (key, metrics) in self.spans.items()}
+
+    def to_dict(self) -> Dict[str, object]:
+        spans = {}
+        for ((logger, stage), summary) in self.get_summaries().items():
+            spans.setdefault(logger, {})[stage] = {
+                name: None if np.isnan(value) else float(value) for (name, value) in summary.items()}
+        return {'time': time.time(), 'spans': spans, 'buffer_bytes': dict(self.buffer_bytes)}
+
+    def to_prometheus(self) -> str:
+        """Return the metrics in the Prometheus text exposition format."""
+        lines = ['# HELP crypto_logger_span_seconds Logger stage durations.', 
+                 '# TYPE crypto_logger_span_seconds summary']
+        summaries = self.get_summaries()
+        for ((logger, stage), summary) in summaries.items():
+            labels = 'logger="{}",stage="{}"'.format(logger, stage)
+            for quantile in QUANTILES:
+                value = summary['p{:g}_ms'.format(100 * quantile)] / 1000
+                lines.append('crypto_logger_span_seconds{{{},quantile="{:g}"}} {:.6f}'.format(
+                    labels, quantile, value))
+            lines.append('crypto_logger_span_seconds_sum{{{}}} {:.6f}'.format(labels, summary['total_s']))
+            lines.append('crypto_logger_span_seconds_count{{{}}} {}'.format(labels, summary['count']))
+        lines += ['# HELP crypto_logger_span_allocated_blocks Net allocated blocks per stage.', 
+                  '# TYPE crypto_logger_span_allocated_blocks gauge']
+        for ((logger, stage), summary) in summaries.items():
+            for quantile in QUANTILES:
+                lines.append('crypto_logger_span_allocated_blocks{{logger="{}",stage="{}",quantile="{:g}"}} {:g}'.format(
+                    logger, stage, quantile, summary['p{:g}_blocks'.format(100 * quantile)]))
+        lines += ['# HELP crypto_logger_buffer_bytes Logger buffer size.', 
+                  '# TYPE crypto_logger_buffer_bytes gauge']
+        for (logger, nbytes) in self.buffer_bytes.items():
+            lines.append('crypto_logger_buffer_bytes{{logger="{}"}} {}'.format(logger, nbytes))
+        return '\n'.join(lines) + '\n'
+
+    def write_json(self, path: str) -> None:
+        """Write the metrics to path atomically (readers never see a partial file)."""
+        with open(path + '.tmp', 'w') as f:
+            json.dump(self.to_dict(), f, indent=1)
+        replace(path + '.tmp', path)
+
+    def format_summary(self) -> str:
+        lines = ['{:24s} {:24s} {:>7s} {:>8s} {:>8s} {:>8s} {:>9s}'.format(
+            'logger', 'stage', 'count', 'p50 ms', 'p90 ms', 'p99 ms', 'p50 blk')]
+        for ((logger, stage), summary) in self.get_summaries().items():
+            lines.append('{:24s} {:24s} {:7d} {:8.1f} {:8.1f} {:8.1f} {:9.0f}'.format(
+                logger, stage, summary['count'], summary['p50_ms'], summary['p90_ms'], 
+                summary['p99_ms'], summary['p50_blocks']))
+        for (logger, nbytes) in self.buffer_bytes.items():
+            lines.append('{:24s} {:24s} {:.1f} MB'.format(logger, 'buffer', nbytes / 2 ** 20))
+        return '\n'.join(lines)
+
+class Metrics_server:
+    """Serve the metrics of a profiler as Prometheus text on /metrics (and JSON on /metrics.json)."""
+    def __init__(self, 
+                 profiler: Profiler, 
+                 host: str = '127.0.0.1', 
+                 port: int = 9105):
+        """
+        :param profiler: profiler to expose.
+        :param host: address to listen on.
+        :param port: port to listen on (0 picks a free one).
+        """
+        self.profiler = profiler
+        self.host = host
+        self.port = port
+        self.server = None
+        self.thread = None
+
+    def start(self) -> str:
+        """Start serving from a background thread and return the URL."""
+        profiler = self.profiler
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    (body, content_type) = (profiler.to_prometheus(), 'text/plain; version=0.0.4')
+                elif self.path == '/metrics.json':
+                    (body, content_type) = (json.dumps(profiler.to_dict()), 'application/json')
+                else:
+                    self.send_error(404)
+                    return
+                body = body.encode()
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self.server.server_address[1]
+        self.thread = Thread(target=self.server.serve_forever, name='metrics_server', daemon=True)
+        self.thread.start()
+        return 'http://{}:{}/metrics'.format(self.host, self.port)
+
+    def stop(self) -> None:
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.thread.join()
+            self.server = None
+
+# Shared by the loggers.
+PROFILER = Profiler()
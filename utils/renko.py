@@ -7,6 +7,8 @@
 # Description: This file handles the Renko technical indicator and trigger.
 
 # Library imports.
+from .renko_bricks import build_renko, get_atr, get_auto_brick_sizes, get_brick_lists
+from .renko_bricks import get_renko_scores, score_brick_sizes
 from scipy.stats import iqr
 import math
 import numpy as np
@@ -14,7 +16,6 @@ import pandas as pd
 import scipy.optimize as opt
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
-import talib
 
 # Class definition.
 class Renko:
@@ -64,20 +65,14 @@ class Renko:
 
         return num_new_bars
 
-    # Getting renko on history
+    # Getting renko on history (in one array pass, see renko_bricks.build_renko)
     def build_history(self, prices):
         if len(prices) > 0:
-            # Init by start values
             self.source_prices = prices
-            self.timed_renko_prices = []
-            self.timed_renko_prices.append(prices.iloc[0])
-            self.renko_prices.append(prices.iloc[0])
-            self.renko_directions.append(0)
-
-            # For each price in history
-            for p in self.source_prices[1:]:
-                self.__renko_rule(p)
-                self.timed_renko_prices.append(self.renko_prices[-1].copy())
+            (renko_prices, renko_directions, self.timed_renko_prices) = \
+                get_brick_lists(np.double(prices), self.brick_size)
+            self.renko_prices += renko_prices
+            self.renko_directions += renko_directions
 
         return len(self.renko_prices)
 
@@ -98,10 +93,10 @@ class Renko:
 
         # If we have enough of data
         if HLC_history.shape[0] > atr_timeperiod:
-            brick_size = np.median(talib.ATR(high=np.double(HLC_history.iloc[:,0]), 
-                                             low=np.double(HLC_history.iloc[:,1]), 
-                                             close=np.double(HLC_history.iloc[:,2]), 
-                                             timeperiod=atr_timeperiod)[atr_timeperiod:])
+            brick_size = get_auto_brick_sizes(high=np.double(HLC_history.iloc[:,0]), 
+                                              low=np.double(HLC_history.iloc[:,1]), 
+                                              close=np.double(HLC_history.iloc[:,2]), 
+                                              atr_timeperiod=atr_timeperiod)
 
         return brick_size
 
@@ -110,12 +105,9 @@ class Renko:
         price_ratio = len(self.source_prices) / len(self.renko_prices)
 
         if method == 'simple':
-            for i in range(2, len(self.renko_directions)):
-                if self.renko_directions[i] == self.renko_directions[i - 1]:
-                    balance += 1
-                else:
-                    balance -= 2
-                    sign_changes = sign_changes + 1
+            directions = np.array(self.renko_directions)
+            sign_changes = int((directions[2:] != directions[1:-1]).sum())
+            balance = max(len(directions) - 2, 0) - 3 * sign_changes
 
             if sign_changes == 0:
                 sign_changes = 1
@@ -167,15 +159,14 @@ class Renko:
         plt.show()
 
 # Function definitions.
-def get_renko_trigger(data, compress=False, direction_type='long', trigger_type='simple', method='brent', plot=False, return_raw=False):
+def get_renko_trigger(data, compress=False, direction_type='long', trigger_type='simple', method='brent', plot=False, return_raw=False, grid_size=64):
+    # method: 'brent' (fminbound over the score), 'grid' (grid_size brick sizes
+    # scored in one pass), 'atr' or 'auto_atr'.
     def identity(x):
         return x
 
     def evaluate_renko(brick, history, column_name):
-        renko_obj = Renko()
-        renko_obj.set_brick_size(brick_size=brick, auto=False)
-        renko_obj.build_history(prices = history)
-        return renko_obj.evaluate()[column_name]
+        return get_renko_scores(build_renko(np.double(history), brick))[0]
 
     data.reset_index(drop=True)
     if compress:
@@ -201,10 +192,10 @@ def get_renko_trigger(data, compress=False, direction_type='long', trigger_type=
     if method == 'brent':
         # Get ATR values (it needs to get boundaries)
         # Drop NaNs
-        atr = talib.ATR(high=np.double(data.high),
-                        low=np.double(data.low),
-                        close=np.double(data.close),
-                        timeperiod=25)
+        atr = get_atr(high=np.double(data.high), 
+                      low=np.double(data.low), 
+                      close=np.double(data.close), 
+                      timeperiod=25)
         atr = atr[np.isnan(atr) == False]
         if atr.shape[0] == 0:
             return False
@@ -215,13 +206,26 @@ def get_renko_trigger(data, compress=False, direction_type='long', trigger_type=
                                                                     history=data.close, column_name='score'), 
                                           np.min(atr), np.max(atr), disp=0)
 
+    elif method == 'grid':
+        atr = get_atr(high=np.double(data.high), 
+                      low=np.double(data.low), 
+                      close=np.double(data.close), 
+                      timeperiod=25)
+        atr = atr[np.isnan(atr) == False]
+        if atr.shape[0] == 0:
+            return False
+
+        # Score grid_size brick sizes between the ATR boundaries at once
+        brick_sizes = np.linspace(np.min(atr), np.max(atr), grid_size)
+        optimal_brick_sfo = brick_sizes[np.argmax(score_brick_sizes(data.close, brick_sizes))]
+
     elif method == 'atr':
         # Get ATR values (it needs to get boundaries)
         # Drop NaNs
-        atr = talib.ATR(high=np.double(data.high),
-                        low=np.double(data.low),
-                        close=np.double(data.close),
-                        timeperiod=25)
+        atr = get_atr(high=np.double(data.high), 
+                      low=np.double(data.low), 
+                      close=np.double(data.close), 
+                      timeperiod=25)
         atr = atr[np.isnan(atr) == False]
         if atr.shape[0] == 0:
             return False
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        utils/renko_bricks.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Array-based Renko bricks: one pass over the prices for many columns (symbols or brick sizes) at once.
+
+# Library imports.
+from typing import Dict, List, Tuple
+import numpy as np
+try:
+    from numba import njit
+except ImportError: # Optional: without it, many columns take the vectorized path.
+    njit = None
+
+# Variable definitions.
+COMPILED = njit is not None
+VECTORIZED_MIN_COLUMNS = 128 # Below this, the per-column loop beats stepping numpy over time.
+
+# Function definitions.
+def get_atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, timeperiod: int = 14) -> np.ndarray:
+    """talib.ATR of every column: the mean of the first timeperiod true ranges, then Wilder's smoothing."""
+    (high, low, close) = [np.asarray(values, dtype=float) for values in (high, low, close)]
+    true_range = np.full(high.shape, np.nan)
+    true_range[1:] = np.maximum(np.maximum(high[1:] - low[1:], np.abs(high[1:] - close[:-1])), 
+                                np.abs(low[1:] - close[:-1]))
+    atr = np.full(high.shape, np.nan)
+    if high.shape[0] <= timeperiod:
+        return atr
+    atr[timeperiod] = true_range[1:timeperiod + 1].mean(axis=0)
+    for i in range(timeperiod + 1, high.shape[0]):
+        atr[i] = (atr[i - 1] * (timeperiod - 1) + true_range[i]) / timeperiod
+    return atr
+
+def get_auto_brick_sizes(high: np.ndarray, 
+                         low: np.ndarray, 
+                         close: np.ndarray, 
+                         atr_timeperiod: int = 9) -> np.ndarray:
+    """Renko.set_brick_size(auto=True) of every column: the median ATR, 0 without enough history."""
+    if high.shape[0] <= atr_timeperiod:
+        return np.zeros(high.shape[1:])
+    return np.median(get_atr(high, low, close, timeperiod=atr_timeperiod)[atr_timeperiod:], axis=0)
+
+def build_renko_column(prices: np.ndarray, 
+                       brick_size: float, 
+                       counts: np.ndarray, 
+                       directions: np.ndarray, 
+                       reversals: np.ndarray, 
+                       renko_prices: np.ndarray) -> Tuple[int, int, int, int, int]:
+    """Renko.build_history of one price series, filling the per-price outputs.
+
+    Returns the brick count, the last two brick directions, the balance and
+    the sign changes. Compiled with numba when it is installed.
+    """
+    renko_price = prices[0]
+    (direction, previous_direction, n_bricks, balance, sign_changes) = (0, 0, 1, 0, 0)
+    renko_prices[0] = renko_price
+    counts[0] = 1
+    valid = brick_size > 0
+    for i in range(1, prices.shape[0]):
+        gap = (prices[i] - renko_price) / brick_size if valid else 0.0
+        if gap >= 1 or gap <= -1:
+            gap = int(gap)
+            sign = 1 if gap > 0 else -1
+            count = 0
+            reverse = False
+            if sign * direction >= 0:
+                count = abs(gap)
+            elif abs(gap) >= 2:
+                (count, reverse) = (abs(gap) - 1, True)
+            if count > 0:
+                remaining = count
+                if reverse:
+                    renko_price = renko_price + 2 * brick_size * sign
+                    remaining -= 1
+                for _ in range(remaining):
+                    renko_price = renko_price + brick_size * sign
+                if n_bricks >= 2:
+                    if sign == direction:
+                        balance += 1
+                    else:
+                        balance -= 2
+                        sign_changes += 1
+                balance += count - 1
+                previous_direction = sign if count >= 2 else direction
+                direction = sign
+                n_bricks += count
+                counts[i] = count
+                directions[i] = sign
+                reversals[i] = reverse
+        renko_prices[i] = renko_price
+    return (n_bricks, direction, previous_direction, balance, sign_changes)
+
+if COMPILED:
+    build_renko_column = njit(cache=True)(build_renko_column)
+
+def build_renko(prices: np.ndarray, brick_sizes: np.ndarray, keep_steps: bool = False) -> Dict[str, np.ndarray]:
+    """Renko.build_history of every column of prices (time x columns), column k using brick_sizes[k].
+
+    Bricks are added one at a time as Renko does, so the brick prices (and
+    hence the gaps) are bit for bit the same. Returns the brick count, the
+    last two brick directions and the balance and sign changes of
+    Renko.evaluate; keep_steps adds the per-price last brick price, bricks
+    added, direction and reversal (what get_brick_lists expands). A zero or
+    NaN brick size (or price) adds no brick.
+
+    Columns go through build_renko_column when it is compiled or when they
+    are few, else numpy steps over time with all the columns at once.
+    """
+    prices = np.asarray(prices, dtype=float)
+    prices = prices[:, None] if prices.ndim == 1 else prices
+    brick_sizes = np.broadcast_to(np.asarray(brick_sizes, dtype=float), prices.shape[1:])
+    if prices.shape[0] > 0 and (COMPILED or prices.shape[1] < VECTORIZED_MIN_COLUMNS):
+        return build_renko_columns(prices, brick_sizes, keep_steps=keep_steps)
+    return build_renko_vectorized(prices, brick_sizes, keep_steps=keep_steps)
+
+def build_renko_columns(prices: np.ndarray, 
+                        brick_sizes: np.ndarray, 
+                        keep_steps: bool = False) -> Dict[str, np.ndarray]:
+    """build_renko with build_renko_column for each column."""
+    steps = {'renko_prices': np.empty(prices.shape), 
+             'counts': np.zeros(prices.shape, dtype=int), 
+             'directions': np.zeros(prices.shape, dtype=int), 
+             'reversals': np.zeros(prices.shape, dtype=bool)}
+    summaries = [build_renko_column(prices[:, column], brick_sizes[column], 
+                                    steps['counts'][:, column], steps['directions'][:, column], 
+                                    steps['reversals'][:, column], steps['renko_prices'][:, column]) 
+                 for column in range(prices.shape[1])]
+    summaries = np.array(summaries, dtype=int).reshape(-1, 5)
+    bricks = {name: summaries[:, i] for (i, name) in enumerate(
+        ['n_bricks', 'direction', 'previous_direction', 'balance', 'sign_changes'])}
+    bricks['n_prices'] = prices.shape[0]
+    if keep_steps:
+        bricks.update(steps)
+    return bricks
+
+def build_renko_vectorized(prices: np.ndarray, 
+                           brick_sizes: np.ndarray, 
+                           keep_steps: bool = False) -> Dict[str, np.ndarray]:
+    """build_renko with numpy stepping over time, all the columns at once."""
+    n_columns = prices.shape[1]
+    renko_price = prices[0].copy() if prices.shape[0] > 0 else np.full(n_columns, np.nan)
+    direction = np.zeros(n_columns, dtype=int)
+    previous_direction = np.zeros(n_columns, dtype=int)
+    n_bricks = np.ones(n_columns, dtype=int)
+    balance = np.zeros(n_columns, dtype=int)
+    sign_changes = np.zeros(n_columns, dtype=int)
+    if keep_steps:
+        steps = {'renko_prices': np.empty(prices.shape), 
+                 'counts': np.zeros(prices.shape, dtype=int), 
+                 'directions': np.zeros(prices.shape, dtype=int), 
+                 'reversals': np.zeros(prices.shape, dtype=bool)}
+        steps['renko_prices'][:1] = renko_price
+        steps['counts'][:1] = 1
+    divisors = np.where(brick_sizes > 0, brick_sizes, np.inf) # No brick (the gaps are 0).
+    doubled_sizes = 2 * brick_sizes
+    gap = np.empty(n_columns)
+    for i in range(1, prices.shape[0]):
+        np.subtract(prices[i], renko_price, out=gap)
+        np.divide(gap, divisors, out=gap)
+        np.trunc(gap, out=gap)
+        moved = np.abs(gap) >= 1
+        if moved.any():
+            gap[~moved] = 0 # NaN prices too.
+            sign = np.sign(gap).astype(int)
+            forward = moved & (sign * direction >= 0)
+            reverse = ~forward & (np.abs(gap) >= 2)
+            count = np.where(forward, np.abs(gap), np.where(reverse, np.abs(gap) - 1, 0)).astype(int)
+            added = count > 0
+            renko_price = np.where(reverse, renko_price + doubled_sizes * sign, renko_price)
+            remaining = count - reverse
+            increment = brick_sizes * sign
+            while (remaining > 0).any():
+                renko_price = np.where(remaining > 0, renko_price + increment, renko_price)
+                remaining -= 1
+            counted = added & (n_bricks >= 2)
+            changed = counted & (sign != direction)
+            balance += counted & ~changed
+            balance += np.where(added, count - 1, 0) - 2 * changed
+            sign_changes += changed
+            previous_direction = np.where(added, np.where(count >= 2, sign, direction), previous_direction)
+            direction = np.where(added, sign, direction)
+            n_bricks += count
+            if keep_steps:
+                steps['counts'][i] = count
+                steps['directions'][i] = np.where(added, sign, 0)
+                steps['reversals'][i] = reverse
+        if keep_steps:
+            steps['renko_prices'][i] = renko_price
+    bricks = {'n_bricks': n_bricks, 'direction': direction, 'previous_direction': previous_direction, 
+              'balance': balance, 'sign_changes': sign_changes, 'n_prices': prices.shape[0]}
+    if keep_steps:
+        bricks.update(steps)
+    return bricks
+
+def get_brick_lists(prices: np.ndarray, brick_size: float) -> Tuple[List[float], List[int], List[float]]:
+    """Return the brick prices, brick directions and per-price last brick price of one price series."""
+    bricks = build_renko(prices, np.array([brick_size]), keep_steps=True)
+    steps = np.flatnonzero(bricks['counts'][1:, 0] > 0) + 1
+    counts = bricks['counts'][steps, 0]
+    increments = brick_size * bricks['directions'][steps, 0]
+    first = np.cumsum(counts) - counts
+    brick_prices = np.empty(counts.sum())
+    brick_prices[first] = bricks['renko_prices'][steps - 1, 0] + \
+        np.where(bricks['reversals'][steps, 0], 2 * increments, increments)
+    for brick in range(1, counts.max(initial=1)):
+        inside = counts > brick
+        brick_prices[(first + brick)[inside]] = \
+            brick_prices[(first + brick - 1)[inside]] + increments[inside]
+    renko_prices = [bricks['renko_prices'][0, 0]] + brick_prices.tolist()
+    renko_directions = [0] + np.repeat(bricks['directions'][steps, 0], counts).tolist()
+    return renko_prices, renko_directions, bricks['renko_prices'][:, 0].tolist()
+
+def get_renko_scores(bricks: Dict[str, np.ndarray]) -> np.ndarray:
+    """Renko.evaluate(method='simple')['score'] of every column."""
+    sign_changes = np.maximum(bricks['sign_changes'], 1)
+    score = bricks['balance'] / sign_changes
+    price_ratio = bricks['n_prices'] / bricks['n_bricks']
+    valid = (score >= 0) & (price_ratio >= 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(valid, np.log(np.where(valid, score, 0) + 1) * np.log(price_ratio), -1.0)
+
+def score_brick_sizes(prices: np.ndarray, brick_sizes: np.ndarray) -> np.ndarray:
+    """Score every candidate brick size of one price series in a single pass."""
+    prices = np.asarray(prices, dtype=float)
+    brick_sizes = np.asarray(brick_sizes, dtype=float)
+    bricks = build_renko(np.broadcast_to(prices[:, None], (prices.shape[0], brick_sizes.shape[0])), brick_sizes)
+    return get_renko_scores(bricks)
+
+def get_renko_trigger_mask(bricks: Dict[str, np.ndarray], 
+                           direction_type: str = 'long', 
+                           trigger_type: str = 'simple') -> np.ndarray:
+    """get_renko_trigger's decision for every column, from its last two brick directions."""
+    (last, previous) = (bricks['direction'], bricks['previous_direction'])
+    (sign, opposite) = (1, -1) if direction_type == 'long' else (-1, 1)
+    if trigger_type == 'exit':
+        return (last == opposite) & (previous == sign)
+    trigger = last == sign
+    if trigger_type == 'entry':
+        trigger &= previous == opposite
+    return trigger
@@ -7,8 +7,10 @@
 # Description: Provides whole market downsampling.
 
 # Library imports.
+from typing import List
 from .volume_conversion import recalculate_volumes
 #from .ohlcv_cleaning import clean_data
+import numpy as np
 import pandas as pd
 
 # Function definitions.
@@ -39,3 +41,230 @@ def resample(df: pd.DataFrame, interval: str = '1min') -> pd.DataFrame:
     if interval == '1min':
         df = recalculate_volumes(df)
     return df
+
+# Class definition.
+class Incremental_resampler:
+    """resample() one parent bar at a time.
+
+    Only the parent bars of the two newest buckets are kept, so an update 
+    costs O(parent bars x symbols) whatever the buffer size. The bars are 
+    kept in one float64 (rows x (symbol, feature)) array which slides back 
+    once every slack rows, so to_frame is a view and memory stays flat.
+    """
+    features = ['base_volume', 'close', 'high', 'low', 'open', 'quote_volume', 
+                'rolling_base_volume', 'rolling_quote_volume']
+
+    def __init__(self, interval: str = '1min', buffer_size: int = 60):
+        """
+        :param interval: OHLCV interval of the buckets.
+        :param buffer_size: number of bars returned by to_frame.
+        """
+        self.interval = interval
+        self.buffer_size = buffer_size
+        self.recalculate = interval == '1min'
+        self.history = max(buffer_size, 1442) if self.recalculate else max(buffer_size, 2)
+        self.slack = max(self.history // 4, 2)
+        frequency_interval = pd.tseries.frequencies.to_offset(interval)
+        self.sum_volumes = frequency_interval >= pd.tseries.frequencies.to_offset('1min')
+        self.sum_rolling_volumes = frequency_interval >= pd.tseries.frequencies.to_offset('1d')
+        self.n_features = len(self.features)
+        self.symbols = pd.Index([], dtype=object)
+        self.names = ['symbol', 'feature']
+        self.columns = pd.MultiIndex.from_product([self.symbols, self.features], names=self.names)
+        self.values = np.full((self.history + self.slack, 0), np.nan)
+        self.dates = np.zeros(self.history + self.slack, dtype=np.int64)
+        self.first_rows = np.full(0, -1, dtype=np.int64)
+        self.volumes = np.zeros(0, dtype=bool)
+        self.n_rows = 0
+        self.first_row = 0
+        self.parents = {}
+        self.raw_volumes = {}
+        self.parent_columns = None
+        self.parent_indexer = np.zeros(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return min(self.n_rows, self.buffer_size)
+
+    def get_nbytes(self) -> int:
+        """Return the memory held by the bar arrays."""
+        return self.values.nbytes + self.dates.nbytes + self.first_rows.nbytes
+
+    def get_feature_columns(self, feature: str) -> np.ndarray:
+        return np.arange(self.features.index(feature), len(self.columns), self.n_features)
+
+    def insert_symbols(self, symbols: List[str]) -> None:
+        """Insert new symbols in the sorted columns (volumes 0 and other features NaN)."""
+        symbols = self.symbols.append(pd.Index(symbols, dtype=object)).sort_values()
+        columns = pd.MultiIndex.from_product([symbols, self.features], names=self.names)
+        indexer = columns.get_indexer(self.columns)
+        values = np.full((self.values.shape[0], len(columns)), np.nan)
+        values[:, indexer] = self.values
+        first_rows = np.full(len(columns), -1, dtype=np.int64)
+        first_rows[indexer] = self.first_rows
+        (self.symbols, self.columns) = (symbols, columns)
+        (self.values, self.first_rows) = (values, first_rows)
+        self.volumes = np.zeros(len(columns), dtype=bool)
+        for feature in ['base_volume', 'quote_volume']:
+            self.volumes[self.get_feature_columns(feature)] = True
+        new = np.ones(len(columns), dtype=bool)
+        new[indexer] = False
+        self.values[:, new & self.volumes] = 0.0
+        for parents in self.parents.values():
+            for (date, parent) in parents.items():
+                parents[date] = np.full(len(columns), np.nan)
+                parents[date][indexer] = parent
+
+    def get_parent_rows(self, dataset: pd.DataFrame) -> np.ndarray:
+        """Return the dataset rows in the column order of the buffer."""
+        values = dataset.to_numpy(dtype=np.float64)
+        if self.parent_columns is None or not dataset.columns.equals(self.parent_columns):
+            if dataset.columns.names[0] is not None:
+                self.names = list(dataset.columns.names)
+            self.parent_columns = dataset.columns
+            self.parent_indexer = self.columns.get_indexer(dataset.columns)
+        found = self.parent_indexer >= 0
+        if not found.all():
+            new = ~found & ~np.isnan(values).all(axis=0)
+            symbols = dataset.columns.get_level_values(0)[new].unique()
+            symbols = symbols[~symbols.isin(self.symbols)]
+            if len(symbols) > 0:
+                self.insert_symbols(symbols.tolist())
+                self.parent_indexer = self.columns.get_indexer(dataset.columns)
+                found = self.parent_indexer >= 0
+        rows = np.full((dataset.shape[0], len(self.columns)), np.nan)
+        rows[:, self.parent_indexer[found]] = values[:, found]
+        return rows
+
+    def get_row(self, row: int) -> np.ndarray:
+        return self.values[row - self.first_row]
+
+    def append_row(self, bucket: int) -> None:
+        """Append an empty bar, sliding the last history - 1 bars back when full."""
+        if self.n_rows - self.first_row == self.values.shape[0]:
+            kept = self.history - 1
+            start = self.n_rows - kept - self.first_row
+            self.values[:kept] = self.values[start:start + kept]
+            self.dates[:kept] = self.dates[start:start + kept]
+            self.first_row = self.n_rows - kept
+        self.dates[self.n_rows - self.first_row] = bucket
+        self.parents[self.n_rows] = {}
+        self.n_rows += 1
+
+    def aggregate(self, parents: np.ndarray) -> np.ndarray:
+        """pivot_table's first/max/min/last/sum over the parent bars of one bucket."""
+        (n_parents, n_columns) = parents.shape
+        parents = parents.reshape(n_parents, -1, self.n_features)
+        valid = ~np.isnan(parents)
+        present = valid.any(axis=2).any(axis=0)
+        first = np.take_along_axis(parents, valid.argmax(axis=0)[np.newaxis], axis=0)[0]
+        last = np.take_along_axis(
+            parents, (n_parents - 1 - valid[::-1].argmax(axis=0))[np.newaxis], axis=0)[0]
+        total = np.where(present[:, np.newaxis], np.nansum(parents, axis=0), np.nan)
+        bar = np.empty(parents.shape[1:])
+        for (f, feature) in enumerate(self.features):
+            if feature == 'open':
+                bar[:, f] = first[:, f]
+            elif feature == 'high':
+                bar[:, f] = np.fmax.reduce(parents[:, :, f], axis=0)
+            elif feature == 'low':
+                bar[:, f] = np.fmin.reduce(parents[:, :, f], axis=0)
+            elif feature == 'close':
+                bar[:, f] = last[:, f]
+            elif feature in ['base_volume', 'quote_volume']:
+                bar[:, f] = total[:, f] if self.sum_volumes else last[:, f]
+            else:
+                bar[:, f] = total[:, f] if self.sum_rolling_volumes else last[:, f]
+        return bar.reshape(n_columns)
+
+    def fill(self, row: int, bar: np.ndarray) -> np.ndarray:
+        """fillna(0) the volumes then pad, but never from backfilled bars."""
+        bar[self.volumes & np.isnan(bar)] = 0.0
+        missing = np.isnan(bar)
+        if row > 0 and missing.any():
+            pad = missing & (self.first_rows >= 0) & (self.first_rows < row)
+            bar[pad] = self.get_row(row - 1)[pad]
+        found = (self.first_rows < 0) | (self.first_rows > row)
+        found &= ~np.isnan(bar) & ~self.volumes
+        self.first_rows[found] = row
+        return bar
+
+    def backfill(self, start: int) -> None:
+        """Backfill the columns whose first bar is at or after row start."""
+        for column in np.flatnonzero(self.first_rows >= start):
+            first_row = self.first_rows[column]
+            self.values[:first_row - self.first_row, column] = self.get_row(first_row)[column]
+
+    def recalculate_volumes(self) -> None:
+        """recalculate_volumes on the last two bars, keeping the summed volumes aside."""
+        for feature in ['base_volume', 'quote_volume']:
+            columns = self.get_feature_columns(feature)
+            rolling_columns = self.get_feature_columns('rolling_' + feature)
+            for row in range(max(self.n_rows - 2, 0), self.n_rows):
+                values = np.full(len(columns), np.nan)
+                if row - 1440 >= self.first_row:
+                    values = self.get_row(row)[rolling_columns] - \
+                        self.get_row(row - 1)[rolling_columns] + \
+                        self.get_row(row - 1440)[columns]
+                self.raw_volumes[(row, feature)] = self.get_row(row)[columns].copy()
+                self.get_row(row)[columns] = values
+
+    def restore_volumes(self) -> int:
+        """Put back the summed volumes of the last recalculated bars, return the first one."""
+        start = self.n_rows
+        for ((row, feature), values) in self.raw_volumes.items():
+            if row >= self.first_row:
+                self.get_row(row)[self.get_feature_columns(feature)] = values
+                start = min(start, row)
+        self.raw_volumes = {}
+        return start
+
+    def fold(self, dates: np.ndarray, buckets: np.ndarray, rows: np.ndarray) -> int:
+        """Put parent bars in their bucket and recompute the changed bars."""
+        start = self.n_rows
+        for (date, bucket, parent) in zip(dates, buckets, rows):
+            if self.n_rows == 0 or bucket > self.dates[self.n_rows - 1 - self.first_row]:
+                self.append_row(bucket)
+            for row in range(self.n_rows - 1, max(self.n_rows - 3, -1), -1):
+                if bucket == self.dates[row - self.first_row]:
+                    self.parents[row][date] = parent
+                    start = min(start, row)
+                    break
+        for row in range(start, self.n_rows):
+            parents = self.parents[row]
+            parents = np.stack([parents[date] for date in sorted(parents)])
+            self.values[row - self.first_row] = self.fill(row, self.aggregate(parents))
+        self.backfill(start)
+        self.parents = {row: parents for (row, parents) in self.parents.items() 
+                        if row >= self.n_rows - 2}
+        return start
+
+    def update(self, dataset: pd.DataFrame) -> pd.DataFrame:
+        """Fold new or updated parent bars and return the bars that changed.
+
+        Parent bars older than the two newest buckets are ignored.
+        """
+        start = self.n_rows
+        if dataset is not None and dataset.shape[0] > 0:
+            start = self.restore_volumes()
+            rows = self.get_parent_rows(dataset)
+            dates = pd.DatetimeIndex(dataset.index)
+            buckets = dates.round(self.interval).asi8
+            dates = dates.asi8
+            for chunk in range(0, rows.shape[0], self.slack):
+                chunk = slice(chunk, chunk + self.slack)
+                start = min(start, self.fold(dates[chunk], buckets[chunk], rows[chunk]))
+            if self.recalculate:
+                self.recalculate_volumes()
+                start = min(start, max(self.n_rows - 2, 0))
+        return self.to_frame().iloc[max(start - self.n_rows + len(self), 0):].copy()
+
+    def put_frame(self, dataset: pd.DataFrame) -> None:
+        """Refill the buffer from resampled bars, e.g. the logged ones on restart."""
+        self.update(dataset.sort_index(axis='index'))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the last buffer_size bars as resample would, as a view until the next update."""
+        window = slice(self.n_rows - len(self) - self.first_row, self.n_rows - self.first_row)
+        index = pd.DatetimeIndex(self.dates[window].view('datetime64[ns]'), name='date')
+        columns = pd.MultiIndex.from_product([self.symbols, self.features], names=self.names)
+        return pd.DataFrame(self.values[window], index=index, columns=columns, copy=False)
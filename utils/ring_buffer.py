@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        utils/ring_buffer.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Fixed-capacity NumPy ring buffer for the raw ticker window.
+
+# Library imports.
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+
+# Global constants.
+TRADABLE_TICKERS_INFO_COLUMNS = [
+    'symbol', 'close', 'price_change_percent', 'bid_price', 'ask_price', 
+    'bid_volume', 'ask_volume', 'bid_ask_percent_change', 
+    'bid_ask_volume_percent_change', 'rolling_base_volume', 
+    'rolling_quote_volume', 'count']
+RESAMPLED_FIELDS = ['close', 'rolling_base_volume', 'rolling_quote_volume']
+
+# Class definition.
+class Ticker_ring_buffer:
+    def __init__(self, 
+                 slots: int = 32, 
+                 max_rows: Optional[int] = None, 
+                 capacity: int = 256, 
+                 key: str = 'symbol', 
+                 count: str = 'count'):
+        """
+        Raw ticker rows stored as float64 (time slots x symbols x fields), 
+        one slot per tick. The window is the last max_rows observed rows and a 
+        row whose symbol and trade count are already in the window is not 
+        observed again (drop_duplicates on symbol and count). Before the oldest 
+        tick is overwritten while some of its rows are still in the window, the 
+        empty slots are dropped, or the slot axis doubled if there are none. 
+        The time axis is mirrored so the window is always one contiguous slice.
+
+        :param slots: initial number of ticks kept.
+        :param max_rows: number of rows kept (None keeps every row of the last slots ticks).
+        :param capacity: initial number of symbols, doubled whenever exceeded.
+        :param key: column holding the symbol.
+        :param count: column holding the trade count.
+        """
+        self.slots = slots
+        self.max_rows = max_rows
+        self.capacity = capacity
+        self.key = key
+        self.count = count
+        self.columns = None
+        self.fields = None
+        self.labels = None
+        self.dtypes = None
+        self.index_name = None
+        self.symbol_names = []
+        self.symbol_index = pd.Index([], dtype=object)
+        self.label_values = {}
+        self.n_slots = 0
+        self.values = None
+        self.dates = None
+        self.observed = None
+        self.orders = None
+        self.frame = None
+        self.tail_frame = None
+
+    def __len__(self) -> int:
+        return min(self.n_slots, self.slots)
+
+    def get_nbytes(self) -> int:
+        """Return the memory held by the slot arrays."""
+        if self.values is None:
+            return 0
+        arrays = [self.values, self.dates, self.observed, self.orders] + list(self.label_values.values())
+        return sum([array.nbytes for array in arrays])
+
+    def set_columns(self, table: pd.DataFrame) -> None:
+        """Split the table columns in float fields and per symbol labels."""
+        self.columns = table.columns.tolist()
+        self.dtypes = table.dtypes.to_dict()
+        self.index_name = table.index.name
+        self.fields = [column for column in self.columns if column != self.key and
+                       pd.api.types.is_numeric_dtype(self.dtypes[column])]
+        self.labels = [column for column in self.columns if column != self.key and
+                       column not in self.fields]
+        if self.count not in self.fields:
+            raise ValueError('Ticker column {} is not numeric.'.format(self.count))
+        self.count_field = self.fields.index(self.count)
+        self.label_values = {label: np.empty(self.capacity, dtype=object)
+                             for label in self.labels}
+        self.values = np.full((2 * self.slots, self.capacity, len(self.fields)), np.nan)
+        self.dates = np.zeros((2 * self.slots, self.capacity), dtype=np.int64)
+        self.observed = np.zeros((2 * self.slots, self.capacity), dtype=bool)
+        self.orders = np.zeros((2 * self.slots, self.capacity), dtype=np.int64)
+
+    def grow(self, capacity: int) -> None:
+        """Reallocate the symbol axis (amortized by doubling)."""
+        while self.capacity < capacity:
+            self.capacity *= 2
+        old_capacity = self.observed.shape[1]
+        values = np.full((2 * self.slots, self.capacity, len(self.fields)), np.nan)
+        values[:, :old_capacity] = self.values
+        self.values = values
+        dates = np.zeros((2 * self.slots, self.capacity), dtype=np.int64)
+        dates[:, :old_capacity] = self.dates
+        self.dates = dates
+        observed = np.zeros((2 * self.slots, self.capacity), dtype=bool)
+        observed[:, :old_capacity] = self.observed
+        self.observed = observed
+        orders = np.zeros((2 * self.slots, self.capacity), dtype=np.int64)
+        orders[:, :old_capacity] = self.orders
+        self.orders = orders
+        for label in self.labels:
+            label_values = np.empty(self.capacity, dtype=object)
+            label_values[:old_capacity] = self.label_values[label]
+            self.label_values[label] = label_values
+
+    def get_symbol_columns(self, table: pd.DataFrame) -> np.ndarray:
+        """Return the symbol axis position of every row, adding new symbols."""
+        symbols = table[self.key].to_numpy()
+        columns = self.symbol_index.get_indexer(symbols)
+        new = columns < 0
+        if new.any():
+            new_symbols = pd.unique(symbols[new]).tolist()
+            n_symbols = len(self.symbol_names)
+            if n_symbols + len(new_symbols) > self.capacity:
+                self.grow(n_symbols + len(new_symbols))
+            self.symbol_names += new_symbols
+            self.symbol_index = pd.Index(self.symbol_names, dtype=object)
+            columns = self.symbol_index.get_indexer(symbols)
+            for label in self.labels:
+                self.label_values[label][columns[new]] = table[label].to_numpy()[new]
+        return columns
+
+    def put(self, table: pd.DataFrame) -> None:
+        """Write one tick (a conversion table) into the next slot."""
+        if self.columns is None:
+            self.set_columns(table)
+        elif table.columns.tolist() != self.columns:
+            raise ValueError('Ticker columns changed: {}.'.format(table.columns.tolist()))
+        columns = self.get_symbol_columns(table)
+        values = table[self.fields].to_numpy(dtype=np.float64)
+        dates = table.index.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        if self.n_slots > 0:
+            window_counts = self.values[self.get_window(), :, self.count_field][:, columns]
+            seen = self.get_row_mask()[:, columns] & (window_counts == values[:, self.count_field])
+            new = ~seen.any(axis=0)
+            (columns, values, dates) = (columns[new], values[new], dates[new])
+            if self.max_rows is not None and self.n_slots >= self.slots:
+                rows = self.get_row_mask().sum(axis=1)
+                if rows[0] > 0 and rows[1:].sum() + columns.shape[0] < self.max_rows:
+                    self.compact()
+        position = self.n_slots % self.slots
+        self.values[position] = np.nan
+        self.values[position, columns] = values
+        self.dates[position, columns] = dates
+        self.observed[position] = False
+        self.observed[position, columns] = True
+        self.orders[position, columns] = np.arange(columns.shape[0])
+        for array in [self.values, self.dates, self.observed, self.orders]:
+            array[position + self.slots] = array[position]
+        self.n_slots += 1
+        self.frame = None
+        self.tail_frame = None
+
+    def compact(self) -> None:
+        """Drop the empty slots of the window, doubling the slot axis if none is empty."""
+        window = self.get_window()
+        kept = np.flatnonzero(self.observed[window].any(axis=1))
+        slots = self.slots if kept.shape[0] < self.slots else 2 * self.slots
+        for (name, fill) in [('values', np.nan), ('dates', 0), ('observed', False), ('orders', 0)]:
+            array = getattr(self, name)[window][kept]
+            compacted = np.full((2 * slots,) + array.shape[1:], fill, dtype=array.dtype)
+            compacted[:kept.shape[0]] = array
+            compacted[slots:slots + kept.shape[0]] = array
+            setattr(self, name, compacted)
+        self.slots = slots
+        self.n_slots = kept.shape[0]
+
+    def put_frame(self, frame: pd.DataFrame) -> None:
+        """Refill the buffer from a raw window, e.g. the logged one on restart."""
+        frame = frame.sort_index(axis='index', kind='stable')
+        occurrences = frame.groupby(self.key).cumcount(ascending=False).to_numpy()
+        for occurrence in range(occurrences.max(initial=-1), -1, -1):
+            self.put(frame[occurrences == occurrence])
+
+    def get_window(self) -> slice:
+        start = self.n_slots % self.slots if self.n_slots >= self.slots else 0
+        return slice(start, start + len(self))
+
+    def get_field(self, field: str) -> pd.DataFrame:
+        """Zero-copy (slots x symbols) view of one field, oldest slot first.
+
+        Cells a symbol was not observed in are NaN.
+        """
+        values = self.values[self.get_window(), :len(self.symbol_names), 
+                             self.fields.index(field)]
+        return pd.DataFrame(values, columns=self.symbol_index, copy=False)
+
+    def get_row_mask(self) -> np.ndarray:
+        """Return the (slots x symbols) cells of the last max_rows observed rows."""
+        window = self.get_window()
+        observed = self.observed[window, :len(self.symbol_names)]
+        if self.max_rows is None:
+            return observed.copy()
+        rows = observed.sum(axis=1)
+        newer_rows = np.cumsum(rows[::-1])[::-1] - rows
+        ranks = newer_rows[:, np.newaxis] + rows[:, np.newaxis] - \
+            self.orders[window, :len(self.symbol_names)]
+        return observed & (ranks <= self.max_rows)
+
+    def get_last_observations(self, 
+                              field: str, 
+                              mask: np.ndarray, 
+                              n: int = 2) -> np.ndarray:
+        """Return the last n observed values of field per symbol, newest first."""
+        values = self.get_field(field).to_numpy()
+        mask = mask.copy()
+        columns = np.arange(mask.shape[1])
+        observations = np.full((n, mask.shape[1]), np.nan)
+        for i in range(n):
+            has = mask.any(axis=0)
+            rows = mask.shape[0] - 1 - np.argmax(mask[::-1], axis=0)
+            observations[i, has] = values[rows[has], columns[has]]
+            mask[rows[has], columns[has]] = False
+        return observations
+
+    def get_rows(self, 
+                 rows: np.ndarray, 
+                 columns: np.ndarray, 
+                 names: Optional[List[str]] = None, 
+                 dtypes: bool = True) -> pd.DataFrame:
+        """Gather (slot, symbol) cells of the window as a raw table."""
+        window = self.get_window()
+        names = self.columns if names is None else names
+        index = pd.DatetimeIndex(self.dates[window][rows, columns], name=self.index_name)
+        values = self.values[window][rows, columns]
+        data = {}
+        for name in names:
+            if name == self.key:
+                data[name] = self.symbol_index.to_numpy()[columns]
+            elif name in self.labels:
+                data[name] = self.label_values[name][columns]
+            else:
+                data[name] = values[:, self.fields.index(name)]
+                if dtypes and pd.api.types.is_integer_dtype(self.dtypes[name]):
+                    data[name] = data[name].astype(self.dtypes[name])
+        return pd.DataFrame(data, index=index)
+
+    def get_masked_rows(self, mask: np.ndarray) -> pd.DataFrame:
+        """Gather the (slots x symbols) cells of mask as a raw table, oldest tick first."""
+        (rows, columns) = np.nonzero(mask)
+        order = np.lexsort((self.orders[self.get_window()][rows, columns], rows))
+        (rows, columns) = (rows[order], columns[order])
+        return self.get_rows(rows, columns)
+
+    def get_tail_mask(self, fields: List[str] = RESAMPLED_FIELDS) -> np.ndarray:
+        """Return the cells of the window the last two bars resampled from it depend on.
+
+        These are the rows of the first date (the bar resample_from_raw drops), 
+        of the last two dates and, per symbol and field, of the latest date in 
+        between the field was observed at (the value padded forward).
+        """
+        mask = self.get_row_mask()
+        dates = self.dates[self.get_window(), :len(self.symbol_names)]
+        observed_dates = np.unique(dates[mask])
+        if observed_dates.shape[0] <= 3:
+            return mask
+        (first, tail_start) = (observed_dates[0], observed_dates[-2])
+        middle = mask & (dates > first) & (dates < tail_start)
+        tail_mask = mask & ((dates == first) | (dates >= tail_start))
+        for field in fields:
+            observed = middle & ~np.isnan(self.get_field(field).to_numpy())
+            latest = np.where(observed, dates, np.iinfo(np.int64).min).max(axis=0)
+            tail_mask |= middle & (dates == latest)
+        return tail_mask
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the window as a raw table, oldest tick first (cached until the next put)."""
+        if self.frame is None:
+            self.frame = self.get_masked_rows(self.get_row_mask())
+        return self.frame
+
+    def to_tail_frame(self) -> pd.DataFrame:
+        """Return the rows of get_tail_mask as a raw table (cached until the next put).
+
+        Crypto_logger_output.resample_from_raw gives the same last two bars 
+        (and bar counts) for it as for the whole window, without gathering 
+        the whole window every tick.
+        """
+        if self.tail_frame is None:
+            self.tail_frame = self.get_masked_rows(self.get_tail_mask())
+        return self.tail_frame
+
+# Function definitions.
+def get_tradable_tickers(ring: Ticker_ring_buffer) -> List[str]:
+    """get_tradable_tickers_info's live filter, straight on the ring buffer."""
+    mask = ring.get_row_mask()
+    with np.errstate(invalid='ignore'):
+        mask &= ring.get_field('bid_ask_percent_change').to_numpy() < 0.3
+        mask &= ring.get_field('rolling_quote_volume').to_numpy() > 10000000
+        mask &= ring.get_field('count').to_numpy() > 1000
+    return ring.symbol_index[mask.any(axis=0)].tolist()
+
+def filter_movers(ring: Ticker_ring_buffer, 
+                  count: int = 1000, 
+                  price_percent: float = 5.0, 
+                  volume_percent: float = 0.0) -> pd.DataFrame:
+    """Crypto_logger_input.filter_movers on the ring buffer.
+
+    Only the two last observations of each symbol are read and only the
+    rows of the movers are gathered into a DataFrame.
+    """
+    mask = ring.get_row_mask()
+    (price, previous_price) = ring.get_last_observations('price_change_percent', mask)
+    (volume, previous_volume) = ring.get_last_observations('rolling_base_volume', mask)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        price_moves = np.abs(price - previous_price)
+        volume_moves = 100 * (volume / previous_volume - 1)
+        movers = np.flatnonzero((price_moves > 0.0) & (price_moves > price_percent) &
+                                (volume_moves > volume_percent))
+    order = np.lexsort((-price_moves[movers], -volume_moves[movers]))
+    movers = movers[order][-count:] if count > 0 else movers[:0]
+    (columns, rows) = np.nonzero(mask[:, movers].T)
+    (rows, columns) = (rows, movers[columns])
+    dataset = ring.get_rows(rows, columns, names=TRADABLE_TICKERS_INFO_COLUMNS, dtypes=False)
+    dataset['last_price_move'] = price_moves[columns]
+    dataset['last_volume_move'] = volume_moves[columns]
+    return dataset.drop_duplicates(subset=['symbol', 'count'], keep='last')
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        utils/scheduler.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Drift-free poll scheduler aligned to interval boundaries.
+
+# Library imports.
+from typing import Dict, Optional
+from collections import deque
+from threading import Event
+import time
+import numpy as np
+import pandas as pd
+
+# Class definition.
+class Interval_scheduler:
+    """Fire ticks on the epoch grid of an interval (00:00:00, 00:00:05, ...).
+
+    Boundaries come from the grid, not from the last tick plus the period,
+    so latencies never accumulate and dataset.index.round(interval) maps
+    each poll to its own bucket. A tick late by less than tolerance periods
+    still fires right away (it rounds to the same bucket), later than that
+    the missed boundaries are skipped rather than polled in a burst.
+    """
+    def __init__(self, 
+                 interval: str = '5s', 
+                 tolerance: float = 0.4, 
+                 window: int = 1000):
+        """
+        :param interval: poll interval, e.g. '5s'.
+        :param tolerance: lateness (in periods) still catching the missed boundary.
+        :param window: jitters kept for the statistics.
+        """
+        self.period = pd.Timedelta(interval).total_seconds()
+        self.tolerance = tolerance
+        self.jitters = deque(maxlen=window)
+        self.boundary = None
+        self.behind = False
+        self.ticks = 0
+        self.missed = 0
+        self.overruns = 0
+        self.skipped = {}
+
+    def get_next_boundary(self, now: float) -> float:
+        return (np.floor(now / self.period) + 1) * self.period
+
+    def wait(self, stopping: Optional[Event] = None) -> Optional[float]:
+        """Sleep until the next boundary and return it (None when stopping is set)."""
+        now = time.time()
+        boundary = self.get_next_boundary(now)
+        self.behind = False
+        if self.boundary is not None:
+            expected = self.boundary + self.period
+            if expected <= now < expected + self.tolerance * self.period:
+                boundary = expected
+                self.behind = True
+            elif boundary > expected:
+                self.missed += int(round((boundary - expected) / self.period))
+                self.behind = True
+        delay = boundary - time.time()
+        if delay > 0:
+            if stopping is not None:
+                if stopping.wait(delay):
+                    return None
+            else:
+                time.sleep(delay)
+        elif stopping is not None and stopping.is_set():
+            return None
+        self.jitters.append(time.time() - boundary)
+        self.boundary = boundary
+        self.ticks += 1
+        return boundary
+
+    def finish(self) -> None:
+        """Close the current tick, counting an overrun when it outlasted its period."""
+        if self.boundary is not None and time.time() - self.boundary > self.period:
+            self.overruns += 1
+            self.behind = True
+
+    def skip(self, name: str) -> None:
+        """Count work skipped to catch up (e.g. 'screen' or 'fetch')."""
+        self.skipped[name] = self.skipped.get(name, 0) + 1
+
+    def is_behind(self) -> bool:
+        """Whether the current tick is late or the previous one overran."""
+        return self.behind
+
+    def get_summary(self) -> Dict[str, float]:
+        jitters = np.array(self.jitters) * 1000
+        summary = {'ticks': self.ticks, 'missed': self.missed, 'overruns': self.overruns, 
+                   'jitter_mean_ms': np.nan, 'jitter_p95_ms': np.nan, 'jitter_max_ms': np.nan}
+        if jitters.shape[0] > 0:
+            summary.update({'jitter_mean_ms': jitters.mean(), 
+                            'jitter_p95_ms': np.percentile(jitters, 95), 
+                            'jitter_max_ms': jitters.max()})
+        summary.update({'skipped_' + name: count for (name, count) in self.skipped.items()})
+        return summary
+
+    def format_summary(self) -> str:
+        summary = self.get_summary()
+        line = 'ticks {} | missed {} | overruns {} | jitter mean {:.1f} ms p95 {:.1f} ms max {:.1f} ms'.format(
+            summary['ticks'], summary['missed'], summary['overruns'], summary['jitter_mean_ms'], 
+            summary['jitter_p95_ms'], summary['jitter_max_ms'])
+        for (name, count) in self.skipped.items():
+            line += ' | skipped {} {}'.format(name, count)
+        return line
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        utils/screener.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Cross-sectional screener: the output triggers evaluated on (time x symbol) matrices at once.
+
+# Library imports.
+from .renko_bricks import build_renko, get_auto_brick_sizes, get_renko_trigger_mask
+from typing import Dict, List, Tuple
+from sys import float_info as sflt
+import numpy as np
+import pandas as pd
+
+# Function definitions.
+def get_feature_matrices(dataset: pd.DataFrame, 
+                         features: List[str]) -> Tuple[pd.Index, Dict[str, np.ndarray]]:
+    """Return the symbols of an output dataset and a (time x symbol) matrix per feature.
+
+    Duplicated (symbol, feature) columns keep their first occurrence, as
+    filter_in_market does.
+    """
+    kept = np.flatnonzero(~dataset.columns.duplicated())
+    columns = dataset.columns[kept]
+    symbols = columns.get_level_values(0).unique()
+    matrices = {}
+    for feature in features:
+        positions = columns.get_indexer(pd.MultiIndex.from_product([symbols, [feature]]))
+        values = dataset.iloc[:, kept[positions]].to_numpy(dtype=float)
+        values[:, positions < 0] = np.nan
+        matrices[feature] = values
+    return symbols, matrices
+
+def forward_fill(values: np.ndarray) -> np.ndarray:
+    """fillna(method='pad') along the time axis."""
+    rows = np.where(np.isnan(values), 0, np.arange(values.shape[0])[:, None])
+    rows = np.maximum.accumulate(rows, axis=0)
+    return values[rows, np.arange(values.shape[1])]
+
+def get_unique_counts(values: np.ndarray) -> np.ndarray:
+    """Series.unique().size of every column (NaN counting as one value)."""
+    values = np.sort(values, axis=0)
+    n_nan = np.isnan(values).sum(axis=0)
+    n_valid = values.shape[0] - n_nan
+    changes = values[1:] != values[:-1]
+    changes &= np.arange(1, values.shape[0])[:, None] < n_valid[None, :]
+    return changes.sum(axis=0) + (n_valid > 0) + (n_nan > 0)
+
+def get_rma(values: np.ndarray, length: int) -> np.ndarray:
+    """pandas_ta rma (Wilder's moving average) of every column."""
+    return pd.DataFrame(values).ewm(alpha=1.0 / length, min_periods=length).mean().to_numpy()
+
+def get_rsi(close: np.ndarray, length: int = 14) -> np.ndarray:
+    negative = np.full_like(close, np.nan)
+    negative[1:] = close[1:] - close[:-1]
+    positive = np.where(negative < 0, 0.0, negative)
+    negative = np.where(negative > 0, 0.0, negative)
+    positive_average = get_rma(positive, length)
+    negative_average = get_rma(negative, length)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 * positive_average / (positive_average + np.abs(negative_average))
+
+def get_kdj(high: np.ndarray, 
+            low: np.ndarray, 
+            close: np.ndarray, 
+            length: int = 9, 
+            signal: int = 3) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return the K, D and J lines of pandas_ta kdj for every column."""
+    highest_high = pd.DataFrame(high).rolling(length).max().to_numpy()
+    lowest_low = pd.DataFrame(low).rolling(length).min().to_numpy()
+    value_range = highest_high - lowest_low
+    value_range += sflt.epsilon * (value_range == 0).any(axis=0)
+    fast_k = 100 * (close - lowest_low) / value_range
+    k = get_rma(fast_k, signal)
+    d = get_rma(k, signal)
+    return k, d, 3 * k - 2 * d
+
+def get_jma(close: np.ndarray, length: int = 7, phase: float = 0) -> np.ndarray:
+    """pandas_ta jma of every column, the recursion stepping over time for all symbols at once."""
+    sum_length = 10
+    half_length = 0.5 * (length - 1)
+    pr = 0.5 if phase < -100 else 2.5 if phase > 100 else 1.5 + phase * 0.01
+    length1 = max((np.log(np.sqrt(half_length)) / np.log(2.0)) + 2.0, 0)
+    pow1 = max(length1 - 2.0, 0.5)
+    length2 = length1 * np.sqrt(half_length)
+    bet = length2 / (length2 + 1)
+    beta = 0.45 * (length - 1) / (0.45 * (length - 1) + 2.0)
+
+    jma = np.zeros_like(close)
+    volty = np.zeros_like(close)
+    v_sum = np.zeros_like(close)
+    v_sum_cumulative = np.zeros((close.shape[0] + 1, close.shape[1]))
+    det0 = np.zeros(close.shape[1])
+    det1 = np.zeros(close.shape[1])
+    jma[0] = ma1 = upper_band = lower_band = close[0]
+    for i in range(1, close.shape[0]):
+        price = close[i]
+        del1 = price - upper_band
+        del2 = price - lower_band
+        volty[i] = np.where(np.abs(del1) != np.abs(del2), np.maximum(np.abs(del1), np.abs(del2)), 0)
+        v_sum[i] = v_sum[i - 1] + (volty[i] - volty[max(i - sum_length, 0)]) / sum_length
+        v_sum_cumulative[i + 1] = v_sum_cumulative[i] + v_sum[i]
+        start = max(i - 65, 0)
+        average_volty = (v_sum_cumulative[i + 1] - v_sum_cumulative[start]) / (i + 1 - start)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            d_volty = np.where(average_volty == 0, 0, volty[i] / average_volty)
+        r_volty = np.maximum(1.0, np.minimum(np.power(length1, 1 / pow1), d_volty))
+        power = np.power(r_volty, pow1)
+        kv = np.power(bet, np.sqrt(power))
+        upper_band = np.where(del1 > 0, price, price - kv * del1)
+        lower_band = np.where(del2 < 0, price, price - kv * del2)
+        alpha = np.power(beta, power)
+        ma1 = (1 - alpha) * price + alpha * ma1
+        det0 = (price - ma1) * (1 - beta) + beta * det0
+        ma2 = ma1 + pr * det0
+        det1 = (ma2 - jma[i - 1]) * (1 - alpha) * (1 - alpha) + alpha * alpha * det1
+        jma[i] = jma[i - 1] + det1
+    jma[:length - 1] = np.nan
+    return jma
+
+def get_not_square_wave_mask(close: np.ndarray, multiplications: int = 10) -> np.ndarray:
+    """get_not_square_wave_triggers of every column."""
+    multiplications = min(close.shape[0] // 5, multiplications)
+    mask = np.ones(close.shape[1], dtype=bool)
+    for multiplier in range(1, multiplications + 1):
+        mask &= get_unique_counts(close[-5 * multiplier:]) >= 2 * multiplier
+    return mask
+
+def get_rising_volume_mask(rolling_base_volume: np.ndarray) -> np.ndarray:
+    return rolling_base_volume[-1] - rolling_base_volume[-2] > 0
+
+def get_bullish_price_mask(high: np.ndarray, close: np.ndarray) -> np.ndarray:
+    return close[-1] > high[-2]
+
+def get_minute_daily_volume_minimum_mask(rolling_base_volume: np.ndarray, 
+                                         minimum: float = 1000000) -> np.ndarray:
+    return rolling_base_volume[-1] > minimum
+
+def get_minute_daily_volume_change_mask(rolling_base_volume: np.ndarray, 
+                                        threshold: float = 300, 
+                                        periods: int = 1440) -> np.ndarray:
+    """Last (pct_change(periods) * 100) > threshold of every column."""
+    if rolling_base_volume.shape[0] <= periods:
+        return np.zeros(rolling_base_volume.shape[1], dtype=bool)
+    volume = forward_fill(rolling_base_volume)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (volume[-1] / volume[-periods - 1] - 1) * 100 > threshold
+
+def get_positive_RSI_mask(close: np.ndarray) -> np.ndarray:
+    (RSI_6, RSI_12, RSI_24) = [get_rsi(close, length=length)[-1] for length in [6, 12, 24]]
+    return (RSI_6 > RSI_12) | (RSI_6 > RSI_24) | (RSI_12 > RSI_24)
+
+def get_positive_momentum_mask(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    (K, D, J) = get_kdj(high, low, close, length=5, signal=3)
+    return (J[-1] > D[-1]) & (J[-1] > K[-1])
+
+def get_positive_JMA_mask(close: np.ndarray) -> np.ndarray:
+    return close[-1] < get_jma(close, length=7, phase=0)[-1]
+
+def get_renko_mask(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """get_renko_trigger(method='auto_atr') (long, simple) of every column, on hlc3 bricks."""
+    brick_sizes = get_auto_brick_sizes(high, low, close)
+    bricks = build_renko((high + low + close) / 3, brick_sizes)
+    return get_renko_trigger_mask(bricks, direction_type='long', trigger_type='simple')
+
+def get_screen_mask(dataset: pd.DataFrame) -> pd.Series:
+    """screen_one of every symbol of an output dataset, as a boolean Series by symbol."""
+    if dataset.shape[1] == 0:
+        return pd.Series([], dtype=bool)
+    frequency = (dataset.index[1:] - dataset.index[:-1]).min()
+    frequency = pd.tseries.frequencies.to_offset(frequency)
+    frequency_1min = pd.tseries.frequencies.to_offset('1min')
+    frequency_30min = pd.tseries.frequencies.to_offset('30min')
+    frequency_1d = pd.tseries.frequencies.to_offset('1d')
+    features = ['close', 'rolling_base_volume'] + (['high', 'low'] if frequency == frequency_30min else [])
+    (symbols, matrices) = get_feature_matrices(dataset, features)
+    (close, rolling_base_volume) = (matrices['close'], matrices['rolling_base_volume'])
+    mask = get_not_square_wave_mask(close, multiplications=10)
+    if frequency_1min <= frequency < frequency_1d:
+        mask &= get_rising_volume_mask(rolling_base_volume)
+        if frequency == frequency_1min:
+            mask &= get_minute_daily_volume_minimum_mask(rolling_base_volume)
+            mask &= get_minute_daily_volume_change_mask(rolling_base_volume, threshold=0)
+        elif frequency == frequency_30min:
+            mask &= get_renko_mask(matrices['high'], matrices['low'], close)
+    return pd.Series(mask, index=symbols)
+
+def screen_all(dataset: pd.DataFrame) -> pd.Series:
+    """Drop-in for filter_in_market(screen_one, dataset): the symbols passing the screen."""
+    mask = get_screen_mask(dataset)
+    return pd.Series(mask.index[mask.to_numpy()].tolist(), dtype='str')
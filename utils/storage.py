@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        utils/storage.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Pluggable storage backends for the logger buffers.
+
+# Library imports.
+from typing import Dict, List, Optional, Union
+from abc import abstractmethod, ABC
+from os import listdir, makedirs, mkdir, replace
+from os.path import exists, join, splitext
+from shutil import rmtree
+import json
+import sys
+import numpy as np
+import pandas as pd
+
+# Variable definitions.
+DEFAULT_LOG_STORAGE = 'segments'
+FRAME_SCHEMA_VERSION = 1
+
+# Function definitions.
+def encode_frame(dataset: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Return the arrays of a column-typed, binary copy of dataset.
+
+    Columns are grouped into one 2D block per kind (float, int, bool, 
+    datetime, str) so a buffer of thousands of float columns is a single
+    array. Object columns are stored as numbers when they all parse as such, 
+    like read_csv would, otherwise as strings with a mask of missing values.
+    """
+    columns = dataset.columns
+    if isinstance(columns, pd.MultiIndex):
+        labels = np.array([[str(label) for label in column] for column in columns], 
+                          dtype=str).reshape(len(columns), columns.nlevels)
+    else:
+        labels = np.array([str(column) for column in columns], dtype=str)
+    metadata = {'schema_version': FRAME_SCHEMA_VERSION, 
+                'index_name': dataset.index.name, 
+                'column_names': list(columns.names), 
+                'multiindex': isinstance(columns, pd.MultiIndex)}
+    arrays = {'index': pd.DatetimeIndex(dataset.index).asi8, 
+              'columns': labels}
+    if (dataset.dtypes == float).all():
+        arrays['positions_float'] = np.arange(dataset.shape[1], dtype=np.int64)
+        arrays['block_float'] = dataset.to_numpy(dtype=float)
+    else:
+        kinds = {'float': [], 'int': [], 'bool': [], 'datetime': [], 'str': []}
+        values = {kind: [] for kind in kinds}
+        for (i, (_, column)) in enumerate(dataset.items()):
+            if column.dtype == object:
+                try:
+                    column = pd.to_numeric(column)
+                except (ValueError, TypeError):
+                    pass
+            if pd.api.types.is_bool_dtype(column.dtype):
+                kind = 'bool'
+            elif pd.api.types.is_integer_dtype(column.dtype):
+                kind = 'int'
+            elif pd.api.types.is_float_dtype(column.dtype):
+                kind = 'float'
+            elif pd.api.types.is_datetime64_any_dtype(column.dtype):
+                kind = 'datetime'
+                column = column.astype('datetime64[ns]').view('int64')
+            else:
+                kind = 'str'
+            kinds[kind].append(i)
+            values[kind].append(column.to_numpy())
+        dtypes = {'float': float, 'int': np.int64, 'bool': bool, 
+                  'datetime': np.int64, 'str': object}
+        for kind in kinds:
+            if len(kinds[kind]) > 0:
+                block = np.column_stack(values[kind]).astype(dtypes[kind])
+                arrays['positions_' + kind] = np.array(kinds[kind], dtype=np.int64)
+                if kind == 'str':
+                    mask = pd.isna(block)
+                    arrays['mask_str'] = mask
+                    block = np.where(mask, '', block).astype(str)
+                arrays['block_' + kind] = block
+    arrays['metadata'] = np.array(json.dumps(metadata))
+    return arrays
+
+def decode_frame(arrays: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """Return the DataFrame encoded by encode_frame."""
+    metadata = json.loads(str(arrays['metadata']))
+    index = pd.DatetimeIndex(arrays['index'], name=metadata['index_name'])
+    labels = arrays['columns']
+    if metadata['multiindex']:
+        columns = pd.MultiIndex.from_arrays(labels.T.tolist(), 
+                                            names=metadata['column_names'])
+    else:
+        columns = pd.Index(labels.tolist(), name=metadata['column_names'][0])
+    frames = []
+    positions = []
+    for kind in ['float', 'int', 'bool', 'datetime', 'str']:
+        if 'positions_' + kind in arrays:
+            block = arrays['block_' + kind]
+            if kind == 'str':
+                block = np.where(arrays['mask_str'], np.nan, block.astype(object))
+            frame = pd.DataFrame(block, index=index)
+            if kind == 'datetime':
+                frame = frame.apply(lambda column: pd.to_datetime(column, unit='ns'))
+            frames.append(frame)
+            positions.append(arrays['positions_' + kind])
+    if len(frames) == 0:
+        return pd.DataFrame(index=index, columns=columns)
+    if len(frames) == 1:
+        dataset = frames[0]
+    else:
+        dataset = pd.concat(frames, axis='columns', ignore_index=True)
+        dataset = dataset.iloc[:, np.argsort(np.concatenate(positions), kind='stable')]
+    dataset.columns = columns
+    return dataset
+
+def get_kinds(arrays: Dict[str, np.ndarray]) -> Dict[str, List[int]]:
+    """Return the column positions of every column kind of encoded arrays."""
+    return {key: arrays[key].tolist() for key in arrays if key.startswith('positions_')}
+
+def get_equal_rows(dataset: pd.DataFrame, row: pd.Series) -> np.ndarray:
+    """Return which rows of dataset equal row (missing values being equal)."""
+    equal = dataset.eq(row, axis='columns') | (dataset.isna() & row.isna())
+    return equal.all(axis='columns').to_numpy()
+
+def get_log_storage(storage: Union[str, 'Log_storage'] = DEFAULT_LOG_STORAGE, 
+                    max_rows: Optional[int] = None) -> 'Log_storage':
+    """Return the storage backend named storage ('csv', 'npz' or 'segments')."""
+    if isinstance(storage, Log_storage):
+        return storage
+    if storage == 'segments':
+        return Segment_log_storage(max_rows=max_rows)
+    backends = {'csv': CSV_log_storage, 'npz': NPZ_log_storage}
+    if storage not in backends:
+        raise ValueError('Unknown log storage: {}'.format(storage))
+    return backends[storage]()
+
+def get_log_storage_from_path(path: str) -> 'Log_storage':
+    extension = splitext(path.rstrip('/'))[1]
+    backends = {NPZ_log_storage.extension: NPZ_log_storage, 
+                Segment_log_storage.extension: Segment_log_storage}
+    return backends.get(extension, CSV_log_storage)()
+
+def export_log_to_csv(path: str, csv_path: Optional[str] = None) -> str:
+    """Write the log at path as the CSV the loggers used to write (.txt)."""
+    if csv_path is None:
+        csv_path = splitext(path.rstrip('/'))[0] + CSV_log_storage.extension
+    dataset = get_log_storage_from_path(path).read(path)
+    if dataset is None:
+        raise FileNotFoundError(path)
+    CSV_log_storage().write(dataset, csv_path)
+    return csv_path
+
+# Class definitions.
+class Log_storage(ABC):
+    extension = ''
+
+    def get_path(self, name: str) -> str:
+        """Return the file path of the log called name (without extension)."""
+        return name + self.extension
+
+    @abstractmethod
+    def write(self, dataset: pd.DataFrame, path: str) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def read(self, 
+             path: str, 
+             header: Union[int, List[int]] = 0) -> Optional[pd.DataFrame]:
+        raise NotImplementedError()
+
+class CSV_log_storage(Log_storage):
+    """The original text logs, readable with cat and pd.read_csv."""
+    extension = '.txt'
+
+    def write(self, dataset: pd.DataFrame, path: str) -> None:
+        dataset.to_csv(path)
+
+    def read(self, 
+             path: str, 
+             header: Union[int, List[int]] = 0) -> Optional[pd.DataFrame]:
+        if not exists(path):
+            return None
+        dataset = pd.read_csv(path, header=header, index_col=0)
+        dataset.index = pd.DatetimeIndex(dataset.index)
+        return dataset
+
+class NPZ_log_storage(Log_storage):
+    """Uncompressed .npz of column-typed blocks plus JSON metadata.
+
+    Files are written to a temporary path and renamed, so a reader never
+    sees a partial buffer. The header argument of read is not needed, the
+    column levels are stored with the data.
+    """
+    extension = '.npz'
+
+    def write(self, dataset: pd.DataFrame, path: str) -> None:
+        temporary_path = path + '.tmp'
+        with open(temporary_path, 'wb') as f:
+            np.savez(f, **encode_frame(dataset))
+        replace(temporary_path, path)
+
+    def read(self, 
+             path: str, 
+             header: Union[int, List[int]] = 0) -> Optional[pd.DataFrame]:
+        if not exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as arrays:
+            return decode_frame({key: arrays[key] for key in arrays.files})
+
+class Segment_log_storage(Log_storage):
+    """Append-only log of .npy segments, one directory per segment.
+
+    A full write (compaction) stores the whole buffer as a single segment.
+    Afterwards every write only stores the rows that are new or changed since
+    the previous write of the same path by this process:
+    - 'label' mode (sorted unique index, e.g. OHLCV bars): the segment holds
+      the rows from the first changed bar on and replaces them on read.
+    - 'positional' mode (repeated index, e.g. the raw ticker rows): the
+      segment holds the rows appended after the previously written last row.
+    Only the first segment stores the column labels and metadata. Readers
+    mmap the segments listed in log.json, keep the valid rows of each and
+    the last max_rows of those. The log is compacted once the segments
+    hold max_rows appended rows or max_segments segments, or when the columns
+    or column kinds change. The last written dataset is kept as a copy since
+    buffers such as Incremental_resampler.to_frame are views updated in place.
+    """
+    extension = '.seg'
+    row_keys = ('index', 'block_float', 'block_int', 'block_bool', 
+                'block_datetime', 'block_str', 'mask_str')
+
+    def __init__(self, 
+                 max_rows: Optional[int] = None, 
+                 max_segments: int = 256, 
+                 max_scan: int = 64):
+        """
+        :param max_rows: rows kept by readers (the logger buffer_size), 
+                         the written dataset length when None.
+        :param max_segments: segments written before compacting.
+        :param max_scan: changed bars searched (label mode) before a full write.
+        """
+        self.max_rows = max_rows
+        self.max_segments = max_segments
+        self.max_scan = max_scan
+        self.states = {}
+
+    def write(self, dataset: pd.DataFrame, path: str) -> None:
+        state = self.states.get(path)
+        if state is not None and len(state['segments']) < self.max_segments:
+            start = self.get_changed_start(state, dataset)
+            if start is not None:
+                if start == dataset.shape[0]:
+                    state['dataset'] = dataset.copy()
+                    return
+                if state['appended_rows'] + dataset.shape[0] - start < state['max_rows']:
+                    arrays = encode_frame(dataset.iloc[start:])
+                    if get_kinds(arrays) == state['kinds']:
+                        arrays = {key: value for (key, value) in arrays.items() 
+                                  if key in self.row_keys}
+                        self.append_segment(path, state, arrays)
+                        state['appended_rows'] += dataset.shape[0] - start
+                        state['dataset'] = dataset.copy()
+                        return
+        self.compact(dataset, path)
+
+    def get_mode(self, dataset: pd.DataFrame) -> str:
+        index = dataset.index
+        return 'label' if index.is_unique and index.is_monotonic_increasing else 'positional'
+
+    def get_changed_start(self, state: Dict, dataset: pd.DataFrame) -> Optional[int]:
+        """Return where the rows not yet written start (None to rewrite all)."""
+        previous = state['dataset']
+        if dataset.shape[0] == 0 or previous.shape[0] == 0 or \
+                not dataset.columns.equals(previous.columns) or \
+                self.get_mode(dataset) != state['mode']:
+            return None
+        if state['mode'] == 'positional':
+            candidates = np.flatnonzero(dataset.index.asi8 == previous.index.asi8[-1])
+            matches = get_equal_rows(dataset.iloc[candidates], previous.iloc[-1])
+            if not matches.any():
+                return None
+            return int(candidates[matches][-1]) + 1
+        previous_index = previous.index
+        for i in range(dataset.shape[0] - 1, 
+                       max(dataset.shape[0] - 1 - self.max_scan, -1), -1):
+            j = previous_index.get_indexer([dataset.index[i]])[0]
+            if j >= 0 and get_equal_rows(dataset.iloc[[i]], previous.iloc[j]).all():
+                following = dataset.index[i + 1] if i + 1 < dataset.shape[0] else None
+                if j + 1 < previous.shape[0] and \
+                        (following is None or previous_index[j + 1] < following):
+                    return None
+                return i + 1
+        return None
+
+    def compact(self, dataset: pd.DataFrame, path: str) -> None:
+        """Rewrite the log as a single segment holding dataset."""
+        if not exists(path):
+            mkdir(path)
+        log = self.read_log(path)
+        old_segments = [] if log is None else log['segments']
+        next_segment = 0 if log is None else log['next_segment']
+        max_rows = self.max_rows if self.max_rows is not None else dataset.shape[0]
+        state = {'mode': self.get_mode(dataset), 'max_rows': max(max_rows, 1), 
+                 'segments': [], 'next_segment': next_segment, 
+                 'appended_rows': 0, 'dataset': dataset.copy()}
+        arrays = encode_frame(dataset)
+        state['kinds'] = get_kinds(arrays)
+        self.append_segment(path, state, arrays)
+        for segment in old_segments:
+            rmtree(join(path, segment), ignore_errors=True)
+        self.states[path] = state
+
+    def append_segment(self, path: str, state: Dict, arrays: Dict[str, np.ndarray]) -> None:
+        segment = '{:08d}'.format(state['next_segment'])
+        makedirs(join(path, segment), exist_ok=True)
+        for (key, array) in arrays.items():
+            np.save(join(path, segment, key + '.npy'), array, allow_pickle=False)
+        state['next_segment'] += 1
+        state['segments'].append(segment)
+        log = {'schema_version': FRAME_SCHEMA_VERSION, 'mode': state['mode'], 
+               'max_rows': state['max_rows'], 'segments': state['segments'], 
+               'next_segment': state['next_segment']}
+        temporary_path = join(path, 'log.json.tmp')
+        with open(temporary_path, 'w') as f:
+            json.dump(log, f)
+        replace(temporary_path, join(path, 'log.json'))
+
+    def read_log(self, path: str) -> Optional[Dict]:
+        log_path = join(path, 'log.json')
+        if not exists(log_path):
+            return None
+        with open(log_path, 'r') as f:
+            log = json.load(f)
+        return log if log.get('schema_version') == FRAME_SCHEMA_VERSION else None
+
+    def read(self, 
+             path: str, 
+             header: Union[int, List[int]] = 0) -> Optional[pd.DataFrame]:
+        for attempt in range(3):
+            log = self.read_log(path) if exists(path) else None
+            if log is None:
+                return None
+            try:
+                return self.read_segments(path, log)
+            except FileNotFoundError:
+                pass
+        return None
+
+    def read_segments(self, path: str, log: Dict) -> pd.DataFrame:
+        """Reconstruct the window from the mmap'ed segments listed in log."""
+        segments = []
+        for segment in log['segments']:
+            directory = join(path, segment)
+            segments.append({key[:-len('.npy')]: 
+                                 np.load(join(directory, key), mmap_mode='r' 
+                                         if key[:-len('.npy')] in self.row_keys else None, 
+                                         allow_pickle=False) 
+                             for key in listdir(directory) if key.endswith('.npy')})
+        stops = [len(arrays['index']) for arrays in segments]
+        if log['mode'] == 'label':
+            cutoff = None
+            for k in range(len(segments) - 1, -1, -1):
+                index = segments[k]['index']
+                if cutoff is not None:
+                    stops[k] = int(np.searchsorted(index, cutoff, side='left'))
+                if len(index) > 0:
+                    cutoff = index[0] if cutoff is None else min(cutoff, index[0])
+        skip = max(sum(stops) - log['max_rows'], 0)
+        starts = []
+        for stop in stops:
+            starts.append(min(skip, stop))
+            skip -= starts[-1]
+        arrays = {key: value for (key, value) in segments[0].items() 
+                  if key not in self.row_keys}
+        for key in self.row_keys:
+            if key in segments[0]:
+                arrays[key] = np.concatenate([segment[key][start:stop] 
+                                              for (segment, start, stop) in 
+                                              zip(segments, starts, stops)])
+        return decode_frame(arrays)
+
+if __name__ == '__main__':
+    for path in sys.argv[1:]:
+        print('Exported', export_log_to_csv(path))
@@ -0,0 +1,593 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        utils/streaming_indicators.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Incremental indicators: per-symbol state seeded from history once, then advanced one bar at a time.
+
+# Library imports.
+from .screener import get_feature_matrices
+from abc import abstractmethod, ABC
+from typing import Dict, List, Optional, Tuple
+from copy import deepcopy
+from inspect import signature
+from sys import float_info as sflt
+import numpy as np
+import pandas as pd
+
+# Class definition.
+class Streaming_ewm:
+    """pandas ewm(alpha=alpha, adjust=adjust, min_periods=min_periods).mean() of every symbol, one row at a time.
+
+    The state is pandas' own (weighted average, old weight, observations), so
+    the output matches the batch computation, NaN handling included.
+    """
+    def __init__(self, 
+                 n_symbols: int, 
+                 alpha: float, 
+                 adjust: bool = True, 
+                 min_periods: int = 0):
+        """
+        :param n_symbols: number of columns.
+        :param alpha: smoothing factor.
+        :param adjust: pandas adjust flag.
+        :param min_periods: observations before the average is returned.
+        """
+        self.factor = 1 - alpha
+        self.new_weight = 1.0 if adjust else alpha
+        self.adjust = adjust
+        self.min_periods = max(min_periods, 1)
+        self.weighted = np.full(n_symbols, np.nan)
+        self.old_weight = np.ones(n_symbols)
+        self.observations = np.zeros(n_symbols, dtype=int)
+
+    def update(self, values: np.ndarray) -> np.ndarray:
+        observed = ~np.isnan(values)
+        started = ~np.isnan(self.weighted)
+        self.observations += observed
+        self.old_weight = np.where(started, self.old_weight * self.factor, self.old_weight)
+        updated = started & observed
+        average = (self.old_weight * self.weighted + self.new_weight * values) / \
+            (self.old_weight + self.new_weight)
+        self.weighted = np.where(updated & (self.weighted != values), average, self.weighted)
+        self.old_weight = np.where(updated, self.old_weight + self.new_weight
+                                   if self.adjust else 1.0, self.old_weight)
+        self.weighted = np.where(~started & observed, values, self.weighted)
+        return np.where(self.observations >= self.min_periods, self.weighted, np.nan)
+
+class Streaming_rma(Streaming_ewm):
+    """pandas_ta rma (Wilder's smoothing)."""
+    def __init__(self, n_symbols: int, length: int):
+        super().__init__(n_symbols, alpha=1.0 / length, adjust=True, min_periods=length)
+
+class Streaming_ema:
+    """pandas_ta ema: the mean of the first length rows, then ewm(span=length, adjust=False).
+
+    With from_first_valid, the rows are counted from the first observation
+    of each symbol (pandas_ta macd's signal line), else from the first row.
+    """
+    def __init__(self, n_symbols: int, length: int, from_first_valid: bool = False):
+        """
+        :param n_symbols: number of columns.
+        :param length: span of the average.
+        :param from_first_valid: count the rows from the first observation of each symbol.
+        """
+        self.length = length
+        self.from_first_valid = from_first_valid
+        self.rows = np.zeros(n_symbols, dtype=int)
+        self.started = np.zeros(n_symbols, dtype=bool)
+        self.total = np.zeros(n_symbols)
+        self.count = np.zeros(n_symbols, dtype=int)
+        self.ewm = Streaming_ewm(n_symbols, alpha=2.0 / (length + 1), adjust=False)
+
+    def update(self, values: np.ndarray) -> np.ndarray:
+        observed = ~np.isnan(values)
+        self.started |= observed if self.from_first_valid else True
+        seeding = self.started & (self.rows < self.length)
+        self.total += np.where(seeding & observed, values, 0)
+        self.count += seeding & observed
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.where(self.count > 0, self.total / self.count, np.nan)
+        values = np.where(self.rows < self.length - 1, np.nan, values)
+        values = np.where(self.rows == self.length - 1, mean, values)
+        self.rows += self.started
+        return self.ewm.update(np.where(self.started, values, np.nan))
+
+class Rolling_window:
+    """The last length rows of every symbol, for rolling(length) reductions."""
+    def __init__(self, n_symbols: int, length: int):
+        """
+        :param n_symbols: number of columns.
+        :param length: rows in the window.
+        """
+        self.length = length
+        self.values = np.full((length, n_symbols), np.nan)
+        self.count = 0
+
+    def update(self, values: np.ndarray) -> None:
+        self.values[self.count % self.length] = values
+        self.count += 1
+
+    def get_window(self) -> np.ndarray:
+        """Return the window in chronological order, NaN until length rows were seen."""
+        if self.count < self.length:
+            return np.full_like(self.values, np.nan)
+        return self.values[(self.count + np.arange(self.length)) % self.length]
+
+class Streaming_wma:
+    """pandas_ta wma (linear weights over a rolling window)."""
+    def __init__(self, n_symbols: int, length: int):
+        self.window = Rolling_window(n_symbols, length)
+        self.weights = np.arange(1, length + 1) / (0.5 * length * (length + 1))
+
+    def update(self, values: np.ndarray) -> np.ndarray:
+        self.window.update(values)
+        return self.weights @ self.window.get_window()
+
+class Streaming_indicator(ABC):
+    """Base of the streaming indicators: step() advances the state by one bar.
+
+    The last keep values of each output are kept for the triggers that look
+    a few bars back. Outputs are named as the pandas_ta columns.
+    """
+    def __init__(self, n_symbols: int, keep: int = 3):
+        self.history = {output: np.full((keep, n_symbols), np.nan) for output in self.get_outputs()}
+
+    @abstractmethod
+    def get_outputs(self) -> List[str]:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def step(self, bar: Dict[str, np.ndarray]) -> Tuple[np.ndarray, ...]:
+        raise NotImplementedError()
+
+    def update(self, bar: Dict[str, np.ndarray]) -> None:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = self.step(bar)
+        for (output, value) in zip(self.get_outputs(), values):
+            history = self.history[output]
+            history[:-1] = history[1:]
+            history[-1] = value
+
+class Streaming_RSI(Streaming_indicator):
+    def __init__(self, n_symbols: int, length: int = 14, keep: int = 3):
+        self.length = length
+        self.close = np.full(n_symbols, np.nan)
+        self.positive = Streaming_rma(n_symbols, length)
+        self.negative = Streaming_rma(n_symbols, length)
+        super().__init__(n_symbols, keep=keep)
+
+    def get_outputs(self) -> List[str]:
+        return ['RSI_{}'.format(self.length)]
+
+    def step(self, bar: Dict[str, np.ndarray]) -> Tuple[np.ndarray, ...]:
+        change = bar['close'] - self.close
+        self.close = bar['close']
+        positive = self.positive.update(np.where(change < 0, 0.0, change))
+        negative = self.negative.update(np.where(change > 0, 0.0, change))
+        return (100 * positive / (positive + np.abs(negative)),)
+
+class Streaming_RSI_reversal(Streaming_indicator):
+    """The padded threshold signal of get_RSI_reversal_trigger: 1 after a bearish, -1 after a bullish reversal."""
+    def __init__(self, 
+                 n_symbols: int, 
+                 length: int = 2, 
+                 upper_threshold: float = 95, 
+                 lower_threshold: float = 5, 
+                 keep: int = 3):
+        self.length = length
+        self.upper_threshold = upper_threshold
+        self.lower_threshold = lower_threshold
+        self.rsi = Streaming_RSI(n_symbols, length=length, keep=2)
+        self.signal = np.zeros(n_symbols)
+        super().__init__(n_symbols, keep=keep)
+
+    def get_outputs(self) -> List[str]:
+        return ['RSI_reversal_{}'.format(self.length)]
+
+    def step(self, bar: Dict[str, np.ndarray]) -> Tuple[np.ndarray, ...]:
+        self.rsi.update(bar)
+        (RSI_prev, RSI) = self.rsi.history[self.rsi.get_outputs()[0]]
+        bear = (RSI_prev >= self.upper_threshold) & (RSI < self.upper_threshold)
+        bull = (RSI_prev <= self.lower_threshold) & (RSI > self.lower_threshold)
+        thresholds = bear.astype(int) - bull.astype(int)
+        self.signal = np.where(thresholds != 0, thresholds, self.signal)
+        return (self.signal,)
+
+class Streaming_KDJ(Streaming_indicator):
+    """pandas_ta kdj. A zero range gets epsilon added on its own bar only (pandas_ta adds it to the whole column)."""
+    def __init__(self, n_symbols: int, length: int = 9, signal: int = 3, keep: int = 3):
+        self.length = length
+        self.signal = signal
+        self.high = Rolling_window(n_symbols, length)
+        self.low = Rolling_window(n_symbols, length)
+        self.k = Streaming_rma(n_symbols, signal)
+        self.d = Streaming_rma(n_symbols, signal)
+        super().__init__(n_symbols, keep=keep)
+
+    def get_outputs(self) -> List[str]:
+        return ['{}_{}_{}'.format(line, self.length, self.signal) for line in ['K', 'D', 'J']]
+
+    def step(self, bar: Dict[str, np.ndarray]) -> Tuple[np.ndarray, ...]:
+        self.high.update(bar['high'])
+        self.low.update(bar['low'])
+        lowest_low = self.low.get_window().min(axis=0)
+        value_range = self.high.get_window().max(axis=0) - lowest_low
+        value_range += sflt.epsilon * (value_range == 0)
+        k = self.k.update(100 * (bar['close'] - lowest_low) / value_range)
+        d = self.d.update(k)
+        return (k, d, 3 * k - 2 * d)
+
+class Streaming_MACD(Streaming_indicator):
+    def __init__(self, 
+                 n_symbols: int, 
+                 fast: int = 12, 
+                 slow: int = 26, 
+                 signal: int = 9, 
+                 keep: int = 3):
+        (fast, slow) = (slow, fast) if fast > slow else (fast, slow)
+        self.suffix = '{}_{}_{}'.format(fast, slow, signal)
+        self.fast = Streaming_ema(n_symbols, fast)
+        self.slow = Streaming_ema(n_symbols, slow)
+        self.signal = Streaming_ema(n_symbols, signal, from_first_valid=True)
+        super().__init__(n_symbols, keep=keep)
+
+    def get_outputs(self) -> List[str]:
+        return [name + self.suffix for name in ['MACD_', 'MACDh_', 'MACDs_']]
+
+    def step(self, bar: Dict[str, np.ndarray]) -> Tuple[np.ndarray, ...]:
+        macd = self.fast.update(bar['close']) - self.slow.update(bar['close'])
+        signal = self.signal.update(macd)
+        return (macd, macd - signal, signal)
+
+class Streaming_true_range:
+    """pandas_ta true_range (NaN on the first bar)."""
+    def __init__(self, n_symbols: int):
+        self.close = np.full(n_symbols, np.nan)
+        self.started = False
+
+    def update(self, bar: Dict[str, np.ndarray]) -> np.ndarray:
+        ranges = [np.abs(bar['high'] - bar['low']), 
+                  np.abs(bar['high'] - self.close), 
+                  np.abs(self.close - bar['low'])]
+        true_range = np.fmax(np.fmax(ranges[0], ranges[1]), ranges[2])
+        true_range = true_range if self.started else np.full_like(true_range, np.nan)
+        self.close = bar['close']
+        self.started = True
+        return true_range
+
+class Streaming_ADX(Streaming_indicator):
+    def __init__(self, 
+                 n_symbols: int, 
+                 length: int = 14, 
+                 lensig: Optional[int] = None, 
+                 keep: int = 3):
+        self.length = length
+        self.lensig = length if lensig is None else lensig
+        self.true_range = Streaming_true_range(n_symbols)
+        self.atr = Streaming_rma(n_symbols, length)
+        self.high = np.full(n_symbols, np.nan)
+        self.low = np.full(n_symbols, np.nan)
+        self.positive = Streaming_rma(n_symbols, length)
+        self.negative = Streaming_rma(n_symbols, length)
+        self.adx = Streaming_rma(n_symbols, self.lensig)
+        super().__init__(n_symbols, keep=keep)
+
+    def get_outputs(self) -> List[str]:
+        return ['ADX_{}'.format(self.lensig), 'DMP_{}'.format(self.length), 'DMN_{}'.format(self.length)]
+
+    def step(self, bar: Dict[str, np.ndarray]) -> Tuple[np.ndarray, ...]:
+        atr = self.atr.update(self.true_range.update(bar))
+        up = bar['high'] - self.high
+        down = self.low - bar['low']
+        (self.high, self.low) = (bar['high'], bar['low'])
+        positive = ((up > down) & (up > 0)) * up
+        negative = ((down > up) & (down > 0)) * down
+        positive[np.abs(positive) < sflt.epsilon] = 0
+        negative[np.abs(negative) < sflt.epsilon] = 0
+        k = 100 / atr
+        dmp = k * self.positive.update(positive)
+        dmn = k * self.negative.update(negative)
+        dx = 100 * np.abs(dmp - dmn) / (dmp + dmn)
+        return (self.adx.update(dx), dmp, dmn)
+
+class Streaming_HMA(Streaming_indicator):
+    def __init__(self, n_symbols: int, length: int = 10, keep: int = 3):
+        self.length = length
+        self.fast = Streaming_wma(n_symbols, int(length / 2))
+        self.slow = Streaming_wma(n_symbols, length)
+        self.hma = Streaming_wma(n_symbols, int(np.sqrt(length)))
+        super().__init__(n_symbols, keep=keep)
+
+    def get_outputs(self) -> List[str]:
+        return ['HMA_{}'.format(self.length)]
+
+    def step(self, bar: Dict[str, np.ndarray]) -> Tuple[np.ndarray, ...]:
+        return (self.hma.update(2 * self.fast.update(bar['close']) - self.slow.update(bar['close'])),)
+
+class Streaming_JMA(Streaming_indicator):
+    """pandas_ta jma; the volatility sums are rolling windows instead of slices of the whole history."""
+    sum_length = 10
+    average_length = 66
+
+    def __init__(self, n_symbols: int, length: int = 7, phase: float = 0, keep: int = 3):
+        self.length = length
+        self.phase = phase
+        half_length = 0.5 * (length - 1)
+        self.pr = 0.5 if phase < -100 else 2.5 if phase > 100 else 1.5 + phase * 0.01
+        self.length1 = max((np.log(np.sqrt(half_length)) / np.log(2.0)) + 2.0, 0)
+        self.pow1 = max(self.length1 - 2.0, 0.5)
+        length2 = self.length1 * np.sqrt(half_length)
+        self.bet = length2 / (length2 + 1)
+        self.beta = 0.45 * (length - 1) / (0.45 * (length - 1) + 2.0)
+        self.rows = 0
+        self.jma = self.ma1 = self.upper_band = self.lower_band = None
+        self.det0 = np.zeros(n_symbols)
+        self.det1 = np.zeros(n_symbols)
+        self.v_sum = np.zeros(n_symbols)
+        self.volty = Rolling_window(n_symbols, self.sum_length)
+        self.volty.values[:] = 0
+        self.v_sums = Rolling_window(n_symbols, self.average_length)
+        self.v_sums_total = np.zeros(n_symbols)
+        super().__init__(n_symbols, keep=keep)
+
+    def get_outputs(self) -> List[str]:
+        return ['JMA_{}_{}'.format(self.length, self.phase)]
+
+    def step(self, bar: Dict[str, np.ndarray]) -> Tuple[np.ndarray, ...]:
+        price = bar['close']
+        if self.rows == 0:
+            self.jma = self.ma1 = self.upper_band = self.lower_band = price.copy()
+            self.volty.update(np.zeros_like(price))
+            self.v_sums.update(self.v_sum)
+        else:
+            del1 = price - self.upper_band
+            del2 = price - self.lower_band
+            volty = np.where(np.abs(del1) != np.abs(del2), np.maximum(np.abs(del1), np.abs(del2)), 0)
+            oldest_volty = self.volty.values[self.volty.count % self.sum_length]
+            self.v_sum = self.v_sum + (volty - oldest_volty) / self.sum_length
+            self.volty.update(volty)
+            if self.v_sums.count >= self.average_length:
+                self.v_sums_total -= self.v_sums.values[self.v_sums.count % self.average_length]
+            self.v_sums.update(self.v_sum)
+            self.v_sums_total += self.v_sum
+            average_volty = self.v_sums_total / min(self.v_sums.count, self.average_length)
+            d_volty = np.where(average_volty == 0, 0, volty / average_volty)
+            r_volty = np.maximum(1.0, np.minimum(np.power(self.length1, 1 / self.pow1), d_volty))
+            power = np.power(r_volty, self.pow1)
+            kv = np.power(self.bet, np.sqrt(power))
+            self.upper_band = np.where(del1 > 0, price, price - kv * del1)
+            self.lower_band = np.where(del2 < 0, price, price - kv * del2)
+            alpha = np.power(self.beta, power)
+            self.ma1 = (1 - alpha) * price + alpha * self.ma1
+            self.det0 = (price - self.ma1) * (1 - self.beta) + self.beta * self.det0
+            ma2 = self.ma1 + self.pr * self.det0
+            self.det1 = (ma2 - self.jma) * (1 - alpha) * (1 - alpha) + alpha * alpha * self.det1
+            self.jma = self.jma + self.det1
+        self.rows += 1
+        return (self.jma if self.rows >= self.length else np.full_like(price, np.nan),)
+
+class Streaming_CCI(Streaming_indicator):
+    def __init__(self, n_symbols: int, length: int = 14, c: float = 0.015, keep: int = 3):
+        self.length = length
+        self.c = c
+        self.typical_price = Rolling_window(n_symbols, length)
+        super().__init__(n_symbols, keep=keep)
+
+    def get_outputs(self) -> List[str]:
+        return ['CCI_{}_{}'.format(self.length, self.c)]
+
+    def step(self, bar: Dict[str, np.ndarray]) -> Tuple[np.ndarray, ...]:
+        typical_price = (bar['high'] + bar['low'] + bar['close']) / 3.0
+        self.typical_price.update(typical_price)
+        window = self.typical_price.get_window()
+        mean = window.mean(axis=0)
+        mad = np.abs(window - mean).mean(axis=0)
+        return ((typical_price - mean) / (self.c * mad),)
+
+class Streaming_MFI(Streaming_indicator):
+    def __init__(self, n_symbols: int, length: int = 14, keep: int = 3):
+        self.length = length
+        self.typical_price = np.full(n_symbols, np.nan)
+        self.positive = Rolling_window(n_symbols, length)
+        self.negative = Rolling_window(n_symbols, length)
+        super().__init__(n_symbols, keep=keep)
+
+    def get_outputs(self) -> List[str]:
+        return ['MFI_{}'.format(self.length)]
+
+    def step(self, bar: Dict[str, np.ndarray]) -> Tuple[np.ndarray, ...]:
+        typical_price = (bar['high'] + bar['low'] + bar['close']) / 3.0
+        raw_money_flow = typical_price * bar['volume']
+        change = typical_price - self.typical_price
+        self.typical_price = typical_price
+        self.positive.update(np.where(change > 0, raw_money_flow, 0.0))
+        self.negative.update(np.where(change < 0, raw_money_flow, 0.0))
+        positive = self.positive.get_window().sum(axis=0)
+        negative = self.negative.get_window().sum(axis=0)
+        return (100 * positive / (positive + negative),)
+
+class Streaming_CHOP(Streaming_indicator):
+    def __init__(self, 
+                 n_symbols: int, 
+                 length: int = 14, 
+                 atr_length: int = 1, 
+                 scalar: float = 100, 
+                 keep: int = 3):
+        self.name = 'CHOP_{}_{}_{}'.format(length, atr_length, scalar)
+        self.length = length
+        self.scalar = scalar
+        self.true_range = Streaming_true_range(n_symbols)
+        self.atr = Streaming_rma(n_symbols, atr_length)
+        self.atrs = Rolling_window(n_symbols, length)
+        self.high = Rolling_window(n_symbols, length)
+        self.low = Rolling_window(n_symbols, length)
+        super().__init__(n_symbols, keep=keep)
+
+    def get_outputs(self) -> List[str]:
+        return [self.name]
+
+    def step(self, bar: Dict[str, np.ndarray]) -> Tuple[np.ndarray, ...]:
+        self.atrs.update(self.atr.update(self.true_range.update(bar)))
+        self.high.update(bar['high'])
+        self.low.update(bar['low'])
+        value_range = self.high.get_window().max(axis=0) - self.low.get_window().min(axis=0)
+        atr_sum = self.atrs.get_window().sum(axis=0)
+        return (self.scalar * (np.log10(atr_sum) - np.log10(value_range)) / np.log10(self.length),)
+
+class Streaming_heikin_ashi:
+    """pandas_ta ha, one bar at a time."""
+    def __init__(self, n_symbols: int):
+        self.open = None
+        self.close = None
+
+    def update(self, bar: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        close = 0.25 * (bar['open'] + bar['high'] + bar['low'] + bar['close'])
+        open = 0.5 * (bar['open'] + bar['close']) if self.open is None else 0.5 * (self.open + self.close)
+        (self.open, self.close) = (open, close)
+        return {'open': open, 
+                'high': np.fmax(np.fmax(open, bar['high']), close), 
+                'low': np.fmin(np.fmin(open, bar['low']), close), 
+                'close': close, 
+                'volume': bar['volume']}
+
+# Variable definitions.
+INDICATORS = {'rsi': Streaming_RSI, 
+              'rsi_reversal': Streaming_RSI_reversal, 
+              'kdj': Streaming_KDJ, 
+              'macd': Streaming_MACD, 
+              'adx': Streaming_ADX, 
+              'hma': Streaming_HMA, 
+              'jma': Streaming_JMA, 
+              'cci': Streaming_CCI, 
+              'mfi': Streaming_MFI, 
+              'chop': Streaming_CHOP}
+
+# The indicators of the output triggers, and those of get_heikin_ashi_trigger (on Heikin-Ashi bars).
+TRIGGER_INDICATORS = [('rsi', {'length': 6}), ('rsi', {'length': 12}), ('rsi', {'length': 24}), 
+                      ('kdj', {'length': 5, 'signal': 3}), ('jma', {'length': 7, 'phase': 0}), 
+                      ('rsi_reversal', {'length': 2, 'upper_threshold': 95, 'lower_threshold': 5})]
+HEIKIN_ASHI_INDICATORS = [('adx', {}), ('adx', {'length': 14, 'lensig': 8}), ('cci', {'length': 22}), 
+                          ('mfi', {'length': 11}), ('chop', {}), ('macd', {}), ('rsi', {'length': 5})]
+
+# Function definitions.
+def get_indicator_key(name: str, **parameters) -> Tuple[str, Tuple[Tuple[str, object], ...]]:
+    """Return (name, parameters with their defaults) so that rsi() and rsi(length=14) share a key."""
+    parameters = {key: value for (key, value) in parameters.items() if key != 'talib'}
+    arguments = signature(INDICATORS[name]).bind(0, **parameters)
+    arguments.apply_defaults()
+    arguments = {key: value for (key, value) in arguments.arguments.items()
+                 if key not in ['n_symbols', 'keep']}
+    return (name, tuple(sorted(arguments.items())))
+
+# Class definition.
+class Streaming_indicators:
+    """Streaming indicators of every symbol of an output dataset.
+
+    seed() runs the whole history through the indicators once; update()
+    then advances them by the new closed bars only, each bar costing
+    O(symbols) whatever the history length (the rolling windows cost
+    O(window x symbols)). peek() returns a copy advanced by a bar still
+    being formed, leaving the closed-bar state untouched. Symbols which
+    appear after seed() are ignored until the next seed().
+    """
+    features = ['open', 'high', 'low', 'close']
+
+    def __init__(self, 
+                 indicators: List[Tuple[str, Dict[str, object]]] = TRIGGER_INDICATORS, 
+                 heikin_ashi: bool = False, 
+                 volume: str = 'base_volume', 
+                 keep: int = 3):
+        """
+        :param indicators: (name, parameters) of the indicators to maintain (see INDICATORS).
+        :param heikin_ashi: compute the indicators on Heikin-Ashi bars.
+        :param volume: feature used as the volume.
+        :param keep: last values kept per output.
+        """
+        self.specifications = indicators
+        self.heikin_ashi = heikin_ashi
+        self.volume = volume
+        self.keep = keep
+        self.symbols = pd.Index([])
+        self.dates = pd.DatetimeIndex([])
+        self.indicators = {}
+        self.transform = None
+
+    def seed(self, dataset: pd.DataFrame) -> None:
+        (self.symbols, matrices) = get_feature_matrices(dataset, self.features + [self.volume])
+        n_symbols = self.symbols.shape[0]
+        self.indicators = {get_indicator_key(name, **parameters):
+                           INDICATORS[name](n_symbols, keep=self.keep, **parameters)
+                           for (name, parameters) in self.specifications}
+        self.transform = Streaming_heikin_ashi(n_symbols) if self.heikin_ashi else None
+        self.dates = pd.DatetimeIndex([])
+        self.advance(dataset.index, matrices)
+
+    def update(self, dataset: pd.DataFrame) -> None:
+        """Advance the indicators by the closed bars of dataset (the rows after the last one seen)."""
+        if self.dates.shape[0] > 0:
+            dataset = dataset.loc[dataset.index > self.dates[-1]]
+        (symbols, matrices) = get_feature_matrices(dataset, self.features + [self.volume])
+        positions = symbols.get_indexer(self.symbols)
+        for (feature, values) in matrices.items():
+            values = values[:, positions]
+            values[:, positions < 0] = np.nan
+            matrices[feature] = values
+        self.advance(dataset.index, matrices)
+
+    def peek(self, dataset: pd.DataFrame) -> 'Streaming_indicators':
+        """Return a copy advanced by the newest (still open) bars of dataset."""
+        indicators = deepcopy(self)
+        indicators.update(dataset)
+        return indicators
+
+    def advance(self, dates: pd.Index, matrices: Dict[str, np.ndarray]) -> None:
+        for row in range(len(dates)):
+            bar = {feature: matrices[feature][row] for feature in self.features}
+            bar['volume'] = matrices[self.volume][row]
+            if self.transform is not None:
+                bar = self.transform.update(bar)
+            for indicator in self.indicators.values():
+                indicator.update(bar)
+        self.dates = self.dates.append(pd.DatetimeIndex(dates))[-self.keep:]
+
+    def get(self, name: str, **parameters) -> Dict[str, np.ndarray]:
+        """Return the (keep x symbols) history of every output of an indicator."""
+        key = get_indicator_key(name, **parameters)
+        if key not in self.indicators:
+            raise KeyError('{} is not maintained, add it to the indicators before seed().'.format(key))
+        return self.indicators[key].history
+
+    def view(self, symbol: str, data: Optional[pd.DataFrame] = None) -> 'Indicator_view':
+        """Return the indicators of symbol (data is unused, the state being already advanced)."""
+        return Indicator_view(self, self.symbols.get_loc(symbol))
+
+    def __getitem__(self, symbol: str) -> 'Indicator_view':
+        return self.view(symbol)
+
+class Indicator_view:
+    """The streaming indicators of one symbol, queried like the pandas_ta accessor (data.ta).
+
+    view.rsi(length=6) returns the last keep values as pandas_ta would name
+    them: a Series for one output, a DataFrame for several.
+    """
+    def __init__(self, indicators: Streaming_indicators, column: int):
+        """
+        :param indicators: streaming indicators of all the symbols.
+        :param column: position of the symbol.
+        """
+        self.indicators = indicators
+        self.column = column
+
+    def __getattr__(self, name: str):
+        if name not in INDICATORS:
+            raise AttributeError(name)
+
+        def get(**parameters):
+            history = self.indicators.get(name, **parameters)
+            dates = self.indicators.dates
+            frame = pd.DataFrame({output: values[values.shape[0] - dates.shape[0]:, self.column]
+                                  for (output, values) in history.items()}, index=dates)
+            return frame.iloc[:, 0] if frame.shape[1] == 1 else frame
+        return get
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        utils/ticker_replay.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: Local websocket server replaying recorded ticker stream messages.
+
+# Library imports.
+from typing import List, Optional, Tuple, Union
+from threading import Event, Thread
+from .ticker_stream import read_stream_messages
+import asyncio
+import websockets
+
+# Class definition.
+class Ticker_replay_server:
+    """Serve recorded (receive time, raw message) pairs to every client.
+
+    The messages are sent with their recorded spacing divided by speed
+    (0 sends them back to back), then the connection is closed, or the
+    replay restarts when repeat is set.
+    """
+    def __init__(self, 
+                 messages: Union[str, List[Tuple[float, str]]], 
+                 host: str = '127.0.0.1', 
+                 port: int = 0, 
+                 speed: float = 1.0, 
+                 repeat: bool = False):
+        """
+        :param messages: recorded messages or the file Ticker_stream recorded them in.
+        :param host: interface to listen on.
+        :param port: port to listen on (0 picks a free one).
+        :param speed: replay speed factor.
+        :param repeat: whether to replay the messages in a loop.
+        """
+        if isinstance(messages, str):
+            messages = read_stream_messages(messages)
+        self.messages = messages
+        self.host = host
+        self.port = port
+        self.speed = speed
+        self.repeat = repeat
+        self.started = Event()
+        self.stopping = None
+        self.loop = None
+        self.thread = None
+        self.sent = 0
+
+    def get_url(self) -> str:
+        return 'ws://{}:{}'.format(self.host, self.port)
+
+    async def handle(self, websocket) -> None:
+        while True:
+            previous = self.messages[0][0] if len(self.messages) > 0 else 0.0
+            for (t, message) in self.messages:
+                if self.speed > 0 and t > previous:
+                    await asyncio.sleep((t - previous) / self.speed)
+                previous = t
+                await websocket.send(message)
+                self.sent += 1
+            if not self.repeat:
+                break
+
+    async def serve(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        async with websockets.serve(self.handle, self.host, self.port, max_size=None) as server:
+            self.port = server.sockets[0].getsockname()[1]
+            self.started.set()
+            await self.stopping.wait()
+
+    def start(self) -> str:
+        """Start serving from a background thread and return the URL."""
+        self.thread = Thread(target=asyncio.run, args=(self.serve(),), 
+                             name='ticker_replay', daemon=True)
+        self.thread.start()
+        self.started.wait()
+        return self.get_url()
+
+    def stop(self) -> None:
+        if self.thread is not None:
+            self.loop.call_soon_threadsafe(self.stopping.set)
+            self.thread.join()
+            self.thread = None
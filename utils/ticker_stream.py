@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# File:        utils/ticker_stream.py
+# By:          Samuel Duclos
+# For          Myself
+# Description: All-market ticker websocket streams kept as an in-memory client.get_ticker() table.
+
+# Library imports.
+from typing import Dict, List, Optional, Tuple, Union
+from threading import Event, Lock, Thread
+from binance.client import Client
+import asyncio
+import gzip
+import json
+import time
+import pandas as pd
+import websockets
+
+# Variable definitions.
+BINANCE_STREAM_URL = 'wss://stream.binance.com:9443/stream?streams='
+DEFAULT_TICKER_STREAMS = ['!ticker@arr', '!bookTicker']
+TICKER_STREAM_FIELDS = {
+    's': 'symbol', 'p': 'priceChange', 'P': 'priceChangePercent', 
+    'w': 'weightedAvgPrice', 'x': 'prevClosePrice', 'c': 'lastPrice', 
+    'Q': 'lastQty', 'b': 'bidPrice', 'B': 'bidQty', 'a': 'askPrice', 
+    'A': 'askQty', 'o': 'openPrice', 'h': 'highPrice', 'l': 'lowPrice', 
+    'v': 'volume', 'q': 'quoteVolume', 'O': 'openTime', 'C': 'closeTime', 
+    'F': 'firstId', 'L': 'lastId', 'n': 'count'}
+BOOK_TICKER_STREAM_FIELDS = {'b': 'bidPrice', 'B': 'bidQty', 'a': 'askPrice', 'A': 'askQty'}
+
+# Function definitions.
+def open_stream_log(path: str, mode: str = 'rt'):
+    return gzip.open(path, mode) if path.endswith('.gz') else open(path, mode)
+
+def read_stream_messages(path: str) -> List[Tuple[float, str]]:
+    """Read the (receive time, raw message) pairs recorded by Ticker_stream."""
+    with open_stream_log(path, 'rt') as f:
+        return [(record['t'], record['m']) for record in map(json.loads, f)]
+
+def write_stream_messages(messages: List[Tuple[float, str]], path: str) -> None:
+    with open_stream_log(path, 'wt') as f:
+        for (t, message) in messages:
+            f.write(json.dumps({'t': t, 'm': message}) + '\n')
+
+# Class definition.
+class Ticker_table:
+    """client.get_ticker() records by symbol, updated in place by stream events.
+
+    '24hrTicker' events replace the record of their symbol, bookTicker
+    events only update the bid and ask of a known symbol.
+    """
+    def __init__(self):
+        self.records = {}
+        self.lock = Lock()
+        self.updates = 0
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def put_tickers(self, tickers: List[Dict[str, object]]) -> None:
+        """Seed (or reset) the table, e.g. from client.get_ticker()."""
+        with self.lock:
+            for ticker in tickers:
+                self.records[ticker['symbol']] = dict(ticker)
+
+    def apply(self, message: Union[Dict, List]) -> int:
+        """Apply a raw or combined stream message, return the updated records."""
+        if isinstance(message, dict) and 'data' in message:
+            message = message['data']
+        events = message if isinstance(message, list) else [message]
+        updated = 0
+        with self.lock:
+            for event in events:
+                if event.get('e') == '24hrTicker':
+                    self.records[event['s']] = {name: event[key] for (key, name) in
+                                                TICKER_STREAM_FIELDS.items() if key in event}
+                    updated += 1
+                elif 'u' in event and event.get('s') in self.records:
+                    record = self.records[event['s']]
+                    for (key, name) in BOOK_TICKER_STREAM_FIELDS.items():
+                        record[name] = event[key]
+                    updated += 1
+            self.updates += updated
+        return updated
+
+    def get_tickers(self) -> List[Dict[str, object]]:
+        """Return a snapshot of the table as client.get_ticker() would."""
+        with self.lock:
+            return [dict(record) for record in self.records.values()]
+
+    def get_snapshot(self) -> pd.DataFrame:
+        return pd.DataFrame(self.get_tickers())
+
+class Ticker_stream:
+    """Ticker_table fed by the all-market ticker streams from a background thread.
+
+    Reconnects with exponential backoff. The table keeps the last known
+    records meanwhile, so snapshots stay available (and stale) offline.
+    """
+    def __init__(self, 
+                 url: Optional[str] = None, 
+                 streams: Optional[List[str]] = None, 
+                 client: Optional[Client] = None, 
+                 record_path: Optional[str] = None, 
+                 reconnect_delay: float = 1.0, 
+                 max_reconnect_delay: float = 60.0):
+        """
+        :param url: websocket URL, the Binance combined streams URL by default.
+        :param streams: streams of the default URL, all-market tickers and book tickers.
+        :param client: python-binance client seeding the table with client.get_ticker().
+        :param record_path: file (gzipped if it ends with .gz) recording the raw messages.
+        :param reconnect_delay: first delay before reconnecting, doubled after each failure.
+        :param max_reconnect_delay: longest delay before reconnecting.
+        """
+        if url is None:
+            streams = DEFAULT_TICKER_STREAMS if streams is None else streams
+            url = BINANCE_STREAM_URL + '/'.join(streams)
+        self.url = url
+        self.client = client
+        self.record_path = record_path
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.table = Ticker_table()
+        self.connected = Event()
+        self.stopping = Event()
+        self.thread = None
+        self.messages = 0
+        self.reconnects = 0
+
+    def start(self) -> None:
+        if self.client is not None and len(self.table) == 0:
+            self.table.put_tickers(self.client.get_ticker())
+        self.stopping.clear()
+        self.thread = Thread(target=asyncio.run, args=(self.listen(),), 
+                             name='ticker_stream', daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def wait_connected(self, timeout: Optional[float] = None) -> bool:
+        return self.connected.wait(timeout)
+
+    async def listen(self) -> None:
+        delay = self.reconnect_delay
+        record = None if self.record_path is None else open_stream_log(self.record_path, 'at')
+        try:
+            while not self.stopping.is_set():
+                try:
+                    async with websockets.connect(self.url, max_size=None) as websocket:
+                        self.connected.set()
+                        delay = self.reconnect_delay
+                        while not self.stopping.is_set():
+                            try:
+                                message = await asyncio.wait_for(websocket.recv(), timeout=1.0)
+                            except asyncio.TimeoutError:
+                                continue
+                            if record is not None:
+                                record.write(json.dumps({'t': time.time(), 'm': message}) + '\n')
+                            self.table.apply(json.loads(message))
+                            self.messages += 1
+                except websockets.exceptions.ConnectionClosedOK:
+                    pass
+                except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException) as e:
+                    print(e)
+                self.connected.clear()
+                if not self.stopping.is_set():
+                    self.reconnects += 1
+                    await asyncio.get_running_loop().run_in_executor(None, self.stopping.wait, delay)
+                    delay = min(2 * delay, self.max_reconnect_delay)
+        finally:
+            if record is not None:
+                record.close()
+
+    def get_tickers(self) -> List[Dict[str, object]]:
+        return self.table.get_tickers()
+
+    def get_snapshot(self) -> pd.DataFrame:
+        return self.table.get_snapshot()
@@ -10,6 +10,7 @@
 from typing import Dict, List, Optional, Tuple
 from binance.client import Client
 from ..conversion import make_tradable_quantity, convert_price
+from ..conversion import get_base_asset_from_pair
 from ..conversion import get_shortest_pair_path_between_assets
 from ..conversion import select_pair_with_highest_quote_volume_from_base_asset
 from ..conversion_table import get_conversion_table
@@ -125,7 +126,7 @@ def add_entry_to_blacklist(blacklist: pd.DataFrame,
                            conversion_table: pd.DataFrame, 
                            exchange_info: pd.DataFrame, 
                            reason: str = 'stop_loss') -> pd.DataFrame:
-    base_asset_from_pair = exchange_info[exchange_info['symbol'] == pair]['base_asset'].iat[0]
+    base_asset_from_pair = get_base_asset_from_pair(pair, exchange_info=exchange_info)
     if base_asset_from_pair not in blacklist['base_asset'].tolist():
         new_blacklist_entry = conversion_table[conversion_table['symbol'] == pair][['symbol', 'close']].copy()
         new_blacklist_entry['base_asset'] = base_asset_from_pair
@@ -174,7 +175,7 @@ def check_if_asset_from_pair_is_buyable(blacklist: pd.DataFrame,
                                         stop_loss_count: int = 1, 
                                         profit_count: int = 2, 
                                         loss_count: int = 1) -> bool:
-    base_asset_from_pair = exchange_info[exchange_info['symbol'] == pair]['base_asset'].iat[0]
+    base_asset_from_pair = get_base_asset_from_pair(pair, exchange_info=exchange_info)
     is_buyable = True
     if base_asset_from_pair in blacklist['base_asset'].tolist():
         pair = blacklist[blacklist['base_asset'] == base_asset_from_pair]['symbol'].iat[0]
@@ -326,8 +327,8 @@ def trade_conditionally(ssh: paramiko.SSHClient,
                 to_asset, conversion_table, exchange_info)
             blacklist = add_entry_to_blacklist(
                 blacklist, pair, conversion_table, exchange_info, reason=None)
-            base_asset_from_pair = exchange_info[
-                exchange_info['symbol'] == pair]['base_asset'].iat[0]
+            base_asset_from_pair = get_base_asset_from_pair(
+                pair, exchange_info=exchange_info)
             pair = blacklist[blacklist['base_asset'] == base_asset_from_pair][
                 'symbol'].iat[0]
             blacklist.loc[blacklist['symbol'] == pair,'symbol'] = \